@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Скрипт для переноса старых завершённых выполнений алгоритмов в архивную БД (duty_app_archive.db).
+Запускать из корневой директории проекта: python archive_executions.py --days 180 [--vacuum]
+"""
+
+import argparse
+from pathlib import Path
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+
+DB_PATH = "duty_app.db"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Архивация завершённых выполнений алгоритмов.")
+    parser.add_argument("--days", type=int, default=180,
+                        help="Переносить выполнения, завершённые более указанного числа дней назад (по умолчанию 180).")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Выполнить VACUUM основной БД после переноса.")
+    parser.add_argument("--db", default=DB_PATH, help=f"Путь к основной БД (по умолчанию {DB_PATH}).")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"База данных не найдена: {args.db}")
+        return
+
+    manager = SQLiteDatabaseManager(args.db)
+    archived_count = manager.archive_completed_executions(args.days, vacuum=args.vacuum)
+    if archived_count < 0:
+        print("Ошибка при архивации. Подробности в журнале.")
+    else:
+        print(f"Перенесено в архив выполнений: {archived_count} (архив: {manager.archive_db_path})")
+
+
+if __name__ == "__main__":
+    main()
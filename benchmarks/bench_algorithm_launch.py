@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк запуска алгоритма (start_algorithm_execution) против "сырой" вставки тех же строк.
+Запускать из корневой директории проекта: python benchmarks/bench_algorithm_launch.py
+
+Создаёт временную БД с алгоритмом на --actions действий (технический текст, телефоны, отчётные
+материалы) и измеряет время запуска. Для сравнения те же строки action_executions с заранее
+рассчитанными временами вставляются одним executemany - это нижняя граница стоимости вставки
+в SQLite (с теми же триггерами очереди и полнотекстового индекса).
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+
+TECHNICAL_TEXT = "Порядок выполнения: проверить, доложить, зафиксировать в журнале. " * 20
+
+
+def create_database(path: str, actions: int, time_type: str) -> SQLiteDatabaseManager:
+    manager = SQLiteDatabaseManager(path)
+    conn = manager._get_connection()
+    conn.execute("INSERT INTO algorithms (id, name, category, time_type) VALUES (1, 'Запуск', 'повседневная деятельность', ?);",
+                 (time_type,))
+    conn.executemany(
+        "INSERT INTO actions (algorithm_id, description, technical_text, start_offset, end_offset, "
+        "start_offset_seconds, end_offset_seconds, contact_phones, report_materials) "
+        "VALUES (1, ?, ?, ?, ?, ?, ?, '+7 (900) 000-00-00', ?);",
+        (
+            (f"Действие {i}", f"{TECHNICAL_TEXT}\nДействие {i}",
+             f"{i // 24} {i % 24:02d}:00:00", f"{i // 24} {i % 24:02d}:30:00", i * 3600, i * 3600 + 1800,
+             f"C:/Отчёты/{i}.docx\nC:/Отчёты/{i}.xlsx")
+            for i in range(actions)
+        ),
+    )
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def raw_insert(manager: SQLiteDatabaseManager, rows: list) -> None:
+    """Нижняя граница: вставка готовых строк action_executions (новое выполнение, без материалов)."""
+    conn = manager._get_connection()
+    with conn:
+        execution_id = conn.execute(
+            "INSERT INTO algorithm_executions (algorithm_id, snapshot_name, snapshot_category, snapshot_time_type, started_at) "
+            "SELECT algorithm_id, snapshot_name, snapshot_category, snapshot_time_type, started_at "
+            "FROM algorithm_executions WHERE id = 1;"
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO action_executions (execution_id, snapshot_description, snapshot_technical_text_hash, "
+            "snapshot_contact_phones, calculated_start_time, calculated_end_time) VALUES (?, ?, ?, ?, ?, ?);",
+            [(execution_id, *row) for row in rows],
+        )
+    conn.close()
+
+
+def best_time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк запуска алгоритма.")
+    parser.add_argument("--actions", type=int, default=500, help="Количество действий в алгоритме.")
+    parser.add_argument("--repeat", type=int, default=10, help="Количество повторов (берётся лучшее время).")
+    args = parser.parse_args()
+
+    print(f"{'time_type':<16} | {'действий':>8} | {'запуск, мс':>10} | {'вставка, мс':>11} | {'запуск / вставка':>16}")
+    print("-" * 74)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for time_type in ("оперативное", "астрономическое"):
+            manager = create_database(os.path.join(tmp_dir, f"{time_type}.db"), args.actions, time_type)
+            user_id = manager._get_connection().execute("SELECT id FROM users LIMIT 1;").fetchone()[0]
+            with redirect_stdout(io.StringIO()):
+                manager.start_algorithm_execution(1, "2025-01-01 08:00:00", user_id)  # Снимки текстов уже в snapshot_blobs
+            conn = manager._get_connection()
+            rows = conn.execute(
+                "SELECT snapshot_description, snapshot_technical_text_hash, snapshot_contact_phones, "
+                "calculated_start_time, calculated_end_time FROM action_executions WHERE execution_id = 1 ORDER BY id;"
+            ).fetchall()
+            conn.close()
+
+            launch_ms = best_time(lambda: manager.start_algorithm_execution(1, "2025-01-01 08:00:00", user_id), args.repeat)
+            insert_ms = best_time(lambda: raw_insert(manager, rows), args.repeat)
+            print(f"{time_type:<16} | {len(rows):>8} | {launch_ms:>10.2f} | {insert_ms:>11.2f} | {launch_ms / insert_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
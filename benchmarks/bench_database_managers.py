@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк "горячих" методов менеджеров БД на синтетической нагрузке (benchmarks/workload.py).
+Запускать из корневой директории проекта:
+python benchmarks/bench_database_managers.py [--years 3 --executions-per-day 20] [--json результат.json]
+    [--baseline прошлый.json --tolerance 0.25] [--postgres "host=... dbname=... user=... password=..."]
+    [--trace-sql query_trace.json]
+
+SQLite - временная БД по init_sqlite_schema.sql. PostgreSQL - только при --postgres: нужна отдельная
+ПУСТАЯ БД с применённой init_postgres_schema.sql (бенчмарк наполняет её и запускает алгоритмы).
+Замеряются запуск и остановка алгоритма, активные действия, история за дату, списки организаций,
+суточная статистика и построение отчёта по выполнению: --repeat повторов, минимум, медиана,
+95-й процентиль и максимум в мс. --json сохраняет результаты в машиночитаемом виде; с --baseline
+медианы сравниваются с прошлым прогоном, и замедление больше --tolerance даёт код возврата 1.
+--trace-sql собирает статистику запросов замеряемых операций с планами медленных (отчёт -
+query_report.py); трассировка добавляет накладные расходы, поэтому с --baseline её не сочетают.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+from diagnostics.query_tracer import QueryTracer
+from reports.execution_report import render_execution_report
+from workload import CATEGORIES, DEFAULT_WORKLOAD, seed_postgres, seed_sqlite
+
+# Минимальное время (мс), ниже которого медиана не считается регрессией: шум таймера и планировщика
+MIN_REGRESSION_MS = 1.0
+
+
+def quiet(func, *args, **kwargs):
+    """Менеджеры печатают диагностику в stdout - в замеры она не попадает."""
+    with redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def row_count(result) -> int:
+    if isinstance(result, dict) and "items" in result:
+        return len(result["items"])
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 1 if result else 0
+
+
+def measure(operation, repeat: int) -> dict:
+    """
+    Замер операции: один прогрев, затем repeat вызовов.
+    :param operation: Функция (номер повтора) -> результат метода.
+    """
+    quiet(operation, 0)
+    timings, rows = [], 0
+    for index in range(repeat):
+        started = time.perf_counter()
+        result = quiet(operation, index)
+        timings.append((time.perf_counter() - started) * 1000)
+        rows = row_count(result)
+    timings.sort()
+    return {
+        "repeat": repeat,
+        "rows": rows,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def operations(manager, workload: dict, today: datetime.date, user_id: int, seed: int) -> dict:
+    """Операции бенчмарка: имя -> функция (номер повтора) -> результат."""
+    rng = random.Random(seed)
+    history_days = workload["years"] * 365
+    history_executions = history_days * workload["executions_per_day"]
+    first_day = today - datetime.timedelta(days=history_days)
+    history_dates = [first_day + datetime.timedelta(days=rng.randrange(history_days)) for _ in range(64)]
+    history_ids = [rng.randint(1, history_executions) for _ in range(64)] if history_executions else [1]
+    launched = []
+
+    def launch(index):
+        algorithm_id = rng.randint(1, workload["algorithms"])
+        execution_id = manager.start_algorithm_execution(algorithm_id, f"{today.isoformat()} 09:00:00", user_id)
+        launched.append(execution_id)
+        return execution_id
+
+    def stop(index):
+        return manager.stop_algorithm(launched.pop(), datetime.datetime.combine(today, datetime.time(18, 0)))
+
+    def report(index):
+        execution_id = history_ids[index % len(history_ids)]
+        exec_data = manager.get_algorithm_execution_by_id(execution_id)
+        actions = manager.get_action_executions_by_execution_id(execution_id)
+        return render_execution_report(exec_data, actions, "Arial", 12, "normal", "Бенчмарк", today.year)
+
+    month_start = (today - datetime.timedelta(days=30)).isoformat()
+    # Порядок важен: остановка берёт выполнения, запущенные замером запуска
+    return {
+        "get_active_action_executions_with_details": lambda index: manager.get_active_action_executions_with_details(),
+        "get_active_executions_by_category": lambda index: manager.get_active_executions_by_category(
+            CATEGORIES[index % len(CATEGORIES)]),
+        "get_executions_by_date_page": lambda index: manager.get_executions_by_date_page(
+            history_dates[index % len(history_dates)].isoformat()),
+        "get_completed_executions_by_category_and_date_page":
+            lambda index: manager.get_completed_executions_by_category_and_date_page(
+                CATEGORIES[index % len(CATEGORIES)], history_dates[index % len(history_dates)].strftime("%d.%m.%Y")),
+        "get_organizations_page": lambda index: manager.get_organizations_page(),
+        "get_all_organizations": lambda index: manager.get_all_organizations(),
+        "get_daily_execution_stats_month": lambda index: manager.get_daily_execution_stats(month_start, today.isoformat()),
+        "execution_report": report,
+        "start_algorithm_execution": launch,
+        "stop_algorithm": stop,
+    }
+
+
+def run_backend(backend: str, manager, seed_func, workload: dict, repeat: int, tracer=None) -> list:
+    today = datetime.date.today()
+    started = time.perf_counter()
+    counts = quiet(seed_func, manager, today, **workload)
+    seed_seconds = time.perf_counter() - started
+    print(f"[{backend}] наполнение: {', '.join(f'{table} {count}' for table, count in counts.items())} "
+          f"за {seed_seconds:.1f} с")
+
+    conn = manager._get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT id FROM {'app_schema.' if backend == 'postgresql' else ''}users ORDER BY id LIMIT 1;")
+    user_id = cursor.fetchone()[0]
+    cursor.close()
+    if backend == "sqlite":
+        conn.close()
+    if tracer is not None:  # Наполнение в статистику запросов не попадает
+        tracer.install(manager)
+
+    results = []
+    for name, operation in operations(manager, workload, today, user_id, workload["seed"]).items():
+        result = {"backend": backend, "operation": name, **measure(operation, repeat)}
+        results.append(result)
+        print(f"[{backend}] {name:<52} | {result['median_ms']:>10.3f} | {result['p95_ms']:>10.3f} | "
+              f"{result['max_ms']:>10.3f} | {result['rows']:>6}")
+    return results
+
+
+def compare_with_baseline(results: list, baseline_path: str, tolerance: float) -> list:
+    """Операции, медиана которых выросла больше чем на tolerance относительно прошлого прогона."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(item["backend"], item["operation"]): item for item in json.load(f)["results"]}
+    regressions = []
+    for item in results:
+        previous = baseline.get((item["backend"], item["operation"]))
+        if previous is None:
+            continue
+        if item["median_ms"] > max(previous["median_ms"] * (1 + tolerance), previous["median_ms"] + MIN_REGRESSION_MS):
+            regressions.append({
+                "backend": item["backend"], "operation": item["operation"],
+                "baseline_median_ms": previous["median_ms"], "median_ms": item["median_ms"],
+            })
+    return regressions
+
+
+def parse_postgres_config(value: str) -> dict:
+    """'host=... port=... dbname=... user=... password=...' -> параметры PostgreSQLDatabaseManager."""
+    config = dict(part.split("=", 1) for part in value.split())
+    config.setdefault("host", "localhost")
+    config["port"] = int(config.get("port", 5432))
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк методов менеджеров БД на синтетической нагрузке.")
+    parser.add_argument("--algorithms", type=int, default=DEFAULT_WORKLOAD["algorithms"], help="Количество алгоритмов.")
+    parser.add_argument("--actions", type=int, default=DEFAULT_WORKLOAD["actions"], help="Действий в алгоритме.")
+    parser.add_argument("--executions-per-day", type=int, default=DEFAULT_WORKLOAD["executions_per_day"],
+                        help="Выполнений в сутки истории.")
+    parser.add_argument("--years", type=int, default=DEFAULT_WORKLOAD["years"], help="Лет истории.")
+    parser.add_argument("--organizations", type=int, default=DEFAULT_WORKLOAD["organizations"],
+                        help="Организаций в справочнике.")
+    parser.add_argument("--active", type=int, default=DEFAULT_WORKLOAD["active_executions"],
+                        help="Активных выполнений текущего дня.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_WORKLOAD["seed"], help="Начальное значение генератора.")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторов каждой операции.")
+    parser.add_argument("--postgres", help="Параметры пустой БД PostgreSQL ('host=... dbname=... user=... password=...').")
+    parser.add_argument("--skip-sqlite", action="store_true", help="Не замерять SQLite.")
+    parser.add_argument("--json", dest="json_path", help="Файл для результатов в формате JSON.")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения медиан.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Допустимый рост медианы относительно --baseline (по умолчанию 0.25 = 25%%).")
+    parser.add_argument("--trace-sql", help="Файл для статистики SQL-запросов с планами медленных.")
+    parser.add_argument("--trace-sql-slow-ms", type=float, default=10,
+                        help="Порог медленного запроса для --trace-sql, мс (по умолчанию 10).")
+    args = parser.parse_args()
+
+    workload = {
+        "algorithms": args.algorithms,
+        "actions": args.actions,
+        "executions_per_day": args.executions_per_day,
+        "years": args.years,
+        "organizations": args.organizations,
+        "active_executions": args.active,
+        "seed": args.seed,
+    }
+    print(f"{'':<10}{'операция':<52} | {'медиана, мс':>10} | {'p95, мс':>10} | {'макс, мс':>10} | {'строк':>6}")
+    results = []
+    tracer = QueryTracer(slow_ms=args.trace_sql_slow_ms) if args.trace_sql else None
+    if not args.skip_sqlite:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = quiet(SQLiteDatabaseManager, os.path.join(tmp_dir, "bench.db"))
+            results.extend(run_backend("sqlite", manager, seed_sqlite, workload, args.repeat, tracer))
+    if args.postgres:
+        from db.postgresql_manager import PostgreSQLDatabaseManager
+
+        manager = PostgreSQLDatabaseManager(parse_postgres_config(args.postgres))
+        with manager._get_connection().cursor() as cursor:
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {manager.SCHEMA_NAME}.algorithm_executions);")
+            if cursor.fetchone()[0]:
+                print("БД PostgreSQL не пуста - для бенчмарка нужна отдельная БД только со схемой.")
+                sys.exit(2)
+        results.extend(run_backend("postgresql", manager, seed_postgres, workload, args.repeat, tracer))
+    if tracer is not None:
+        tracer.save(args.trace_sql)
+
+    document = {
+        "benchmark": "database_managers",
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "workload": workload,
+        "results": results,
+    }
+    regressions = []
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        document["baseline"] = args.baseline
+        document["regressions"] = regressions
+        for item in regressions:
+            print(f"РЕГРЕССИЯ [{item['backend']}] {item['operation']}: "
+                  f"{item['baseline_median_ms']:.3f} -> {item['median_ms']:.3f} мс")
+        print("Регрессий нет." if not regressions else f"Регрессий: {len(regressions)}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
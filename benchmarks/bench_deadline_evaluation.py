@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк проверки дедлайнов: построчный цикл против векторизованной проверки на NumPy.
+Запускать из корневой директории проекта: python benchmarks/bench_deadline_evaluation.py
+
+Сравниваются:
+- "цикл (строки)"  - как раньше в _check_action_deadlines: разбор строк времени на каждой строке + правила;
+- "цикл (секунды)" - те же правила по готовым секундам (calculated_*_epoch из БД);
+- "NumPy"          - сборка массивов int64 из секунд + evaluate_deadlines.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notifications.deadline_evaluator import evaluate_deadlines, evaluate_deadlines_loop, to_epoch_array
+from time_service import TimeService
+
+import numpy as np
+
+SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def generate_actions(count: int, now_epoch: int, seed: int = 42) -> list:
+    """Активные действия вокруг текущего момента: часть началась, часть просрочена, часть без времени."""
+    rng = random.Random(seed)
+    actions = []
+    for _ in range(count):
+        start = now_epoch + rng.randint(-4 * 3600, 4 * 3600)
+        end = start + rng.choice((60, 240, 600, 1800, 3600))
+        if rng.random() < 0.02:
+            start = None
+        actions.append({
+            'calculated_start_time': TimeService.format(start, '%Y-%m-%d %H:%M:%S') if start is not None else None,
+            'calculated_end_time': TimeService.format(end, '%Y-%m-%d %H:%M:%S'),
+            'calculated_start_epoch': start,
+            'calculated_end_epoch': end,
+            'notified_mask': rng.choice((0, 0, 0, 1, 3)),
+        })
+    return actions
+
+
+def run_loop_strings(actions, now_epoch):
+    starts = [TimeService.to_epoch(a['calculated_start_time']) for a in actions]
+    ends = [TimeService.to_epoch(a['calculated_end_time']) for a in actions]
+    return evaluate_deadlines_loop(starts, ends, [a['notified_mask'] for a in actions], now_epoch)
+
+
+def run_loop_epochs(actions, now_epoch):
+    return evaluate_deadlines_loop(
+        [a['calculated_start_epoch'] for a in actions],
+        [a['calculated_end_epoch'] for a in actions],
+        [a['notified_mask'] for a in actions],
+        now_epoch,
+    )
+
+
+def run_vectorized(actions, now_epoch):
+    return evaluate_deadlines(
+        to_epoch_array([a['calculated_start_epoch'] for a in actions]),
+        to_epoch_array([a['calculated_end_epoch'] for a in actions]),
+        np.array([a['notified_mask'] for a in actions], dtype=np.int64),
+        now_epoch,
+    )
+
+
+def best_time(func, repeat: int, *args):
+    """Лучшее время из repeat запусков (мс) и результат последнего запуска."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк проверки дедлайнов действий.")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов (берётся лучшее время).")
+    args = parser.parse_args()
+
+    now_epoch = TimeService().now_epoch()
+    print(f"{'Действий':>10} | {'цикл (строки), мс':>18} | {'цикл (секунды), мс':>19} | {'NumPy, мс':>10} | {'ускорение':>9}")
+    print("-" * 80)
+    for size in SIZES:
+        actions = generate_actions(size, now_epoch)
+        loop_strings_ms, expected = best_time(run_loop_strings, args.repeat, actions, now_epoch)
+        loop_epochs_ms, _ = best_time(run_loop_epochs, args.repeat, actions, now_epoch)
+        vectorized_ms, actual = best_time(run_vectorized, args.repeat, actions, now_epoch)
+
+        # Результаты обоих вариантов должны совпадать
+        for notification_type, indices in expected.items():
+            assert indices == actual[notification_type].tolist(), f"Расхождение для '{notification_type}' ({size})"
+
+        print(f"{size:>10} | {loop_strings_ms:>18.2f} | {loop_epochs_ms:>19.2f} | {vectorized_ms:>10.2f} | "
+              f"{loop_strings_ms / vectorized_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
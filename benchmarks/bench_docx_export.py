@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк выгрузки журнала действий в DOCX: потоковая запись (reports/docx_export_worker.py)
+против построения всей таблицы в дереве python-docx (table.add_row() на каждую строку).
+Запускать из корневой директории проекта: python benchmarks/bench_docx_export.py
+
+Создаёт временную БД с --executions выполнениями по --actions действий и выгружает весь период
+каждым вариантом в отдельном процессе: время и пиковый размер процесса (ru_maxrss; дерево lxml
+выделяет память вне интерпретатора, tracemalloc её не видит). На Windows пик памяти не выводится.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+from reports.docx_export_worker import (
+    ACTION_LOG_HEADERS, ACTION_STATUS_TEXT, write_action_log_docx,
+)
+from reports.execution_report import format_report_time
+
+PERIOD = ("2025-01-01", "2025-02-01")
+
+
+def create_database(path: str, executions: int, actions: int) -> SQLiteDatabaseManager:
+    manager = SQLiteDatabaseManager(path)
+    conn = manager._get_connection()
+    conn.executemany(
+        "INSERT INTO algorithm_executions (id, snapshot_name, snapshot_category, snapshot_time_type, started_at, status) "
+        "VALUES (?, ?, 'повседневная деятельность', 'absolute', ?, 'completed');",
+        ((i, f"Алгоритм {i}", f"2025-01-{i % 28 + 1:02d} {i % 24:02d}:00:00") for i in range(1, executions + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO action_executions (execution_id, snapshot_description, calculated_start_time, calculated_end_time, "
+        "actual_end_time, status, reported_to, notes) "
+        "VALUES (?, ?, '2025-01-01 09:00:00', '2025-01-01 10:00:00', '2025-01-01 09:45:00', 'completed', 'Начальник смены', ?);",
+        ((i, f"Действие {j}", "Примечание к выполнению. " * 3)
+         for i in range(1, executions + 1) for j in range(actions)),
+    )
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def export_streaming(manager: SQLiteDatabaseManager, path: str) -> int:
+    rows, _ = write_action_log_docx(path, "Журнал действий", "", manager.iter_action_log_rows(*PERIOD))
+    return rows
+
+
+def export_tree(manager: SQLiteDatabaseManager, path: str) -> int:
+    """Прежний подход python-docx: вся таблица в памяти, затем save()."""
+    from docx import Document
+
+    document = Document()
+    document.add_heading("Журнал действий", level=1)
+    table = document.add_table(rows=1, cols=len(ACTION_LOG_HEADERS))
+    for cell, header in zip(table.rows[0].cells, ACTION_LOG_HEADERS):
+        cell.text = header
+    count = 0
+    for rows in manager.iter_action_log_rows(*PERIOD):
+        for (_, _, _, description, start, end, actual_end, status, reported_to, notes) in rows:
+            count += 1
+            values = (count, description, format_report_time(start), format_report_time(end),
+                      format_report_time(actual_end), ACTION_STATUS_TEXT.get(status, status), reported_to, notes)
+            for cell, value in zip(table.add_row().cells, values):
+                cell.text = "" if value is None else str(value)
+    document.save(path)
+    return count
+
+
+VARIANTS = {
+    "потоковая запись": export_streaming,
+    "дерево python-docx": export_tree,
+}
+
+
+def measure(variant: str, db_path: str, path: str):
+    """Выполняется в отдельном процессе: (строк, время, с; пик процесса, МБ или None; размер файла, КБ)."""
+    manager = SQLiteDatabaseManager(db_path)
+    started = time.perf_counter()
+    rows = VARIANTS[variant](manager, path)
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+    return rows, elapsed, peak_mb, os.path.getsize(path) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк выгрузки журнала действий в DOCX.")
+    parser.add_argument("--executions", type=int, default=100, help="Количество выполнений за период.")
+    parser.add_argument("--actions", type=int, default=100, help="Количество действий в выполнении.")
+    parser.add_argument("--skip-tree", action="store_true", help="Не замерять построение дерева python-docx.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        create_database(db_path, args.executions, args.actions)
+        variants = [name for name in VARIANTS if not (args.skip_tree and VARIANTS[name] is export_tree)]
+        print(f"{'Вариант':<20} | {'строк':>7} | {'время, с':>8} | {'пик процесса, МБ':>16} | {'файл, КБ':>8}")
+        print("-" * 72)
+        context = multiprocessing.get_context("spawn")
+        for index, name in enumerate(variants):
+            with context.Pool(1) as pool:
+                rows, elapsed, peak_mb, size_kb = pool.apply(
+                    measure, (name, db_path, os.path.join(tmp_dir, f"{index}.docx")))
+            peak = f"{peak_mb:>16.1f}" if peak_mb is not None else f"{'н/д':>16}"
+            print(f"{name:<20} | {rows:>7} | {elapsed:>8.2f} | {peak} | {size_kb:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
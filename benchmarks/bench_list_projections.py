@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сводной (summary) и полной (detail) проекций списков действий.
+Запускать из корневой директории проекта: python benchmarks/bench_list_projections.py
+
+Создаёт временную БД с "текстовым" алгоритмом (длинный технический текст, телефоны,
+материалы и примечания у каждого действия) и сравнивает для get_actions_by_algorithm_id и
+get_action_executions_by_execution_id объём данных, уходящих в QML (размер строк), и время запроса.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+
+TECHNICAL_TEXT = "Порядок выполнения: проверить, доложить, зафиксировать. " * 60
+CONTACT_PHONES = "\n".join(f"Дежурный {i}: +7 (900) 000-00-{i:02d}" for i in range(20))
+NOTES = "Примечание к выполнению действия. " * 20
+
+
+def create_database(path: str, actions: int) -> SQLiteDatabaseManager:
+    manager = SQLiteDatabaseManager(path)
+    conn = manager._get_connection()
+    conn.execute("INSERT INTO algorithms (id, name, category, time_type) VALUES (1, 'Текстовый', 'повседневная деятельность', 'астрономическое');")
+    conn.executemany(
+        "INSERT INTO actions (algorithm_id, description, technical_text, start_offset, end_offset, contact_phones, report_materials) "
+        "VALUES (1, ?, ?, '00:00:00', '01:00:00', ?, ?);",
+        ((f"Действие {i}", TECHNICAL_TEXT, CONTACT_PHONES, f"C:/Отчёты/{i}.docx") for i in range(actions)),
+    )
+    conn.execute(
+        "INSERT INTO algorithm_executions (id, algorithm_id, snapshot_name, snapshot_category, snapshot_time_type, started_at, status) "
+        "VALUES (1, 1, 'Текстовый', 'повседневная деятельность', 'absolute', '2025-01-01 08:00:00', 'completed');"
+    )
+    conn.executemany(
+        "INSERT INTO action_executions (execution_id, snapshot_description, snapshot_technical_text, snapshot_contact_phones, "
+        "calculated_start_time, calculated_end_time, status, reported_to, notes) "
+        "VALUES (1, ?, ?, ?, '2025-01-01 09:00:00', '2025-01-01 10:00:00', 'completed', 'Начальник смены', ?);",
+        ((f"Действие {i}", TECHNICAL_TEXT, CONTACT_PHONES, NOTES) for i in range(actions)),
+    )
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def payload_size(rows: list) -> int:
+    """Приблизительный объём данных для QML: сумма длин значений всех полей."""
+    return sum(len(str(value)) for row in rows for value in row.values() if value is not None)
+
+
+def best_time(func, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк проекций списков действий.")
+    parser.add_argument("--actions", type=int, default=500, help="Количество действий в алгоритме.")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов (берётся лучшее время).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = create_database(os.path.join(tmp_dir, "bench.db"), args.actions)
+        cases = {
+            "get_actions_by_algorithm_id": lambda summary: manager.get_actions_by_algorithm_id(1, summary=summary),
+            "get_action_executions_by_execution_id": lambda summary: manager.get_action_executions_by_execution_id(1, summary=summary),
+        }
+        print(f"{'Запрос':<40} | {'detail, КБ':>10} | {'summary, КБ':>11} | {'detail, мс':>10} | {'summary, мс':>11}")
+        print("-" * 95)
+        for name, query in cases.items():
+            detail_ms, detail_rows = best_time(lambda: query(False), args.repeat)
+            summary_ms, summary_rows = best_time(lambda: query(True), args.repeat)
+            assert [r['id'] for r in detail_rows] == [r['id'] for r in summary_rows], f"Разный порядок строк в {name}"
+            print(f"{name:<40} | {payload_size(detail_rows) / 1024:>10.1f} | {payload_size(summary_rows) / 1024:>11.1f} | "
+                  f"{detail_ms:>10.2f} | {summary_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк памяти: строки как словари dict(zip(colnames, row)) против записей db/records.py.
+Запускать из корневой директории проекта: python benchmarks/bench_row_records.py
+
+Создаёт временную БД по db/init_sqlite_schema.sql с живым набором действий (опрос дедлайнов,
+ACTIVE_ACTION_EXECUTIONS_QUERY) и историей выполнений, затем для каждой выборки измеряет через
+tracemalloc объём памяти, занятой результатом, пиковое выделение при его построении и время.
+Отдельно показаны накладные расходы самих строк (dict или кортеж-запись, без значений колонок) -
+именно их и сокращают записи; значения (строки, числа) в обоих вариантах одни и те же.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from db.records import ActiveActionRecord, ExecutionRecord
+from db.sqlite_database_manager import ACTIVE_ACTION_EXECUTIONS_QUERY
+
+ACTIONS_PER_EXECUTION = 20
+
+# Колонки ExecutionRecord без соединения с algorithms/users - важен только размер строки результата
+HISTORY_QUERY = """
+    SELECT
+        id, algorithm_id, snapshot_name AS algorithm_name, snapshot_category AS category,
+        started_at, substr(started_at, 1, 19) AS started_at_display,
+        completed_at, substr(completed_at, 1, 19) AS completed_at_display,
+        status, created_by_user_id, created_by_user_display_name
+    FROM algorithm_executions
+    ORDER BY started_at DESC, id DESC;
+"""
+
+
+def create_database(active_actions: int, history: int) -> sqlite3.Connection:
+    """БД в памяти: history завершённых выполнений и активные выполнения на active_actions действий."""
+    conn = sqlite3.connect(":memory:")
+    with open(PROJECT_DIR / "db" / "init_sqlite_schema.sql", encoding="utf-8") as f:
+        conn.executescript(f.read())
+
+    active_executions = max(1, active_actions // ACTIONS_PER_EXECUTION)
+    total = history + active_executions
+    conn.executemany(
+        "INSERT INTO algorithm_executions (id, snapshot_name, snapshot_category, snapshot_time_type, started_at, "
+        "completed_at, status, created_by_user_display_name) VALUES (?, ?, 'повседневная деятельность', 'absolute', ?, ?, ?, ?);",
+        (
+            (i, f"Алгоритм {i}", f"2025-01-{i % 28 + 1:02d} 08:00:00",
+             None if i > history else f"2025-01-{i % 28 + 1:02d} 18:00:00",
+             "active" if i > history else "completed", "Иванов Иван Иванович")
+            for i in range(1, total + 1)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO action_executions (execution_id, snapshot_description, calculated_start_time, calculated_end_time, status) "
+        "VALUES (?, ?, '2025-01-01 09:00:00', '2025-01-01 10:00:00', 'pending');",
+        ((i, f"Действие {j}") for i in range(history + 1, total + 1) for j in range(ACTIONS_PER_EXECUTION)),
+    )
+    conn.commit()
+    return conn
+
+
+def load_dicts(conn: sqlite3.Connection, query: str, record_class) -> list:
+    """Прежний способ: словарь на каждую строку."""
+    cursor = conn.execute(query)
+    colnames = [desc[0] for desc in cursor.description]
+    return [dict(zip(colnames, row)) for row in cursor.fetchall()]
+
+
+def load_records(conn: sqlite3.Connection, query: str, record_class) -> list:
+    return record_class.from_cursor(conn.execute(query))
+
+
+def measure(loader, conn: sqlite3.Connection, query: str, record_class, repeat: int):
+    """(занято результатом, байт; пик при построении, байт; накладные строк, байт; лучшее время, мс; строк)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        loader(conn, query, record_class)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    rows = loader(conn, query, record_class)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    overhead = sum(sys.getsizeof(row) for row in rows)
+    return retained, peak, overhead, best * 1000, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк памяти строк-словарей и записей db/records.py.")
+    parser.add_argument("--active", type=int, default=5000, help="Количество активных действий (опрос дедлайнов).")
+    parser.add_argument("--history", type=int, default=20000, help="Количество выполнений в истории.")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов для замера времени.")
+    args = parser.parse_args()
+
+    conn = create_database(args.active, args.history)
+    cases = {
+        "опрос дедлайнов": (ACTIVE_ACTION_EXECUTIONS_QUERY, ActiveActionRecord),
+        "история выполнений": (HISTORY_QUERY, ExecutionRecord),
+    }
+    print(f"{'Выборка':<20} | {'строк':>6} | {'вариант':<8} | {'занято, КБ':>10} | {'пик, КБ':>8} | "
+          f"{'строки, КБ':>10} | {'время, мс':>9}")
+    print("-" * 91)
+    for name, (query, record_class) in cases.items():
+        results = {}
+        for label, loader in (("dict", load_dicts), ("records", load_records)):
+            results[label] = measure(loader, conn, query, record_class, args.repeat)
+            retained, peak, overhead, elapsed_ms, count = results[label]
+            print(f"{name:<20} | {count:>6} | {label:<8} | {retained / 1024:>10.1f} | {peak / 1024:>8.1f} | "
+                  f"{overhead / 1024:>10.1f} | {elapsed_ms:>9.2f}")
+        assert [dict(r) for r in load_records(conn, query, record_class)] == load_dicts(conn, query, record_class), \
+            f"Расхождение данных в выборке '{name}'"
+        print(f"{'':<20}   результат меньше в {results['dict'][0] / results['records'][0]:.1f} раза, "
+              f"накладные расходы строк - в {results['dict'][2] / results['records'][2]:.1f} раза")
+
+
+if __name__ == "__main__":
+    main()
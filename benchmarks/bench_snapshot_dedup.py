@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк роста файла БД при повторных запусках одного шаблона: снимки технического текста
+в snapshot_blobs (по хешу, со сжатием zlib) против прежнего копирования текста в каждую строку.
+Запускать из корневой директории проекта: python benchmarks/bench_snapshot_dedup.py
+
+Создаёт две временные БД с одинаковым "текстовым" алгоритмом и запускает его --launches раз.
+Во второй БД после каждого запуска технический текст возвращается в колонку
+snapshot_technical_text каждой строки (как хранилось до snapshot_blobs).
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+
+TECHNICAL_TEXT = "Порядок выполнения: проверить, доложить, зафиксировать в журнале. " * 50
+
+
+def create_database(path: str, actions: int) -> SQLiteDatabaseManager:
+    manager = SQLiteDatabaseManager(path)
+    conn = manager._get_connection()
+    conn.execute("INSERT INTO algorithms (id, name, category, time_type) VALUES (1, 'Текстовый', 'повседневная деятельность', 'оперативное');")
+    conn.executemany(
+        "INSERT INTO actions (algorithm_id, description, technical_text, start_offset, end_offset, "
+        "start_offset_seconds, end_offset_seconds) VALUES (1, ?, ?, '00:00:00', '01:00:00', 0, 3600);",
+        ((f"Действие {i}", f"{TECHNICAL_TEXT}\nДействие {i}") for i in range(actions)),
+    )
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def file_size_kb(path: str) -> float:
+    """Размер файла после VACUUM - то, что попадёт в резервную копию."""
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM;")
+    conn.close()
+    return os.path.getsize(path) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк дедупликации снимков технического текста.")
+    parser.add_argument("--actions", type=int, default=200, help="Количество действий в алгоритме.")
+    parser.add_argument("--launches", type=int, default=30, help="Количество запусков алгоритма.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {}
+        for variant in ("snapshot_blobs", "копия в строке"):
+            path = os.path.join(tmp_dir, f"{len(results)}.db")
+            manager = create_database(path, args.actions)
+            user_id = manager._get_connection().execute("SELECT id FROM users LIMIT 1;").fetchone()[0]
+            sizes = [file_size_kb(path)]
+            for launch in range(args.launches):
+                execution_id = manager.start_algorithm_execution(1, f"2025-01-01 {launch % 24:02d}:00:00", user_id)
+                if variant == "копия в строке":
+                    conn = manager._get_connection()
+                    conn.execute(
+                        "UPDATE action_executions SET snapshot_technical_text = "
+                        "(SELECT snapshot_blob_text(content, compressed) FROM snapshot_blobs WHERE hash = snapshot_technical_text_hash), "
+                        "snapshot_technical_text_hash = NULL WHERE execution_id = ?;",
+                        (execution_id,),
+                    )
+                    conn.commit()
+                    conn.close()
+                if launch in (0, args.launches - 1):
+                    sizes.append(file_size_kb(path))
+            results[variant] = sizes
+
+        print(f"{'Вариант':<16} | {'пустая, КБ':>10} | {'1 запуск, КБ':>12} | {f'{args.launches} запусков, КБ':>16} | {'на запуск, КБ':>13}")
+        print("-" * 80)
+        for variant, (empty, first, last) in results.items():
+            per_launch = (last - first) / max(1, args.launches - 1)
+            print(f"{variant:<16} | {empty:>10.0f} | {first:>12.0f} | {last:>16.0f} | {per_launch:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
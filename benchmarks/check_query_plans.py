@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Проверка планов "горячих" запросов SQLite (EXPLAIN QUERY PLAN).
+Запускать из корневой директории проекта: python benchmarks/check_query_plans.py
+
+Создаёт временную БД по db/init_sqlite_schema.sql, наполняет её историей (тысячи завершённых
+выполнений) и небольшим числом активных, затем проверяет, что запросы активных действий
+читают очередь active_action_queue или идут по частичным индексам живых строк, без полного
+просмотра таблиц истории, и что время их выполнения не растёт с объёмом истории.
+
+Затем та же история записывается в БД менеджера (SQLiteDatabaseManager во временном каталоге),
+половина её переносится в архив, и проверяются запросы чтения истории, которые выполняют методы
+менеджера с подключённым архивом: в их планах не должно быть полного просмотра таблиц,
+автоматических индексов и материализации объединения основной БД с архивом.
+Код возврата 1 - регрессия.
+"""
+import argparse
+import io
+import logging
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from db.sqlite_database_manager import (
+    ACTIVE_ACTION_EXECUTIONS_QUERY, ACTIVE_ACTION_QUEUE_REBUILD_QUERY, ACTIVE_EXECUTIONS_BY_CATEGORY_QUERY,
+    SQLiteDatabaseManager,
+)
+from diagnostics.traced_connection import install_connection_tracing
+
+ACTIVE_EXECUTIONS = 5
+ACTIONS_PER_EXECUTION = 20
+CATEGORY = "повседневная деятельность"
+
+# Таблицы, полный просмотр которых допустим: очередь содержит только живой набор
+SMALL_TABLES = ("active_action_queue",)
+
+# Запрос -> (параметры, индексы, которые обязаны встретиться в плане, подготовка перед замером)
+CHECKS = {
+    "get_active_action_executions_with_details": (
+        ACTIVE_ACTION_EXECUTIONS_QUERY, (),
+        (), None,
+    ),
+    "get_active_executions_by_category": (
+        ACTIVE_EXECUTIONS_BY_CATEGORY_QUERY, (0, CATEGORY),
+        ("idx_algorithm_executions_active_category", "idx_active_action_queue_execution_id"), None,
+    ),
+    "_rebuild_active_action_queue": (
+        ACTIVE_ACTION_QUEUE_REBUILD_QUERY, (),
+        ("idx_algorithm_executions_active", "idx_action_executions_live"),
+        "DELETE FROM active_action_queue;",
+    ),
+}
+
+# Срок архивации для проверки с архивом: в архив уходит первая половина истории
+ARCHIVE_AFTER_DAYS = 30
+
+# Чтения истории с архивом: имя метода менеджера -> вызов (менеджер, id выполнения, id действия).
+# Каждый вызов выполняется для выполнения из архива и для выполнения из основной БД.
+HISTORY_READS = {
+    "get_algorithm_execution_by_id": lambda manager, execution_id, action_id:
+        manager.get_algorithm_execution_by_id(execution_id),
+    "get_action_executions_by_execution_id": lambda manager, execution_id, action_id:
+        manager.get_action_executions_by_execution_id(execution_id),
+    "get_action_execution_by_id": lambda manager, execution_id, action_id:
+        manager.get_action_execution_by_id(action_id),
+    "get_action_execution_report_materials": lambda manager, execution_id, action_id:
+        manager.get_action_execution_report_materials(action_id),
+    "get_organizations_for_action_execution": lambda manager, execution_id, action_id:
+        manager.get_organizations_for_action_execution(action_id),
+    "count_action_log_rows": lambda manager, execution_id, action_id:
+        manager.count_action_log_rows(execution_id=execution_id),
+    "iter_action_log_rows": lambda manager, execution_id, action_id:
+        list(manager.iter_action_log_rows(execution_id=execution_id)),
+    "get_performance_source_rows": lambda manager, execution_id, action_id:
+        manager.get_performance_source_rows("2025-01-01", "2025-01-02"),
+    "search": lambda manager, execution_id, action_id:
+        manager.search("Действие"),
+}
+
+
+def fill_history(conn: sqlite3.Connection, history_executions: int):
+    """history_executions завершённых выполнений и ACTIVE_EXECUTIONS активных (схема уже создана)."""
+    total = history_executions + ACTIVE_EXECUTIONS
+    conn.executemany(
+        "INSERT INTO algorithm_executions (id, snapshot_name, snapshot_category, snapshot_time_type, started_at, completed_at, status) "
+        "VALUES (?, ?, ?, 'absolute', ?, ?, ?);",
+        (
+            (i, f"Алгоритм {i}", CATEGORY, "2025-01-01 08:00:00",
+             None if i > history_executions else "2025-01-01 18:00:00",
+             "active" if i > history_executions else "completed")
+            for i in range(1, total + 1)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO action_executions (execution_id, snapshot_description, calculated_start_time, calculated_end_time, status) "
+        "VALUES (?, ?, '2025-01-01 09:00:00', '2025-01-01 10:00:00', ?);",
+        (
+            (i, f"Действие {j}", "pending" if i > history_executions else "completed")
+            for i in range(1, total + 1) for j in range(ACTIONS_PER_EXECUTION)
+        ),
+    )
+    conn.commit()
+
+
+def create_database(history_executions: int) -> sqlite3.Connection:
+    """БД в памяти: history_executions завершённых выполнений и ACTIVE_EXECUTIONS активных."""
+    conn = sqlite3.connect(":memory:")
+    with open(PROJECT_DIR / "db" / "init_sqlite_schema.sql", encoding="utf-8") as f:
+        conn.executescript(f.read())
+    fill_history(conn, history_executions)
+    conn.execute("ANALYZE;")
+    return conn
+
+
+def create_archived_manager(directory: str, history_executions: int) -> SQLiteDatabaseManager:
+    """
+    Менеджер БД в directory с историей, отчётными материалами и привязками организаций;
+    первая половина истории перенесена в архив (вторая завершена недавно и остаётся в основной БД).
+    """
+    with redirect_stdout(io.StringIO()):
+        manager = SQLiteDatabaseManager(str(Path(directory) / "plans.db"))
+    conn = manager._get_connection()
+    fill_history(conn, history_executions)
+    conn.execute("INSERT INTO organizations (id, name) VALUES (1, 'Организация');")
+    conn.execute("INSERT INTO action_execution_materials (action_execution_id, file_path) "
+                 "SELECT id, 'материал ' || id FROM action_executions WHERE id % 3 = 0;")
+    conn.execute("INSERT INTO action_execution_organizations (action_execution_id, organization_id) "
+                 "SELECT id, 1 FROM action_executions WHERE id % 5 = 0;")
+    conn.execute("UPDATE algorithm_executions SET completed_at = datetime('now', 'localtime') "
+                 "WHERE status = 'completed' AND id > ?;", (history_executions // 2,))
+    conn.commit()
+    conn.close()
+    if manager.archive_completed_executions(ARCHIVE_AFTER_DAYS) <= 0:
+        raise RuntimeError("Не удалось перенести историю в архив.")
+    conn = manager._get_connection()
+    conn.execute("ANALYZE;")
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def plan_problems(plan: list) -> list:
+    """
+    Шаги плана запроса истории, недопустимые с архивом: полный просмотр таблицы (кроме
+    SMALL_TABLES, виртуальной таблицы поиска и подзапросов, выполняемых как CO-ROUTINE),
+    автоматический индекс и материализация.
+    """
+    coroutines = {step.split(" ", 1)[1] for step in plan if step.startswith("CO-ROUTINE ")}
+    problems = []
+    for step in plan:
+        if step.startswith("SCAN") and "USING" not in step and "VIRTUAL TABLE" not in step:
+            if step.split(" ", 1)[1] in coroutines or any(table in step for table in SMALL_TABLES):
+                continue
+            problems.append(step)
+        elif "AUTOMATIC" in step or step.startswith("MATERIALIZE"):
+            problems.append(step)
+    return problems
+
+
+def check_history_reads(history_executions: int) -> bool:
+    """Планы запросов методов чтения истории с подключённым архивом. :return: True - регрессия."""
+    logging.disable(logging.INFO)  # Менеджер сообщает о каждом запросе
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        manager = create_archived_manager(directory, history_executions)
+        statements = []
+        install_connection_tracing(manager, statements.append)
+        archived_execution, main_execution = 1, history_executions
+        samples = [
+            (archived_execution, (archived_execution - 1) * ACTIONS_PER_EXECUTION + 1),
+            (main_execution, (main_execution - 1) * ACTIONS_PER_EXECUTION + 1),
+        ]
+
+        for name, call in HISTORY_READS.items():
+            plans = {}
+            for execution_id, action_id in samples:
+                statements.clear()
+                call(manager, execution_id, action_id)
+                conn = manager._get_connection()
+                for event in statements:
+                    if event.statement.lstrip().upper().startswith("SELECT"):
+                        plans[event.statement] = query_plan(conn.raw_connection, event.statement,
+                                                            event.parameters or ())
+                conn.close()
+            print(f"{name} (с архивом):")
+            if not plans:
+                failed = True
+                print("    ОШИБКА: метод не выполнил ни одного запроса")
+            for plan in plans.values():
+                for step in plan:
+                    print(f"    {step}")
+                problems = plan_problems(plan)
+                if problems:
+                    failed = True
+                    print(f"    ОШИБКА: {problems}")
+    logging.disable(logging.NOTSET)
+    return failed
+
+
+def query_plan(conn: sqlite3.Connection, query: str, params) -> list:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def timed(conn: sqlite3.Connection, query: str, params, prepare=None, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        if prepare:
+            conn.execute(prepare)
+        started = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        best = min(best, time.perf_counter() - started)
+        conn.rollback()  # Пересборка очереди пишет в БД - откатываем, чтобы повторы были одинаковыми
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка планов горячих запросов SQLite.")
+    parser.add_argument("--history", type=int, default=20000, help="Количество завершённых выполнений в истории.")
+    args = parser.parse_args()
+
+    small = create_database(100)
+    large = create_database(args.history)
+    failed = False
+
+    for name, (query, params, expected_indexes, prepare) in CHECKS.items():
+        plan = query_plan(large, query, params)
+        print(f"{name}:")
+        for step in plan:
+            print(f"    {step}")
+
+        full_scans = [step for step in plan if step.startswith("SCAN") and "USING" not in step
+                      and not any(table in step for table in SMALL_TABLES)]
+        missing = [index for index in expected_indexes if not any(index in step for step in plan)]
+        if full_scans or missing:
+            failed = True
+            print(f"    ОШИБКА: полный просмотр {full_scans}, не используются индексы {missing}")
+
+        small_ms = timed(small, query, params, prepare)
+        large_ms = timed(large, query, params, prepare)
+        print(f"    время: {small_ms:.3f} мс (история 100) / {large_ms:.3f} мс (история {args.history})")
+
+    failed = check_history_reads(args.history) or failed
+
+    print("Регрессия планов запросов!" if failed else "Планы запросов в порядке.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Генератор синтетической нагрузки для бенчмарков БД.
+
+Наполняет БД по реальной схеме (init_sqlite_schema.sql / init_postgres_schema.sql): справочник
+организаций, алгоритмы с действиями и история выполнений за заданное число лет - завершённые
+выполнения с действиями (выполнены в срок, с опозданием, пропущены) и привязками организаций,
+плюс несколько активных выполнений текущего дня. Строки вставляются пакетами в обход менеджеров
+(с явными id), триггеры схемы срабатывают как при обычной работе.
+Генерация детерминирована (seed), поэтому прогоны с одинаковыми параметрами сравнимы.
+"""
+import datetime
+import random
+from typing import Dict, Iterator, List, Tuple
+
+CATEGORIES = ("повседневная деятельность", "боевая готовность", "противодействие терроризму", "кризисные ситуации")
+TIME_TYPES = ("оперативное", "астрономическое")
+OFFICERS = ("капитан Иванов И.И.", "майор Петров П.П.", "лейтенант Сидоров С.С.", "капитан Кузнецов К.К.")
+TECHNICAL_TEXT = "Порядок выполнения: проверить, доложить, зафиксировать в журнале. " * 5
+
+# Параметры по умолчанию: около 3,7 тыс. выполнений и 110 тыс. действий за год
+DEFAULT_WORKLOAD = {
+    "algorithms": 50,
+    "actions": 30,
+    "executions_per_day": 10,
+    "years": 1,
+    "organizations": 500,
+    "active_executions": 5,
+    "seed": 1,
+}
+
+# Доли исходов действий завершённого выполнения и привязок организаций
+LATE_SHARE = 0.2
+SKIPPED_SHARE = 0.05
+ORGANIZATION_LINK_SHARE = 0.1
+
+# Размер пакета вставки
+BATCH_SIZE = 5000
+
+
+def _format(value: datetime.datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _format_action_time(value: datetime.datetime) -> str:
+    """Времена действий - в формате, который пишет start_algorithm_execution."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _offset(seconds: int) -> str:
+    """Смещение действия 'D HH:MM:SS' (понимают и SQLite-менеджер, и INTERVAL PostgreSQL)."""
+    days, rest = divmod(seconds, 86400)
+    return f"{days} {rest // 3600:02d}:{rest % 3600 // 60:02d}:{rest % 60:02d}"
+
+
+def generate_workload(algorithms: int, actions: int, executions_per_day: int, years: int, organizations: int,
+                      active_executions: int, seed: int, today: datetime.date) -> List[Tuple[str, tuple, Iterator[tuple]]]:
+    """
+    Строки синтетической нагрузки.
+    :param actions: Количество действий в каждом алгоритме.
+    :param today: День активных выполнений; история - years * 365 суток до него.
+    :return: Список (таблица, колонки, строки) в порядке вставки (родительские таблицы раньше).
+    """
+    rng = random.Random(seed)
+    action_offsets = [(i * 1200, i * 1200 + 1800) for i in range(actions)]
+    algorithm_rows = [
+        (algorithm_id, f"Алгоритм {algorithm_id}", CATEGORIES[algorithm_id % len(CATEGORIES)],
+         TIME_TYPES[algorithm_id % len(TIME_TYPES)], algorithm_id)
+        for algorithm_id in range(1, algorithms + 1)
+    ]
+    action_rows = [
+        ((algorithm_id - 1) * actions + number + 1, algorithm_id, f"Действие {number + 1} алгоритма {algorithm_id}",
+         TECHNICAL_TEXT, _offset(start), _offset(end), start, end, "+7 (900) 000-00-00")
+        for algorithm_id in range(1, algorithms + 1)
+        for number, (start, end) in enumerate(action_offsets)
+    ]
+
+    history_days = years * 365
+    first_day = datetime.datetime.combine(today - datetime.timedelta(days=history_days), datetime.time(8, 0))
+    interval = datetime.timedelta(hours=14) / max(executions_per_day, 1)
+    executions = []
+    for day in range(history_days):
+        for number in range(executions_per_day):
+            executions.append((first_day + datetime.timedelta(days=day) + number * interval, False))
+    now = datetime.datetime.combine(today, datetime.time(8, 0))
+    executions.extend((now + datetime.timedelta(minutes=number), True) for number in range(active_executions))
+    execution_algorithms = [rng.randint(1, algorithms) for _ in executions]
+    execution_officers = [rng.choice(OFFICERS) for _ in executions]
+
+    def execution_rows():
+        for execution_id, ((started_at, active), algorithm_id, officer) in enumerate(
+                zip(executions, execution_algorithms, execution_officers), 1):
+            _, name, category, time_type, _ = algorithm_rows[algorithm_id - 1]
+            completed_at = None if active else started_at + datetime.timedelta(seconds=action_offsets[-1][1] + 600)
+            yield (execution_id, algorithm_id, name, category, time_type, _format(started_at),
+                   _format(completed_at) if completed_at else None, "active" if active else "completed", officer)
+
+    def action_execution_rows():
+        action_execution_id = 0
+        for execution_id, ((started_at, active), algorithm_id) in enumerate(zip(executions, execution_algorithms), 1):
+            for number, (start, end) in enumerate(action_offsets):
+                action_execution_id += 1
+                planned_start = started_at + datetime.timedelta(seconds=start)
+                planned_end = started_at + datetime.timedelta(seconds=end)
+                actual_end = None
+                if active:
+                    status = "pending"
+                else:
+                    outcome = rng.random()
+                    if outcome < SKIPPED_SHARE:
+                        status = "skipped"
+                    else:
+                        status = "completed"
+                        lateness = rng.randint(60, 7200) if outcome < SKIPPED_SHARE + LATE_SHARE else -rng.randint(0, 1200)
+                        actual_end = _format_action_time(planned_end + datetime.timedelta(seconds=lateness))
+                yield (action_execution_id, execution_id, f"Действие {number + 1} алгоритма {algorithm_id}",
+                       "+7 (900) 000-00-00", _format_action_time(planned_start), _format_action_time(planned_end),
+                       actual_end, status)
+
+    def organization_link_rows():
+        link_rng = random.Random(seed + 1)
+        total_actions = len(executions) * actions
+        link_id = 0
+        for action_execution_id in range(1, total_actions + 1):
+            if organizations and link_rng.random() < ORGANIZATION_LINK_SHARE:
+                link_id += 1
+                yield link_id, action_execution_id, link_rng.randint(1, organizations)
+
+    organization_rows = (
+        (organization_id, f"Организация {organization_id:05d}", f"+7 (900) {organization_id:07d}",
+         rng.choice(OFFICERS), None)
+        for organization_id in range(1, organizations + 1)
+    )
+    return [
+        ("organizations", ("id", "name", "phone", "contact_person", "notes"), organization_rows),
+        ("algorithms", ("id", "name", "category", "time_type", "sort_order"), iter(algorithm_rows)),
+        ("actions", ("id", "algorithm_id", "description", "technical_text", "start_offset", "end_offset",
+                     "start_offset_seconds", "end_offset_seconds", "contact_phones"), iter(action_rows)),
+        ("algorithm_executions", ("id", "algorithm_id", "snapshot_name", "snapshot_category", "snapshot_time_type",
+                                  "started_at", "completed_at", "status", "created_by_user_display_name"),
+         execution_rows()),
+        ("action_executions", ("id", "execution_id", "snapshot_description", "snapshot_contact_phones",
+                               "calculated_start_time", "calculated_end_time", "actual_end_time", "status"),
+         action_execution_rows()),
+        ("action_execution_organizations", ("id", "action_execution_id", "organization_id"), organization_link_rows()),
+    ]
+
+
+def _batches(rows: Iterator[tuple]) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_sqlite(manager, today: datetime.date, **workload) -> Dict[str, int]:
+    """
+    Наполняет БД SQLiteDatabaseManager синтетической нагрузкой (параметры - как у generate_workload,
+    по умолчанию DEFAULT_WORKLOAD).
+    :return: {таблица: количество вставленных строк}.
+    """
+    params = {**DEFAULT_WORKLOAD, **workload}
+    counts = {}
+    conn = manager._get_connection()
+    try:
+        for table, columns, rows in generate_workload(today=today, **params):
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))});"
+            counts[table] = 0
+            for batch in _batches(rows):
+                conn.executemany(sql, batch)
+                counts[table] += len(batch)
+        conn.commit()
+        conn.execute("ANALYZE;")
+    finally:
+        conn.close()
+    return counts
+
+
+def seed_postgres(manager, today: datetime.date, **workload) -> Dict[str, int]:
+    """
+    Наполняет БД PostgreSQLDatabaseManager синтетической нагрузкой. Смещения секундами в actions
+    вычисляются самой схемой (generated-колонки), последовательности id сдвигаются за вставленные.
+    :return: {таблица: количество вставленных строк}.
+    """
+    from psycopg2.extras import execute_values
+
+    params = {**DEFAULT_WORKLOAD, **workload}
+    schema = manager.SCHEMA_NAME
+    counts = {}
+    conn = manager._get_connection()
+    with conn.cursor() as cursor:
+        for table, columns, rows in generate_workload(today=today, **params):
+            if table == "actions":
+                columns = columns[:6] + columns[8:]
+                rows = (row[:6] + row[8:] for row in rows)
+            sql = f"INSERT INTO {schema}.{table} ({', '.join(columns)}) VALUES %s;"
+            counts[table] = 0
+            for batch in _batches(rows):
+                execute_values(cursor, sql, batch, page_size=len(batch))
+                counts[table] += len(batch)
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{schema}.{table}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {schema}.{table}), false);"
+            )
+    conn.commit()
+    previous_autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("ANALYZE;")
+    finally:
+        conn.autocommit = previous_autocommit
+    return counts
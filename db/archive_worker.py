@@ -0,0 +1,45 @@
+# db/archive_worker.py
+"""
+Фоновая архивация завершённых выполнений (archive_completed_executions менеджера БД).
+
+Перенос в архив на большой истории занимает секунды, поэтому при запуске приложения
+выполняется не в потоке интерфейса. ArchiveWorker запускается в QThread так же, как
+исполнители выгрузки отчётов (reports/). Состояние менеджера (подключение архива к запросам
+истории) исполнитель не меняет: это делает поток интерфейса по сигналу finished
+(activate_archive менеджера БД).
+"""
+import logging
+import traceback
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveWorker(QObject):
+    """
+    Архивация выполнений старше older_than_days дней. Работает в отдельном QThread:
+    thread.started -> run(), finished -> thread.quit().
+    """
+    # Количество перенесённых выполнений или -1 при ошибке
+    finished = Signal(int)
+
+    def __init__(self, database_manager, older_than_days: int):
+        """
+        :param database_manager: Менеджер БД (archive_completed_executions).
+        :param older_than_days: Минимальный возраст завершённых выполнений в днях.
+        """
+        super().__init__()
+        self.database_manager = database_manager
+        self.older_than_days = older_than_days
+
+    @Slot()
+    def run(self):
+        archived_count = -1
+        try:
+            archived_count = self.database_manager.archive_completed_executions(
+                self.older_than_days, activate_archive=False)
+        except Exception as e:
+            logger.error(f"Ошибка фоновой архивации выполнений: {e}")
+            traceback.print_exc()
+        self.finished.emit(archived_count)
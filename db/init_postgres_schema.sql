@@ -67,6 +67,12 @@ CREATE TABLE IF NOT EXISTS app_schema.actions (
     technical_text TEXT,                               -- Технический текст порядка выполнения
     start_offset INTERVAL,                             -- Относительное время начала действия (смещение от начала алгоритма)
     end_offset INTERVAL,                               -- Относительное время окончания действия (смещение от начала алгоритма)
+    -- Смещения в секундах и признак "время суток" (часы смещений < 24) для запуска алгоритма
+    start_offset_seconds INTEGER GENERATED ALWAYS AS (EXTRACT(EPOCH FROM start_offset)::INTEGER) STORED,
+    end_offset_seconds INTEGER GENERATED ALWAYS AS (EXTRACT(EPOCH FROM end_offset)::INTEGER) STORED,
+    offset_time_of_day BOOLEAN GENERATED ALWAYS AS (
+        COALESCE(EXTRACT(HOUR FROM start_offset) < 24, TRUE) AND COALESCE(EXTRACT(HOUR FROM end_offset) < 24, TRUE)
+    ) STORED,
     contact_phones TEXT,                               -- Телефоны для связи, связанные с этим действием
     report_materials TEXT,                             -- Пути или ссылки на отчетные материалы
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,    -- Дата и время создания записи действия
@@ -80,6 +86,14 @@ CREATE TABLE IF NOT EXISTS app_schema.actions (
     -- --- ---
 );
 
+-- Смещения в секундах для БД, созданных до их появления (генерируемые колонки заполняются при добавлении)
+ALTER TABLE app_schema.actions
+    ADD COLUMN IF NOT EXISTS start_offset_seconds INTEGER GENERATED ALWAYS AS (EXTRACT(EPOCH FROM start_offset)::INTEGER) STORED,
+    ADD COLUMN IF NOT EXISTS end_offset_seconds INTEGER GENERATED ALWAYS AS (EXTRACT(EPOCH FROM end_offset)::INTEGER) STORED,
+    ADD COLUMN IF NOT EXISTS offset_time_of_day BOOLEAN GENERATED ALWAYS AS (
+        COALESCE(EXTRACT(HOUR FROM start_offset) < 24, TRUE) AND COALESCE(EXTRACT(HOUR FROM end_offset) < 24, TRUE)
+    ) STORED;
+
 -- Таблица для хранения запущенных/выполняемых экземпляров алгоритмов
 -- Изменена в соответствии с Snapshot-подходом.
 CREATE TABLE IF NOT EXISTS app_schema.algorithm_executions (
@@ -109,6 +123,17 @@ CREATE TABLE IF NOT EXISTS app_schema.algorithm_executions (
     -- --- ---
 );
 
+-- Содержимое снимков больших текстов действий (technical_text), адресуемое хешем (SHA-256 UTF-8, hex).
+-- Повторные запуски шаблона не копируют текст в каждую строку action_executions: строки
+-- ссылаются на одну запись. Большие значения PostgreSQL сжимает сам (TOAST), поэтому
+-- отдельного сжатия zlib, как в SQLite, здесь нет. Записи не удаляются: на них ссылается и архив.
+CREATE TABLE IF NOT EXISTS app_schema.snapshot_blobs (
+    hash TEXT PRIMARY KEY,                             -- SHA-256 текста в UTF-8 (hex)
+    content TEXT NOT NULL,                             -- Текст снимка
+    size INTEGER NOT NULL,                             -- Размер текста в байтах UTF-8
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP     -- Дата и время первого сохранения
+);
+
 -- Таблица для хранения выполнения действий в рамках запущенного алгоритма
 -- Изменена кардинально в соответствии с Snapshot-подходом и уточнениями.
 CREATE TABLE IF NOT EXISTS app_schema.action_executions (
@@ -121,7 +146,8 @@ CREATE TABLE IF NOT EXISTS app_schema.action_executions (
     -- Эти поля хранят копию данных действия на момент планирования его выполнения
     -- Они позволяют action_execution существовать независимо от оригинального шаблона действия
     snapshot_description TEXT NOT NULL,              -- Копия description действия на момент планирования
-    snapshot_technical_text TEXT,                    -- Копия technical_text действия на момент планирования
+    snapshot_technical_text TEXT,                    -- Устаревшее: копия technical_text (переносится в snapshot_blobs)
+    snapshot_technical_text_hash TEXT REFERENCES app_schema.snapshot_blobs(hash), -- Снимок technical_text в snapshot_blobs
     snapshot_contact_phones TEXT,                     -- Копия contact_phones действия на момент планирования
     snapshot_report_materials TEXT,                   -- Копия report_materials действия на момент планирования
     -- --- ---
@@ -160,6 +186,25 @@ CREATE INDEX IF NOT EXISTS idx_action_executions_status ON app_schema.action_exe
 CREATE INDEX IF NOT EXISTS idx_algorithms_sort_order ON app_schema.algorithms(sort_order);
 -- --- ---
 
+-- Частичные индексы "живых" строк для горячих запросов (get_active_action_executions_with_details,
+-- get_active_executions_by_category). Содержат только активные выполнения и незавершённые действия,
+-- поэтому их размер не зависит от объёма истории; INCLUDE делает их покрывающими (Index Only Scan).
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_active
+    ON app_schema.algorithm_executions(id) INCLUDE (snapshot_name, status) WHERE status = 'active';
+CREATE INDEX IF NOT EXISTS idx_action_executions_live
+    ON app_schema.action_executions(execution_id)
+    INCLUDE (status, calculated_start_time, calculated_end_time, snapshot_description)
+    WHERE status IN ('pending', 'in_progress');
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_active_category
+    ON app_schema.algorithm_executions(snapshot_category, started_at) WHERE status = 'active';
+
+-- Постраничная (keyset) выдача истории: порядок (started_at, id) для выполнений за дату
+-- и (snapshot_category, completed_at, id) для завершённых по категории; id делает порядок однозначным.
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_started_at_id
+    ON app_schema.algorithm_executions(started_at, id);
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_category_completed_at_id
+    ON app_schema.algorithm_executions(snapshot_category, completed_at, id);
+
 -- === ФУНКЦИИ И ТРИГГЕРЫ ===
 
 -- Создание или замена функции для обновления поля updated_at
@@ -346,6 +391,9 @@ CREATE INDEX IF NOT EXISTS idx_ae_orgs_organization_id ON app_schema.action_exec
 -- Индекс для ускорения поиска файлов по организации
 CREATE INDEX IF NOT EXISTS idx_org_ref_files_organization_id ON app_schema.organization_reference_files(organization_id);
 
+-- Индекс для постраничной выдачи справочника организаций (порядок name, id)
+CREATE INDEX IF NOT EXISTS idx_organizations_name_id ON app_schema.organizations(name, id);
+
 -- === ТРИГГЕРЫ ДЛЯ ОРГАНИЗАЦИЙ ===
 
 -- Триггер для обновления updated_at у организаций
@@ -384,6 +432,900 @@ EXECUTE FUNCTION app_schema.update_updated_at_column();
 -- INSERT INTO app_schema.events (...) VALUES (...);
 -- ON CONFLICT (id) DO NOTHING;
 
+-- === ОТЧЁТНЫЕ МАТЕРИАЛЫ ВЫПОЛНЕНИЙ ДЕЙСТВИЙ ===
+
+-- Таблица для хранения отчётных материалов action_execution'ов (по одной строке на файл)
+-- Заменяет хранение путей в snapshot_report_materials, разделённых '\n'
+CREATE TABLE IF NOT EXISTS app_schema.action_execution_materials (
+    id SERIAL PRIMARY KEY,                             -- Уникальный идентификатор материала
+    action_execution_id INTEGER NOT NULL REFERENCES app_schema.action_executions(id) ON DELETE CASCADE, -- Ссылка на выполнение действия
+    file_path TEXT NOT NULL,                           -- Путь к файлу материала (или строка описания)
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP     -- Дата и время добавления материала
+);
+
+-- Индекс для ускорения выборки материалов по action_execution
+CREATE INDEX IF NOT EXISTS idx_ae_materials_action_execution_id ON app_schema.action_execution_materials(action_execution_id);
+
+-- Перенос существующих материалов из snapshot_report_materials (как миграция 004 SQLite).
+-- Строка разбивается по '\n', пустые строки пропускаются, ordinality сохраняет исходный порядок.
+-- NOT EXISTS и обнуление старой колонки делают перенос идемпотентным: при повторном запуске
+-- скрипта строк для переноса нет. Триггер updated_at на время обнуления отключается -
+-- перенос не является изменением выполнения.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM app_schema.action_executions WHERE snapshot_report_materials IS NOT NULL) THEN
+        INSERT INTO app_schema.action_execution_materials (action_execution_id, file_path)
+        SELECT ae.id, btrim(m.line)
+        FROM app_schema.action_executions ae,
+             unnest(string_to_array(replace(ae.snapshot_report_materials, E'\r', ''), E'\n'))
+                 WITH ORDINALITY AS m(line, ord)
+        WHERE ae.snapshot_report_materials IS NOT NULL
+          AND btrim(m.line) <> ''
+          AND NOT EXISTS (
+              SELECT 1 FROM app_schema.action_execution_materials x WHERE x.action_execution_id = ae.id
+          )
+        ORDER BY ae.id, m.ord;
+
+        -- Старая колонка больше не является источником данных
+        ALTER TABLE app_schema.action_executions DISABLE TRIGGER update_action_executions_updated_at;
+        UPDATE app_schema.action_executions SET snapshot_report_materials = NULL
+        WHERE snapshot_report_materials IS NOT NULL;
+        ALTER TABLE app_schema.action_executions ENABLE TRIGGER update_action_executions_updated_at;
+    END IF;
+END $$;
+
+-- === ПОЛНОТЕКСТОВЫЙ ПОИСК ===
+
+-- Единый поисковый индекс по алгоритмам, действиям, истории выполнений и организациям.
+-- Поддерживается триггерами на исходных таблицах, поиск - по GIN-индексу на document.
+CREATE TABLE IF NOT EXISTS app_schema.search_index (
+    entity_type VARCHAR(20) NOT NULL,                  -- Тип сущности: algorithm, action, action_execution, organization
+    entity_id INTEGER NOT NULL,                        -- ID сущности в исходной таблице
+    execution_id INTEGER,                              -- ID algorithm_execution (только для action_execution)
+    title TEXT,                                        -- Заголовок (название/описание)
+    body TEXT,                                         -- Остальной текст (технический текст, примечания, телефоны)
+    document TSVECTOR,                                 -- Взвешенный tsvector (title - вес A, body - вес B)
+    PRIMARY KEY (entity_type, entity_id)
+);
+
+-- GIN-индекс для полнотекстового поиска
+CREATE INDEX IF NOT EXISTS idx_search_index_document ON app_schema.search_index USING GIN (document);
+
+-- Функция добавления/обновления записи поискового индекса
+CREATE OR REPLACE FUNCTION app_schema.search_index_upsert(
+    p_entity_type VARCHAR, p_entity_id INTEGER, p_execution_id INTEGER, p_title TEXT, p_body TEXT
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO app_schema.search_index (entity_type, entity_id, execution_id, title, body, document)
+    VALUES (
+        p_entity_type, p_entity_id, p_execution_id, p_title, p_body,
+        setweight(to_tsvector('russian', coalesce(p_title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(p_body, '')), 'B')
+    )
+    ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+        execution_id = EXCLUDED.execution_id,
+        title = EXCLUDED.title,
+        body = EXCLUDED.body,
+        document = EXCLUDED.document;
+END;
+$$ language 'plpgsql';
+
+-- Триггерная функция для algorithms
+CREATE OR REPLACE FUNCTION app_schema.search_index_algorithms_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM app_schema.search_index WHERE entity_type = 'algorithm' AND entity_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    PERFORM app_schema.search_index_upsert('algorithm', NEW.id, NULL, NEW.name, NEW.description);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Триггерная функция для actions
+CREATE OR REPLACE FUNCTION app_schema.search_index_actions_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM app_schema.search_index WHERE entity_type = 'action' AND entity_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    PERFORM app_schema.search_index_upsert('action', NEW.id, NULL, NEW.description,
+        concat_ws(E'\n', NEW.technical_text, NEW.contact_phones));
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Триггерная функция для action_executions
+CREATE OR REPLACE FUNCTION app_schema.search_index_action_executions_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM app_schema.search_index WHERE entity_type = 'action_execution' AND entity_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    PERFORM app_schema.search_index_upsert('action_execution', NEW.id, NEW.execution_id, NEW.snapshot_description,
+        concat_ws(E'\n', NEW.notes, NEW.reported_to, NEW.snapshot_contact_phones));
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Триггерная функция для organizations
+CREATE OR REPLACE FUNCTION app_schema.search_index_organizations_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM app_schema.search_index WHERE entity_type = 'organization' AND entity_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    PERFORM app_schema.search_index_upsert('organization', NEW.id, NULL, NEW.name,
+        concat_ws(E'\n', NEW.phone, NEW.contact_person, NEW.notes));
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Триггеры поискового индекса
+DROP TRIGGER IF EXISTS search_index_algorithms ON app_schema.algorithms;
+CREATE TRIGGER search_index_algorithms
+AFTER INSERT OR UPDATE OF name, description OR DELETE ON app_schema.algorithms
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.search_index_algorithms_trigger();
+
+DROP TRIGGER IF EXISTS search_index_actions ON app_schema.actions;
+CREATE TRIGGER search_index_actions
+AFTER INSERT OR UPDATE OF description, technical_text, contact_phones OR DELETE ON app_schema.actions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.search_index_actions_trigger();
+
+DROP TRIGGER IF EXISTS search_index_action_executions ON app_schema.action_executions;
+CREATE TRIGGER search_index_action_executions
+AFTER INSERT OR UPDATE OF snapshot_description, notes, reported_to, snapshot_contact_phones OR DELETE ON app_schema.action_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.search_index_action_executions_trigger();
+
+DROP TRIGGER IF EXISTS search_index_organizations ON app_schema.organizations;
+CREATE TRIGGER search_index_organizations
+AFTER INSERT OR UPDATE OF name, phone, contact_person, notes OR DELETE ON app_schema.organizations
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.search_index_organizations_trigger();
+
+-- Первичное заполнение индекса для уже существующих данных (повторный запуск безопасен)
+SELECT app_schema.search_index_upsert('algorithm', id, NULL, name, description)
+FROM app_schema.algorithms
+WHERE NOT EXISTS (SELECT 1 FROM app_schema.search_index s WHERE s.entity_type = 'algorithm' AND s.entity_id = algorithms.id);
+
+SELECT app_schema.search_index_upsert('action', id, NULL, description, concat_ws(E'\n', technical_text, contact_phones))
+FROM app_schema.actions
+WHERE NOT EXISTS (SELECT 1 FROM app_schema.search_index s WHERE s.entity_type = 'action' AND s.entity_id = actions.id);
+
+SELECT app_schema.search_index_upsert('action_execution', id, execution_id, snapshot_description,
+       concat_ws(E'\n', notes, reported_to, snapshot_contact_phones))
+FROM app_schema.action_executions
+WHERE NOT EXISTS (SELECT 1 FROM app_schema.search_index s WHERE s.entity_type = 'action_execution' AND s.entity_id = action_executions.id);
+
+SELECT app_schema.search_index_upsert('organization', id, NULL, name, concat_ws(E'\n', phone, contact_person, notes))
+FROM app_schema.organizations
+WHERE NOT EXISTS (SELECT 1 FROM app_schema.search_index s WHERE s.entity_type = 'organization' AND s.entity_id = organizations.id);
+
+-- Уже показанные уведомления о действиях (чтобы после перезапуска не повторять их)
+-- notification_type - код типа (степень двойки): 1 - начало действия, 2 - время истекло, 4 - осталось 5 минут
+CREATE TABLE IF NOT EXISTS app_schema.action_execution_notifications (
+    action_execution_id INTEGER NOT NULL REFERENCES app_schema.action_executions(id) ON DELETE CASCADE, -- Ссылка на выполнение действия
+    notification_type SMALLINT NOT NULL,               -- Код типа уведомления
+    notified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,   -- Когда уведомление было показано
+    PRIMARY KEY (action_execution_id, notification_type)
+);
+
+-- === ОЧЕРЕДЬ АКТИВНЫХ ДЕЙСТВИЙ ===
+-- Компактная копия "живого" набора: незавершённые (pending/in_progress) действия активных выполнений.
+-- Поддерживается триггерами; проверка дедлайнов и списки запущенных алгоритмов читают её
+-- вместо соединения с полной историей. Времена - секунды EXTRACT(EPOCH) настенного времени.
+CREATE TABLE IF NOT EXISTS app_schema.active_action_queue (
+    action_execution_id INTEGER PRIMARY KEY REFERENCES app_schema.action_executions(id) ON DELETE CASCADE, -- ID action_execution
+    execution_id INTEGER NOT NULL,                     -- ID algorithm_execution
+    status VARCHAR(50) NOT NULL,                       -- 'pending' или 'in_progress'
+    start_epoch BIGINT,                                -- Плановое начало (секунды)
+    end_epoch BIGINT,                                  -- Плановое окончание (секунды)
+    snapshot_description TEXT,                         -- Описание действия (для уведомлений)
+    snapshot_name TEXT                                 -- Название алгоритма (для уведомлений)
+);
+
+CREATE INDEX IF NOT EXISTS idx_active_action_queue_execution_id ON app_schema.active_action_queue(execution_id, end_epoch);
+
+CREATE OR REPLACE FUNCTION app_schema.active_action_queue_action_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status IN ('pending', 'in_progress') THEN
+        INSERT INTO app_schema.active_action_queue
+            (action_execution_id, execution_id, status, start_epoch, end_epoch, snapshot_description, snapshot_name)
+        SELECT NEW.id, NEW.execution_id, NEW.status,
+               EXTRACT(EPOCH FROM NEW.calculated_start_time)::BIGINT,
+               EXTRACT(EPOCH FROM NEW.calculated_end_time)::BIGINT,
+               NEW.snapshot_description, e.snapshot_name
+        FROM app_schema.algorithm_executions e
+        WHERE e.id = NEW.execution_id AND e.status = 'active'
+        ON CONFLICT (action_execution_id) DO UPDATE SET
+            status = EXCLUDED.status,
+            start_epoch = EXCLUDED.start_epoch,
+            end_epoch = EXCLUDED.end_epoch,
+            snapshot_description = EXCLUDED.snapshot_description;
+    ELSIF TG_OP = 'UPDATE' THEN
+        DELETE FROM app_schema.active_action_queue WHERE action_execution_id = OLD.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION app_schema.active_action_queue_execution_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status IS DISTINCT FROM OLD.status THEN
+        IF NEW.status <> 'active' THEN
+            DELETE FROM app_schema.active_action_queue WHERE execution_id = NEW.id;
+        ELSE
+            INSERT INTO app_schema.active_action_queue
+                (action_execution_id, execution_id, status, start_epoch, end_epoch, snapshot_description, snapshot_name)
+            SELECT ae.id, ae.execution_id, ae.status,
+                   EXTRACT(EPOCH FROM ae.calculated_start_time)::BIGINT,
+                   EXTRACT(EPOCH FROM ae.calculated_end_time)::BIGINT,
+                   ae.snapshot_description, NEW.snapshot_name
+            FROM app_schema.action_executions ae
+            WHERE ae.execution_id = NEW.id AND ae.status IN ('pending', 'in_progress')
+            ON CONFLICT (action_execution_id) DO NOTHING;
+        END IF;
+    ELSIF NEW.snapshot_name IS DISTINCT FROM OLD.snapshot_name THEN
+        UPDATE app_schema.active_action_queue SET snapshot_name = NEW.snapshot_name WHERE execution_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS active_action_queue_action ON app_schema.action_executions;
+CREATE TRIGGER active_action_queue_action
+AFTER INSERT OR UPDATE OF status, calculated_start_time, calculated_end_time, snapshot_description ON app_schema.action_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.active_action_queue_action_trigger();
+
+DROP TRIGGER IF EXISTS active_action_queue_execution ON app_schema.algorithm_executions;
+CREATE TRIGGER active_action_queue_execution
+AFTER UPDATE OF status, snapshot_name ON app_schema.algorithm_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.active_action_queue_execution_trigger();
+
+-- Первичное заполнение (и выравнивание после ручных правок)
+DELETE FROM app_schema.active_action_queue q
+WHERE NOT EXISTS (
+    SELECT 1 FROM app_schema.action_executions ae
+    JOIN app_schema.algorithm_executions e ON e.id = ae.execution_id
+    WHERE ae.id = q.action_execution_id AND e.status = 'active' AND ae.status IN ('pending', 'in_progress')
+);
+INSERT INTO app_schema.active_action_queue
+    (action_execution_id, execution_id, status, start_epoch, end_epoch, snapshot_description, snapshot_name)
+SELECT ae.id, ae.execution_id, ae.status,
+       EXTRACT(EPOCH FROM ae.calculated_start_time)::BIGINT,
+       EXTRACT(EPOCH FROM ae.calculated_end_time)::BIGINT,
+       ae.snapshot_description, e.snapshot_name
+FROM app_schema.action_executions ae
+JOIN app_schema.algorithm_executions e ON e.id = ae.execution_id
+WHERE e.status = 'active' AND ae.status IN ('pending', 'in_progress')
+ON CONFLICT (action_execution_id) DO NOTHING;
+
+-- === СУТОЧНЫЕ СВОДКИ ДЛЯ АНАЛИТИКИ ИСПОЛНЕНИЯ ===
+-- Итоги по действиям за сутки запуска выполнения (day = started_at::date) в разрезах
+-- (dimension): 'algorithm' - название алгоритма, 'action' - описание действия,
+-- 'officer' - ответственный. Строит и читает reports/performance_analytics.py; триггеры ниже
+-- только помечают сутки, данные которых изменились, и при следующем запросе аналитики
+-- пересчитываются лишь эти сутки. Опоздание - секунды от планового до фактического окончания.
+CREATE TABLE IF NOT EXISTS app_schema.performance_rollup (
+    dimension VARCHAR(20) NOT NULL,                    -- Разрез: 'algorithm', 'action', 'officer'
+    day DATE NOT NULL,                                 -- Сутки запуска
+    group_key TEXT NOT NULL,                           -- Значение разреза
+    total INTEGER NOT NULL,                            -- Всего действий
+    completed INTEGER NOT NULL,                        -- Выполнено
+    on_time INTEGER NOT NULL,                          -- Выполнено в срок
+    late INTEGER NOT NULL,                             -- Выполнено с опозданием
+    skipped INTEGER NOT NULL,                          -- Пропущено
+    lateness_sum BIGINT NOT NULL,                      -- Сумма опозданий, с
+    lateness_max BIGINT NOT NULL,                      -- Наибольшее опоздание, с
+    PRIMARY KEY (dimension, day, group_key)
+);
+
+-- Гистограмма опозданий (интервалы LATENESS_BUCKET_EDGES в performance_analytics.py) - для процентилей
+CREATE TABLE IF NOT EXISTS app_schema.performance_rollup_lateness (
+    dimension VARCHAR(20) NOT NULL,
+    day DATE NOT NULL,
+    group_key TEXT NOT NULL,
+    bucket SMALLINT NOT NULL,                          -- Номер интервала
+    late_count INTEGER NOT NULL,                       -- Опозданий в интервале
+    PRIMARY KEY (dimension, day, group_key, bucket)
+);
+
+-- Сутки, для которых сводка построена
+CREATE TABLE IF NOT EXISTS app_schema.performance_rollup_days (
+    day DATE PRIMARY KEY,
+    built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Сутки, данные которых изменились после построения сводки
+CREATE TABLE IF NOT EXISTS app_schema.performance_rollup_dirty_days (
+    day DATE PRIMARY KEY
+);
+
+CREATE OR REPLACE FUNCTION app_schema.performance_rollup_action_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO app_schema.performance_rollup_dirty_days (day)
+    SELECT DISTINCT e.started_at::date
+    FROM app_schema.algorithm_executions e
+    WHERE e.started_at IS NOT NULL
+      AND e.id IN (
+          CASE WHEN TG_OP <> 'INSERT' THEN OLD.execution_id END,
+          CASE WHEN TG_OP <> 'DELETE' THEN NEW.execution_id END
+      )
+    ON CONFLICT (day) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Удаление выполнения (в том числе перенос в архив): каскадно удалённые действия
+-- уже не видят строку выполнения, поэтому сутки помечаются и здесь
+CREATE OR REPLACE FUNCTION app_schema.performance_rollup_execution_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.started_at IS NOT NULL THEN
+        INSERT INTO app_schema.performance_rollup_dirty_days (day) VALUES (OLD.started_at::date)
+        ON CONFLICT (day) DO NOTHING;
+    END IF;
+    IF TG_OP = 'UPDATE' AND NEW.started_at IS NOT NULL THEN
+        INSERT INTO app_schema.performance_rollup_dirty_days (day) VALUES (NEW.started_at::date)
+        ON CONFLICT (day) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS performance_rollup_action ON app_schema.action_executions;
+CREATE TRIGGER performance_rollup_action
+AFTER INSERT OR UPDATE OF status, calculated_end_time, actual_end_time, snapshot_description, execution_id OR DELETE
+ON app_schema.action_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.performance_rollup_action_trigger();
+
+DROP TRIGGER IF EXISTS performance_rollup_execution ON app_schema.algorithm_executions;
+CREATE TRIGGER performance_rollup_execution
+AFTER UPDATE OF started_at, snapshot_name, created_by_user_display_name OR DELETE ON app_schema.algorithm_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.performance_rollup_execution_trigger();
+
+-- === АРХИВ ЗАВЕРШЁННЫХ ВЫПОЛНЕНИЙ ===
+-- Завершённые/отменённые algorithm_executions старше заданного срока переносятся из "горячих"
+-- таблиц в архивные, секционированные по диапазону completed_at (одна секция на год).
+-- Секции создаются функцией archive_completed_executions по мере необходимости.
+-- История читается через представления all_* (UNION ALL горячих и архивных таблиц).
+-- Архивные записи только для чтения.
+
+CREATE TABLE IF NOT EXISTS app_schema.archive_algorithm_executions (
+    LIKE app_schema.algorithm_executions INCLUDING DEFAULTS,
+    PRIMARY KEY (id, completed_at)
+) PARTITION BY RANGE (completed_at);
+
+-- execution_completed_at - копия completed_at родительского execution'а (ключ секционирования)
+CREATE TABLE IF NOT EXISTS app_schema.archive_action_executions (
+    LIKE app_schema.action_executions INCLUDING DEFAULTS,
+    execution_completed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (id, execution_completed_at)
+) PARTITION BY RANGE (execution_completed_at);
+
+CREATE TABLE IF NOT EXISTS app_schema.archive_action_execution_materials (
+    LIKE app_schema.action_execution_materials INCLUDING DEFAULTS,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS app_schema.archive_action_execution_organizations (
+    LIKE app_schema.action_execution_organizations INCLUDING DEFAULTS,
+    PRIMARY KEY (id)
+);
+
+-- Выполнения, перенесённые в архив до переноса материалов, хранят их в snapshot_report_materials.
+-- Переносим так же, как для горячей таблицы; id материалов берётся из общей последовательности
+-- action_execution_materials (DEFAULT скопирован через LIKE ... INCLUDING DEFAULTS).
+INSERT INTO app_schema.archive_action_execution_materials (action_execution_id, file_path)
+SELECT ae.id, btrim(m.line)
+FROM app_schema.archive_action_executions ae,
+     unnest(string_to_array(replace(ae.snapshot_report_materials, E'\r', ''), E'\n'))
+         WITH ORDINALITY AS m(line, ord)
+WHERE ae.snapshot_report_materials IS NOT NULL
+  AND btrim(m.line) <> ''
+  AND NOT EXISTS (
+      SELECT 1 FROM app_schema.archive_action_execution_materials x WHERE x.action_execution_id = ae.id
+  )
+ORDER BY ae.id, m.ord;
+
+UPDATE app_schema.archive_action_executions SET snapshot_report_materials = NULL
+WHERE snapshot_report_materials IS NOT NULL;
+
+-- Ссылка на снимок technical_text для таблиц, созданных до snapshot_blobs. В таких БД колонка
+-- оказывается последней (в архиве - после execution_completed_at), поэтому представление
+-- all_action_executions и archive_completed_executions перечисляют колонки по именам.
+ALTER TABLE app_schema.action_executions
+    ADD COLUMN IF NOT EXISTS snapshot_technical_text_hash TEXT REFERENCES app_schema.snapshot_blobs(hash);
+ALTER TABLE app_schema.archive_action_executions ADD COLUMN IF NOT EXISTS snapshot_technical_text_hash TEXT;
+
+-- Дедупликация технического текста строк, сохранённых до появления snapshot_blobs (однократно)
+INSERT INTO app_schema.snapshot_blobs (hash, content, size)
+SELECT DISTINCT encode(sha256(convert_to(snapshot_technical_text, 'UTF8')), 'hex'),
+       snapshot_technical_text, octet_length(convert_to(snapshot_technical_text, 'UTF8'))
+FROM (
+    SELECT snapshot_technical_text FROM app_schema.action_executions WHERE snapshot_technical_text IS NOT NULL
+    UNION
+    SELECT snapshot_technical_text FROM app_schema.archive_action_executions WHERE snapshot_technical_text IS NOT NULL
+) t
+ON CONFLICT (hash) DO NOTHING;
+
+UPDATE app_schema.action_executions
+SET snapshot_technical_text_hash = encode(sha256(convert_to(snapshot_technical_text, 'UTF8')), 'hex'),
+    snapshot_technical_text = NULL
+WHERE snapshot_technical_text IS NOT NULL;
+
+UPDATE app_schema.archive_action_executions
+SET snapshot_technical_text_hash = encode(sha256(convert_to(snapshot_technical_text, 'UTF8')), 'hex'),
+    snapshot_technical_text = NULL
+WHERE snapshot_technical_text IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_archive_algorithm_executions_started_at ON app_schema.archive_algorithm_executions(started_at);
+CREATE INDEX IF NOT EXISTS idx_archive_algorithm_executions_id ON app_schema.archive_algorithm_executions(id);
+CREATE INDEX IF NOT EXISTS idx_archive_action_executions_execution_id ON app_schema.archive_action_executions(execution_id);
+CREATE INDEX IF NOT EXISTS idx_archive_action_executions_id ON app_schema.archive_action_executions(id);
+CREATE INDEX IF NOT EXISTS idx_archive_ae_materials_action_execution_id ON app_schema.archive_action_execution_materials(action_execution_id);
+CREATE INDEX IF NOT EXISTS idx_archive_ae_orgs_action_execution_id ON app_schema.archive_action_execution_organizations(action_execution_id);
+
+-- Создаёт годовые секции архивных таблиц (если их ещё нет)
+CREATE OR REPLACE FUNCTION app_schema.ensure_archive_partitions(p_year INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_from DATE := make_date(p_year, 1, 1);
+    v_to DATE := make_date(p_year + 1, 1, 1);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS app_schema.archive_algorithm_executions_%s '
+        'PARTITION OF app_schema.archive_algorithm_executions FOR VALUES FROM (%L) TO (%L)',
+        p_year, v_from, v_to);
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS app_schema.archive_action_executions_%s '
+        'PARTITION OF app_schema.archive_action_executions FOR VALUES FROM (%L) TO (%L)',
+        p_year, v_from, v_to);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Переносит завершённые/отменённые execution'ы, завершившиеся раньше NOW() - p_older_than,
+-- вместе с action_executions, материалами и связями с организациями в архив.
+-- Возвращает количество перенесённых execution'ов.
+CREATE OR REPLACE FUNCTION app_schema.archive_completed_executions(p_older_than INTERVAL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_year INTEGER;
+    v_count INTEGER;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS archive_batch (
+        id INTEGER PRIMARY KEY,
+        completed_at TIMESTAMP NOT NULL
+    ) ON COMMIT DROP;
+    TRUNCATE archive_batch;
+
+    INSERT INTO archive_batch (id, completed_at)
+    SELECT id, completed_at
+    FROM app_schema.algorithm_executions
+    WHERE status IN ('completed', 'cancelled')
+      AND completed_at IS NOT NULL
+      AND completed_at < CURRENT_TIMESTAMP - p_older_than;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    IF v_count = 0 THEN
+        RETURN 0;
+    END IF;
+
+    FOR v_year IN SELECT DISTINCT EXTRACT(YEAR FROM completed_at)::INTEGER FROM archive_batch LOOP
+        PERFORM app_schema.ensure_archive_partitions(v_year);
+    END LOOP;
+
+    INSERT INTO app_schema.archive_algorithm_executions
+    SELECT e.* FROM app_schema.algorithm_executions e JOIN archive_batch b ON b.id = e.id;
+
+    INSERT INTO app_schema.archive_action_executions (
+    id, execution_id, snapshot_description, snapshot_technical_text, snapshot_technical_text_hash,
+    snapshot_contact_phones, snapshot_report_materials, calculated_start_time, calculated_end_time,
+    actual_end_time, status, reported_to, notes, created_at, updated_at,
+    execution_completed_at)
+    SELECT
+    ae.id, ae.execution_id, snapshot_description, snapshot_technical_text, snapshot_technical_text_hash,
+    snapshot_contact_phones, snapshot_report_materials, calculated_start_time, calculated_end_time,
+    actual_end_time, status, reported_to, notes, created_at, updated_at,
+    b.completed_at
+    FROM app_schema.action_executions ae JOIN archive_batch b ON b.id = ae.execution_id;
+
+    INSERT INTO app_schema.archive_action_execution_materials
+    SELECT m.* FROM app_schema.action_execution_materials m
+    JOIN app_schema.action_executions ae ON ae.id = m.action_execution_id
+    JOIN archive_batch b ON b.id = ae.execution_id;
+
+    INSERT INTO app_schema.archive_action_execution_organizations
+    SELECT o.* FROM app_schema.action_execution_organizations o
+    JOIN app_schema.action_executions ae ON ae.id = o.action_execution_id
+    JOIN archive_batch b ON b.id = ae.execution_id;
+
+    -- action_executions, материалы и связи удаляются каскадно
+    DELETE FROM app_schema.algorithm_executions WHERE id IN (SELECT id FROM archive_batch);
+
+    -- Триггеры статистики вычли вклад перенесённых выполнений - возвращаем его (статистика охватывает архив).
+    -- Горячих строк выполнений уже нет, поэтому триггер execution_stats суточные итоги не меняет.
+    INSERT INTO app_schema.execution_stats (execution_id, total, completed, on_time, late, skipped)
+    SELECT
+        ae.execution_id, COUNT(*),
+        COUNT(*) FILTER (WHERE ae.status = 'completed'),
+        COUNT(*) FILTER (WHERE ae.status = 'completed' AND ae.actual_end_time <= ae.calculated_end_time),
+        COUNT(*) FILTER (WHERE ae.status = 'completed' AND ae.actual_end_time > ae.calculated_end_time),
+        COUNT(*) FILTER (WHERE ae.status = 'skipped')
+    FROM app_schema.archive_action_executions ae
+    JOIN archive_batch b ON b.id = ae.execution_id
+    GROUP BY ae.execution_id;
+
+    INSERT INTO app_schema.daily_execution_stats
+        (day, snapshot_category, algorithm_id, executions, completed_executions, total, completed, on_time, late, skipped)
+    SELECT e.started_at::date, e.snapshot_category, COALESCE(e.algorithm_id, 0),
+           COUNT(*), COUNT(*) FILTER (WHERE e.status = 'completed'),
+           COALESCE(SUM(s.total), 0), COALESCE(SUM(s.completed), 0), COALESCE(SUM(s.on_time), 0),
+           COALESCE(SUM(s.late), 0), COALESCE(SUM(s.skipped), 0)
+    FROM app_schema.archive_algorithm_executions e
+    JOIN archive_batch b ON b.id = e.id
+    LEFT JOIN app_schema.execution_stats s ON s.execution_id = e.id
+    WHERE e.started_at IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        executions = daily_execution_stats.executions + EXCLUDED.executions,
+        completed_executions = daily_execution_stats.completed_executions + EXCLUDED.completed_executions,
+        total = daily_execution_stats.total + EXCLUDED.total,
+        completed = daily_execution_stats.completed + EXCLUDED.completed,
+        on_time = daily_execution_stats.on_time + EXCLUDED.on_time,
+        late = daily_execution_stats.late + EXCLUDED.late,
+        skipped = daily_execution_stats.skipped + EXCLUDED.skipped;
+
+    -- Триггер поиска удалил записи action_execution'ов - возвращаем их (поиск охватывает архив)
+    PERFORM app_schema.search_index_upsert('action_execution', ae.id, ae.execution_id, ae.snapshot_description,
+                                           concat_ws(E'\n', ae.notes, ae.reported_to, ae.snapshot_contact_phones))
+    FROM app_schema.archive_action_executions ae
+    JOIN archive_batch b ON b.id = ae.execution_id;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Представления истории: горячие + архивные записи
+DROP VIEW IF EXISTS app_schema.all_algorithm_executions;
+CREATE VIEW app_schema.all_algorithm_executions AS
+SELECT * FROM app_schema.algorithm_executions
+UNION ALL
+SELECT * FROM app_schema.archive_algorithm_executions;
+
+DROP VIEW IF EXISTS app_schema.all_action_executions;
+CREATE VIEW app_schema.all_action_executions AS
+SELECT
+    id, execution_id, snapshot_description, snapshot_technical_text, snapshot_technical_text_hash,
+    snapshot_contact_phones, snapshot_report_materials, calculated_start_time, calculated_end_time,
+    actual_end_time, status, reported_to, notes, created_at, updated_at,
+    NULL::TIMESTAMP AS execution_completed_at
+FROM app_schema.action_executions
+UNION ALL
+SELECT
+    id, execution_id, snapshot_description, snapshot_technical_text, snapshot_technical_text_hash,
+    snapshot_contact_phones, snapshot_report_materials, calculated_start_time, calculated_end_time,
+    actual_end_time, status, reported_to, notes, created_at, updated_at,
+    execution_completed_at
+FROM app_schema.archive_action_executions;
+
+DROP VIEW IF EXISTS app_schema.all_action_execution_materials;
+CREATE VIEW app_schema.all_action_execution_materials AS
+SELECT * FROM app_schema.action_execution_materials
+UNION ALL
+SELECT * FROM app_schema.archive_action_execution_materials;
+
+DROP VIEW IF EXISTS app_schema.all_action_execution_organizations;
+CREATE VIEW app_schema.all_action_execution_organizations AS
+SELECT * FROM app_schema.action_execution_organizations
+UNION ALL
+SELECT * FROM app_schema.archive_action_execution_organizations;
+
+-- === СТАТИСТИКА ВЫПОЛНЕНИЙ (ИТОГИ ПО ДЕЙСТВИЯМ) ===
+-- Счётчики действий выполнения и их суммы за сутки запуска по категории и алгоритму.
+-- Поддерживаются триггерами приращениями (завершение действия меняет одну строку каждой
+-- таблицы); круговая диаграмма, итоги дня в календаре и аналитика за длинные периоды читают их
+-- вместо строк action_executions. Статистика охватывает архив: archive_completed_executions
+-- возвращает в неё вклад перенесённых выполнений. Пересборка по истории -
+-- функция rebuild_execution_statistics (скрипт rebuild_statistics.py).
+-- В срок - действие выполнено и фактическое окончание не позже планового, с опозданием - позже;
+-- выполненные без одного из времён входят только в completed.
+CREATE TABLE IF NOT EXISTS app_schema.execution_stats (
+    execution_id INTEGER PRIMARY KEY,                  -- ID algorithm_execution (горячего или архивного)
+    total INTEGER NOT NULL DEFAULT 0,                  -- Всего действий
+    completed INTEGER NOT NULL DEFAULT 0,              -- Выполнено
+    on_time INTEGER NOT NULL DEFAULT 0,                -- Выполнено в срок
+    late INTEGER NOT NULL DEFAULT 0,                   -- Выполнено с опозданием
+    skipped INTEGER NOT NULL DEFAULT 0                 -- Пропущено
+);
+
+CREATE TABLE IF NOT EXISTS app_schema.daily_execution_stats (
+    day DATE NOT NULL,                                 -- Сутки запуска
+    snapshot_category VARCHAR(100) NOT NULL,           -- Категория из snapshot'а выполнения
+    algorithm_id INTEGER NOT NULL,                     -- ID алгоритма (0 - выполнение без алгоритма)
+    executions INTEGER NOT NULL DEFAULT 0,             -- Запущено выполнений
+    completed_executions INTEGER NOT NULL DEFAULT 0,   -- Из них завершено (остановлено)
+    total INTEGER NOT NULL DEFAULT 0,                  -- Счётчики действий - как в execution_stats
+    completed INTEGER NOT NULL DEFAULT 0,
+    on_time INTEGER NOT NULL DEFAULT 0,
+    late INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, snapshot_category, algorithm_id)
+);
+
+-- Действия: разница прежнего и нового вклада действия - в счётчики выполнения
+CREATE OR REPLACE FUNCTION app_schema.execution_stats_action_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_total INTEGER := 0;
+    v_completed INTEGER := 0;
+    v_on_time INTEGER := 0;
+    v_late INTEGER := 0;
+    v_skipped INTEGER := 0;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.calculated_end_time IS NOT DISTINCT FROM NEW.calculated_end_time
+       AND OLD.actual_end_time IS NOT DISTINCT FROM NEW.actual_end_time THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_total := 1;
+        v_completed := (NEW.status IS NOT DISTINCT FROM 'completed')::INTEGER;
+        v_on_time := ((NEW.status = 'completed' AND NEW.actual_end_time <= NEW.calculated_end_time) IS TRUE)::INTEGER;
+        v_late := ((NEW.status = 'completed' AND NEW.actual_end_time > NEW.calculated_end_time) IS TRUE)::INTEGER;
+        v_skipped := (NEW.status IS NOT DISTINCT FROM 'skipped')::INTEGER;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        v_total := v_total - 1;
+        v_completed := v_completed - (OLD.status IS NOT DISTINCT FROM 'completed')::INTEGER;
+        v_on_time := v_on_time - ((OLD.status = 'completed' AND OLD.actual_end_time <= OLD.calculated_end_time) IS TRUE)::INTEGER;
+        v_late := v_late - ((OLD.status = 'completed' AND OLD.actual_end_time > OLD.calculated_end_time) IS TRUE)::INTEGER;
+        v_skipped := v_skipped - (OLD.status IS NOT DISTINCT FROM 'skipped')::INTEGER;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO app_schema.execution_stats (execution_id, total, completed, on_time, late, skipped)
+        VALUES (NEW.execution_id, v_total, v_completed, v_on_time, v_late, v_skipped)
+        ON CONFLICT (execution_id) DO UPDATE SET
+            total = execution_stats.total + EXCLUDED.total,
+            completed = execution_stats.completed + EXCLUDED.completed,
+            on_time = execution_stats.on_time + EXCLUDED.on_time,
+            late = execution_stats.late + EXCLUDED.late,
+            skipped = execution_stats.skipped + EXCLUDED.skipped;
+    ELSE
+        -- При удалении выполнения строки статистики уже нет - каскадно удаляемые действия ничего не вычитают
+        UPDATE app_schema.execution_stats SET
+            total = total + v_total,
+            completed = completed + v_completed,
+            on_time = on_time + v_on_time,
+            late = late + v_late,
+            skipped = skipped + v_skipped
+        WHERE execution_id = OLD.execution_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Счётчики выполнения: та же разница - в сутки, категорию и алгоритм выполнения
+CREATE OR REPLACE FUNCTION app_schema.daily_execution_stats_es_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_execution_id INTEGER;
+    v_total INTEGER := 0;
+    v_completed INTEGER := 0;
+    v_on_time INTEGER := 0;
+    v_late INTEGER := 0;
+    v_skipped INTEGER := 0;
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        v_execution_id := NEW.execution_id;
+        v_total := NEW.total;
+        v_completed := NEW.completed;
+        v_on_time := NEW.on_time;
+        v_late := NEW.late;
+        v_skipped := NEW.skipped;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        v_execution_id := OLD.execution_id;
+        v_total := v_total - OLD.total;
+        v_completed := v_completed - OLD.completed;
+        v_on_time := v_on_time - OLD.on_time;
+        v_late := v_late - OLD.late;
+        v_skipped := v_skipped - OLD.skipped;
+    END IF;
+
+    INSERT INTO app_schema.daily_execution_stats
+        (day, snapshot_category, algorithm_id, total, completed, on_time, late, skipped)
+    SELECT e.started_at::date, e.snapshot_category, COALESCE(e.algorithm_id, 0),
+           v_total, v_completed, v_on_time, v_late, v_skipped
+    FROM app_schema.algorithm_executions e
+    WHERE e.id = v_execution_id AND e.started_at IS NOT NULL
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        executions = daily_execution_stats.executions + EXCLUDED.executions,
+        completed_executions = daily_execution_stats.completed_executions + EXCLUDED.completed_executions,
+        total = daily_execution_stats.total + EXCLUDED.total,
+        completed = daily_execution_stats.completed + EXCLUDED.completed,
+        on_time = daily_execution_stats.on_time + EXCLUDED.on_time,
+        late = daily_execution_stats.late + EXCLUDED.late,
+        skipped = daily_execution_stats.skipped + EXCLUDED.skipped;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Выполнения: запуск, остановка, смена суток/категории/алгоритма (вклад переносится из прежней
+-- строки суток в новую) и удаление (BEFORE - пока строка и счётчики ещё на месте)
+CREATE OR REPLACE FUNCTION app_schema.daily_execution_stats_execution_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.started_at::date IS NOT DISTINCT FROM NEW.started_at::date
+       AND OLD.snapshot_category IS NOT DISTINCT FROM NEW.snapshot_category
+       AND OLD.algorithm_id IS NOT DISTINCT FROM NEW.algorithm_id THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        IF OLD.started_at IS NOT NULL THEN
+            INSERT INTO app_schema.daily_execution_stats (day, snapshot_category, algorithm_id, executions, completed_executions)
+            VALUES (OLD.started_at::date, OLD.snapshot_category, COALESCE(OLD.algorithm_id, 0),
+                    -1, -(OLD.status IS NOT DISTINCT FROM 'completed')::INTEGER)
+            ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+                executions = daily_execution_stats.executions + EXCLUDED.executions,
+                completed_executions = daily_execution_stats.completed_executions + EXCLUDED.completed_executions,
+                total = daily_execution_stats.total + EXCLUDED.total,
+                completed = daily_execution_stats.completed + EXCLUDED.completed,
+                on_time = daily_execution_stats.on_time + EXCLUDED.on_time,
+                late = daily_execution_stats.late + EXCLUDED.late,
+                skipped = daily_execution_stats.skipped + EXCLUDED.skipped;
+        END IF;
+        -- Счётчики действий вычитает триггер execution_stats
+        DELETE FROM app_schema.execution_stats WHERE execution_id = OLD.id;
+        RETURN OLD;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND OLD.started_at IS NOT NULL THEN
+        INSERT INTO app_schema.daily_execution_stats
+            (day, snapshot_category, algorithm_id, executions, completed_executions, total, completed, on_time, late, skipped)
+        SELECT OLD.started_at::date, OLD.snapshot_category, COALESCE(OLD.algorithm_id, 0),
+               -1, -(OLD.status IS NOT DISTINCT FROM 'completed')::INTEGER,
+               -COALESCE(s.total, 0), -COALESCE(s.completed, 0), -COALESCE(s.on_time, 0),
+               -COALESCE(s.late, 0), -COALESCE(s.skipped, 0)
+        FROM (SELECT OLD.id AS id) x
+        LEFT JOIN app_schema.execution_stats s ON s.execution_id = x.id
+        ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+            executions = daily_execution_stats.executions + EXCLUDED.executions,
+            completed_executions = daily_execution_stats.completed_executions + EXCLUDED.completed_executions,
+            total = daily_execution_stats.total + EXCLUDED.total,
+            completed = daily_execution_stats.completed + EXCLUDED.completed,
+            on_time = daily_execution_stats.on_time + EXCLUDED.on_time,
+            late = daily_execution_stats.late + EXCLUDED.late,
+            skipped = daily_execution_stats.skipped + EXCLUDED.skipped;
+    END IF;
+    IF NEW.started_at IS NOT NULL THEN
+        INSERT INTO app_schema.daily_execution_stats
+            (day, snapshot_category, algorithm_id, executions, completed_executions, total, completed, on_time, late, skipped)
+        SELECT NEW.started_at::date, NEW.snapshot_category, COALESCE(NEW.algorithm_id, 0),
+               1, (NEW.status IS NOT DISTINCT FROM 'completed')::INTEGER,
+               COALESCE(s.total, 0), COALESCE(s.completed, 0), COALESCE(s.on_time, 0),
+               COALESCE(s.late, 0), COALESCE(s.skipped, 0)
+        FROM (SELECT NEW.id AS id) x
+        LEFT JOIN app_schema.execution_stats s ON s.execution_id = x.id
+        ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+            executions = daily_execution_stats.executions + EXCLUDED.executions,
+            completed_executions = daily_execution_stats.completed_executions + EXCLUDED.completed_executions,
+            total = daily_execution_stats.total + EXCLUDED.total,
+            completed = daily_execution_stats.completed + EXCLUDED.completed,
+            on_time = daily_execution_stats.on_time + EXCLUDED.on_time,
+            late = daily_execution_stats.late + EXCLUDED.late,
+            skipped = daily_execution_stats.skipped + EXCLUDED.skipped;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS execution_stats_action ON app_schema.action_executions;
+CREATE TRIGGER execution_stats_action
+AFTER INSERT OR UPDATE OF status, calculated_end_time, actual_end_time OR DELETE
+ON app_schema.action_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.execution_stats_action_trigger();
+
+DROP TRIGGER IF EXISTS daily_execution_stats_es ON app_schema.execution_stats;
+CREATE TRIGGER daily_execution_stats_es
+AFTER INSERT OR UPDATE OR DELETE ON app_schema.execution_stats
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.daily_execution_stats_es_trigger();
+
+DROP TRIGGER IF EXISTS daily_execution_stats_execution ON app_schema.algorithm_executions;
+CREATE TRIGGER daily_execution_stats_execution
+AFTER INSERT OR UPDATE OF status, started_at, snapshot_category, algorithm_id ON app_schema.algorithm_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.daily_execution_stats_execution_trigger();
+
+DROP TRIGGER IF EXISTS daily_execution_stats_execution_delete ON app_schema.algorithm_executions;
+CREATE TRIGGER daily_execution_stats_execution_delete
+BEFORE DELETE ON app_schema.algorithm_executions
+FOR EACH ROW
+EXECUTE FUNCTION app_schema.daily_execution_stats_execution_trigger();
+
+-- Пересчитывает статистику по истории (горячие и архивные записи) для выполнений, запущенных
+-- в сутки [p_start, p_end); NULL - без границы. Срабатывающие при этом триггеры меняют только
+-- строки перестраиваемых суток, которые затем заменяются целиком. Отметки сводок аналитики
+-- этих суток снимаются - сводки перестроятся при следующем запросе.
+-- Возвращает количество выполнений, статистика которых пересчитана.
+CREATE OR REPLACE FUNCTION app_schema.rebuild_execution_statistics(p_start DATE, p_end DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS stats_batch (
+        id INTEGER PRIMARY KEY
+    ) ON COMMIT DROP;
+    TRUNCATE stats_batch;
+
+    INSERT INTO stats_batch (id)
+    SELECT id FROM app_schema.all_algorithm_executions
+    WHERE (p_start IS NULL OR started_at >= p_start) AND (p_end IS NULL OR started_at < p_end);
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    DELETE FROM app_schema.execution_stats WHERE execution_id IN (SELECT id FROM stats_batch);
+    INSERT INTO app_schema.execution_stats (execution_id, total, completed, on_time, late, skipped)
+    SELECT
+        a.execution_id, COUNT(*),
+        COUNT(*) FILTER (WHERE a.status = 'completed'),
+        COUNT(*) FILTER (WHERE a.status = 'completed' AND a.actual_end_time <= a.calculated_end_time),
+        COUNT(*) FILTER (WHERE a.status = 'completed' AND a.actual_end_time > a.calculated_end_time),
+        COUNT(*) FILTER (WHERE a.status = 'skipped')
+    FROM app_schema.all_action_executions a
+    JOIN stats_batch b ON b.id = a.execution_id
+    GROUP BY a.execution_id;
+
+    DELETE FROM app_schema.daily_execution_stats
+    WHERE (p_start IS NULL OR day >= p_start) AND (p_end IS NULL OR day < p_end);
+    DELETE FROM app_schema.performance_rollup_days
+    WHERE (p_start IS NULL OR day >= p_start) AND (p_end IS NULL OR day < p_end);
+    INSERT INTO app_schema.daily_execution_stats
+        (day, snapshot_category, algorithm_id, executions, completed_executions, total, completed, on_time, late, skipped)
+    SELECT e.started_at::date, e.snapshot_category, COALESCE(e.algorithm_id, 0),
+           COUNT(*), COUNT(*) FILTER (WHERE e.status = 'completed'),
+           COALESCE(SUM(s.total), 0), COALESCE(SUM(s.completed), 0), COALESCE(SUM(s.on_time), 0),
+           COALESCE(SUM(s.late), 0), COALESCE(SUM(s.skipped), 0)
+    FROM app_schema.all_algorithm_executions e
+    JOIN stats_batch b ON b.id = e.id
+    LEFT JOIN app_schema.execution_stats s ON s.execution_id = e.id
+    WHERE e.started_at IS NOT NULL
+    GROUP BY 1, 2, 3;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Однократное заполнение для БД, созданных до появления таблиц статистики
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM app_schema.execution_stats)
+       AND EXISTS (SELECT 1 FROM app_schema.all_algorithm_executions) THEN
+        PERFORM app_schema.rebuild_execution_statistics(NULL, NULL);
+    END IF;
+END $$;
+
 -- Сообщение
 DO $$ BEGIN
     RAISE NOTICE 'Схема ''app_schema'' создана (если не существовала).';
@@ -395,4 +1337,14 @@ DO $$ BEGIN
     RAISE NOTICE 'Таблица algorithm_executions обновлена: algorithm_id теперь может быть NULL, добавлено ON DELETE SET NULL.';
     RAISE NOTICE 'Поле notes удалено из таблицы algorithm_executions (если не нужно).';
     RAISE NOTICE 'Добавлены таблицы мероприятий (events, event_occurrences), индексы и триггеры.';
+    RAISE NOTICE 'Добавлена таблица action_execution_materials (отчётные материалы выполнений действий).';
+    RAISE NOTICE 'Добавлен полнотекстовый поиск: таблица search_index, GIN-индекс и триггеры.';
+    RAISE NOTICE 'Добавлены архивные таблицы (секционирование по completed_at), функция archive_completed_executions и представления all_*.';
+    RAISE NOTICE 'Добавлена таблица action_execution_notifications (состояние показанных уведомлений).';
+    RAISE NOTICE 'Добавлены частичные покрывающие индексы активных выполнений и действий.';
+    RAISE NOTICE 'Добавлена таблица active_action_queue (очередь активных действий) и поддерживающие её триггеры.';
+    RAISE NOTICE 'Добавлены индексы постраничной выдачи истории выполнений и организаций.';
+    RAISE NOTICE 'Добавлена таблица snapshot_blobs (дедупликация технического текста выполнений действий).';
+    RAISE NOTICE 'Добавлены таблицы суточных сводок аналитики исполнения (performance_rollup*) и триггеры пометки изменённых суток.';
+    RAISE NOTICE 'Добавлены таблицы статистики выполнений (execution_stats, daily_execution_stats), поддерживающие их триггеры и функция rebuild_execution_statistics.';
 END $$;
\ No newline at end of file
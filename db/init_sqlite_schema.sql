@@ -63,6 +63,9 @@ CREATE TABLE IF NOT EXISTS actions (
     technical_text TEXT,                               -- Технический текст порядка выполнения
     start_offset TEXT,                                 -- Относительное время начала действия (смещение от начала алгоритма) в формате строки
     end_offset TEXT,                                   -- Относительное время окончания действия (смещение от начала алгоритма) в формате строки
+    start_offset_seconds INTEGER,                      -- start_offset в секундах (NULL - смещения нет или формат не распознан)
+    end_offset_seconds INTEGER,                        -- end_offset в секундах (NULL - смещения нет или формат не распознан)
+    offset_time_of_day INTEGER NOT NULL DEFAULT 1,     -- 1 - часы/минуты/секунды обоих смещений - корректное время суток (для астрономического времени)
     contact_phones TEXT,                               -- Телефоны для связи, связанные с этим действием
     report_materials TEXT,                             -- Пути или ссылки на отчетные материалы
     created_at TEXT DEFAULT (datetime('now', 'localtime')), -- Дата и время создания записи действия
@@ -91,13 +94,28 @@ CREATE TABLE IF NOT EXISTS algorithm_executions (
     CHECK (status IN ('active', 'completed', 'cancelled'))
 );
 
+-- Содержимое снимков больших текстов действий (technical_text), адресуемое хешем.
+-- Запуск одного и того же шаблона не копирует текст в каждую строку action_executions:
+-- строки ссылаются на одну запись snapshot_blobs. Тексты от SNAPSHOT_BLOB_COMPRESS_MIN_BYTES
+-- (sqlite_database_manager.py) хранятся сжатыми zlib (compressed = 1, content - BLOB),
+-- короче - как есть (compressed = 0, content - TEXT). Записи не удаляются: на них ссылаются
+-- и строки архива (<БД>_archive.db).
+CREATE TABLE IF NOT EXISTS snapshot_blobs (
+    hash TEXT PRIMARY KEY,                             -- SHA-256 текста в UTF-8 (hex)
+    compressed INTEGER NOT NULL DEFAULT 0 CHECK (compressed IN (0, 1)), -- 1 - content сжат zlib
+    content BLOB NOT NULL,                             -- Текст или сжатые zlib байты UTF-8
+    size INTEGER NOT NULL,                             -- Размер текста в байтах UTF-8 до сжатия
+    created_at TEXT DEFAULT (datetime('now', 'localtime')) -- Дата и время первого сохранения
+);
+
 -- Таблица для хранения выполнения действий в рамках запущенного алгоритма
 CREATE TABLE IF NOT EXISTS action_executions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,              -- Уникальный идентификатор выполнения действия
     execution_id INTEGER NOT NULL,                     -- Ссылка на экземпляр выполнения алгоритма
     -- ПОЛЯ ДЛЯ SNAPSHOT'А СТАТИЧЕСКИХ ДАННЫХ ДЕЙСТВИЯ НА МОМЕНТ ПЛАНИРОВАНИЯ
     snapshot_description TEXT NOT NULL,                -- Копия description действия на момент планирования
-    snapshot_technical_text TEXT,                      -- Копия technical_text действия на момент планирования
+    snapshot_technical_text TEXT,                      -- Устаревшее: копия technical_text (переносится в snapshot_blobs)
+    snapshot_technical_text_hash TEXT REFERENCES snapshot_blobs(hash), -- Снимок technical_text в snapshot_blobs
     snapshot_contact_phones TEXT,                      -- Копия contact_phones действия на момент планирования
     snapshot_report_materials TEXT,                    -- Копия report_materials действия на момент планирования
     -- РАССЧИТАННЫЕ АБСОЛЮТНЫЕ ВРЕМЕНА (вместо snapshot_*_offset шаблона действия)
@@ -128,6 +146,26 @@ CREATE INDEX IF NOT EXISTS idx_action_executions_status ON action_executions(sta
 -- НОВЫЙ ИНДЕКС: Для сортировки алгоритмов
 CREATE INDEX IF NOT EXISTS idx_algorithms_sort_order ON algorithms(sort_order);
 
+-- Частичные индексы "живых" строк для горячих запросов (get_active_action_executions_with_details,
+-- get_active_executions_by_category). В них попадают только активные выполнения и незавершённые
+-- действия, поэтому их размер не зависит от объёма истории. Первые два - покрывающие:
+-- все выбираемые колонки читаются из индекса без обращения к таблице.
+-- Проверка планов: python benchmarks/check_query_plans.py
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_active
+    ON algorithm_executions(status, id, snapshot_name) WHERE status = 'active';
+CREATE INDEX IF NOT EXISTS idx_action_executions_live
+    ON action_executions(execution_id, status, calculated_start_time, calculated_end_time, snapshot_description)
+    WHERE status IN ('pending', 'in_progress');
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_active_category
+    ON algorithm_executions(snapshot_category, started_at) WHERE status = 'active';
+
+-- Постраничная (keyset) выдача истории: порядок (started_at, id) для выполнений за дату
+-- и (snapshot_category, completed_at, id) для завершённых по категории; id делает порядок однозначным.
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_started_at_id
+    ON algorithm_executions(started_at, id);
+CREATE INDEX IF NOT EXISTS idx_algorithm_executions_category_completed_at_id
+    ON algorithm_executions(snapshot_category, completed_at, id);
+
 -- === НАЧАЛЬНЫЕ ДАННЫЕ ===
 
 -- Вставка начальных настроек поста
@@ -268,4 +306,367 @@ CREATE INDEX IF NOT EXISTS idx_ae_orgs_action_execution_id ON action_execution_o
 CREATE INDEX IF NOT EXISTS idx_ae_orgs_organization_id ON action_execution_organizations(organization_id);
 
 -- Индекс для ускорения поиска файлов по организации
-CREATE INDEX IF NOT EXISTS idx_org_ref_files_organization_id ON organization_reference_files(organization_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_org_ref_files_organization_id ON organization_reference_files(organization_id);
+
+-- Индекс для постраничной выдачи справочника организаций (порядок name, id)
+CREATE INDEX IF NOT EXISTS idx_organizations_name_id ON organizations(name, id);
+
+-- === ОТЧЁТНЫЕ МАТЕРИАЛЫ ВЫПОЛНЕНИЙ ДЕЙСТВИЙ ===
+
+-- Таблица для хранения отчётных материалов action_execution'ов (по одной строке на файл)
+-- Заменяет хранение путей в snapshot_report_materials, разделённых '\n'
+CREATE TABLE IF NOT EXISTS action_execution_materials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,              -- Уникальный идентификатор материала
+    action_execution_id INTEGER NOT NULL,              -- Ссылка на выполнение действия
+    file_path TEXT NOT NULL,                           -- Путь к файлу материала (или строка описания)
+    created_at TEXT DEFAULT (datetime('now', 'localtime')), -- Дата и время добавления материала
+    FOREIGN KEY (action_execution_id) REFERENCES action_executions(id) ON DELETE CASCADE
+);
+
+-- Индекс для ускорения выборки материалов по action_execution
+CREATE INDEX IF NOT EXISTS idx_ae_materials_action_execution_id ON action_execution_materials(action_execution_id);
+
+
+-- Уже показанные уведомления о действиях (чтобы после перезапуска не повторять их)
+-- notification_type - код типа (степень двойки): 1 - начало действия, 2 - время истекло, 4 - осталось 5 минут
+-- Записи завершённых действий удаляются (SQLiteDatabaseManager.prune_action_execution_notifications)
+CREATE TABLE IF NOT EXISTS action_execution_notifications (
+    action_execution_id INTEGER NOT NULL,              -- Ссылка на выполнение действия
+    notification_type INTEGER NOT NULL,                -- Код типа уведомления
+    notified_at TEXT DEFAULT (datetime('now', 'localtime')), -- Когда уведомление было показано
+    PRIMARY KEY (action_execution_id, notification_type),
+    FOREIGN KEY (action_execution_id) REFERENCES action_executions(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+
+-- === ОЧЕРЕДЬ АКТИВНЫХ ДЕЙСТВИЙ ===
+-- Компактная копия "живого" набора: незавершённые (pending/in_progress) действия активных выполнений.
+-- Поддерживается триггерами на action_executions и algorithm_executions; проверка дедлайнов и
+-- списки запущенных алгоритмов читают её вместо соединения с полной историей.
+-- Времена - целые секунды в шкале TimeService (strftime('%s') настенного времени).
+CREATE TABLE IF NOT EXISTS active_action_queue (
+    action_execution_id INTEGER PRIMARY KEY,           -- ID action_execution
+    execution_id INTEGER NOT NULL,                     -- ID algorithm_execution
+    status TEXT NOT NULL,                              -- 'pending' или 'in_progress'
+    start_epoch INTEGER,                               -- Плановое начало (секунды)
+    end_epoch INTEGER,                                 -- Плановое окончание (секунды)
+    snapshot_description TEXT,                         -- Описание действия (для уведомлений)
+    snapshot_name TEXT,                                -- Название алгоритма (для уведомлений)
+    FOREIGN KEY (action_execution_id) REFERENCES action_executions(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_active_action_queue_execution_id ON active_action_queue(execution_id, end_epoch);
+
+-- Новое действие активного выполнения
+CREATE TRIGGER IF NOT EXISTS trg_active_queue_ae_insert
+AFTER INSERT ON action_executions
+WHEN new.status IN ('pending', 'in_progress')
+BEGIN
+    INSERT OR REPLACE INTO active_action_queue
+        (action_execution_id, execution_id, status, start_epoch, end_epoch, snapshot_description, snapshot_name)
+    SELECT new.id, new.execution_id, new.status,
+           CAST(strftime('%s', new.calculated_start_time) AS INTEGER),
+           CAST(strftime('%s', new.calculated_end_time) AS INTEGER),
+           new.snapshot_description, e.snapshot_name
+    FROM algorithm_executions e
+    WHERE e.id = new.execution_id AND e.status = 'active';
+END;
+
+-- Смена статуса/времён/описания действия: обновляем строку очереди или убираем её
+CREATE TRIGGER IF NOT EXISTS trg_active_queue_ae_update
+AFTER UPDATE OF status, calculated_start_time, calculated_end_time, snapshot_description ON action_executions
+BEGIN
+    DELETE FROM active_action_queue
+    WHERE action_execution_id = old.id AND new.status NOT IN ('pending', 'in_progress');
+
+    INSERT OR REPLACE INTO active_action_queue
+        (action_execution_id, execution_id, status, start_epoch, end_epoch, snapshot_description, snapshot_name)
+    SELECT new.id, new.execution_id, new.status,
+           CAST(strftime('%s', new.calculated_start_time) AS INTEGER),
+           CAST(strftime('%s', new.calculated_end_time) AS INTEGER),
+           new.snapshot_description, e.snapshot_name
+    FROM algorithm_executions e
+    WHERE e.id = new.execution_id AND e.status = 'active' AND new.status IN ('pending', 'in_progress');
+END;
+
+-- Остановка/возобновление выполнения алгоритма
+CREATE TRIGGER IF NOT EXISTS trg_active_queue_exec_status
+AFTER UPDATE OF status ON algorithm_executions
+WHEN new.status IS NOT old.status
+BEGIN
+    DELETE FROM active_action_queue WHERE execution_id = new.id AND new.status <> 'active';
+
+    INSERT OR REPLACE INTO active_action_queue
+        (action_execution_id, execution_id, status, start_epoch, end_epoch, snapshot_description, snapshot_name)
+    SELECT ae.id, ae.execution_id, ae.status,
+           CAST(strftime('%s', ae.calculated_start_time) AS INTEGER),
+           CAST(strftime('%s', ae.calculated_end_time) AS INTEGER),
+           ae.snapshot_description, new.snapshot_name
+    FROM action_executions ae
+    WHERE ae.execution_id = new.id AND new.status = 'active' AND ae.status IN ('pending', 'in_progress');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_active_queue_exec_name
+AFTER UPDATE OF snapshot_name ON algorithm_executions
+BEGIN
+    UPDATE active_action_queue SET snapshot_name = new.snapshot_name WHERE execution_id = new.id;
+END;
+
+
+-- === СУТОЧНЫЕ СВОДКИ ДЛЯ АНАЛИТИКИ ИСПОЛНЕНИЯ ===
+-- Итоги по действиям за сутки запуска выполнения (day = дата started_at) в разрезах
+-- (dimension): 'algorithm' - название алгоритма, 'action' - описание действия,
+-- 'officer' - ответственный. Строит и читает reports/performance_analytics.py; триггеры ниже
+-- только помечают сутки, данные которых изменились, и при следующем запросе аналитики
+-- пересчитываются лишь эти сутки. Опоздание - секунды от планового до фактического окончания.
+CREATE TABLE IF NOT EXISTS performance_rollup (
+    dimension TEXT NOT NULL,                           -- Разрез: 'algorithm', 'action', 'officer'
+    day TEXT NOT NULL,                                 -- Сутки запуска 'YYYY-MM-DD'
+    group_key TEXT NOT NULL,                           -- Значение разреза
+    total INTEGER NOT NULL,                            -- Всего действий
+    completed INTEGER NOT NULL,                        -- Выполнено
+    on_time INTEGER NOT NULL,                          -- Выполнено в срок
+    late INTEGER NOT NULL,                             -- Выполнено с опозданием
+    skipped INTEGER NOT NULL,                          -- Пропущено
+    lateness_sum INTEGER NOT NULL,                     -- Сумма опозданий, с
+    lateness_max INTEGER NOT NULL,                     -- Наибольшее опоздание, с
+    PRIMARY KEY (dimension, day, group_key)
+) WITHOUT ROWID;
+
+-- Гистограмма опозданий (интервалы LATENESS_BUCKET_EDGES в performance_analytics.py) - для процентилей
+CREATE TABLE IF NOT EXISTS performance_rollup_lateness (
+    dimension TEXT NOT NULL,
+    day TEXT NOT NULL,
+    group_key TEXT NOT NULL,
+    bucket INTEGER NOT NULL,                           -- Номер интервала
+    late_count INTEGER NOT NULL,                       -- Опозданий в интервале
+    PRIMARY KEY (dimension, day, group_key, bucket)
+) WITHOUT ROWID;
+
+-- Сутки, для которых сводка построена
+CREATE TABLE IF NOT EXISTS performance_rollup_days (
+    day TEXT PRIMARY KEY,
+    built_at TEXT DEFAULT (datetime('now', 'localtime'))
+) WITHOUT ROWID;
+
+-- Сутки, данные которых изменились после построения сводки
+CREATE TABLE IF NOT EXISTS performance_rollup_dirty_days (
+    day TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_performance_dirty_ae_insert
+AFTER INSERT ON action_executions
+BEGIN
+    INSERT OR IGNORE INTO performance_rollup_dirty_days (day)
+    SELECT substr(started_at, 1, 10) FROM algorithm_executions WHERE id = new.execution_id AND started_at IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_performance_dirty_ae_update
+AFTER UPDATE OF status, calculated_end_time, actual_end_time, snapshot_description, execution_id ON action_executions
+BEGIN
+    INSERT OR IGNORE INTO performance_rollup_dirty_days (day)
+    SELECT substr(started_at, 1, 10) FROM algorithm_executions
+    WHERE id IN (old.execution_id, new.execution_id) AND started_at IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_performance_dirty_ae_delete
+AFTER DELETE ON action_executions
+BEGIN
+    INSERT OR IGNORE INTO performance_rollup_dirty_days (day)
+    SELECT substr(started_at, 1, 10) FROM algorithm_executions WHERE id = old.execution_id AND started_at IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_performance_dirty_exec_update
+AFTER UPDATE OF started_at, snapshot_name, created_by_user_display_name ON algorithm_executions
+BEGIN
+    INSERT OR IGNORE INTO performance_rollup_dirty_days (day)
+    SELECT substr(value, 1, 10) FROM (SELECT old.started_at AS value UNION SELECT new.started_at)
+    WHERE value IS NOT NULL;
+END;
+
+-- Удаление выполнения (в том числе перенос в архив): каскадно удалённые действия
+-- уже не видят строку выполнения, поэтому сутки помечаются здесь
+CREATE TRIGGER IF NOT EXISTS trg_performance_dirty_exec_delete
+AFTER DELETE ON algorithm_executions
+WHEN old.started_at IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO performance_rollup_dirty_days (day) VALUES (substr(old.started_at, 1, 10));
+END;
+
+-- === СТАТИСТИКА ВЫПОЛНЕНИЙ (ИТОГИ ПО ДЕЙСТВИЯМ) ===
+-- Счётчики действий выполнения и их суммы за сутки запуска по категории и алгоритму.
+-- Поддерживаются триггерами приращениями (завершение действия меняет одну строку каждой
+-- таблицы); круговая диаграмма, итоги дня в календаре и аналитика за длинные периоды читают их
+-- вместо строк action_executions. Пересборка по истории (вместе с архивом) -
+-- SQLiteDatabaseManager.rebuild_execution_statistics (скрипт rebuild_statistics.py).
+-- В срок - действие выполнено и фактическое окончание не позже планового, с опозданием - позже;
+-- выполненные без одного из времён входят только в completed.
+CREATE TABLE IF NOT EXISTS execution_stats (
+    execution_id INTEGER PRIMARY KEY,                  -- ID algorithm_execution
+    total INTEGER NOT NULL DEFAULT 0,                  -- Всего действий
+    completed INTEGER NOT NULL DEFAULT 0,              -- Выполнено
+    on_time INTEGER NOT NULL DEFAULT 0,                -- Выполнено в срок
+    late INTEGER NOT NULL DEFAULT 0,                   -- Выполнено с опозданием
+    skipped INTEGER NOT NULL DEFAULT 0                 -- Пропущено
+);
+
+CREATE TABLE IF NOT EXISTS daily_execution_stats (
+    day TEXT NOT NULL,                                 -- Сутки запуска 'YYYY-MM-DD'
+    snapshot_category TEXT NOT NULL,                   -- Категория из snapshot'а выполнения
+    algorithm_id INTEGER NOT NULL,                     -- ID алгоритма (0 - выполнение без алгоритма)
+    executions INTEGER NOT NULL DEFAULT 0,             -- Запущено выполнений
+    completed_executions INTEGER NOT NULL DEFAULT 0,   -- Из них завершено (остановлено)
+    total INTEGER NOT NULL DEFAULT 0,                  -- Счётчики действий - как в execution_stats
+    completed INTEGER NOT NULL DEFAULT 0,
+    on_time INTEGER NOT NULL DEFAULT 0,
+    late INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, snapshot_category, algorithm_id)
+) WITHOUT ROWID;
+
+-- Действия: приращения счётчиков выполнения
+CREATE TRIGGER IF NOT EXISTS trg_execution_stats_ae_insert
+AFTER INSERT ON action_executions
+BEGIN
+    INSERT INTO execution_stats (execution_id, total, completed, on_time, late, skipped)
+    VALUES (
+        new.execution_id, 1, new.status IS 'completed',
+        (new.status IS 'completed' AND CAST(strftime('%s', new.actual_end_time) AS INTEGER) <= CAST(strftime('%s', new.calculated_end_time) AS INTEGER)) IS 1,
+        (new.status IS 'completed' AND CAST(strftime('%s', new.actual_end_time) AS INTEGER) > CAST(strftime('%s', new.calculated_end_time) AS INTEGER)) IS 1,
+        new.status IS 'skipped'
+    )
+    ON CONFLICT (execution_id) DO UPDATE SET
+        total = total + excluded.total, completed = completed + excluded.completed, on_time = on_time + excluded.on_time,
+        late = late + excluded.late, skipped = skipped + excluded.skipped;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_execution_stats_ae_update
+AFTER UPDATE OF status, actual_end_time, calculated_end_time ON action_executions
+BEGIN
+    UPDATE execution_stats SET
+        completed = completed + (new.status IS 'completed') - (old.status IS 'completed'),
+        on_time = on_time
+            + ((new.status IS 'completed' AND CAST(strftime('%s', new.actual_end_time) AS INTEGER) <= CAST(strftime('%s', new.calculated_end_time) AS INTEGER)) IS 1)
+            - ((old.status IS 'completed' AND CAST(strftime('%s', old.actual_end_time) AS INTEGER) <= CAST(strftime('%s', old.calculated_end_time) AS INTEGER)) IS 1),
+        late = late
+            + ((new.status IS 'completed' AND CAST(strftime('%s', new.actual_end_time) AS INTEGER) > CAST(strftime('%s', new.calculated_end_time) AS INTEGER)) IS 1)
+            - ((old.status IS 'completed' AND CAST(strftime('%s', old.actual_end_time) AS INTEGER) > CAST(strftime('%s', old.calculated_end_time) AS INTEGER)) IS 1),
+        skipped = skipped + (new.status IS 'skipped') - (old.status IS 'skipped')
+    WHERE execution_id = new.execution_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_execution_stats_ae_delete
+AFTER DELETE ON action_executions
+BEGIN
+    UPDATE execution_stats SET
+        total = total - 1,
+        completed = completed - (old.status IS 'completed'),
+        on_time = on_time - ((old.status IS 'completed' AND CAST(strftime('%s', old.actual_end_time) AS INTEGER) <= CAST(strftime('%s', old.calculated_end_time) AS INTEGER)) IS 1),
+        late = late - ((old.status IS 'completed' AND CAST(strftime('%s', old.actual_end_time) AS INTEGER) > CAST(strftime('%s', old.calculated_end_time) AS INTEGER)) IS 1),
+        skipped = skipped - (old.status IS 'skipped')
+    WHERE execution_id = old.execution_id;
+END;
+
+-- Счётчики выполнения: та же разница - в сутки, категорию и алгоритм выполнения
+CREATE TRIGGER IF NOT EXISTS trg_daily_stats_es_insert
+AFTER INSERT ON execution_stats
+BEGIN
+    INSERT INTO daily_execution_stats (day, snapshot_category, algorithm_id, total, completed, on_time, late, skipped)
+    SELECT substr(e.started_at, 1, 10), e.snapshot_category, IFNULL(e.algorithm_id, 0),
+           new.total, new.completed, new.on_time, new.late, new.skipped
+    FROM algorithm_executions e
+    WHERE e.id = new.execution_id AND e.started_at IS NOT NULL
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        total = total + excluded.total, completed = completed + excluded.completed, on_time = on_time + excluded.on_time,
+        late = late + excluded.late, skipped = skipped + excluded.skipped;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_stats_es_update
+AFTER UPDATE ON execution_stats
+BEGIN
+    INSERT INTO daily_execution_stats (day, snapshot_category, algorithm_id, total, completed, on_time, late, skipped)
+    SELECT substr(e.started_at, 1, 10), e.snapshot_category, IFNULL(e.algorithm_id, 0),
+           new.total - old.total, new.completed - old.completed, new.on_time - old.on_time,
+           new.late - old.late, new.skipped - old.skipped
+    FROM algorithm_executions e
+    WHERE e.id = new.execution_id AND e.started_at IS NOT NULL
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        total = total + excluded.total, completed = completed + excluded.completed, on_time = on_time + excluded.on_time,
+        late = late + excluded.late, skipped = skipped + excluded.skipped;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_stats_es_delete
+AFTER DELETE ON execution_stats
+BEGIN
+    INSERT INTO daily_execution_stats (day, snapshot_category, algorithm_id, total, completed, on_time, late, skipped)
+    SELECT substr(e.started_at, 1, 10), e.snapshot_category, IFNULL(e.algorithm_id, 0),
+           -old.total, -old.completed, -old.on_time, -old.late, -old.skipped
+    FROM algorithm_executions e
+    WHERE e.id = old.execution_id AND e.started_at IS NOT NULL
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        total = total + excluded.total, completed = completed + excluded.completed, on_time = on_time + excluded.on_time,
+        late = late + excluded.late, skipped = skipped + excluded.skipped;
+END;
+
+-- Запуск выполнения
+CREATE TRIGGER IF NOT EXISTS trg_daily_stats_exec_insert
+AFTER INSERT ON algorithm_executions
+WHEN new.started_at IS NOT NULL
+BEGIN
+    INSERT INTO daily_execution_stats (day, snapshot_category, algorithm_id, executions, completed_executions)
+    VALUES (substr(new.started_at, 1, 10), new.snapshot_category, IFNULL(new.algorithm_id, 0), 1, new.status IS 'completed')
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        executions = executions + excluded.executions, completed_executions = completed_executions + excluded.completed_executions;
+END;
+
+-- Остановка выполнения или смена суток/категории/алгоритма: вклад выполнения переносится
+-- из прежней строки суток в новую
+CREATE TRIGGER IF NOT EXISTS trg_daily_stats_exec_update
+AFTER UPDATE OF status, started_at, snapshot_category, algorithm_id ON algorithm_executions
+WHEN old.status IS NOT new.status OR substr(old.started_at, 1, 10) IS NOT substr(new.started_at, 1, 10)
+     OR old.snapshot_category IS NOT new.snapshot_category OR old.algorithm_id IS NOT new.algorithm_id
+BEGIN
+    INSERT INTO daily_execution_stats
+        (day, snapshot_category, algorithm_id, executions, completed_executions, total, completed, on_time, late, skipped)
+    SELECT substr(old.started_at, 1, 10), old.snapshot_category, IFNULL(old.algorithm_id, 0), -1, -(old.status IS 'completed'),
+           -IFNULL(s.total, 0), -IFNULL(s.completed, 0), -IFNULL(s.on_time, 0), -IFNULL(s.late, 0), -IFNULL(s.skipped, 0)
+    FROM (SELECT old.id AS id) x
+    LEFT JOIN execution_stats s ON s.execution_id = x.id
+    WHERE old.started_at IS NOT NULL
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        executions = executions + excluded.executions, completed_executions = completed_executions + excluded.completed_executions,
+        total = total + excluded.total, completed = completed + excluded.completed, on_time = on_time + excluded.on_time,
+        late = late + excluded.late, skipped = skipped + excluded.skipped;
+
+    INSERT INTO daily_execution_stats
+        (day, snapshot_category, algorithm_id, executions, completed_executions, total, completed, on_time, late, skipped)
+    SELECT substr(new.started_at, 1, 10), new.snapshot_category, IFNULL(new.algorithm_id, 0), 1, new.status IS 'completed',
+           IFNULL(s.total, 0), IFNULL(s.completed, 0), IFNULL(s.on_time, 0), IFNULL(s.late, 0), IFNULL(s.skipped, 0)
+    FROM (SELECT new.id AS id) x
+    LEFT JOIN execution_stats s ON s.execution_id = x.id
+    WHERE new.started_at IS NOT NULL
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        executions = executions + excluded.executions, completed_executions = completed_executions + excluded.completed_executions,
+        total = total + excluded.total, completed = completed + excluded.completed, on_time = on_time + excluded.on_time,
+        late = late + excluded.late, skipped = skipped + excluded.skipped;
+END;
+
+-- Удаление выполнения (BEFORE - пока строка и счётчики ещё на месте; каскадно удаляемые
+-- действия затем не находят строку execution_stats и ничего не вычитают повторно)
+CREATE TRIGGER IF NOT EXISTS trg_daily_stats_exec_delete
+BEFORE DELETE ON algorithm_executions
+BEGIN
+    INSERT INTO daily_execution_stats (day, snapshot_category, algorithm_id, executions, completed_executions)
+    SELECT substr(old.started_at, 1, 10), old.snapshot_category, IFNULL(old.algorithm_id, 0), -1, -(old.status IS 'completed')
+    WHERE old.started_at IS NOT NULL
+    ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+        executions = executions + excluded.executions, completed_executions = completed_executions + excluded.completed_executions;
+
+    DELETE FROM execution_stats WHERE execution_id = old.id;
+END;
+
+-- === ПОЛНОТЕКСТОВЫЙ ПОИСК ===
+
+-- Виртуальная таблица search_index (FTS5) и её триггеры создаются миграцией
+-- db/migrations/005_add_fulltext_search.sql, которую SQLiteDatabaseManager применяет
+-- при первом запуске (если сборка SQLite поддерживает FTS5).
@@ -0,0 +1,44 @@
+-- Миграция 004: Вынос отчётных материалов action_execution'ов в отдельную таблицу
+-- Дата: 2026-10-19
+
+-- Раньше пути к материалам хранились в action_executions.snapshot_report_materials
+-- одной строкой, разделённой '\n'. Теперь каждый материал - отдельная строка таблицы
+-- action_execution_materials, добавление/удаление - одна операция INSERT/DELETE.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS action_execution_materials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action_execution_id INTEGER NOT NULL,
+    file_path TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (action_execution_id) REFERENCES action_executions(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_ae_materials_action_execution_id ON action_execution_materials(action_execution_id);
+
+-- Разбиваем существующие строки по '\n' (рекурсивный CTE), пустые строки пропускаем.
+-- Порядковый номер (ord) сохраняет исходный порядок материалов.
+INSERT INTO action_execution_materials (action_execution_id, file_path)
+WITH RECURSIVE split(action_execution_id, ord, line, rest) AS (
+    SELECT id, 0, '', replace(snapshot_report_materials, char(13), '') || char(10)
+    FROM action_executions
+    WHERE snapshot_report_materials IS NOT NULL
+    UNION ALL
+    SELECT
+        action_execution_id,
+        ord + 1,
+        substr(rest, 1, instr(rest, char(10)) - 1),
+        substr(rest, instr(rest, char(10)) + 1)
+    FROM split
+    WHERE rest <> ''
+)
+SELECT action_execution_id, trim(line)
+FROM split
+WHERE trim(line) <> ''
+ORDER BY action_execution_id, ord;
+
+-- Старая колонка больше не является источником данных
+UPDATE action_executions SET snapshot_report_materials = NULL WHERE snapshot_report_materials IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,122 @@
+-- Миграция 005: Полнотекстовый поиск (FTS5) по алгоритмам, действиям, истории выполнений и организациям
+-- Дата: 2026-10-19
+
+-- Единый индекс search_index поддерживается триггерами на исходных таблицах.
+-- rowid записи индекса кодирует тип и ID сущности: rowid = id * 4 + код типа
+--   0 - algorithm, 1 - action, 2 - action_execution, 3 - organization
+-- Это позволяет удалять/обновлять запись индекса по rowid без полного просмотра.
+-- Скрипт идемпотентен: повторный запуск пересобирает индекс целиком.
+
+BEGIN;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    entity_type UNINDEXED,                             -- Тип сущности: algorithm, action, action_execution, organization
+    entity_id UNINDEXED,                               -- ID сущности в исходной таблице
+    execution_id UNINDEXED,                            -- ID algorithm_execution (только для action_execution)
+    title,                                             -- Заголовок (название/описание)
+    body,                                              -- Остальной текст (технический текст, примечания, телефоны)
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+-- === ТРИГГЕРЫ: algorithms ===
+
+CREATE TRIGGER IF NOT EXISTS trg_search_algorithms_ai AFTER INSERT ON algorithms BEGIN
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 0, 'algorithm', new.id, NULL, new.name, coalesce(new.description, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_algorithms_au AFTER UPDATE OF name, description ON algorithms BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 0;
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 0, 'algorithm', new.id, NULL, new.name, coalesce(new.description, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_algorithms_ad AFTER DELETE ON algorithms BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 0;
+END;
+
+-- === ТРИГГЕРЫ: actions ===
+
+CREATE TRIGGER IF NOT EXISTS trg_search_actions_ai AFTER INSERT ON actions BEGIN
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 1, 'action', new.id, NULL, new.description,
+            coalesce(new.technical_text, '') || char(10) || coalesce(new.contact_phones, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_actions_au AFTER UPDATE OF description, technical_text, contact_phones ON actions BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 1, 'action', new.id, NULL, new.description,
+            coalesce(new.technical_text, '') || char(10) || coalesce(new.contact_phones, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_actions_ad AFTER DELETE ON actions BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+END;
+
+-- === ТРИГГЕРЫ: action_executions ===
+
+CREATE TRIGGER IF NOT EXISTS trg_search_action_executions_ai AFTER INSERT ON action_executions BEGIN
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 2, 'action_execution', new.id, new.execution_id, new.snapshot_description,
+            coalesce(new.notes, '') || char(10) || coalesce(new.reported_to, '') || char(10) || coalesce(new.snapshot_contact_phones, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_action_executions_au
+AFTER UPDATE OF snapshot_description, notes, reported_to, snapshot_contact_phones ON action_executions BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 2, 'action_execution', new.id, new.execution_id, new.snapshot_description,
+            coalesce(new.notes, '') || char(10) || coalesce(new.reported_to, '') || char(10) || coalesce(new.snapshot_contact_phones, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_action_executions_ad AFTER DELETE ON action_executions BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+END;
+
+-- === ТРИГГЕРЫ: organizations ===
+
+CREATE TRIGGER IF NOT EXISTS trg_search_organizations_ai AFTER INSERT ON organizations BEGIN
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 3, 'organization', new.id, NULL, new.name,
+            coalesce(new.phone, '') || char(10) || coalesce(new.contact_person, '') || char(10) || coalesce(new.notes, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_organizations_au AFTER UPDATE OF name, phone, contact_person, notes ON organizations BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+    VALUES (new.id * 4 + 3, 'organization', new.id, NULL, new.name,
+            coalesce(new.phone, '') || char(10) || coalesce(new.contact_person, '') || char(10) || coalesce(new.notes, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_organizations_ad AFTER DELETE ON organizations BEGIN
+    DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+END;
+
+-- === ПЕРВИЧНОЕ ЗАПОЛНЕНИЕ (ПЕРЕСБОРКА) ИНДЕКСА ===
+
+DELETE FROM search_index;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+SELECT id * 4 + 0, 'algorithm', id, NULL, name, coalesce(description, '')
+FROM algorithms;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+SELECT id * 4 + 1, 'action', id, NULL, description,
+       coalesce(technical_text, '') || char(10) || coalesce(contact_phones, '')
+FROM actions;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+SELECT id * 4 + 2, 'action_execution', id, execution_id, snapshot_description,
+       coalesce(notes, '') || char(10) || coalesce(reported_to, '') || char(10) || coalesce(snapshot_contact_phones, '')
+FROM action_executions;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+SELECT id * 4 + 3, 'organization', id, NULL, name,
+       coalesce(phone, '') || char(10) || coalesce(contact_person, '') || char(10) || coalesce(notes, '')
+FROM organizations;
+
+INSERT INTO search_index (search_index) VALUES ('optimize');
+
+COMMIT;
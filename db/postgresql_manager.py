@@ -4,15 +4,149 @@ from psycopg2 import sql
 import re
 # from psycopg2.extras import RealDictCursor # Для получения результатов как dict
 from werkzeug.security import check_password_hash, generate_password_hash
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 import datetime
-from psycopg2.extras import RealDictCursor
+import hashlib
+from psycopg2.extras import RealDictCursor, execute_values
+from db.records import (
+    ActionExecutionRecord, ActionExecutionSummaryRecord, ActiveActionRecord,
+    AlgorithmRecord, ExecutionRecord, OrganizationRecord,
+)
 
 # Настройка логирования для отладки
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO) # Или DEBUG для более подробного лога
 
+# Подзапрос, собирающий отчётные материалы action_execution'а из action_execution_materials
+# в одну строку через '\n' (в порядке добавления). QML продолжает получать snapshot_report_materials
+# как текст. {alias} - псевдоним таблицы action_executions во внешнем запросе.
+REPORT_MATERIALS_SUBQUERY = """(
+    SELECT string_agg(m.file_path, E'\\n' ORDER BY m.id)
+    FROM app_schema.all_action_execution_materials m
+    WHERE m.action_execution_id = {alias}.id
+)"""
+
+# Снимок технического текста action_execution'а: содержимое из snapshot_blobs по хешу,
+# для строк, ещё не перенесённых в snapshot_blobs, - старая колонка snapshot_technical_text.
+# {alias} - псевдоним таблицы action_executions во внешнем запросе.
+SNAPSHOT_TECHNICAL_TEXT_SUBQUERY = """COALESCE((
+    SELECT b.content
+    FROM app_schema.snapshot_blobs b
+    WHERE b.hash = {alias}.snapshot_technical_text_hash
+), {alias}.snapshot_technical_text)"""
+
+# Журнал действий для выгрузки (DOCX): одна строка на action_execution, порядок колонок -
+# (id выполнения, название, начало выполнения, описание действия, плановые начало и окончание,
+# фактическое окончание, статус, кому доложено, примечания). {where} - условие отбора выполнений.
+ACTION_LOG_QUERY = """
+    SELECT
+        e.id, e.snapshot_name, e.started_at, a.snapshot_description, a.calculated_start_time,
+        a.calculated_end_time, a.actual_end_time, a.status, a.reported_to, a.notes
+    FROM app_schema.all_algorithm_executions e
+    JOIN app_schema.all_action_executions a ON a.execution_id = e.id
+    WHERE {where}
+    ORDER BY e.started_at, e.id, a.calculated_start_time, a.id
+"""
+
+# Размер порции строк журнала действий, читаемой с серверного курсора за один раз
+ACTION_LOG_CHUNK_SIZE = 1000
+
+# Исходные строки суточных сводок аналитики (reports/performance_analytics.py): одна строка на
+# action_execution - (сутки запуска, алгоритм, описание действия, ответственный, статус,
+# плановое и фактическое окончание в секундах).
+PERFORMANCE_SOURCE_QUERY = """
+    SELECT
+        to_char(e.started_at, 'YYYY-MM-DD'), e.snapshot_name, a.snapshot_description, e.created_by_user_display_name,
+        a.status,
+        EXTRACT(EPOCH FROM a.calculated_end_time)::BIGINT,
+        EXTRACT(EPOCH FROM a.actual_end_time)::BIGINT
+    FROM app_schema.all_algorithm_executions e
+    JOIN app_schema.all_action_executions a ON a.execution_id = e.id
+    WHERE e.started_at >= %s::date AND e.started_at < %s::date
+"""
+
+# Размер страницы по умолчанию для постраничной (keyset) выдачи истории и справочников
+DEFAULT_PAGE_SIZE = 50
+
+# Проекции списков действий. Сводная (summary) - только то, что показывает строка списка:
+# без технического текста, телефонов, отчётных материалов и примечаний. Полные данные
+# строки читаются отдельно по ID (get_action_by_id / get_action_execution_by_id) при открытии.
+ACTION_SUMMARY_COLUMNS = "id, algorithm_id, description, start_offset, end_offset"
+ACTION_DETAIL_COLUMNS = (
+    "id, algorithm_id, description, technical_text, start_offset, end_offset, "
+    "contact_phones, report_materials, created_at, updated_at"
+)
+ACTION_EXECUTION_SUMMARY_COLUMNS = """
+    ae.id,
+    ae.execution_id,
+    ae.snapshot_description,
+    ae.calculated_start_time,
+    ae.calculated_end_time,
+    ae.actual_end_time,
+    ae.status,
+    ae.reported_to
+"""
+
+# Запуск алгоритма (start_algorithm_execution) запросами INSERT ... SELECT, без построчного
+# прохода по действиям в Python. Сначала в snapshot_blobs добавляются ещё не сохранённые технические тексты.
+LAUNCH_SNAPSHOT_BLOBS_QUERY = """
+    INSERT INTO app_schema.snapshot_blobs (hash, content, size)
+    SELECT DISTINCT
+        encode(sha256(convert_to(technical_text, 'UTF8')), 'hex'),
+        technical_text,
+        octet_length(convert_to(technical_text, 'UTF8'))
+    FROM app_schema.actions
+    WHERE algorithm_id = %(algorithm_id)s AND technical_text IS NOT NULL
+    ON CONFLICT (hash) DO NOTHING;
+"""
+
+# Снимки действий и их отчётные материалы одним запросом: id новых строк берутся из последовательности
+# заранее (source), по ним же материалы (строки report_materials через '\n') привязываются к снимкам.
+# Время = точка отсчёта (%(base_time)s) + секунды смещения из actions.
+# Пробелы по краям строк материалов и пустые строки отбрасываются, как в _split_report_materials.
+LAUNCH_ACTION_EXECUTIONS_QUERY = """
+    WITH source AS (
+        SELECT nextval(pg_get_serial_sequence('app_schema.action_executions', 'id')) AS action_execution_id, a.*
+        FROM (
+            SELECT description, technical_text, contact_phones, report_materials,
+                   start_offset_seconds, end_offset_seconds
+            FROM app_schema.actions
+            WHERE algorithm_id = %(algorithm_id)s
+            ORDER BY start_offset, id
+        ) a
+    ),
+    inserted AS (
+        INSERT INTO app_schema.action_executions (
+            id, execution_id,
+            snapshot_description, snapshot_technical_text_hash, snapshot_contact_phones,
+            calculated_start_time, calculated_end_time
+        )
+        SELECT
+            action_execution_id, %(execution_id)s,
+            description, encode(sha256(convert_to(technical_text, 'UTF8')), 'hex'), contact_phones,
+            %(base_time)s::timestamp + start_offset_seconds * INTERVAL '1 second',
+            %(base_time)s::timestamp + end_offset_seconds * INTERVAL '1 second'
+        FROM source
+        RETURNING id
+    ),
+    materials AS (
+        INSERT INTO app_schema.action_execution_materials (action_execution_id, file_path)
+        SELECT source.action_execution_id, btrim(m.line, E' \\t\\r')
+        FROM source
+        CROSS JOIN LATERAL unnest(string_to_array(source.report_materials, E'\\n')) WITH ORDINALITY AS m(line, position)
+        WHERE btrim(m.line, E' \\t\\r') <> ''
+        ORDER BY source.action_execution_id, m.position
+    )
+    SELECT COUNT(*) FROM inserted;
+"""
+
+
+def _isoformat_datetime(value):
+    """datetime -> ISO-строка (как в SQLite), остальные значения без изменений. Для Record.from_cursor."""
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
 class PostgreSQLDatabaseManager:
     """
     Класс для управления подключением к базе данных PostgreSQL
@@ -101,6 +235,22 @@ class PostgreSQLDatabaseManager:
             self.connection.close()
             logger.info("Подключение к PostgreSQL закрыто.")
 
+    def _open_dedicated_connection(self):
+        """
+        Отдельное подключение для работы в фоновом потоке (архивация, выгрузка журнала действий).
+        Общее self.connection принадлежит потоку интерфейса: commit()/rollback() из другого потока
+        зафиксировали бы или откатили его незавершённую транзакцию. Закрывает вызывающий.
+        """
+        connection = psycopg2.connect(
+            host=self.connection_config['host'],
+            port=self.connection_config['port'],
+            dbname=self.connection_config['dbname'],
+            user=self.connection_config['user'],
+            password=self.connection_config['password']
+        )
+        connection.set_client_encoding('UTF8')
+        return connection
+
     def test_connection(self) -> bool:
         """
         Тестирует подключение к БД.
@@ -628,7 +778,7 @@ class PostgreSQLDatabaseManager:
     def get_all_algorithms(self) -> List[Dict[str, Any]]:
         """
         Получает список всех алгоритмов, отсортированных по названию.
-        :return: Список словарей с данными алгоритмов.
+        :return: Список записей AlgorithmRecord (db/records.py).
         """
         try:
             conn = self._get_connection()
@@ -636,10 +786,8 @@ class PostgreSQLDatabaseManager:
             cursor.execute(
                 f"SELECT id, name, category, time_type, description, created_at, updated_at FROM {self.SCHEMA_NAME}.algorithms ORDER BY sort_order ASC;"
             )
-            rows = cursor.fetchall()
-            colnames = [desc[0] for desc in cursor.description]
+            algorithms_list = AlgorithmRecord.from_cursor(cursor)
             cursor.close()
-            algorithms_list = [dict(zip(colnames, row)) for row in rows]
             logger.debug(f"Получен список {len(algorithms_list)} алгоритмов из БД.")
             return algorithms_list
         except psycopg2.Error as e:
@@ -992,10 +1140,11 @@ class PostgreSQLDatabaseManager:
 
     # --- МЕТОДЫ ДЛЯ РАБОТЫ С ACTIONS ---
 
-    def get_actions_by_algorithm_id(self, algorithm_id: int) -> List[Dict[str, Any]]:
+    def get_actions_by_algorithm_id(self, algorithm_id: int, summary: bool = False) -> List[Dict[str, Any]]:
         """
         Получает список всех действий для заданного алгоритма, отсортированных по start_offset.
         :param algorithm_id: ID алгоритма.
+        :param summary: True - только поля строки списка (ACTION_SUMMARY_COLUMNS), без тяжёлых текстов.
         :return: Список словарей с данными действий.
         """
         if not isinstance(algorithm_id, int) or algorithm_id <= 0:
@@ -1007,7 +1156,7 @@ class PostgreSQLDatabaseManager:
             cursor = conn.cursor()
             # Используем полное имя таблицы с указанием схемы
             cursor.execute(
-                f"SELECT id, algorithm_id, description, start_offset, end_offset, contact_phones, report_materials, created_at, updated_at "
+                f"SELECT {ACTION_SUMMARY_COLUMNS if summary else ACTION_DETAIL_COLUMNS} "
                 f"FROM {self.SCHEMA_NAME}.actions "
                 f"WHERE algorithm_id = %s "
                 f"ORDER BY start_offset ASC, end_offset ASC, id ASC;",
@@ -1556,16 +1705,54 @@ class PostgreSQLDatabaseManager:
                 conn.rollback()
             return False
 
+    @staticmethod
+    def _keyset_page(items: List[Dict[str, Any]], limit: Optional[int], key_column: str) -> Dict[str, Any]:
+        """
+        Оформляет страницу keyset-выдачи. Запрос выбирает limit + 1 строк: лишняя строка
+        означает, что следующая страница есть, и отбрасывается.
+        :param items: Строки страницы (записи db/records.py или словари) в порядке выдачи.
+        :param limit: Размер страницы или None (без ограничения).
+        :param key_column: Колонка сортировки (вместе с id задаёт однозначный порядок).
+        :return: {'items': [...], 'has_more': bool, 'next_key': str, 'next_id': int}.
+                 next_key/next_id - ключ последней строки, передаётся в следующий вызов как after_key/after_id.
+        """
+        has_more = limit is not None and len(items) > limit
+        if has_more:
+            items = items[:limit]
+        last = items[-1] if items else None
+        return {
+            'items': items,
+            'has_more': has_more,
+            # TIMESTAMP -> 'YYYY-MM-DD HH:MM:SS[.ffffff]', обратно приводится через ::timestamp
+            'next_key': str(last[key_column]) if last and last[key_column] is not None else "",
+            'next_id': last['id'] if last else 0,
+        }
+
     def get_executions_by_date(self, date_string: str) -> List[Dict[str, Any]]:
         """
         Получает список ВСЕХ выполнений алгоритмов (algorithm_executions) за заданную дату.
         Включает активные, завершенные и отмененные.
+        Для интерфейса используйте get_executions_by_date_page.
         :param date_string: Дата в формате 'YYYY-MM-DD'.
-        :return: Список словарей с данными execution'ов.
+        :return: Список записей ExecutionRecord.
+        """
+        return self.get_executions_by_date_page(date_string, limit=None)['items']
+
+    def get_executions_by_date_page(self, date_string: str, after_key: str = "", after_id: int = 0,
+                                    limit: Optional[int] = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Получает страницу выполнений алгоритмов (algorithm_executions) за заданную дату.
+        Порядок - (started_at, id) по убыванию; следующая страница начинается после ключа
+        (after_key, after_id), поэтому её выборка не зависит от номера страницы.
+        :param date_string: Дата в формате 'YYYY-MM-DD'.
+        :param after_key: started_at последней строки предыдущей страницы ('' - первая страница).
+        :param after_id: id последней строки предыдущей страницы.
+        :param limit: Размер страницы или None (все строки).
+        :return: Страница (см. _keyset_page) с записями ExecutionRecord.
         """
         if not date_string:
             logger.warning("Некорректная дата для получения execution'ов.")
-            return []
+            return self._keyset_page([], limit, 'started_at')
 
         try:
             conn = self._get_connection()
@@ -1579,6 +1766,7 @@ class PostgreSQLDatabaseManager:
                 ae.id,
                 ae.algorithm_id,
                 a.name AS algorithm_name,
+                ae.snapshot_category AS category,
                 ae.started_at,
                 TO_CHAR(ae.started_at, 'DD.MM.YYYY HH24:MI:SS') AS started_at_display,
                 ae.completed_at,
@@ -1589,45 +1777,375 @@ class PostgreSQLDatabaseManager:
                 ae.status,
                 ae.created_by_user_id,
                 COALESCE(u.last_name || ' ' || u.first_name || ' ' || u.middle_name, 'Неизвестен') AS created_by_user_display_name
-            FROM {self.SCHEMA_NAME}.algorithm_executions ae
+            FROM {self.SCHEMA_NAME}.all_algorithm_executions ae
             JOIN {self.SCHEMA_NAME}.algorithms a ON ae.algorithm_id = a.id
             LEFT JOIN {self.SCHEMA_NAME}.users u ON ae.created_by_user_id = u.id
-            WHERE CAST(ae.started_at AS DATE) = %s
-            ORDER BY ae.started_at DESC;
+            WHERE ae.started_at >= %s::date AND ae.started_at < %s::date + 1
+            {"AND (ae.started_at, ae.id) < (%s::timestamp, %s)" if after_key else ""}
+            ORDER BY ae.started_at DESC, ae.id DESC
+            {"LIMIT %s" if limit is not None else ""};
             """
             # --- ---
-            
-            logger.debug(f"Выполнение SQL получения ВСЕХ execution'ов за дату '{date_string}': {cursor.mogrify(sql_query, (date_string,))}")
-            cursor.execute(sql_query, (date_string,))
-            rows = cursor.fetchall()
-            # Получаем названия колонок
-            colnames = [desc[0] for desc in cursor.description]
+
+            params = [date_string, date_string]
+            if after_key:
+                params += [after_key, after_id]
+            if limit is not None:
+                params.append(limit + 1)
+            logger.debug(f"Выполнение SQL получения execution'ов за дату '{date_string}': {cursor.mogrify(sql_query, params)}")
+            cursor.execute(sql_query, params)
+            executions_list = ExecutionRecord.from_cursor(cursor)
             cursor.close()
-            
-            # Преобразуем список кортежей в список словарей
-            executions_list = [dict(zip(colnames, row)) for row in rows]
-            logger.info(f"Получен список {len(executions_list)} ВСЕХ execution'ов за дату '{date_string}' из БД.")
-            return executions_list
-            
+            logger.info(f"Получено {len(executions_list)} execution'ов за дату '{date_string}' из БД.")
+            return self._keyset_page(executions_list, limit, 'started_at')
+
         except psycopg2.Error as e:
-            logger.error(f"Ошибка БД при получении ВСЕХ execution'ов за дату '{date_string}': {e}")
-            return []
+            logger.error(f"Ошибка БД при получении execution'ов за дату '{date_string}': {e}")
+            return self._keyset_page([], limit, 'started_at')
         except Exception as e:
-            logger.error(f"Неизвестная ошибка при получении ВСЕХ execution'ов за дату '{date_string}': {e}")
+            logger.error(f"Неизвестная ошибка при получении execution'ов за дату '{date_string}': {e}")
             import traceback
             traceback.print_exc()
+            return self._keyset_page([], limit, 'started_at')
+
+    def get_execution_ids_by_period(self, start_string: str, end_string: str) -> List[int]:
+        """
+        Получает id выполнений, запущенных в периоде [start_string, end_string) - например,
+        за сутки или за смену (для пакетной выгрузки отчётов). Учитывает архив.
+        :param start_string: Начало периода 'YYYY-MM-DD' или 'YYYY-MM-DD HH:MM:SS'.
+        :param end_string: Конец периода (не включается) в том же формате.
+        :return: Список id в порядке запуска (started_at, id).
+        """
+        if not start_string or not end_string:
+            logger.warning("Некорректный период для получения id execution'ов.")
             return []
-        
+
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT id FROM {self.SCHEMA_NAME}.all_algorithm_executions
+                WHERE started_at >= %s::timestamp AND started_at < %s::timestamp
+                ORDER BY started_at, id;
+                """,
+                (start_string, end_string),
+            )
+            execution_ids = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            logger.info(f"Получено {len(execution_ids)} id execution'ов за период '{start_string}' - '{end_string}'.")
+            return execution_ids
+        except psycopg2.Error as e:
+            logger.error(f"Ошибка БД при получении id execution'ов за период '{start_string}' - '{end_string}': {e}")
+            return []
+
+    @staticmethod
+    def _action_log_filter(start_string: Optional[str], end_string: Optional[str],
+                           execution_id: Optional[int]) -> Tuple[str, list]:
+        """Условие отбора выполнений журнала действий: одно выполнение или период [start, end)."""
+        if execution_id is not None:
+            return "e.id = %s", [execution_id]
+        return "e.started_at >= %s::timestamp AND e.started_at < %s::timestamp", [start_string, end_string]
+
+    def count_action_log_rows(self, start_string: Optional[str] = None, end_string: Optional[str] = None,
+                              execution_id: Optional[int] = None) -> int:
+        """
+        Количество строк журнала действий (для индикатора хода выгрузки).
+        :return: Количество action_execution'ов выполнения execution_id или выполнений периода
+                 [start_string, end_string); -1 при ошибке.
+        """
+        where, params = self._action_log_filter(start_string, end_string, execution_id)
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT COUNT(*)
+                FROM {self.SCHEMA_NAME}.all_algorithm_executions e
+                JOIN {self.SCHEMA_NAME}.all_action_executions a ON a.execution_id = e.id
+                WHERE {where};
+                """,
+                params,
+            )
+            count = cursor.fetchone()[0]
+            cursor.close()
+            return count
+        except psycopg2.Error as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при подсчёте строк журнала действий: {e}")
+            return -1
+
+    def iter_action_log_rows(self, start_string: Optional[str] = None, end_string: Optional[str] = None,
+                             execution_id: Optional[int] = None, chunk_size: int = ACTION_LOG_CHUNK_SIZE):
+        """
+        Журнал действий (ACTION_LOG_QUERY) порциями по chunk_size строк через серверный (именованный)
+        курсор: в памяти клиента одновременно только одна порция. Генератор читается в потоке
+        выгрузки (DocxExportWorker), поэтому курсор открывается на отдельном подключении, которое
+        закрывается по окончании чтения.
+        Отбор - одно выполнение (execution_id) или период [start_string, end_string).
+        :return: Генератор списков кортежей. Ошибки БД (psycopg2.Error) передаются вызывающему.
+        """
+        where, params = self._action_log_filter(start_string, end_string, execution_id)
+        conn = self._open_dedicated_connection()
+        try:
+            with conn.cursor(name="action_log") as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(ACTION_LOG_QUERY.format(where=where), params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+        finally:
+            conn.close()
+
+    # --- СУТОЧНЫЕ СВОДКИ АНАЛИТИКИ ИСПОЛНЕНИЯ (performance_rollup) ---
+
+    def claim_performance_rollup_days(self, start_date: str, end_date: str) -> Optional[List[str]]:
+        """
+        Сутки периода [start_date, end_date), сводку которых нужно (пере)строить: с выполнениями,
+        но без сводки, и помеченные триггерами как изменённые. Пометки и отметки о построении
+        этих суток снимаются сразу - изменение во время перестроения снова пометит сутки,
+        а при сбое перестроения они останутся непостроенными. Учитывает архив.
+        :param start_date: Начало периода 'YYYY-MM-DD'.
+        :param end_date: Конец периода (не включается) 'YYYY-MM-DD'.
+        :return: Отсортированный список суток 'YYYY-MM-DD' или None при ошибке.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    WITH claimed AS (
+                        (SELECT DISTINCT started_at::date AS day FROM {self.SCHEMA_NAME}.all_algorithm_executions
+                         WHERE started_at >= %s::date AND started_at < %s::date
+                         EXCEPT
+                         SELECT day FROM {self.SCHEMA_NAME}.performance_rollup_days)
+                        UNION
+                        SELECT day FROM {self.SCHEMA_NAME}.performance_rollup_dirty_days
+                        WHERE day >= %s::date AND day < %s::date
+                    ),
+                    undirty AS (
+                        DELETE FROM {self.SCHEMA_NAME}.performance_rollup_dirty_days
+                        WHERE day IN (SELECT day FROM claimed)
+                    ),
+                    unbuilt AS (
+                        DELETE FROM {self.SCHEMA_NAME}.performance_rollup_days
+                        WHERE day IN (SELECT day FROM claimed)
+                    )
+                    SELECT to_char(day, 'YYYY-MM-DD') FROM claimed ORDER BY 1;
+                    """,
+                    (start_date, end_date, start_date, end_date),
+                )
+                days = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+            return days
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при отборе суток для сводок аналитики: {e}")
+            if conn:
+                conn.rollback()
+        return None
+
+    def get_performance_source_rows(self, start_date: str, end_date: str) -> list:
+        """
+        Исходные строки сводок аналитики (PERFORMANCE_SOURCE_QUERY) за сутки [start_date, end_date).
+        Учитывает архив.
+        :return: Список кортежей. Ошибки БД (psycopg2.Error) передаются вызывающему.
+        """
+        conn = self._get_connection()
+        with conn.cursor() as cursor:
+            cursor.execute(PERFORMANCE_SOURCE_QUERY, (start_date, end_date))
+            return cursor.fetchall()
+
+    def save_performance_rollup(self, days: List[str], rollup_rows: list, lateness_rows: list) -> bool:
+        """
+        Заменяет сводки аналитики за сутки days одной транзакцией и отмечает сутки построенными.
+        :param rollup_rows: Кортежи (dimension, day, group_key, total, completed, on_time, late,
+                            skipped, lateness_sum, lateness_max).
+        :param lateness_rows: Кортежи (dimension, day, group_key, bucket, late_count).
+        :return: True, если успешно, иначе False.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.SCHEMA_NAME}.performance_rollup WHERE day = ANY(%s::date[]);", (days,))
+                cursor.execute(f"DELETE FROM {self.SCHEMA_NAME}.performance_rollup_lateness WHERE day = ANY(%s::date[]);", (days,))
+                execute_values(
+                    cursor,
+                    f"INSERT INTO {self.SCHEMA_NAME}.performance_rollup (dimension, day, group_key, total, completed, "
+                    f"on_time, late, skipped, lateness_sum, lateness_max) VALUES %s;",
+                    rollup_rows,
+                )
+                execute_values(
+                    cursor,
+                    f"INSERT INTO {self.SCHEMA_NAME}.performance_rollup_lateness (dimension, day, group_key, bucket, late_count) "
+                    f"VALUES %s;",
+                    lateness_rows,
+                )
+                cursor.execute(
+                    f"INSERT INTO {self.SCHEMA_NAME}.performance_rollup_days (day) SELECT unnest(%s::date[]) "
+                    f"ON CONFLICT (day) DO UPDATE SET built_at = CURRENT_TIMESTAMP;",
+                    (days,),
+                )
+            conn.commit()
+            logger.info(f"PostgreSQLDatabaseManager: Сводки аналитики построены за {len(days)} сут.")
+            return True
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при сохранении сводок аналитики: {e}")
+            if conn:
+                conn.rollback()
+        return False
+
+    def get_performance_rollup(self, dimension: str, start_date: str, end_date: str) -> Optional[Tuple[list, list]]:
+        """
+        Итоги сводок аналитики за сутки [start_date, end_date) в разрезе dimension.
+        :return: (итоги: кортежи (group_key, total, completed, on_time, late, skipped, lateness_sum,
+                 lateness_max), гистограмма: кортежи (group_key, bucket, late_count)) или None при ошибке.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT group_key, SUM(total), SUM(completed), SUM(on_time), SUM(late), SUM(skipped),
+                           SUM(lateness_sum)::BIGINT, MAX(lateness_max)
+                    FROM {self.SCHEMA_NAME}.performance_rollup
+                    WHERE dimension = %s AND day >= %s::date AND day < %s::date
+                    GROUP BY group_key;
+                    """,
+                    (dimension, start_date, end_date),
+                )
+                totals = cursor.fetchall()
+                cursor.execute(
+                    f"""
+                    SELECT group_key, bucket, SUM(late_count)
+                    FROM {self.SCHEMA_NAME}.performance_rollup_lateness
+                    WHERE dimension = %s AND day >= %s::date AND day < %s::date
+                    GROUP BY group_key, bucket;
+                    """,
+                    (dimension, start_date, end_date),
+                )
+                lateness = cursor.fetchall()
+            return totals, lateness
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при чтении сводок аналитики: {e}")
+            if conn:
+                conn.rollback()
+        return None
+
+    # --- СТАТИСТИКА ВЫПОЛНЕНИЙ (execution_stats, daily_execution_stats) ---
+
+    def get_execution_stats(self, execution_id: int) -> Optional[Dict[str, int]]:
+        """
+        Счётчики действий выполнения из execution_stats (поддерживаются триггерами).
+        :return: {"total", "completed", "on_time", "late", "skipped", "not_done"} или None,
+                 если строки статистики нет или произошла ошибка.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    f"SELECT total, completed, on_time, late, skipped FROM {self.SCHEMA_NAME}.execution_stats "
+                    f"WHERE execution_id = %s;",
+                    (execution_id,),
+                )
+                row = cursor.fetchone()
+            if row is None:
+                return None
+            stats = dict(row)
+            stats["not_done"] = stats["total"] - stats["on_time"] - stats["late"]
+            return stats
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при получении статистики execution {execution_id}: {e}")
+            if conn:
+                conn.rollback()
+        return None
+
+    def get_daily_execution_stats(self, start_date: str, end_date: str, category: Optional[str] = None) -> list:
+        """
+        Суточные итоги выполнений за сутки запуска [start_date, end_date) ('YYYY-MM-DD') из
+        daily_execution_stats - без чтения строк action_executions. Включает архив.
+        :param category: Категория выполнений или None - все категории.
+        :return: Список словарей по суткам, упорядоченный по дате: {"day", "executions",
+                 "completed_executions", "total", "completed", "on_time", "late", "skipped"};
+                 [] при ошибке.
+        """
+        conditions = ["day >= %s::date", "day < %s::date"]
+        params = [start_date, end_date]
+        if category:
+            conditions.append("snapshot_category = %s")
+            params.append(category)
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT to_char(day, 'YYYY-MM-DD') AS day,
+                           SUM(executions)::INTEGER AS executions,
+                           SUM(completed_executions)::INTEGER AS completed_executions,
+                           SUM(total)::INTEGER AS total, SUM(completed)::INTEGER AS completed,
+                           SUM(on_time)::INTEGER AS on_time, SUM(late)::INTEGER AS late,
+                           SUM(skipped)::INTEGER AS skipped
+                    FROM {self.SCHEMA_NAME}.daily_execution_stats
+                    WHERE {" AND ".join(conditions)}
+                    GROUP BY day
+                    HAVING SUM(executions) > 0
+                    ORDER BY day;
+                    """,
+                    params,
+                )
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при получении суточной статистики выполнений: {e}")
+            if conn:
+                conn.rollback()
+        return []
+
+    def rebuild_execution_statistics(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        """
+        Пересобирает статистику выполнений (execution_stats, daily_execution_stats) за сутки
+        запуска [start_date, end_date) ('YYYY-MM-DD'); без границ - по всей истории, включая архив
+        (см. app_schema.rebuild_execution_statistics).
+        :return: Количество выполнений, статистика которых пересчитана, или -1 при ошибке.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {self.SCHEMA_NAME}.rebuild_execution_statistics(%s::date, %s::date);",
+                    (start_date, end_date),
+                )
+                count = cursor.fetchone()[0] or 0
+            conn.commit()
+            logger.info(f"PostgreSQLDatabaseManager: Статистика пересобрана для {count} выполнений "
+                        f"(период '{start_date or '-'}' - '{end_date or '-'}').")
+            return count
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при пересборке статистики выполнений: {e}")
+            if conn:
+                conn.rollback()
+        return -1
+
     # --- МЕТОДЫ ДЛЯ РАБОТЫ С ЗАПУЩЕННЫМИ АЛГОРИТМАМИ (EXECUTIONS) ---
 
-    def get_active_executions_by_category(self, category: str) -> list:
+    def get_active_executions_by_category(self, category: str, now_epoch: Optional[int] = None) -> list:
         """
         Получает список активных (status = 'active') запущенных алгоритмов (executions)
         для заданной категории (snapshot_category).
+        Для каждого execution'а из active_action_queue считаются незавершённые действия
+        (live_actions_count) и просроченные на момент now_epoch (overdue_actions_count).
 
         :param category: Категория алгоритмов (например, "повседневная деятельность").
+        :param now_epoch: Текущее время в секундах (шкала TimeService); None - системное время.
         :return: Список словарей с данными executions.
         """
+        if now_epoch is None:
+            now_epoch = int(datetime.datetime.now().replace(tzinfo=datetime.timezone.utc).timestamp())
         if not self.connection:
             print("PostgreSQLDatabaseManager: Нет подключения к БД.")
             return []
@@ -1646,12 +2164,16 @@ class PostgreSQLDatabaseManager:
                         completed_at,
                         status,
                         created_by_user_id, -- ID пользователя на момент запуска
-                        created_by_user_display_name -- Отображаемое имя на момент запуска
-                    FROM app_schema.algorithm_executions
+                        created_by_user_display_name, -- Отображаемое имя на момент запуска
+                        (SELECT COUNT(*) FROM app_schema.active_action_queue q
+                         WHERE q.execution_id = e.id) AS live_actions_count,
+                        (SELECT COUNT(*) FROM app_schema.active_action_queue q
+                         WHERE q.execution_id = e.id AND q.end_epoch < %s) AS overdue_actions_count
+                    FROM app_schema.algorithm_executions e
                     WHERE snapshot_category = %s AND status = 'active'
                     ORDER BY started_at DESC; -- Сортируем по времени запуска, например
                 """
-                cursor.execute(query, (category,))
+                cursor.execute(query, (now_epoch, category))
                 rows = cursor.fetchall()
 
                 # Преобразуем результаты в список словарей
@@ -1773,7 +2295,7 @@ class PostgreSQLDatabaseManager:
 
         try:
             with self.connection.cursor() as cursor:
-                # 1. Получить оригинальный алгоритм и его действия
+                # 1. Получить оригинальный алгоритм
                 # --- ИЗМЕНЕНО: Получаем time_type ---
                 cursor.execute("""
                     SELECT id, name, category, time_type, description
@@ -1797,25 +2319,6 @@ class PostgreSQLDatabaseManager:
                 print(f"PostgreSQLDatabaseManager: Запуск алгоритма ID {algorithm_id} с time_type '{algorithm_time_type}'.")
                 # --- ---
 
-                cursor.execute("""
-                    SELECT id, description, start_offset, end_offset, contact_phones, report_materials
-                    FROM app_schema.actions WHERE algorithm_id = %s ORDER BY start_offset
-                """, (algorithm_id,))
-                original_actions_raw = cursor.fetchall()
-                # Преобразуем в список словарей
-                original_actions = []
-                for action_row in original_actions_raw:
-                    action_dict = {
-                        'id': action_row[0],
-                        'description': action_row[1],
-                        'start_offset': action_row[2], # Это будет timedelta или None
-                        'end_offset': action_row[3],   # Это будет timedelta или None
-                        'contact_phones': action_row[4],
-                        'report_materials': action_row[5]
-                    }
-                    original_actions.append(action_dict)
-                print(f"PostgreSQLDatabaseManager: Получено {len(original_actions)} действий для алгоритма {algorithm_id}.")
-
                 # 2. Получить информацию о пользователе на момент запуска
                 cursor.execute("""
                     SELECT rank, last_name, first_name, middle_name
@@ -1852,114 +2355,34 @@ class PostgreSQLDatabaseManager:
                 new_execution_id = cursor.fetchone()[0]
                 print(f"PostgreSQLDatabaseManager: Создан новый execution ID {new_execution_id} для алгоритма {algorithm_id}.")
 
-                # 4. Вставить action_executions (snapshot'ы действий)
-                # Рассчитываем абсолютные времена на основе started_at и смещений
+                # 4. Вставить action_executions (snapshot'ы действий) запросами INSERT ... SELECT из actions:
+                # время = точка отсчёта + секунды смещения (генерируемые колонки start_offset_seconds/end_offset_seconds)
                 import datetime
                 started_at_dt = datetime.datetime.fromisoformat(started_at_str.replace(' ', 'T'))
                 print(f"PostgreSQLDatabaseManager: Абсолютное время запуска алгоритма: {started_at_dt}.")
 
-                for action in original_actions:
-                    calculated_start_time = None
-                    calculated_end_time = None
-                    
-                    # --- ИЗМЕНЕНО: Логика в зависимости от time_type ---
-                    if action['start_offset'] is not None:
-                        if algorithm_time_type == 'астрономическое':
-                            # --- ЛОГИКА ДЛЯ АСТРОНОМИЧЕСКОГО (ИСПРАВЛЕНО) ---
-                            print(f"PostgreSQLDatabaseManager: Рассчитываем calculated_start_time для астрономического времени действия ID {action['id']}.")
-                            start_date_only = started_at_dt.date()
-                            offset_timedelta_start = action['start_offset']
-                            
-                            if isinstance(offset_timedelta_start, datetime.timedelta):
-                                # --- ИЗМЕНЕНО: Извлекаем "время суток" и дни ---
-                                total_seconds = int(offset_timedelta_start.total_seconds())
-                                seconds_in_day = 24 * 60 * 60 # 86400
-                                
-                                # Количество полных дней в смещении
-                                days = total_seconds // seconds_in_day
-                                # Остаток секунд для "времени суток"
-                                total_seconds_in_day = total_seconds % seconds_in_day
-                                
-                                # Извлекаем часы, минуты, секунды из остатка
-                                hours = total_seconds_in_day // 3600
-                                minutes = (total_seconds_in_day % 3600) // 60
-                                seconds = total_seconds_in_day % 60
-                                # --- ---
-                                
-                                # Создаем новое datetime: дата_запуска + дни + время_из_смещения
-                                # datetime.timedelta(days=days) корректно обработает переходы через месяцы/годы
-                                calculated_start_time = datetime.datetime.combine(
-                                    start_date_only,
-                                    datetime.time(hour=hours, minute=minutes, second=seconds)
-                                ) + datetime.timedelta(days=days)
-                                print(f"PostgreSQLDatabaseManager:   Дата запуска: {start_date_only}, Дни: {days}, Время из смещения: {hours:02d}:{minutes:02d}:{seconds:02d}")
-                                print(f"PostgreSQLDatabaseManager:   Результат calculated_start_time: {calculated_start_time}")
-                            else:
-                                print(f"PostgreSQLDatabaseManager: Ошибка - start_offset для действия {action['id']} не является timedelta: {type(offset_timedelta_start)}. Устанавливаю None.")
-                                calculated_start_time = None
-                            # --- ---
-                        else:
-                            # --- ЛОГИКА ДЛЯ ОПЕРАТИВНОГО ---
-                            print(f"PostgreSQLDatabaseManager: Рассчитываем calculated_start_time для оперативного времени действия ID {action['id']}.")
-                            calculated_start_time = started_at_dt + action['start_offset']
-                            print(f"PostgreSQLDatabaseManager:   started_at_dt ({started_at_dt}) + start_offset ({action['start_offset']}) = {calculated_start_time}")
-                            # --- ---
-                    # --- ---
-                    if action['end_offset'] is not None:
-                        if algorithm_time_type == 'астрономическое':
-                            # --- ЛОГИКА ДЛЯ АСТРОНОМИЧЕСКОГО (ИСПРАВЛЕНО) ---
-                            print(f"PostgreSQLDatabaseManager: Рассчитываем calculated_end_time для астрономического времени действия ID {action['id']}.")
-                            start_date_only = started_at_dt.date()
-                            offset_timedelta_end = action['end_offset']
-                            
-                            if isinstance(offset_timedelta_end, datetime.timedelta):
-                                # --- ИЗМЕНЕНО: Извлекаем "время суток" и дни ---
-                                total_seconds = int(offset_timedelta_end.total_seconds())
-                                seconds_in_day = 24 * 60 * 60 # 86400
-                                
-                                # Количество полных дней в смещении
-                                days = total_seconds // seconds_in_day
-                                # Остаток секунд для "времени суток"
-                                total_seconds_in_day = total_seconds % seconds_in_day
-                                
-                                # Извлекаем часы, минуты, секунды из остатка
-                                hours = total_seconds_in_day // 3600
-                                minutes = (total_seconds_in_day % 3600) // 60
-                                seconds = total_seconds_in_day % 60
-                                # --- ---
-                                
-                                # Создаем новое datetime: дата_запуска + дни + время_из_смещения
-                                # datetime.timedelta(days=days) корректно обработает переходы через месяцы/годы
-                                calculated_end_time = datetime.datetime.combine(
-                                    start_date_only,
-                                    datetime.time(hour=hours, minute=minutes, second=seconds)
-                                ) + datetime.timedelta(days=days)
-                                print(f"PostgreSQLDatabaseManager:   Дата запуска: {start_date_only}, Дни: {days}, Время из смещения: {hours:02d}:{minutes:02d}:{seconds:02d}")
-                                print(f"PostgreSQLDatabaseManager:   Результат calculated_end_time: {calculated_end_time}")
-                            else:
-                                print(f"PostgreSQLDatabaseManager: Ошибка - end_offset для действия {action['id']} не является timedelta: {type(offset_timedelta_end)}. Устанавливаю None.")
-                                calculated_end_time = None
-                            # --- ---
-                        else:
-                            # --- ЛОГИКА ДЛЯ ОПЕРАТИВНОГО ---
-                            print(f"PostgreSQLDatabaseManager: Рассчитываем calculated_end_time для оперативного времени действия ID {action['id']}.")
-                            calculated_end_time = started_at_dt + action['end_offset']
-                            print(f"PostgreSQLDatabaseManager:   started_at_dt ({started_at_dt}) + end_offset ({action['end_offset']}) = {calculated_end_time}")
-                            # --- ---
+                if algorithm_time_type == 'астрономическое':
+                    # Астрономическое: смещение - номер дня и время суток, отсчёт от полуночи даты запуска
+                    base_dt = datetime.datetime.combine(started_at_dt.date(), datetime.time())
+                    cursor.execute(
+                        "SELECT COUNT(*) FROM app_schema.actions WHERE algorithm_id = %s AND NOT offset_time_of_day;", (algorithm_id,)
+                    )
+                    if cursor.fetchone()[0] > 0:
+                        print(f"PostgreSQLDatabaseManager: Внимание - смещения части действий алгоритма {algorithm_id} не являются "
+                              f"временем суток (часы >= 24), время переносится на следующие сутки.")
+                else:
+                    # Оперативное: смещение отсчитывается от момента запуска
+                    base_dt = started_at_dt
 
-                    cursor.execute("""
-                        INSERT INTO app_schema.action_executions (
-                            execution_id,
-                            snapshot_description, snapshot_contact_phones, snapshot_report_materials,
-                            calculated_start_time, calculated_end_time
-                        ) VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (
-                        new_execution_id,
-                        action['description'], action['contact_phones'], action['report_materials'],
-                        calculated_start_time, calculated_end_time
-                    ))
-                    print(f"PostgreSQLDatabaseManager: Создан action_execution для действия ID {action['id']} (start: {calculated_start_time}, end: {calculated_end_time}).")
-                print(f"PostgreSQLDatabaseManager: Созданы {len(original_actions)} action_executions для execution ID {new_execution_id}.")
+                params = {
+                    'algorithm_id': algorithm_id,
+                    'execution_id': new_execution_id,
+                    'base_time': base_dt,
+                }
+                cursor.execute(LAUNCH_SNAPSHOT_BLOBS_QUERY, params)
+                cursor.execute(LAUNCH_ACTION_EXECUTIONS_QUERY, params)
+                actions_count = cursor.fetchone()[0]
+                print(f"PostgreSQLDatabaseManager: Созданы {actions_count} action_executions для execution ID {new_execution_id}.")
 
                 self.connection.commit()
                 print(f"PostgreSQLDatabaseManager: Транзакция завершена успешно. Новый execution ID: {new_execution_id}")
@@ -1984,17 +2407,36 @@ class PostgreSQLDatabaseManager:
         выполнений алгоритмов (algorithm_executions) за заданную дату и категорию.
         Включает время начала и окончания в отформатированном виде.
 
+        Для интерфейса используйте get_completed_executions_by_category_and_date_page.
+
+        :param category: Категория алгоритмов (snapshot_category).
+        :param date_string: Дата в формате 'DD.MM.YYYY'.
+        :return: Список записей ExecutionRecord.
+        """
+        return self.get_completed_executions_by_category_and_date_page(category, date_string, limit=None)['items']
+
+    def get_completed_executions_by_category_and_date_page(self, category: str, date_string: str,
+                                                           after_key: str = "", after_id: int = 0,
+                                                           limit: Optional[int] = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Получает страницу завершённых (status = 'completed' или 'cancelled') выполнений
+        алгоритмов за заданную дату завершения и категорию.
+        Порядок - (completed_at, id) по убыванию; следующая страница начинается после ключа (after_key, after_id).
+
         :param category: Категория алгоритмов (snapshot_category).
         :param date_string: Дата в формате 'DD.MM.YYYY'.
-        :return: Список словарей с данными execution'ов.
+        :param after_key: completed_at последней строки предыдущей страницы ('' - первая страница).
+        :param after_id: id последней строки предыдущей страницы.
+        :param limit: Размер страницы или None (все строки).
+        :return: Страница (см. _keyset_page) с записями ExecutionRecord.
         """
         if not self.connection:
             print("PostgreSQLDatabaseManager: Нет подключения к БД.")
-            return []
+            return self._keyset_page([], limit, 'completed_at')
 
         if not category or not date_string:
             print("PostgreSQLDatabaseManager: Категория или дата не заданы.")
-            return []
+            return self._keyset_page([], limit, 'completed_at')
 
         try:
             # Преобразуем дату из DD.MM.YYYY в объект date для SQL
@@ -2004,7 +2446,7 @@ class PostgreSQLDatabaseManager:
 
             print(f"PostgreSQLDatabaseManager: Поиск завершённых executions категории '{category}' за дату {target_date_iso}.")
 
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self.connection.cursor() as cursor:
                 # SQL-запрос
                 sql_query = f"""
                     SELECT
@@ -2022,33 +2464,58 @@ class PostgreSQLDatabaseManager:
                         ae.status,
                         ae.created_by_user_id,
                         ae.created_by_user_display_name
-                    FROM {self.SCHEMA_NAME}.algorithm_executions ae
+                    FROM {self.SCHEMA_NAME}.all_algorithm_executions ae
                     WHERE ae.snapshot_category = %s
                     AND ae.status IN ('completed', 'cancelled')
-                    AND CAST(ae.completed_at AS DATE) = %s
-                    ORDER BY ae.completed_at DESC;
+                    AND ae.completed_at >= %s::date AND ae.completed_at < %s::date + 1
+                    {"AND (ae.completed_at, ae.id) < (%s::timestamp, %s)" if after_key else ""}
+                    ORDER BY ae.completed_at DESC, ae.id DESC
+                    {"LIMIT %s" if limit is not None else ""};
                 """
-                cursor.execute(sql_query, (category, target_date_iso))
-                rows = cursor.fetchall()
-
-                # Преобразуем результаты в список словарей
-                executions = [dict(row) for row in rows]
+                params = [category, target_date_iso, target_date_iso]
+                if after_key:
+                    params += [after_key, after_id]
+                if limit is not None:
+                    params.append(limit + 1)
+                cursor.execute(sql_query, params)
+                executions = ExecutionRecord.from_cursor(cursor)
                 print(f"PostgreSQLDatabaseManager: Найдено {len(executions)} завершённых executions.")
-                return executions
+                return self._keyset_page(executions, limit, 'completed_at')
 
         except psycopg2.Error as e:
             print(f"PostgreSQLDatabaseManager: Ошибка БД при получении завершённых executions: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            return self._keyset_page([], limit, 'completed_at')
         except ValueError as ve:
             print(f"PostgreSQLDatabaseManager: Ошибка преобразования даты '{date_string}': {ve}")
-            return []
+            return self._keyset_page([], limit, 'completed_at')
         except Exception as e:
             print(f"PostgreSQLDatabaseManager: Неизвестная ошибка: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            return self._keyset_page([], limit, 'completed_at')
+
+    def get_action_executions_version(self, execution_id: int) -> Optional[tuple]:
+        """
+        Версия строк действий execution'а для кэша отчётов: количество и max(updated_at).
+        Любое изменение действия (статус, примечания, материалы) обновляет его updated_at.
+        :param execution_id: ID execution'а.
+        :return: (количество действий, max(updated_at)) или None в случае ошибки.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT COUNT(*), MAX(updated_at) FROM {self.SCHEMA_NAME}.all_action_executions WHERE execution_id = %s;",
+                (execution_id,),
+            )
+            count, max_updated_at = cursor.fetchone()
+            cursor.close()
+            return count, max_updated_at
+        except psycopg2.Error as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при получении версии action_execution'ов для execution ID {execution_id}: {e}")
+            return None
 
     def get_algorithm_execution_by_id(self, execution_id: int) -> dict:
         """
@@ -2093,7 +2560,7 @@ class PostgreSQLDatabaseManager:
                         -- ae.notes, -- <-- УДАЛЕНО: Столбец 'notes' не существует в таблице algorithm_executions
                         ae.created_at,
                         ae.updated_at
-                    FROM app_schema.algorithm_executions ae
+                    FROM app_schema.all_algorithm_executions ae
                     WHERE ae.id = %s
                 """
                 cursor.execute(sql_query, (execution_id,))
@@ -2135,13 +2602,15 @@ class PostgreSQLDatabaseManager:
             # self.connection.rollback() # Уже был выполнен выше, если ошибка произошла после него
             return None
 
-    def get_action_executions_by_execution_id(self, execution_id: int) -> list:
+    def get_action_executions_by_execution_id(self, execution_id: int, summary: bool = False) -> list:
         """
         Получает список всех выполнений действий (action_execution'ов) для конкретного execution'а.
         Результат сортируется по calculated_start_time.
         :param execution_id: ID execution'а.
-        :return: Список словарей с данными action_execution'ов или пустой список, если не найдены.
-                 Возвращает None в случае ошибки.
+        :param summary: True - только поля строки списка (ACTION_EXECUTION_SUMMARY_COLUMNS),
+                        без технического текста, телефонов, материалов и примечаний.
+        :return: Список записей ActionExecutionRecord (ActionExecutionSummaryRecord при summary=True)
+                 или пустой список, если не найдены. Возвращает None в случае ошибки.
         """
         if not self.connection:
             print("PostgreSQLDatabaseManager: Нет подключения к БД.")
@@ -2152,13 +2621,13 @@ class PostgreSQLDatabaseManager:
             with self.connection.cursor() as cursor:
                 # SQL-запрос для получения данных action_execution'ов
                 # Сортировка по calculated_start_time
-                sql_query = """
-                    SELECT
+                columns = ACTION_EXECUTION_SUMMARY_COLUMNS if summary else f"""
                         ae.id,
                         ae.execution_id,
                         ae.snapshot_description,
+                        {SNAPSHOT_TECHNICAL_TEXT_SUBQUERY.format(alias='ae')} AS snapshot_technical_text,
                         ae.snapshot_contact_phones,
-                        ae.snapshot_report_materials,
+                        {REPORT_MATERIALS_SUBQUERY.format(alias='ae')} AS snapshot_report_materials,
                         ae.calculated_start_time,
                         ae.calculated_end_time,
                         ae.actual_end_time,
@@ -2167,7 +2636,10 @@ class PostgreSQLDatabaseManager:
                         ae.notes,
                         ae.created_at,
                         ae.updated_at
-                    FROM app_schema.action_executions ae
+                """
+                sql_query = f"""
+                    SELECT {columns}
+                    FROM app_schema.all_action_executions ae
                     WHERE ae.execution_id = %s
                     ORDER BY
                         ae.calculated_start_time ASC,
@@ -2175,20 +2647,9 @@ class PostgreSQLDatabaseManager:
                         ae.id ASC
                 """
                 cursor.execute(sql_query, (execution_id,))
-                rows = cursor.fetchall()
-
-                # Получаем названия колонок
-                colnames = [desc[0] for desc in cursor.description]
-
-                action_executions_list = []
-                for row in rows:
-                    # Создаем словарь из строки результата
-                    action_exec_dict = dict(zip(colnames, row))
-                    # Преобразуем datetime в строку, если они не None
-                    for time_field in ['calculated_start_time', 'calculated_end_time', 'actual_end_time', 'created_at', 'updated_at']:
-                        if action_exec_dict.get(time_field):
-                            action_exec_dict[time_field] = action_exec_dict[time_field].isoformat()
-                    action_executions_list.append(action_exec_dict)
+                # Преобразуем datetime в строку, если они не None
+                record_class = ActionExecutionSummaryRecord if summary else ActionExecutionRecord
+                action_executions_list = record_class.from_cursor(cursor, _isoformat_datetime)
 
                 logger.info(f"PostgreSQLDatabaseManager: Получено {len(action_executions_list)} action_execution'ов для execution ID {execution_id}.")
                 return action_executions_list
@@ -2241,6 +2702,9 @@ class PostgreSQLDatabaseManager:
         # Создаем копию данных, содержащую только разрешенные поля
         prepared_data = {k: v for k, v in action_execution_data.items() if k in allowed_fields_in_db}
         logger.debug(f"PostgreSQLDatabaseManager: Подготовленные данные (до преобразования времени): {prepared_data}")
+
+        # Отчётные материалы хранятся в action_execution_materials, а не в колонке
+        report_materials = prepared_data.pop('snapshot_report_materials', None)
         
         # Добавляем execution_id
         prepared_data['execution_id'] = execution_id
@@ -2317,6 +2781,7 @@ class PostgreSQLDatabaseManager:
                     new_action_id = new_action_id_row[0] if new_action_id_row else None
                     # conn.commit() вызывается автоматически при выходе из контекстного менеджера `with conn:`
                     if new_action_id:
+                        self._insert_action_execution_materials(cursor, new_action_id, report_materials)
                         logger.info(f"PostgreSQLDatabaseManager: Новое action_execution (ID: {new_action_id}) добавлено для execution ID {execution_id}.")
                         return True # Или return new_action_id, если хотите возвращать ID
                     else:
@@ -2367,6 +2832,10 @@ class PostgreSQLDatabaseManager:
                 else:
                     prepared_data[k] = v
 
+        # Отчётные материалы хранятся в action_execution_materials: при передаче - заменяем набор целиком
+        replace_report_materials = 'snapshot_report_materials' in prepared_data
+        report_materials = prepared_data.pop('snapshot_report_materials', None)
+
         logger.debug(f"PostgreSQLDatabaseManager: Подготовленные данные для обновления (до преобразования времени): {prepared_data}")
         # --- ---
 
@@ -2436,6 +2905,19 @@ class PostgreSQLDatabaseManager:
                     # (или можно предусмотреть явное указание статуса в action_execution_data, если нужно)
                     # --- ---
 
+                    if replace_report_materials:
+                        cursor.execute(
+                            f"DELETE FROM {self.SCHEMA_NAME}.action_execution_materials WHERE action_execution_id = %s;",
+                            (action_execution_id,)
+                        )
+                        self._insert_action_execution_materials(cursor, action_execution_id, report_materials)
+                        if not prepared_data:
+                            cursor.execute(
+                                f"UPDATE {self.SCHEMA_NAME}.action_executions SET updated_at = CURRENT_TIMESTAMP WHERE id = %s;",
+                                (action_execution_id,)
+                            )
+                            return True
+
                     # --- Подготовка SQL-запроса ---
                     if not prepared_data:
                         logger.warning("PostgreSQLDatabaseManager: Нет данных для обновления (после фильтрации и преобразований).")
@@ -2504,19 +2986,20 @@ class PostgreSQLDatabaseManager:
                 # Запрос включает все нужные поля, включая snapshot и calculated/actual
                 query = f"""
                 SELECT
-                    id,
-                    execution_id,
-                    snapshot_description,
-                    snapshot_contact_phones,
-                    snapshot_report_materials,
-                    calculated_start_time,
-                    calculated_end_time,
-                    actual_end_time,
-                    status,
-                    reported_to,
-                    notes
-                FROM {self.SCHEMA_NAME}.action_executions
-                WHERE id = %s;
+                    ae.id,
+                    ae.execution_id,
+                    ae.snapshot_description,
+                    ae.snapshot_contact_phones,
+                    {REPORT_MATERIALS_SUBQUERY.format(alias='ae')} AS snapshot_report_materials,
+                    ae.calculated_start_time,
+                    ae.calculated_end_time,
+                    ae.actual_end_time,
+                    ae.status,
+                    ae.reported_to,
+                    ae.notes,
+                    {SNAPSHOT_TECHNICAL_TEXT_SUBQUERY.format(alias='ae')} AS snapshot_technical_text
+                FROM {self.SCHEMA_NAME}.all_action_executions ae
+                WHERE ae.id = %s;
                 """
                 cursor.execute(query, (action_execution_id,))
                 row = cursor.fetchone()
@@ -2555,8 +3038,10 @@ class PostgreSQLDatabaseManager:
     def get_active_action_executions_with_details(self) -> list:
         """
         Получает список активных action_executions вместе с деталями execution'а.
+        Вызывается таймером проверки дедлайнов каждые несколько секунд, поэтому строки
+        возвращаются компактными записями ActiveActionRecord (db/records.py), а не словарями.
 
-        Возвращает список словарей:
+        Возвращает список записей с полями:
         [
             {
                 'id': int, # ID action_execution
@@ -2565,37 +3050,34 @@ class PostgreSQLDatabaseManager:
                 'calculated_end_time': datetime.datetime, # Объект datetime времени окончания
                 'status': str, # Статус action_execution ('pending', 'in_progress', ...) - теперь без алиаса
                 'snapshot_description': str, # Описание действия
-                'execution_status': str # Статус algorithm_execution ('active', 'completed', ...)
+                'execution_status': str, # Статус algorithm_execution ('active', 'completed', ...)
+                'calculated_start_epoch': int, # Время начала в секундах (шкала TimeService) или None
+                'calculated_end_epoch': int # Время окончания в секундах (шкала TimeService) или None
             },
             ...
         ]
         """
         query = """
         SELECT
-            ae.id,
-            ae.execution_id,
-            ae.calculated_start_time,
-            ae.calculated_end_time,
-            ae.status, -- Явно указываем ae.status, он будет 'status' в словаре Python
-            ae.snapshot_description,
-            exec.status AS execution_status,
-            exec.snapshot_name -- <-- Добавляем snapshot_name из связанного execution
-        FROM app_schema.action_executions ae
-        JOIN app_schema.algorithm_executions exec ON ae.execution_id = exec.id
-        WHERE exec.status = 'active' -- Только активные выполнения алгоритмов
-        AND ae.status IN ('pending', 'in_progress'); -- Только активные действия
+            q.action_execution_id AS id,
+            q.execution_id,
+            -- Секунды настенного времени обратно в TIMESTAMP без пояса
+            to_timestamp(q.start_epoch) AT TIME ZONE 'UTC' AS calculated_start_time,
+            to_timestamp(q.end_epoch) AT TIME ZONE 'UTC' AS calculated_end_time,
+            q.status,
+            q.snapshot_description,
+            'active' AS execution_status, -- В очереди только действия активных выполнений
+            q.snapshot_name,
+            q.start_epoch AS calculated_start_epoch,
+            q.end_epoch AS calculated_end_epoch
+        FROM app_schema.active_action_queue q; -- Поддерживается триггерами (init_postgres_schema.sql)
         """
         try:
             # Используем _get_connection для получения соединения
             with self._get_connection() as conn:
-                # Создаем курсор из соединения, используя RealDictCursor
-                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                with conn.cursor() as cursor:
                     cursor.execute(query)
-                    rows = cursor.fetchall()
-                    # rows уже будут списком RealDictRow, который можно напрямую конвертировать в dict
-                    # Преобразуем в список словарей Python
-                    results = [dict(row) for row in rows]
-                    return results
+                    return ActiveActionRecord.from_cursor(cursor)
         except Exception as e:
             logger.error(f"Ошибка при получении активных действий с деталями: {e}")
             import traceback
@@ -2603,27 +3085,340 @@ class PostgreSQLDatabaseManager:
             return []
     # --- Конец метода get_active_action_executions_with_details ---
 
+    # ========================================================================
+    # МЕТОДЫ ДЛЯ РАБОТЫ С ОТЧЁТНЫМИ МАТЕРИАЛАМИ ACTION_EXECUTION
+    # ========================================================================
+
+    @staticmethod
+    def _split_report_materials(materials_text) -> List[str]:
+        """
+        Разбивает текст отчётных материалов (строки, разделённые '\\n') на список путей.
+        Пустые строки пропускаются.
+        :param materials_text: Текст материалов или None.
+        :return: Список непустых строк.
+        """
+        if not materials_text or not isinstance(materials_text, str):
+            return []
+        return [line.strip() for line in materials_text.split("\n") if line.strip()]
+
+    def _store_snapshot_blob(self, cursor, snapshot_text: Optional[str]) -> Optional[str]:
+        """
+        Сохраняет текст снимка в snapshot_blobs (если такого ещё нет) и возвращает его хеш.
+        Использует переданный курсор, коммит выполняет вызывающий метод.
+        :param cursor: Курсор открытой транзакции.
+        :param snapshot_text: Текст снимка или None.
+        :return: SHA-256 текста (hex) или None для None.
+        """
+        if snapshot_text is None:
+            return None
+        data = snapshot_text.encode('utf-8')
+        blob_hash = hashlib.sha256(data).hexdigest()
+        cursor.execute(
+            f"INSERT INTO {self.SCHEMA_NAME}.snapshot_blobs (hash, content, size) VALUES (%s, %s, %s) "
+            f"ON CONFLICT (hash) DO NOTHING;",
+            (blob_hash, snapshot_text, len(data))
+        )
+        return blob_hash
+
+    def _insert_action_execution_materials(self, cursor, action_execution_id: int, materials_text) -> int:
+        """
+        Добавляет отчётные материалы action_execution'а в action_execution_materials.
+        Использует переданный курсор, коммит выполняет вызывающий метод.
+        :param cursor: Курсор открытой транзакции.
+        :param action_execution_id: ID action_execution'а.
+        :param materials_text: Текст материалов (строки, разделённые '\\n') или None.
+        :return: Количество добавленных строк.
+        """
+        materials = self._split_report_materials(materials_text)
+        if materials:
+            cursor.executemany(
+                f"INSERT INTO {self.SCHEMA_NAME}.action_execution_materials (action_execution_id, file_path) VALUES (%s, %s);",
+                [(action_execution_id, path) for path in materials]
+            )
+        return len(materials)
+
+    def get_action_execution_report_materials(self, action_execution_id: int) -> list:
+        """
+        Получает отчётные материалы action_execution'а в порядке добавления.
+        :param action_execution_id: ID action_execution'а.
+        :return: Список словарей {id, action_execution_id, file_path, created_at} или пустой список.
+        """
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    cursor.execute(
+                        f"SELECT id, action_execution_id, file_path, created_at FROM {self.SCHEMA_NAME}.all_action_execution_materials "
+                        "WHERE action_execution_id = %s ORDER BY id;",
+                        (action_execution_id,)
+                    )
+                    results = []
+                    for row in cursor.fetchall():
+                        row_dict = dict(row)
+                        if isinstance(row_dict.get('created_at'), datetime.datetime):
+                            row_dict['created_at'] = row_dict['created_at'].isoformat()
+                        results.append(row_dict)
+                    return results
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при получении отчётных материалов для action_execution ID {action_execution_id}: {e}")
+            return []
+        return []
+
+    def append_action_execution_report_material(self, action_execution_id: int, material_path: str) -> bool:
+        """
+        Добавляет отчётный материал к action_execution (одна строка в action_execution_materials).
+        :param action_execution_id: ID action_execution'а.
+        :param material_path: Путь к файлу материала.
+        :return: True, если успешно, иначе False.
+        """
+        material_path = (material_path or "").strip()
+        if not material_path:
+            logger.error("PostgreSQLDatabaseManager: Пустой путь к отчётному материалу.")
+            return False
+
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {self.SCHEMA_NAME}.action_execution_materials (action_execution_id, file_path) VALUES (%s, %s);",
+                        (action_execution_id, material_path)
+                    )
+                    cursor.execute(
+                        f"UPDATE {self.SCHEMA_NAME}.action_executions SET updated_at = CURRENT_TIMESTAMP WHERE id = %s;",
+                        (action_execution_id,)
+                    )
+                    conn.commit()
+                    logger.info(f"PostgreSQLDatabaseManager: Добавлен отчётный материал для action_execution ID {action_execution_id}.")
+                    return True
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при добавлении отчётного материала для action_execution ID {action_execution_id}: {e}")
+            if conn:
+                conn.rollback()
+            return False
+        return False
+
+    def delete_action_execution_report_material(self, action_execution_id: int, material_index: int) -> bool:
+        """
+        Удаляет отчётный материал по его позиции в списке материалов action_execution'а.
+        Оставлено для совместимости; предпочтительно удаление по ID
+        (delete_action_execution_report_material_by_id).
+        :param action_execution_id: ID action_execution'а.
+        :param material_index: Позиция материала (0-based, в порядке добавления).
+        :return: True, если успешно, иначе False.
+        """
+        if not isinstance(material_index, int) or material_index < 0:
+            logger.error(f"PostgreSQLDatabaseManager: Некорректный индекс материала: {material_index}")
+            return False
+
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"""
+                        DELETE FROM {self.SCHEMA_NAME}.action_execution_materials
+                        WHERE id = (
+                            SELECT id FROM {self.SCHEMA_NAME}.action_execution_materials
+                            WHERE action_execution_id = %s
+                            ORDER BY id
+                            LIMIT 1 OFFSET %s
+                        );
+                    """, (action_execution_id, material_index))
+                    deleted = cursor.rowcount
+                    if deleted > 0:
+                        cursor.execute(
+                            f"UPDATE {self.SCHEMA_NAME}.action_executions SET updated_at = CURRENT_TIMESTAMP WHERE id = %s;",
+                            (action_execution_id,)
+                        )
+                    conn.commit()
+                    return deleted > 0
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при удалении отчётного материала для action_execution ID {action_execution_id}: {e}")
+            if conn:
+                conn.rollback()
+            return False
+        return False
+
+    def delete_action_execution_report_material_by_id(self, material_id: int) -> bool:
+        """
+        Удаляет отчётный материал по его ID в action_execution_materials.
+        :param material_id: ID материала.
+        :return: True, если материал удалён, иначе False.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {self.SCHEMA_NAME}.action_execution_materials WHERE id = %s RETURNING action_execution_id;",
+                        (material_id,)
+                    )
+                    row = cursor.fetchone()
+                    if row:
+                        cursor.execute(
+                            f"UPDATE {self.SCHEMA_NAME}.action_executions SET updated_at = CURRENT_TIMESTAMP WHERE id = %s;",
+                            (row[0],)
+                        )
+                    conn.commit()
+                    logger.info(f"PostgreSQLDatabaseManager: Удалён отчётный материал ID {material_id}: {bool(row)}.")
+                    return row is not None
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при удалении отчётного материала ID {material_id}: {e}")
+            if conn:
+                conn.rollback()
+            return False
+        return False
+
+    # ========================================================================
+    # СОСТОЯНИЕ УВЕДОМЛЕНИЙ (уже показанные уведомления о действиях)
+    # ========================================================================
+
+    def get_action_execution_notification_masks(self, action_execution_ids: list) -> Dict[int, int]:
+        """
+        Возвращает битовые маски уже показанных уведомлений для заданных action_execution'ов.
+        :param action_execution_ids: Список ID action_execution'ов.
+        :return: Словарь {action_execution_id: маска}; ID без уведомлений в словарь не попадают.
+        """
+        ids = [int(i) for i in action_execution_ids if i is not None]
+        if not ids:
+            return {}
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"""
+                        SELECT action_execution_id, SUM(notification_type)
+                        FROM {self.SCHEMA_NAME}.action_execution_notifications
+                        WHERE action_execution_id = ANY(%s)
+                        GROUP BY action_execution_id;
+                    """, (ids,))
+                    return {row[0]: int(row[1]) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при получении состояния уведомлений: {e}")
+            if conn:
+                conn.rollback()
+        return {}
+
+    def mark_action_execution_notified(self, action_execution_id: int, notification_type: int) -> bool:
+        """
+        Сохраняет факт показа уведомления данного типа для action_execution'а.
+        :param action_execution_id: ID action_execution'а.
+        :param notification_type: Код типа уведомления (степень двойки).
+        :return: True, если успешно, иначе False.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {self.SCHEMA_NAME}.action_execution_notifications (action_execution_id, notification_type) "
+                        f"VALUES (%s, %s) ON CONFLICT DO NOTHING;",
+                        (action_execution_id, notification_type)
+                    )
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при сохранении уведомления для action_execution ID {action_execution_id}: {e}")
+            if conn:
+                conn.rollback()
+        return False
+
+    def mark_action_executions_notified(self, pairs: list) -> bool:
+        """
+        Сохраняет факты показа уведомлений одной транзакцией (за одну проверку дедлайнов).
+        :param pairs: Список пар (ID action_execution'а, код типа уведомления).
+        :return: True, если успешно, иначе False.
+        """
+        if not pairs:
+            return True
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor() as cursor:
+                    execute_values(
+                        cursor,
+                        f"INSERT INTO {self.SCHEMA_NAME}.action_execution_notifications (action_execution_id, notification_type) "
+                        f"VALUES %s ON CONFLICT DO NOTHING;",
+                        pairs
+                    )
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при сохранении уведомлений ({len(pairs)} шт.): {e}")
+            if conn:
+                conn.rollback()
+        return False
+
+    def prune_action_execution_notifications(self) -> int:
+        """
+        Удаляет состояние уведомлений для завершённых/пропущенных действий и неактивных выполнений.
+        Активные действия - строки active_action_queue, проверяются только записи состояния.
+        :return: Количество удалённых записей или -1 при ошибке.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"""
+                        DELETE FROM {self.SCHEMA_NAME}.action_execution_notifications n
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM {self.SCHEMA_NAME}.active_action_queue q
+                            WHERE q.action_execution_id = n.action_execution_id
+                        );
+                    """)
+                    deleted_count = cursor.rowcount
+                conn.commit()
+                return deleted_count
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при очистке состояния уведомлений: {e}")
+            if conn:
+                conn.rollback()
+        return -1
+
     # ========================================================================
     # МЕТОДЫ ДЛЯ РАБОТЫ С ОРГАНИЗАЦИЯМИ
     # ========================================================================
 
     def get_all_organizations(self) -> list:
         """Получить все организации из справочника."""
+        return self.get_organizations_page(limit=None)['items']
+
+    def get_organizations_page(self, after_key: str = "", after_id: int = 0,
+                               limit: Optional[int] = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Получить страницу справочника организаций в порядке (name, id).
+        :param after_key: name последней организации предыдущей страницы ('' - первая страница).
+        :param after_id: id последней организации предыдущей страницы.
+        :param limit: Размер страницы или None (все организации).
+        :return: Страница (см. _keyset_page) с записями OrganizationRecord.
+        """
         try:
             conn = self._get_connection()
             if conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("SELECT * FROM app_schema.organizations ORDER BY name;")
-                    rows = cursor.fetchall()
-                    organizations = [dict(row) for row in rows]
+                    params = []
+                    sql_query = "SELECT id, name, phone, contact_person, notes, created_at, updated_at FROM app_schema.organizations"
+                    if after_key or after_id:
+                        sql_query += " WHERE (name, id) > (%s, %s)"
+                        params += [after_key, after_id]
+                    sql_query += " ORDER BY name, id"
+                    if limit is not None:
+                        sql_query += " LIMIT %s"
+                        params.append(limit + 1)
+                    cursor.execute(sql_query + ";", params)
+                    organizations = OrganizationRecord.from_cursor(cursor)
                     logger.info(f"PostgreSQLDatabaseManager: Получено {len(organizations)} организаций.")
-                    return organizations
+                    return self._keyset_page(organizations, limit, 'name')
         except Exception as e:
             logger.error(f"PostgreSQLDatabaseManager: Ошибка при получении организаций: {e}")
-            return []
-        except Exception as e:
-            logger.exception(f"PostgreSQLDatabaseManager: Неизвестная ошибка при получении организаций: {e}")
-            return []
+        return self._keyset_page([], limit, 'name')
 
     def create_organization(self, org_data: dict) -> int:
         """Создать новую организацию. Возвращает ID или 0 при ошибке."""
@@ -2811,7 +3606,7 @@ class PostgreSQLDatabaseManager:
                     cursor.execute("""
                         SELECT o.*
                         FROM app_schema.organizations o
-                        INNER JOIN app_schema.action_execution_organizations aeo ON o.id = aeo.organization_id
+                        INNER JOIN app_schema.all_action_execution_organizations aeo ON o.id = aeo.organization_id
                         WHERE aeo.action_execution_id = %s
                         ORDER BY o.name;
                     """, (action_execution_id,))
@@ -2878,6 +3673,160 @@ class PostgreSQLDatabaseManager:
             return False
 
 
+    # ========================================================================
+    # ПОЛНОТЕКСТОВЫЙ ПОИСК
+    # ========================================================================
+
+    # Типы сущностей в search_index
+    SEARCH_ENTITY_TYPES = ('algorithm', 'action', 'action_execution', 'organization')
+
+    @staticmethod
+    def _build_tsquery(query_text: str) -> str:
+        """
+        Преобразует пользовательскую строку поиска в выражение для to_tsquery.
+        Каждое слово ищется по префиксу, слова объединяются по И.
+        :param query_text: Строка, введённая пользователем.
+        :return: Выражение tsquery или пустая строка.
+        """
+        tokens = re.findall(r'\w+', query_text or "", re.UNICODE)
+        return ' & '.join(f"{token}:*" for token in tokens)
+
+    def search(self, query_text: str, entity_types: list = None, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        Ранжированный полнотекстовый поиск по алгоритмам, действиям, истории выполнений и организациям.
+        :param query_text: Строка поиска (слова ищутся по префиксу, все слова должны встречаться).
+        :param entity_types: Список типов сущностей для фильтрации (см. SEARCH_ENTITY_TYPES) или None - все.
+        :param limit: Размер страницы.
+        :param offset: Смещение страницы.
+        :return: Словарь {'items': [...], 'has_more': bool}. Элемент содержит entity_type, entity_id,
+                 execution_id, algorithm_id, title, snippet, rank, execution_name, execution_started_at.
+        """
+        empty_result = {'items': [], 'has_more': False}
+        tsquery = self._build_tsquery(query_text)
+        if not tsquery:
+            return empty_result
+
+        limit = max(1, min(int(limit), 500))
+        offset = max(0, int(offset))
+
+        type_filter = ""
+        params: List[Any] = [tsquery]
+        if entity_types:
+            types = [t for t in entity_types if t in self.SEARCH_ENTITY_TYPES]
+            if not types:
+                return empty_result
+            type_filter = "AND s.entity_type = ANY(%s)"
+            params.append(types)
+        # Лишняя строка (limit + 1) показывает, есть ли следующая страница
+        params.extend([limit + 1, offset])
+
+        # ts_headline считается только для строк выбранной страницы
+        sql_query = f"""
+            SELECT
+                page.entity_type,
+                page.entity_id,
+                page.execution_id,
+                a.algorithm_id,
+                page.title,
+                ts_headline('russian', concat_ws(E'\\n', page.title, page.body), page.q,
+                            'StartSel=<b>, StopSel=</b>, MaxWords=24, MinWords=8') AS snippet,
+                page.rank,
+                ex.snapshot_name AS execution_name,
+                ex.started_at AS execution_started_at
+            FROM (
+                SELECT s.entity_type, s.entity_id, s.execution_id, s.title, s.body, q,
+                       ts_rank(s.document, q) AS rank
+                FROM {self.SCHEMA_NAME}.search_index s
+                CROSS JOIN to_tsquery('russian', %s) AS q
+                WHERE s.document @@ q {type_filter}
+                ORDER BY rank DESC, s.entity_id DESC
+                LIMIT %s OFFSET %s
+            ) page
+            LEFT JOIN {self.SCHEMA_NAME}.all_algorithm_executions ex ON ex.id = page.execution_id
+            LEFT JOIN {self.SCHEMA_NAME}.actions a ON page.entity_type = 'action' AND a.id = page.entity_id
+            ORDER BY page.rank DESC, page.entity_id DESC;
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    cursor.execute(sql_query, params)
+                    rows = cursor.fetchall()
+                    items = []
+                    for row in rows[:limit]:
+                        item = dict(row)
+                        if isinstance(item.get('execution_started_at'), datetime.datetime):
+                            item['execution_started_at'] = item['execution_started_at'].isoformat()
+                        item['rank'] = float(item['rank']) if item.get('rank') is not None else 0.0
+                        items.append(item)
+                    return {'items': items, 'has_more': len(rows) > limit}
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка при полнотекстовом поиске '{query_text}': {e}")
+            if conn:
+                conn.rollback()
+            return empty_result
+        return empty_result
+
+    # --- АРХИВ ЗАВЕРШЁННЫХ ВЫПОЛНЕНИЙ ---
+
+    def activate_archive(self) -> bool:
+        """
+        Подключение архива к запросам истории. В PostgreSQL архивные таблицы всегда входят
+        в представления all_*, подключать нечего; метод повторяет интерфейс SQLiteDatabaseManager.
+        """
+        return True
+
+    def archive_completed_executions(self, older_than_days: int, vacuum: bool = False,
+                                     activate_archive: bool = True) -> int:
+        """
+        Переносит завершённые и отменённые execution'ы, завершившиеся более older_than_days дней назад,
+        в архивные таблицы, секционированные по completed_at (см. app_schema.archive_completed_executions).
+        Архивные записи остаются доступны запросам истории (представления all_*) и поиску.
+        Выполняется на отдельном подключении: метод вызывается и из фонового потока (ArchiveWorker).
+        :param older_than_days: Минимальный возраст завершённых execution'ов в днях.
+        :param vacuum: Выполнить VACUUM ANALYZE горячих таблиц после переноса.
+        :param activate_archive: Для совместимости с SQLiteDatabaseManager (архив подключен всегда).
+        :return: Количество перенесённых execution'ов или -1 при ошибке.
+        """
+        if not isinstance(older_than_days, int) or older_than_days <= 0:
+            logger.error(f"PostgreSQLDatabaseManager: Некорректный срок архивации: {older_than_days}")
+            return -1
+
+        conn = None
+        try:
+            conn = self._open_dedicated_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {self.SCHEMA_NAME}.archive_completed_executions(make_interval(days => %s));",
+                    (older_than_days,)
+                )
+                archived_count = cursor.fetchone()[0] or 0
+            conn.commit()
+            logger.info(f"PostgreSQLDatabaseManager: В архив перенесено {archived_count} execution'ов (старше {older_than_days} дн.).")
+
+            if vacuum and archived_count > 0:
+                # VACUUM нельзя выполнять внутри транзакции; подключение своё - режим не восстанавливается
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    for table in ('algorithm_executions', 'action_executions',
+                                  'action_execution_materials', 'action_execution_organizations'):
+                        cursor.execute(f"VACUUM ANALYZE {self.SCHEMA_NAME}.{table};")
+            return archived_count
+        except psycopg2.Error as e:
+            logger.error(f"PostgreSQLDatabaseManager: Ошибка БД при архивации execution'ов: {e}")
+            if conn and not conn.autocommit:
+                conn.rollback()
+            return -1
+        except Exception as e:
+            logger.error(f"PostgreSQLDatabaseManager: Неизвестная ошибка при архивации execution'ов: {e}")
+            if conn and not conn.autocommit:
+                conn.rollback()
+            return -1
+        finally:
+            if conn:
+                conn.close()
+
 # --- Пример использования (для тестирования модуля отдельно) ---
 if __name__ == "__main__":
     # Для тестирования в standalone-режиме нужно получить конфиг из SQLite
@@ -0,0 +1,152 @@
+# db/records.py
+"""
+Компактные записи строк БД для "горячих" выборок (опрос дедлайнов, история, справочники).
+
+Запись - кортеж (подкласс tuple с __slots__ = ()): значения колонок лежат в одном кортеже,
+а имена полей хранятся один раз в классе. В отличие от dict(zip(colnames, row)) строка не
+тянет за собой собственную хеш-таблицу ключей: накладные расходы строки в 2-4 раза меньше,
+и выборка из тысяч строк на каждом тике таймера или при загрузке истории строится быстрее
+(см. benchmarks/bench_row_records.py).
+
+Для совместимости с кодом, который работал со словарями, запись поддерживает row['имя'],
+row.get('имя', default) и keys() (а значит и dict(row)). В QML записи передаются только
+словарями - через to_dict() / records_to_maps() / page_to_maps() в слотах ApplicationData,
+иначе PySide6 превратит кортеж в QVariantList вместо QVariantMap.
+
+Порядок _fields должен совпадать с порядком колонок запроса: from_cursor проверяет это
+по cursor.description.
+"""
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Record(tuple):
+    """Базовый класс записи. Подклассы задают _fields и __slots__ = ()."""
+    __slots__ = ()
+
+    _fields: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._index = {name: i for i, name in enumerate(cls._fields)}
+        # Доступ к полям как к атрибутам: row.status
+        for i, name in enumerate(cls._fields):
+            setattr(cls, name, property(itemgetter(i)))
+
+    @classmethod
+    def from_row(cls, row) -> "Record":
+        """Запись из строки результата (кортежа значений в порядке _fields)."""
+        return tuple.__new__(cls, row)
+
+    @classmethod
+    def from_cursor(cls, cursor, convert: Optional[Callable[[Any], Any]] = None) -> List["Record"]:
+        """
+        Все оставшиеся строки курсора (sqlite3 или psycopg2) как список записей.
+        :param convert: Необязательное преобразование каждого значения (например, datetime -> ISO-строка).
+        :raises ValueError: Колонки запроса не совпадают с _fields.
+        """
+        columns = tuple(column[0] for column in cursor.description)
+        if columns != cls._fields:
+            raise ValueError(f"{cls.__name__}: колонки запроса {columns} не совпадают с полями {cls._fields}")
+        # Для sqlite3 отключаем sqlite3.Row соединения: строки приходят простыми кортежами
+        if getattr(cursor, 'row_factory', None) is not None:
+            cursor.row_factory = None
+        new = tuple.__new__
+        if convert is not None:
+            return [new(cls, map(convert, row)) for row in cursor.fetchall()]
+        return [new(cls, row) for row in cursor.fetchall()]
+
+    # --- Интерфейс словаря (только чтение) ---
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def values(self) -> "Record":
+        return self
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь для QML (QVariantMap) или для изменения полей."""
+        return dict(zip(self._fields, self))
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self))
+        return f"{type(self).__name__}({values})"
+
+
+class ExecutionRecord(Record):
+    """Строка истории выполнений (get_executions_by_date_page, get_completed_executions_by_category_and_date_page)."""
+    __slots__ = ()
+    _fields = (
+        'id', 'algorithm_id', 'algorithm_name', 'category',
+        'started_at', 'started_at_display', 'completed_at', 'completed_at_display',
+        'status', 'created_by_user_id', 'created_by_user_display_name',
+    )
+
+
+class ActiveActionRecord(Record):
+    """Строка живого набора действий для проверки дедлайнов (get_active_action_executions_with_details)."""
+    __slots__ = ()
+    _fields = (
+        'id', 'execution_id', 'calculated_start_time', 'calculated_end_time', 'status',
+        'snapshot_description', 'execution_status', 'snapshot_name',
+        'calculated_start_epoch', 'calculated_end_epoch',
+    )
+
+
+class ActionExecutionRecord(Record):
+    """Полная строка action_execution'а (get_action_executions_by_execution_id)."""
+    __slots__ = ()
+    _fields = (
+        'id', 'execution_id', 'snapshot_description', 'snapshot_technical_text', 'snapshot_contact_phones',
+        'snapshot_report_materials', 'calculated_start_time', 'calculated_end_time', 'actual_end_time',
+        'status', 'reported_to', 'notes', 'created_at', 'updated_at',
+    )
+
+
+class ActionExecutionSummaryRecord(Record):
+    """Сводная строка action_execution'а (ACTION_EXECUTION_SUMMARY_COLUMNS)."""
+    __slots__ = ()
+    _fields = (
+        'id', 'execution_id', 'snapshot_description', 'calculated_start_time', 'calculated_end_time',
+        'actual_end_time', 'status', 'reported_to',
+    )
+
+
+class AlgorithmRecord(Record):
+    """Строка списка алгоритмов (get_all_algorithms)."""
+    __slots__ = ()
+    _fields = ('id', 'name', 'category', 'time_type', 'description', 'created_at', 'updated_at')
+
+
+class OrganizationRecord(Record):
+    """Строка справочника организаций (get_organizations_page)."""
+    __slots__ = ()
+    _fields = ('id', 'name', 'phone', 'contact_person', 'notes', 'created_at', 'updated_at')
+
+
+def records_to_maps(rows: Optional[list]) -> Optional[list]:
+    """Список записей -> список словарей для QML. Словари и None пропускаются как есть."""
+    if rows is None:
+        return None
+    return [row.to_dict() if isinstance(row, Record) else row for row in rows]
+
+
+def page_to_maps(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Страница keyset-выдачи (_keyset_page) с записями -> та же страница со словарями для QML."""
+    return dict(page, items=records_to_maps(page['items']))
@@ -108,7 +108,8 @@ class SQLiteConfigManager:
             'show_moscow_time': "INTEGER DEFAULT 1",
             'moscow_time_offset_seconds': "INTEGER DEFAULT 0",
             'font_style': "TEXT DEFAULT 'normal'",
-            'print_font_style': "TEXT DEFAULT 'normal'"
+            'print_font_style': "TEXT DEFAULT 'normal'",
+            'archive_after_days': "INTEGER DEFAULT 180"  # 0 - не архивировать завершённые выполнения
         }
 
         # Проверяем и добавляем каждую новую колонку, если её нет
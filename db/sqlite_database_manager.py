@@ -1,14 +1,309 @@
 ﻿# db/sqlite_database_manager.py
 import sqlite3
-from typing import Optional, Dict, Any, List
+import os
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 import datetime
+import hashlib
+import re
+import time
+import zlib
 from werkzeug.security import check_password_hash, generate_password_hash
+from db.records import (
+    ActionExecutionRecord, ActionExecutionSummaryRecord, ActiveActionRecord,
+    AlgorithmRecord, ExecutionRecord, OrganizationRecord,
+)
 
 # Настройка логирования для отладки
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO) # Или DEBUG для более подробного лога
 
+# Подзапрос, собирающий отчётные материалы action_execution'а из action_execution_materials
+# в одну строку через '\n' (в порядке добавления). QML продолжает получать snapshot_report_materials
+# как текст. {alias} - псевдоним таблицы action_executions во внешнем запросе,
+# {materials} - таблица материалов одной БД (см. _report_materials_sql).
+REPORT_MATERIALS_SUBQUERY = """(
+    SELECT group_concat(m.file_path, char(10))
+    FROM (
+        SELECT file_path FROM {materials}
+        WHERE action_execution_id = {alias}.id
+        ORDER BY id
+    ) m
+)"""
+
+# Снимок технического текста action_execution'а: содержимое из snapshot_blobs по хешу,
+# для строк, ещё не перенесённых в snapshot_blobs, - старая колонка snapshot_technical_text.
+# {alias} - псевдоним таблицы action_executions во внешнем запросе.
+SNAPSHOT_TECHNICAL_TEXT_SUBQUERY = """COALESCE((
+    SELECT snapshot_blob_text(b.content, b.compressed)
+    FROM snapshot_blobs b
+    WHERE b.hash = {alias}.snapshot_technical_text_hash
+), {alias}.snapshot_technical_text)"""
+
+# Журнал действий для выгрузки (DOCX): одна строка на action_execution, порядок колонок -
+# (id выполнения, название, начало выполнения, описание действия, плановые начало и окончание,
+# фактическое окончание, статус, кому доложено, примечания). {where} - условие отбора выполнений.
+# Строки одной БД истории ({schema}, см. _history_union); порядок задаёт ACTION_LOG_ORDER_QUERY.
+ACTION_LOG_QUERY = """
+    SELECT
+        e.id, e.snapshot_name, e.started_at, a.snapshot_description, a.calculated_start_time,
+        a.calculated_end_time, a.actual_end_time, a.status, a.reported_to, a.notes,
+        a.id AS action_execution_id
+    FROM {schema}.algorithm_executions e
+    JOIN {schema}.action_executions a ON a.execution_id = e.id
+    WHERE {where}
+"""
+
+# Порция строк ACTION_LOG_QUERY из всех БД истории ({rows}) в порядке журнала; параметр - размер порции.
+# Ключ порядка (ACTION_LOG_KEY) уникален, по последней строке порции отбирается следующая.
+ACTION_LOG_ORDER_QUERY = """
+    SELECT
+        id, snapshot_name, started_at, snapshot_description, calculated_start_time,
+        calculated_end_time, actual_end_time, status, reported_to, notes, action_execution_id
+    FROM ({rows})
+    ORDER BY IFNULL(started_at, ''), id, IFNULL(calculated_start_time, ''), action_execution_id
+    LIMIT ?
+"""
+
+# Условие "после строки журнала с ключом (?, ?, ?, ?)" для ACTION_LOG_QUERY - тот же порядок, что в
+# ACTION_LOG_ORDER_QUERY (пустые времена - первыми, как NULL)
+ACTION_LOG_KEY = "(IFNULL(e.started_at, ''), e.id, IFNULL(a.calculated_start_time, ''), a.id) > (?, ?, ?, ?)"
+
+# Размер порции строк журнала действий, читаемой одним запросом
+ACTION_LOG_CHUNK_SIZE = 1000
+
+# Исходные строки суточных сводок аналитики (reports/performance_analytics.py): одна строка на
+# action_execution - (сутки запуска, алгоритм, описание действия, ответственный, статус,
+# плановое и фактическое окончание в секундах).
+PERFORMANCE_SOURCE_QUERY = """
+    SELECT
+        substr(e.started_at, 1, 10), e.snapshot_name, a.snapshot_description, e.created_by_user_display_name,
+        a.status,
+        CAST(strftime('%s', a.calculated_end_time) AS INTEGER),
+        CAST(strftime('%s', a.actual_end_time) AS INTEGER)
+    FROM {schema}.algorithm_executions e
+    JOIN {schema}.action_executions a ON a.execution_id = e.id
+    WHERE e.started_at >= ? AND e.started_at < ?
+"""
+
+# Счётчики execution_stats по строкам действий (пересборка статистики выполнений):
+# (id выполнения, всего, выполнено, в срок, с опозданием, пропущено). Те же условия, что в
+# триггерах trg_execution_stats_* (init_sqlite_schema.sql). {schema} - БД истории (main или archive),
+# {where} - условие отбора действий.
+EXECUTION_STATS_QUERY = """
+    SELECT
+        a.execution_id, COUNT(*), SUM(a.status IS 'completed'),
+        SUM((a.status IS 'completed' AND CAST(strftime('%s', a.actual_end_time) AS INTEGER)
+             <= CAST(strftime('%s', a.calculated_end_time) AS INTEGER)) IS 1),
+        SUM((a.status IS 'completed' AND CAST(strftime('%s', a.actual_end_time) AS INTEGER)
+             > CAST(strftime('%s', a.calculated_end_time) AS INTEGER)) IS 1),
+        SUM(a.status IS 'skipped')
+    FROM {schema}.action_executions a
+    WHERE {where}
+    GROUP BY a.execution_id
+"""
+
+# Тексты снимков от этого размера (байт UTF-8) сжимаются zlib при сохранении в snapshot_blobs.
+# None - не сжимать.
+SNAPSHOT_BLOB_COMPRESS_MIN_BYTES = 512
+
+
+def _snapshot_blob_text(content, compressed):
+    """SQL-функция snapshot_blob_text(content, compressed): содержимое snapshot_blobs -> текст."""
+    if content is None or not compressed:
+        return content
+    return zlib.decompress(content).decode('utf-8')
+
+
+def _snapshot_blob_hash(snapshot_text):
+    """SQL-функция snapshot_blob_hash(text): ключ snapshot_blobs - SHA-256 текста в UTF-8 (hex)."""
+    if snapshot_text is None:
+        return None
+    return hashlib.sha256(snapshot_text.encode('utf-8')).hexdigest()
+
+
+def _snapshot_blob_pack(snapshot_text):
+    """
+    SQL-функция snapshot_blob_pack(text): содержимое snapshot_blobs для текста снимка.
+    Тексты от SNAPSHOT_BLOB_COMPRESS_MIN_BYTES сжимаются zlib (BLOB), если это уменьшает размер,
+    остальные хранятся как есть (TEXT) - поэтому compressed = (typeof(content) = 'blob').
+    """
+    if snapshot_text is None:
+        return None
+    data = snapshot_text.encode('utf-8')
+    if SNAPSHOT_BLOB_COMPRESS_MIN_BYTES is not None and len(data) >= SNAPSHOT_BLOB_COMPRESS_MIN_BYTES:
+        packed = zlib.compress(data)
+        if len(packed) < len(data):
+            return packed
+    return snapshot_text
+
+
+# Смещение действия в том виде, в каком его сохраняет _convert_time_string_to_interval:
+# 'd hh:mm:ss' или 'hh:mm:ss'
+ACTION_OFFSET_PATTERN = re.compile(r'(?:(\d+)\s+)?(\d{2}):(\d{2}):(\d{2})')
+
+
+def _offset_to_seconds(offset: Optional[str]) -> Tuple[Optional[int], bool]:
+    """
+    Разбирает сохранённое смещение действия.
+    :param offset: Строка смещения ('d hh:mm:ss' или 'hh:mm:ss') или None.
+    :return: (секунды или None, если смещения нет или формат не распознан;
+              True, если часы, минуты и секунды смещения - корректное время суток).
+    """
+    match = ACTION_OFFSET_PATTERN.fullmatch(offset.strip()) if offset else None
+    if not match:
+        return None, True
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds, hours < 24 and minutes < 60 and seconds < 60
+
+
+# Размер страницы по умолчанию для постраничной (keyset) выдачи истории и справочников
+DEFAULT_PAGE_SIZE = 50
+
+# Проекции списков действий. Сводная (summary) - только то, что показывает строка списка:
+# без технического текста, телефонов, отчётных материалов и примечаний. Полные данные
+# строки читаются отдельно по ID (get_action_by_id / get_action_execution_by_id) при открытии.
+ACTION_SUMMARY_COLUMNS = "id, algorithm_id, description, start_offset, end_offset"
+ACTION_DETAIL_COLUMNS = (
+    "id, algorithm_id, description, technical_text, start_offset, end_offset, "
+    "contact_phones, report_materials, created_at, updated_at"
+)
+ACTION_EXECUTION_SUMMARY_COLUMNS = """
+    ae.id,
+    ae.execution_id,
+    ae.snapshot_description,
+    ae.calculated_start_time,
+    ae.calculated_end_time,
+    ae.actual_end_time,
+    ae.status,
+    ae.reported_to
+"""
+
+# Живой набор действий читается из active_action_queue, которую поддерживают триггеры
+# (init_sqlite_schema.sql): несколько сотен строк без соединения с полной историей.
+ACTIVE_ACTION_EXECUTIONS_QUERY = """
+    SELECT
+        action_execution_id AS id,
+        execution_id,
+        datetime(start_epoch, 'unixepoch') AS calculated_start_time,
+        datetime(end_epoch, 'unixepoch') AS calculated_end_time,
+        status,
+        snapshot_description,
+        'active' AS execution_status, -- В очереди только действия активных выполнений
+        snapshot_name,
+        start_epoch AS calculated_start_epoch,
+        end_epoch AS calculated_end_epoch
+    FROM active_action_queue;
+"""
+
+# Пересборка active_action_queue из основных таблиц (при старте, на случай правок в обход триггеров).
+# Условия WHERE должны совпадать с условиями частичных индексов idx_algorithm_executions_active,
+# idx_action_executions_live и idx_algorithm_executions_active_category (init_sqlite_schema.sql),
+# иначе SQLite их не использует. Планы проверяет benchmarks/check_query_plans.py.
+ACTIVE_ACTION_QUEUE_REBUILD_QUERY = """
+    INSERT INTO active_action_queue
+        (action_execution_id, execution_id, status, start_epoch, end_epoch, snapshot_description, snapshot_name)
+    SELECT
+        ae.id,
+        ae.execution_id,
+        ae.status,
+        CAST(strftime('%s', ae.calculated_start_time) AS INTEGER),
+        CAST(strftime('%s', ae.calculated_end_time) AS INTEGER),
+        ae.snapshot_description,
+        exec.snapshot_name
+    FROM action_executions ae
+    JOIN algorithm_executions exec ON ae.execution_id = exec.id
+    WHERE exec.status = 'active' -- Только активные выполнения алгоритмов
+    AND ae.status IN ('pending', 'in_progress'); -- Только активные действия
+"""
+
+ACTIVE_EXECUTIONS_BY_CATEGORY_QUERY = """
+    SELECT
+        id,
+        algorithm_id, -- Ссылка на оригинальный алгоритм
+        snapshot_name AS algorithm_name, -- Имя из snapshot'а
+        snapshot_category AS category, -- Категория из snapshot'а
+        started_at,
+        substr(started_at, 1, 19) AS started_at_display, -- <-- НОВОЕ: Отформатированное значение
+        completed_at,
+        status,
+        created_by_user_id, -- ID пользователя на момент запуска
+        created_by_user_display_name, -- Отображаемое имя на момент запуска
+        (SELECT COUNT(*) FROM active_action_queue q WHERE q.execution_id = algorithm_executions.id) AS live_actions_count,
+        (SELECT COUNT(*) FROM active_action_queue q
+         WHERE q.execution_id = algorithm_executions.id AND q.end_epoch < ?) AS overdue_actions_count
+    FROM algorithm_executions
+    WHERE snapshot_category = ? AND status = 'active'
+    ORDER BY started_at DESC; -- Сортируем по времени запуска
+"""
+
+# Запуск алгоритма (start_algorithm_execution) тремя запросами INSERT ... SELECT, без построчного
+# прохода по действиям в Python. Сначала в snapshot_blobs добавляются ещё не сохранённые технические тексты.
+LAUNCH_SNAPSHOT_BLOBS_QUERY = """
+    INSERT INTO snapshot_blobs (hash, compressed, content, size)
+    SELECT
+        t.hash,
+        typeof(snapshot_blob_pack(t.technical_text)) = 'blob',
+        snapshot_blob_pack(t.technical_text),
+        length(CAST(t.technical_text AS BLOB))
+    FROM (
+        SELECT DISTINCT snapshot_blob_hash(technical_text) AS hash, technical_text
+        FROM actions
+        WHERE algorithm_id = :algorithm_id AND technical_text IS NOT NULL
+    ) t
+    WHERE NOT EXISTS (SELECT 1 FROM snapshot_blobs b WHERE b.hash = t.hash);
+"""
+
+# Снимки действий: время = точка отсчёта (:base_time) + секунды смещения из actions.
+# Порядок вставки (ORDER BY) задаёт порядок id новых строк - по нему материалы
+# (LAUNCH_MATERIALS_QUERY) сопоставляются с исходными действиями.
+LAUNCH_ACTION_EXECUTIONS_QUERY = """
+    INSERT INTO action_executions (
+        execution_id,
+        snapshot_description, snapshot_technical_text_hash, snapshot_contact_phones,
+        calculated_start_time, calculated_end_time
+    )
+    SELECT
+        :execution_id,
+        description, snapshot_blob_hash(technical_text), contact_phones,
+        strftime('%Y-%m-%dT%H:%M:%S', :base_time, '+' || start_offset_seconds || ' seconds'),
+        strftime('%Y-%m-%dT%H:%M:%S', :base_time, '+' || end_offset_seconds || ' seconds')
+    FROM actions
+    WHERE algorithm_id = :algorithm_id
+    ORDER BY start_offset, id;
+"""
+
+# Отчётные материалы шаблонов (строки через '\n') - отдельными строками action_execution_materials.
+# Снимки одного запуска вставлены подряд в одной транзакции, поэтому n-е действие в порядке
+# LAUNCH_ACTION_EXECUTIONS_QUERY получило id = (первый id выполнения) + n - 1.
+# Пробелы по краям строк и пустые строки отбрасываются, как в _split_report_materials.
+LAUNCH_MATERIALS_QUERY = """
+    WITH RECURSIVE
+    numbered(action_execution_id, report_materials) AS (
+        SELECT
+            (SELECT MIN(id) FROM action_executions WHERE execution_id = :execution_id)
+                + ROW_NUMBER() OVER (ORDER BY start_offset, id) - 1,
+            report_materials
+        FROM actions WHERE algorithm_id = :algorithm_id
+    ),
+    source(action_execution_id, rest) AS (
+        SELECT action_execution_id, report_materials || char(10)
+        FROM numbered WHERE report_materials IS NOT NULL
+    ),
+    lines(action_execution_id, position, line, rest) AS (
+        SELECT action_execution_id, 0, NULL, rest FROM source
+        UNION ALL
+        SELECT action_execution_id, position + 1,
+               trim(substr(rest, 1, instr(rest, char(10)) - 1), ' ' || char(9) || char(13)),
+               substr(rest, instr(rest, char(10)) + 1)
+        FROM lines WHERE rest <> ''
+    )
+    INSERT INTO action_execution_materials (action_execution_id, file_path)
+    SELECT action_execution_id, line FROM lines
+    WHERE line <> ''
+    ORDER BY action_execution_id, position;
+"""
+
 class SQLiteDatabaseManager:
     """
     Класс для управления подключением к базе данных SQLite
@@ -22,6 +317,11 @@ class SQLiteDatabaseManager:
         """
         self.db_path = db_path
         self.connection = None
+        # Архив завершённых execution'ов - отдельный файл рядом с основной БД,
+        # подключается к каждому соединению через ATTACH под именем 'archive'
+        self.archive_db_path = os.path.splitext(db_path)[0] + '_archive.db'
+        self.archive_available = False
+        self._history_columns: Dict[str, List[str]] = {}
         logger.info(f"SQLiteDatabaseManager инициализирован. Путь к БД: {self.db_path}")
         
         # Инициализируем базу данных
@@ -41,6 +341,16 @@ class SQLiteDatabaseManager:
             conn.execute("PRAGMA foreign_keys = ON;")
             logger.debug("Поддержка внешних ключей включена.")
 
+            # Распаковка снимков из snapshot_blobs (см. SNAPSHOT_TECHNICAL_TEXT_SUBQUERY)
+            conn.create_function("snapshot_blob_text", 2, _snapshot_blob_text, deterministic=True)
+            # Хеш и упаковка снимков при запуске алгоритма (см. LAUNCH_SNAPSHOT_BLOBS_QUERY)
+            conn.create_function("snapshot_blob_hash", 1, _snapshot_blob_hash, deterministic=True)
+            conn.create_function("snapshot_blob_pack", 1, _snapshot_blob_pack, deterministic=True)
+
+            # Подключаем архив, чтобы запросы истории охватывали обе БД
+            if self.archive_available:
+                conn.execute("ATTACH DATABASE ? AS archive;", (self.archive_db_path,))
+
             logger.debug("Соединение sqlite3 создано.")
 
             return conn
@@ -97,12 +407,188 @@ class SQLiteDatabaseManager:
                 logger.info("Миграция: добавлена колонка snapshot_technical_text в action_executions.")
             except sqlite3.Error as e:
                 logger.warning(f"Миграция: не удалось добавить snapshot_technical_text: {e}")
+
+        cursor.execute("PRAGMA table_info(action_executions)")
+        if 'snapshot_technical_text_hash' not in [info[1] for info in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE action_executions ADD COLUMN snapshot_technical_text_hash TEXT REFERENCES snapshot_blobs(hash);")
+            logger.info("Миграция: добавлена колонка snapshot_technical_text_hash в action_executions.")
+
+        if 'start_offset_seconds' not in existing_columns:
+            cursor.execute("ALTER TABLE actions ADD COLUMN start_offset_seconds INTEGER;")
+            cursor.execute("ALTER TABLE actions ADD COLUMN end_offset_seconds INTEGER;")
+            cursor.execute("ALTER TABLE actions ADD COLUMN offset_time_of_day INTEGER NOT NULL DEFAULT 1;")
+            logger.info("Миграция: добавлены колонки start_offset_seconds, end_offset_seconds, offset_time_of_day в actions.")
+
+        # Файлы миграций лежат рядом со схемой (в exe - тоже, см. datas в DuOfficer.spec)
+        self.migrations_dir = os.path.join(os.path.dirname(schema_path), 'migrations')
+
+        # Перенос отчётных материалов из snapshot_report_materials в action_execution_materials
+        cursor.execute("SELECT COUNT(*) FROM action_executions WHERE snapshot_report_materials IS NOT NULL;")
+        if cursor.fetchone()[0] > 0:
+            try:
+                self._run_migration_file(cursor, '004_add_action_execution_materials.sql')
+                logger.info("Миграция: отчётные материалы перенесены в action_execution_materials.")
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Миграция: не удалось перенести отчётные материалы: {e}")
+
+        # Полнотекстовый поиск: индекс FTS5 и триггеры создаются при первом запуске
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index';")
+        self.fulltext_search_available = cursor.fetchone() is not None
+        if not self.fulltext_search_available:
+            try:
+                self._run_migration_file(cursor, '005_add_fulltext_search.sql')
+                self.fulltext_search_available = True
+                logger.info("Миграция: создан полнотекстовый индекс search_index.")
+            except (sqlite3.Error, OSError) as e:
+                # Например, сборка SQLite без FTS5 - приложение работает, но без поиска
+                logger.warning(f"Миграция: не удалось создать полнотекстовый индекс (поиск недоступен): {e}")
         # --- Конец миграции ---
 
+        # Секунды смещений для действий, сохранённых до появления колонок (или вставленных в обход create_action)
+        offsets_count = self._refresh_action_offset_seconds(cursor)
+        if offsets_count > 0:
+            logger.info(f"Миграция: рассчитаны смещения в секундах для {offsets_count} действий.")
+
+        self._rebuild_active_action_queue(cursor)
+
+        # Дедупликация снимков технического текста (однократно для старых строк)
+        migrated_count = self._migrate_snapshot_blobs(cursor, 'main')
+
         conn.commit()
+
+        if migrated_count > 0:
+            # Освобождённые страницы возвращаем файловой системе - иначе файл БД (и резервные копии) не уменьшится
+            conn.execute("VACUUM main;")
+            logger.info("Миграция: выполнен VACUUM основной БД после переноса снимков в snapshot_blobs.")
+
+        # Архив: при наличии файла приводим его схему в соответствие с основной БД
+        if os.path.exists(self.archive_db_path):
+            try:
+                cursor.execute("ATTACH DATABASE ? AS archive;", (self.archive_db_path,))
+                self._history_columns.update(self._ensure_archive_schema(cursor))
+                archived_migrated_count = self._migrate_snapshot_blobs(cursor, 'archive')
+                conn.commit()
+                if archived_migrated_count > 0:
+                    conn.execute("VACUUM archive;")
+                self.archive_available = True
+                logger.info(f"Архив подключен: {self.archive_db_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"Не удалось подключить архив {self.archive_db_path}: {e}")
+
+        # Статистика выполнений: однократное заполнение для БД, созданных до появления таблиц
+        cursor.execute(
+            f"SELECT NOT EXISTS (SELECT 1 FROM execution_stats) "
+            f"AND EXISTS (SELECT 1 FROM {self._history_table('algorithm_executions')});"
+        )
+        if cursor.fetchone()[0]:
+            stats_count = self._rebuild_execution_statistics(cursor)
+            conn.commit()
+            logger.info(f"Миграция: статистика выполнений заполнена для {stats_count} выполнений.")
+
         conn.close()
         logger.info("База данных SQLite инициализирована.")
 
+    def _store_snapshot_blob(self, cursor, snapshot_text: Optional[str]) -> Optional[str]:
+        """
+        Сохраняет текст снимка в snapshot_blobs (если такого ещё нет) и возвращает его хеш.
+        Тексты от SNAPSHOT_BLOB_COMPRESS_MIN_BYTES сжимаются zlib, если это уменьшает размер.
+        Использует переданный курсор, коммит выполняет вызывающий метод.
+        :param cursor: Курсор открытой транзакции.
+        :param snapshot_text: Текст снимка или None.
+        :return: SHA-256 текста (hex) или None для None.
+        """
+        if snapshot_text is None:
+            return None
+        blob_hash = _snapshot_blob_hash(snapshot_text)
+        cursor.execute("SELECT 1 FROM snapshot_blobs WHERE hash = ?;", (blob_hash,))
+        if cursor.fetchone() is None:
+            content = _snapshot_blob_pack(snapshot_text)
+            cursor.execute(
+                "INSERT INTO snapshot_blobs (hash, compressed, content, size) VALUES (?, ?, ?, ?);",
+                (blob_hash, int(isinstance(content, bytes)), content, len(snapshot_text.encode('utf-8')))
+            )
+        return blob_hash
+
+    def _migrate_snapshot_blobs(self, cursor, schema: str) -> int:
+        """
+        Переносит технический текст строк action_executions, сохранённых до появления snapshot_blobs,
+        в snapshot_blobs: одинаковые тексты сохраняются один раз, строки получают ссылку по хешу.
+        :param cursor: Курсор подключения (schema должна быть доступна: 'main' или присоединённый 'archive').
+        :param schema: Схема с таблицей action_executions.
+        :return: Количество перенесённых строк.
+        """
+        cursor.execute(
+            f"SELECT id, snapshot_technical_text FROM {schema}.action_executions WHERE snapshot_technical_text IS NOT NULL;"
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+        hashes = {}
+        updates = []
+        for action_execution_id, snapshot_text in rows:
+            if snapshot_text not in hashes:
+                hashes[snapshot_text] = self._store_snapshot_blob(cursor, snapshot_text)
+            updates.append((hashes[snapshot_text], action_execution_id))
+        cursor.executemany(
+            f"UPDATE {schema}.action_executions SET snapshot_technical_text_hash = ?, snapshot_technical_text = NULL WHERE id = ?;",
+            updates
+        )
+        logger.info(f"Миграция: технический текст {len(updates)} action_execution'ов ({schema}) перенесён "
+                    f"в snapshot_blobs ({len(hashes)} уникальных текстов).")
+        return len(updates)
+
+    def _refresh_action_offset_seconds(self, cursor, action_id: Optional[int] = None) -> int:
+        """
+        Пересчитывает start_offset_seconds, end_offset_seconds и offset_time_of_day действия
+        из строковых смещений. Использует переданный курсор, коммит выполняет вызывающий метод.
+        :param cursor: Курсор открытой транзакции.
+        :param action_id: ID действия или None - все действия, у которых есть смещение, но нет секунд.
+        :return: Количество пересчитанных действий.
+        """
+        if action_id is None:
+            cursor.execute(
+                "SELECT id, start_offset, end_offset FROM actions "
+                "WHERE (start_offset IS NOT NULL AND start_offset_seconds IS NULL) "
+                "OR (end_offset IS NOT NULL AND end_offset_seconds IS NULL);"
+            )
+        else:
+            cursor.execute("SELECT id, start_offset, end_offset FROM actions WHERE id = ?;", (action_id,))
+        updates = []
+        for row_id, start_offset, end_offset in cursor.fetchall():
+            start_seconds, start_time_of_day = _offset_to_seconds(start_offset)
+            end_seconds, end_time_of_day = _offset_to_seconds(end_offset)
+            updates.append((start_seconds, end_seconds, int(start_time_of_day and end_time_of_day), row_id))
+        cursor.executemany(
+            "UPDATE actions SET start_offset_seconds = ?, end_offset_seconds = ?, offset_time_of_day = ? WHERE id = ?;",
+            updates
+        )
+        return len(updates)
+
+    def _run_migration_file(self, cursor, file_name: str):
+        """
+        Выполняет SQL-скрипт миграции из каталога db/migrations.
+        :param cursor: Курсор подключения к БД.
+        :param file_name: Имя файла миграции.
+        """
+        import os
+        migration_path = os.path.join(self.migrations_dir, file_name)
+        with open(migration_path, 'r', encoding='utf-8') as f:
+            cursor.executescript(f.read())
+
+    def _rebuild_active_action_queue(self, cursor):
+        """
+        Пересобирает active_action_queue из action_executions/algorithm_executions.
+        Дальше очередь поддерживают триггеры; пересборка при старте выравнивает её после
+        правок БД в обход триггеров (старые версии приложения, ручные правки).
+        :param cursor: Курсор подключения к БД.
+        """
+        try:
+            cursor.execute("DELETE FROM active_action_queue;")
+            cursor.execute(ACTIVE_ACTION_QUEUE_REBUILD_QUERY)
+            logger.info(f"Очередь активных действий пересобрана: {cursor.rowcount} строк.")
+        except sqlite3.Error as e:
+            logger.warning(f"Не удалось пересобрать очередь активных действий: {e}")
+
     def close_connection(self):
         """Закрывает подключение к БД."""
         if self.connection:
@@ -630,7 +1116,7 @@ class SQLiteDatabaseManager:
     def get_all_algorithms(self) -> List[Dict[str, Any]]:
         """
         Получает список всех алгоритмов, отсортированных по sort_order.
-        :return: Список словарей с данными алгоритмов.
+        :return: Список записей AlgorithmRecord (db/records.py).
         """
         try:
             conn = self._get_connection()
@@ -638,10 +1124,8 @@ class SQLiteDatabaseManager:
             cursor.execute(
                 "SELECT id, name, category, time_type, description, created_at, updated_at FROM algorithms ORDER BY sort_order ASC;"
             )
-            rows = cursor.fetchall()
-            colnames = [desc[0] for desc in cursor.description]
+            algorithms_list = AlgorithmRecord.from_cursor(cursor)
             cursor.close()
-            algorithms_list = [dict(zip(colnames, row)) for row in rows]
             logger.debug(f"Получен список {len(algorithms_list)} алгоритмов из БД.")
             return algorithms_list
         except sqlite3.Error as e:
@@ -981,11 +1465,12 @@ class SQLiteDatabaseManager:
 
     # --- МЕТОДЫ ДЛЯ РАБОТЫ С ACTIONS ---
 
-    def get_actions_by_algorithm_id(self, algorithm_id: int) -> List[Dict[str, Any]]:
+    def get_actions_by_algorithm_id(self, algorithm_id: int, summary: bool = False) -> List[Dict[str, Any]]:
         """
         Получает список всех действий для заданного алгоритма, отсортированных по времени начала (start_offset).
         Поддерживает сортировку как по числовым значениям (секунды), так и по формату времени (HH:MM:SS).
         :param algorithm_id: ID алгоритма.
+        :param summary: True - только поля строки списка (ACTION_SUMMARY_COLUMNS), без тяжёлых текстов.
         :return: Список словарей с данными действий.
         """
         if not isinstance(algorithm_id, int) or algorithm_id <= 0:
@@ -996,24 +1481,11 @@ class SQLiteDatabaseManager:
             conn = self._get_connection()
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, algorithm_id, description, technical_text, start_offset, end_offset, contact_phones, report_materials, created_at, updated_at "
+                f"SELECT {ACTION_SUMMARY_COLUMNS if summary else ACTION_DETAIL_COLUMNS} "
                 "FROM actions "
                 "WHERE algorithm_id = ? "
-                "ORDER BY "
-                "CASE "
-                "WHEN start_offset LIKE '% %:__:__' THEN "
-                "  CASE "
-                "    WHEN start_offset LIKE '____-__-__T__:__:__%' THEN "
-                "      substr(start_offset, 1, 4) * 31536000 + substr(start_offset, 6, 2) * 2678400 + substr(start_offset, 9, 2) * 86400 + substr(start_offset, 12, 2) * 3600 + substr(start_offset, 15, 2) * 60 + substr(start_offset, 18, 2) "
-                "    ELSE "
-                "      CAST(substr(start_offset, 1, instr(start_offset, ' ') - 1) AS INTEGER) * 86400 + "
-                "      substr(substr(start_offset, instr(start_offset, ' ') + 1), 1, 2) * 3600 + "
-                "      substr(substr(start_offset, instr(start_offset, ' ') + 1), 4, 2) * 60 + "
-                "      substr(substr(start_offset, instr(start_offset, ' ') + 1), 7, 2) "
-                "  END "
-                "WHEN start_offset LIKE '__:__:__' THEN substr(start_offset, 1, 2) * 3600 + substr(start_offset, 4, 2) * 60 + substr(start_offset, 7, 2) "
-                "ELSE CAST(COALESCE(start_offset, '0') AS INTEGER) "
-                "END ASC, "
+                # Смещение в секундах рассчитано при сохранении; для нераспознанных строк - их числовое значение
+                "ORDER BY COALESCE(start_offset_seconds, CAST(COALESCE(start_offset, '0') AS INTEGER)) ASC, "
                 "id ASC;",
                 (algorithm_id,)
             )
@@ -1263,6 +1735,8 @@ class SQLiteDatabaseManager:
             logger.debug(f"Значения для вставки: {values}")
             cursor.execute(sql_query, values)
             new_id = cursor.lastrowid
+            # Смещения в секундах считаются один раз здесь, а не при каждом запуске алгоритма
+            self._refresh_action_offset_seconds(cursor, new_id)
             conn.commit()
             cursor.close()
 
@@ -1363,9 +1837,10 @@ class SQLiteDatabaseManager:
             print(f"DEBUG UPDATE action {action_id}: SQL = {sql_query}")
             print(f"DEBUG UPDATE action {action_id}: VALUES = {values}")
             cursor.execute(sql_query, values)
-            conn.commit()
-
             rows_affected = cursor.rowcount
+            if 'start_offset' in fields_to_update or 'end_offset' in fields_to_update:
+                self._refresh_action_offset_seconds(cursor, action_id)
+            conn.commit()
             cursor.close()
 
             if rows_affected > 0:
@@ -1618,16 +2093,53 @@ class SQLiteDatabaseManager:
                 conn.rollback()
             return False
 
+    @staticmethod
+    def _keyset_page(items: List[Dict[str, Any]], limit: Optional[int], key_column: str) -> Dict[str, Any]:
+        """
+        Оформляет страницу keyset-выдачи. Запрос выбирает limit + 1 строк: лишняя строка
+        означает, что следующая страница есть, и отбрасывается.
+        :param items: Строки страницы (записи db/records.py или словари) в порядке выдачи.
+        :param limit: Размер страницы или None (без ограничения).
+        :param key_column: Колонка сортировки (вместе с id задаёт однозначный порядок).
+        :return: {'items': [...], 'has_more': bool, 'next_key': str, 'next_id': int}.
+                 next_key/next_id - ключ последней строки, передаётся в следующий вызов как after_key/after_id.
+        """
+        has_more = limit is not None and len(items) > limit
+        if has_more:
+            items = items[:limit]
+        last = items[-1] if items else None
+        return {
+            'items': items,
+            'has_more': has_more,
+            'next_key': str(last[key_column]) if last and last[key_column] is not None else "",
+            'next_id': last['id'] if last else 0,
+        }
+
     def get_executions_by_date(self, date_string: str) -> List[Dict[str, Any]]:
         """
         Получает список ВСЕХ выполнений алгоритмов (algorithm_executions) за заданную дату.
         Включает активные, завершенные и отмененные.
+        Для интерфейса используйте get_executions_by_date_page.
+        :param date_string: Дата в формате 'YYYY-MM-DD'.
+        :return: Список записей ExecutionRecord.
+        """
+        return self.get_executions_by_date_page(date_string, limit=None)['items']
+
+    def get_executions_by_date_page(self, date_string: str, after_key: str = "", after_id: int = 0,
+                                    limit: Optional[int] = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Получает страницу выполнений алгоритмов (algorithm_executions) за заданную дату.
+        Порядок - (started_at, id) по убыванию; следующая страница начинается после ключа
+        (after_key, after_id), поэтому её выборка не зависит от номера страницы.
         :param date_string: Дата в формате 'YYYY-MM-DD'.
-        :return: Список словарей с данными execution'ов.
+        :param after_key: started_at последней строки предыдущей страницы ('' - первая страница).
+        :param after_id: id последней строки предыдущей страницы.
+        :param limit: Размер страницы или None (все строки).
+        :return: Страница (см. _keyset_page) с записями ExecutionRecord.
         """
         if not date_string:
             logger.warning("Некорректная дата для получения execution'ов.")
-            return []
+            return self._keyset_page([], limit, 'started_at')
 
         try:
             conn = self._get_connection()
@@ -1635,11 +2147,12 @@ class SQLiteDatabaseManager:
 
             # SQL-запрос БЕЗ фильтрации по status
             # Используем substr для извлечения даты из timestamp
-            sql_query = """
+            sql_query = f"""
             SELECT
                 ae.id,
                 ae.algorithm_id,
                 a.name AS algorithm_name,
+                ae.snapshot_category AS category,
                 ae.started_at,
                 substr(ae.started_at, 1, 19) AS started_at_display,
                 ae.completed_at,
@@ -1650,66 +2163,436 @@ class SQLiteDatabaseManager:
                 ae.status,
                 ae.created_by_user_id,
                 COALESCE(u.last_name || ' ' || u.first_name || ' ' || u.middle_name, 'Неизвестен') AS created_by_user_display_name
-            FROM algorithm_executions ae
+            FROM {self._history_table('algorithm_executions')} ae
             JOIN algorithms a ON ae.algorithm_id = a.id
             LEFT JOIN users u ON ae.created_by_user_id = u.id
-            WHERE substr(ae.started_at, 1, 10) = ?
-            ORDER BY ae.started_at DESC;
+            WHERE ae.started_at >= ? AND ae.started_at < ?
+            {"AND (ae.started_at, ae.id) < (?, ?)" if after_key else ""}
+            ORDER BY ae.started_at DESC, ae.id DESC
+            {"LIMIT ?" if limit is not None else ""};
             """
 
-            logger.debug(f"Выполнение SQL получения ВСЕХ execution'ов за дату '{date_string}': {sql_query} с параметром {date_string}")
-            cursor.execute(sql_query, (date_string,))
-            rows = cursor.fetchall()
-            # Получаем названия колонок
-            colnames = [desc[0] for desc in cursor.description]
+            # Диапазон [дата, дата + 1 день) вместо substr() позволяет использовать индекс по started_at
+            next_date_string = (datetime.date.fromisoformat(date_string) + datetime.timedelta(days=1)).isoformat()
+            params = [date_string, next_date_string]
+            if after_key:
+                params += [after_key, after_id]
+            if limit is not None:
+                params.append(limit + 1)
+            logger.debug(f"Выполнение SQL получения execution'ов за дату '{date_string}': {sql_query} с параметрами {params}")
+            cursor.execute(sql_query, params)
+            executions_list = ExecutionRecord.from_cursor(cursor)
             cursor.close()
-
-            # Преобразуем список кортежей в список словарей
-            executions_list = [dict(zip(colnames, row)) for row in rows]
-            logger.info(f"Получен список {len(executions_list)} ВСЕХ execution'ов за дату '{date_string}' из БД.")
-            return executions_list
+            logger.info(f"Получено {len(executions_list)} execution'ов за дату '{date_string}' из БД.")
+            return self._keyset_page(executions_list, limit, 'started_at')
 
         except sqlite3.Error as e:
-            logger.error(f"Ошибка БД при получении ВСЕХ execution'ов за дату '{date_string}': {e}")
-            return []
+            logger.error(f"Ошибка БД при получении execution'ов за дату '{date_string}': {e}")
+            return self._keyset_page([], limit, 'started_at')
         except Exception as e:
-            logger.error(f"Неизвестная ошибка при получении ВСЕХ execution'ов за дату '{date_string}': {e}")
+            logger.error(f"Неизвестная ошибка при получении execution'ов за дату '{date_string}': {e}")
             import traceback
             traceback.print_exc()
+            return self._keyset_page([], limit, 'started_at')
+
+    def get_execution_ids_by_period(self, start_string: str, end_string: str) -> List[int]:
+        """
+        Получает id выполнений, запущенных в периоде [start_string, end_string) - например,
+        за сутки или за смену (для пакетной выгрузки отчётов). Учитывает архив.
+        :param start_string: Начало периода 'YYYY-MM-DD' или 'YYYY-MM-DD HH:MM:SS'.
+        :param end_string: Конец периода (не включается) в том же формате.
+        :return: Список id в порядке запуска (started_at, id).
+        """
+        if not start_string or not end_string:
+            logger.warning("Некорректный период для получения id execution'ов.")
+            return []
+
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            # started_at хранится строкой 'YYYY-MM-DD HH:MM:SS': границы сравниваются как строки по индексу
+            cursor.execute(
+                f"""
+                SELECT id FROM {self._history_table('algorithm_executions')}
+                WHERE started_at >= ? AND started_at < ?
+                ORDER BY started_at, id;
+                """,
+                (start_string, end_string),
+            )
+            execution_ids = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            logger.info(f"Получено {len(execution_ids)} id execution'ов за период '{start_string}' - '{end_string}'.")
+            return execution_ids
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка БД при получении id execution'ов за период '{start_string}' - '{end_string}': {e}")
+            return []
+
+    @staticmethod
+    def _action_log_filter(start_string: Optional[str], end_string: Optional[str],
+                           execution_id: Optional[int]) -> Tuple[str, list]:
+        """Условие отбора выполнений журнала действий: одно выполнение или период [start, end)."""
+        if execution_id is not None:
+            return "e.id = ?", [execution_id]
+        return "e.started_at >= ? AND e.started_at < ?", [start_string, end_string]
+
+    def count_action_log_rows(self, start_string: Optional[str] = None, end_string: Optional[str] = None,
+                              execution_id: Optional[int] = None) -> int:
+        """
+        Количество строк журнала действий (для индикатора хода выгрузки).
+        :return: Количество action_execution'ов выполнения execution_id или выполнений периода
+                 [start_string, end_string); -1 при ошибке.
+        """
+        where, params = self._action_log_filter(start_string, end_string, execution_id)
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            counts, params = self._history_union(
+                """
+                SELECT COUNT(*) AS rows_count
+                FROM {schema}.algorithm_executions e
+                JOIN {schema}.action_executions a ON a.execution_id = e.id
+                WHERE {where}
+                """,
+                params,
+                where=where,
+            )
+            cursor.execute(f"SELECT IFNULL(SUM(rows_count), 0) FROM ({counts});", params)
+            count = cursor.fetchone()[0]
+            cursor.close()
+            conn.close()
+            return count
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка при подсчёте строк журнала действий: {e}")
+            return -1
+
+    def iter_action_log_rows(self, start_string: Optional[str] = None, end_string: Optional[str] = None,
+                             execution_id: Optional[int] = None, chunk_size: int = ACTION_LOG_CHUNK_SIZE):
+        """
+        Журнал действий (ACTION_LOG_QUERY) порциями по chunk_size строк; в памяти одновременно только
+        одна порция. Каждая порция - отдельный короткий запрос на своём подключении (продолжение после
+        ключа последней строки, ACTION_LOG_KEY): пока вызывающий обрабатывает порцию, блокировка
+        чтения не удерживается и запись в БД из других потоков не ждёт конца выгрузки.
+        Учитывает архив. Отбор - одно выполнение (execution_id) или период [start_string, end_string).
+        :return: Генератор списков кортежей. Ошибки БД (sqlite3.Error) передаются вызывающему.
+        """
+        where, params = self._action_log_filter(start_string, end_string, execution_id)
+        last_key = None
+        while True:
+            chunk_where, chunk_params = where, list(params)
+            if last_key is not None:
+                chunk_where = f"{where} AND {ACTION_LOG_KEY}"
+                chunk_params += last_key
+            rows, union_params = self._history_union(ACTION_LOG_QUERY, chunk_params, where=chunk_where)
+            conn = self._get_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.row_factory = None  # Простые кортежи вместо sqlite3.Row
+                cursor.execute(ACTION_LOG_ORDER_QUERY.format(rows=rows), union_params + [chunk_size])
+                rows = cursor.fetchall()
+                cursor.close()
+            finally:
+                conn.close()
+            if not rows:
+                break
+            last = rows[-1]
+            last_key = ['' if last[2] is None else last[2], last[0], '' if last[4] is None else last[4], last[10]]
+            yield [row[:10] for row in rows]
+            if len(rows) < chunk_size:
+                break
+
+    # --- СУТОЧНЫЕ СВОДКИ АНАЛИТИКИ ИСПОЛНЕНИЯ (performance_rollup) ---
+
+    def claim_performance_rollup_days(self, start_date: str, end_date: str) -> Optional[List[str]]:
+        """
+        Сутки периода [start_date, end_date), сводку которых нужно (пере)строить: с выполнениями,
+        но без сводки, и помеченные триггерами как изменённые. Пометки и отметки о построении
+        этих суток снимаются сразу - изменение во время перестроения снова пометит сутки,
+        а при сбое перестроения они останутся непостроенными. Учитывает архив.
+        :param start_date: Начало периода 'YYYY-MM-DD'.
+        :param end_date: Конец периода (не включается) 'YYYY-MM-DD'.
+        :return: Отсортированный список суток 'YYYY-MM-DD' или None при ошибке.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT DISTINCT substr(started_at, 1, 10) FROM {self._history_table('algorithm_executions')}
+                WHERE started_at >= ? AND started_at < ?
+                EXCEPT
+                SELECT day FROM performance_rollup_days
+                UNION
+                SELECT day FROM performance_rollup_dirty_days WHERE day >= ? AND day < ?
+                ORDER BY 1;
+                """,
+                (start_date, end_date, start_date, end_date),
+            )
+            days = [row[0] for row in cursor.fetchall()]
+            if days:
+                cursor.executemany("DELETE FROM performance_rollup_dirty_days WHERE day = ?;", ((day,) for day in days))
+                cursor.executemany("DELETE FROM performance_rollup_days WHERE day = ?;", ((day,) for day in days))
+            conn.commit()
+            conn.close()
+            return days
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка при отборе суток для сводок аналитики: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return None
+
+    def get_performance_source_rows(self, start_date: str, end_date: str) -> list:
+        """
+        Исходные строки сводок аналитики (PERFORMANCE_SOURCE_QUERY) за сутки [start_date, end_date).
+        Учитывает архив.
+        :return: Список кортежей. Ошибки БД (sqlite3.Error) передаются вызывающему.
+        """
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # Простые кортежи вместо sqlite3.Row
+            cursor.execute(*self._history_union(PERFORMANCE_SOURCE_QUERY, (start_date, end_date)))
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def save_performance_rollup(self, days: List[str], rollup_rows: list, lateness_rows: list) -> bool:
+        """
+        Заменяет сводки аналитики за сутки days одной транзакцией и отмечает сутки построенными.
+        :param rollup_rows: Кортежи (dimension, day, group_key, total, completed, on_time, late,
+                            skipped, lateness_sum, lateness_max).
+        :param lateness_rows: Кортежи (dimension, day, group_key, bucket, late_count).
+        :return: True, если успешно, иначе False.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            day_params = [(day,) for day in days]
+            cursor.executemany("DELETE FROM performance_rollup WHERE day = ?;", day_params)
+            cursor.executemany("DELETE FROM performance_rollup_lateness WHERE day = ?;", day_params)
+            cursor.executemany(
+                "INSERT INTO performance_rollup (dimension, day, group_key, total, completed, on_time, late, "
+                "skipped, lateness_sum, lateness_max) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);",
+                rollup_rows,
+            )
+            cursor.executemany(
+                "INSERT INTO performance_rollup_lateness (dimension, day, group_key, bucket, late_count) "
+                "VALUES (?, ?, ?, ?, ?);",
+                lateness_rows,
+            )
+            cursor.executemany("INSERT OR REPLACE INTO performance_rollup_days (day) VALUES (?);", day_params)
+            conn.commit()
+            conn.close()
+            logger.info(f"SQLiteDatabaseManager: Сводки аналитики построены за {len(days)} сут.")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при сохранении сводок аналитики: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+                conn.close()
+            return False
+
+    def get_performance_rollup(self, dimension: str, start_date: str, end_date: str) -> Optional[Tuple[list, list]]:
+        """
+        Итоги сводок аналитики за сутки [start_date, end_date) в разрезе dimension.
+        :return: (итоги: кортежи (group_key, total, completed, on_time, late, skipped, lateness_sum,
+                 lateness_max), гистограмма: кортежи (group_key, bucket, late_count)) или None при ошибке.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
+                """
+                SELECT group_key, SUM(total), SUM(completed), SUM(on_time), SUM(late), SUM(skipped),
+                       SUM(lateness_sum), MAX(lateness_max)
+                FROM performance_rollup
+                WHERE dimension = ? AND day >= ? AND day < ?
+                GROUP BY group_key;
+                """,
+                (dimension, start_date, end_date),
+            )
+            totals = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT group_key, bucket, SUM(late_count)
+                FROM performance_rollup_lateness
+                WHERE dimension = ? AND day >= ? AND day < ?
+                GROUP BY group_key, bucket;
+                """,
+                (dimension, start_date, end_date),
+            )
+            lateness = cursor.fetchall()
+            conn.close()
+            return totals, lateness
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при чтении сводок аналитики: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return None
+
+    # --- СТАТИСТИКА ВЫПОЛНЕНИЙ (execution_stats, daily_execution_stats) ---
+
+    def get_execution_stats(self, execution_id: int) -> Optional[Dict[str, int]]:
+        """
+        Счётчики действий выполнения из execution_stats (поддерживаются триггерами).
+        :return: {"total", "completed", "on_time", "late", "skipped", "not_done"} или None,
+                 если строки статистики нет или произошла ошибка.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT total, completed, on_time, late, skipped FROM execution_stats WHERE execution_id = ?;",
+                (execution_id,),
+            )
+            row = cursor.fetchone()
+            conn.close()
+            if row is None:
+                return None
+            stats = dict(row)
+            stats["not_done"] = stats["total"] - stats["on_time"] - stats["late"]
+            return stats
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при получении статистики execution {execution_id}: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return None
+
+    def get_daily_execution_stats(self, start_date: str, end_date: str, category: Optional[str] = None) -> list:
+        """
+        Суточные итоги выполнений за сутки запуска [start_date, end_date) ('YYYY-MM-DD') из
+        daily_execution_stats - без чтения строк action_executions. Включает архив.
+        :param category: Категория выполнений или None - все категории.
+        :return: Список словарей по суткам, упорядоченный по дате: {"day", "executions",
+                 "completed_executions", "total", "completed", "on_time", "late", "skipped"};
+                 [] при ошибке.
+        """
+        conditions = ["day >= ?", "day < ?"]
+        params = [start_date, end_date]
+        if category:
+            conditions.append("snapshot_category = ?")
+            params.append(category)
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT day, SUM(executions) AS executions, SUM(completed_executions) AS completed_executions,
+                       SUM(total) AS total, SUM(completed) AS completed, SUM(on_time) AS on_time,
+                       SUM(late) AS late, SUM(skipped) AS skipped
+                FROM daily_execution_stats
+                WHERE {" AND ".join(conditions)}
+                GROUP BY day
+                HAVING SUM(executions) > 0
+                ORDER BY day;
+                """,
+                params,
+            )
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при получении суточной статистики выполнений: {e}")
+            if 'conn' in locals():
+                conn.close()
             return []
 
+    def _rebuild_execution_statistics(self, cursor, start_date: Optional[str] = None,
+                                      end_date: Optional[str] = None) -> int:
+        """
+        Пересчитывает execution_stats и daily_execution_stats по строкам истории (вместе с архивом)
+        для выполнений, запущенных в сутки [start_date, end_date); без границ - по всей истории.
+        Срабатывающие при этом триггеры меняют только строки перестраиваемых суток, которые
+        затем заменяются целиком. Отметки сводок аналитики этих суток снимаются - сводки
+        перестроятся при следующем запросе. Использует переданный курсор, коммит выполняет
+        вызывающий метод.
+        :return: Количество выполнений, статистика которых пересчитана.
+        """
+        conditions, params = [], []
+        if start_date:
+            conditions.append("started_at >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("started_at < ?")
+            params.append(end_date)
+        where = " AND ".join(conditions) or "1 = 1"
+        executions = self._history_table('algorithm_executions')
+        selected = f"SELECT id FROM {executions} WHERE {where}"
+
+        cursor.execute(f"DELETE FROM execution_stats WHERE execution_id IN ({selected});", params)
+        stats_rows, stats_params = self._history_union(EXECUTION_STATS_QUERY, params,
+                                                       where=f"a.execution_id IN ({selected})")
+        cursor.execute(
+            "INSERT INTO execution_stats (execution_id, total, completed, on_time, late, skipped) " + stats_rows,
+            stats_params,
+        )
+
+        day_conditions = ["day >= ?"] * bool(start_date) + ["day < ?"] * bool(end_date)
+        cursor.execute(f"DELETE FROM daily_execution_stats WHERE {' AND '.join(day_conditions) or '1 = 1'};", params)
+        cursor.execute(f"DELETE FROM performance_rollup_days WHERE {' AND '.join(day_conditions) or '1 = 1'};", params)
+        cursor.execute(
+            f"""
+            INSERT INTO daily_execution_stats
+                (day, snapshot_category, algorithm_id, executions, completed_executions,
+                 total, completed, on_time, late, skipped)
+            SELECT substr(e.started_at, 1, 10), e.snapshot_category, IFNULL(e.algorithm_id, 0),
+                   COUNT(*), SUM(e.status IS 'completed'),
+                   IFNULL(SUM(s.total), 0), IFNULL(SUM(s.completed), 0), IFNULL(SUM(s.on_time), 0),
+                   IFNULL(SUM(s.late), 0), IFNULL(SUM(s.skipped), 0)
+            FROM {executions} e
+            LEFT JOIN execution_stats s ON s.execution_id = e.id
+            WHERE e.started_at IS NOT NULL AND {where}
+            GROUP BY 1, 2, 3;
+            """,
+            params,
+        )
+        cursor.execute(f"SELECT COUNT(*) FROM ({selected});", params)
+        return cursor.fetchone()[0]
+
+    def rebuild_execution_statistics(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        """
+        Пересобирает статистику выполнений (execution_stats, daily_execution_stats) за сутки
+        запуска [start_date, end_date) ('YYYY-MM-DD'); без границ - по всей истории, включая архив.
+        Нужна для заполнения по данным, записанным до появления таблиц или в обход триггеров.
+        :return: Количество выполнений, статистика которых пересчитана, или -1 при ошибке.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            count = self._rebuild_execution_statistics(cursor, start_date, end_date)
+            conn.commit()
+            conn.close()
+            logger.info(f"SQLiteDatabaseManager: Статистика пересобрана для {count} выполнений "
+                        f"(период '{start_date or '-'}' - '{end_date or '-'}').")
+            return count
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при пересборке статистики выполнений: {e}")
+            if 'conn' in locals():
+                conn.rollback()
+                conn.close()
+            return -1
+
     # --- МЕТОДЫ ДЛЯ РАБОТЫ С ЗАПУЩЕННЫМИ АЛГОРИТМАМИ (EXECUTIONS) ---
 
-    def get_active_executions_by_category(self, category: str) -> list:
+    def get_active_executions_by_category(self, category: str, now_epoch: Optional[int] = None) -> list:
         """
         Получает список активных (status = 'active') запущенных алгоритмов (executions)
         для заданной категории (snapshot_category).
+        Для каждого execution'а из active_action_queue считаются незавершённые действия
+        (live_actions_count) и просроченные на момент now_epoch (overdue_actions_count).
 
         :param category: Категория алгоритмов (например, "повседневная деятельность").
+        :param now_epoch: Текущее время в секундах (шкала TimeService); None - системное время.
         :return: Список словарей с данными executions.
         """
+        if now_epoch is None:
+            now_epoch = int(datetime.datetime.now().replace(tzinfo=datetime.timezone.utc).timestamp())
         try:
             conn = self._get_connection()
             with conn:
                 cursor = conn.cursor()
                 # Запрос к таблице algorithm_executions, фильтруем по snapshot_category и status
-                query = """
-                    SELECT
-                        id,
-                        algorithm_id, -- Ссылка на оригинальный алгоритм
-                        snapshot_name AS algorithm_name, -- Имя из snapshot'а
-                        snapshot_category AS category, -- Категория из snapshot'а
-                        started_at,
-                        substr(started_at, 1, 19) AS started_at_display, -- <-- НОВОЕ: Отформатированное значение
-                        completed_at,
-                        status,
-                        created_by_user_id, -- ID пользователя на момент запуска
-                        created_by_user_display_name -- Отображаемое имя на момент запуска
-                    FROM algorithm_executions
-                    WHERE snapshot_category = ? AND status = 'active'
-                    ORDER BY started_at DESC; -- Сортируем по времени запуска, например
-                """
-                cursor.execute(query, (category,))
+                cursor.execute(ACTIVE_EXECUTIONS_BY_CATEGORY_QUERY, (now_epoch, category))
                 rows = cursor.fetchall()
 
                 # Преобразуем результаты в список словарей
@@ -1828,7 +2711,7 @@ class SQLiteDatabaseManager:
             with conn:
                 cursor = conn.cursor()
                 
-                # 1. Получить оригинальный алгоритм и его действия
+                # 1. Получить оригинальный алгоритм
                 cursor.execute("""
                     SELECT id, name, category, time_type, description
                     FROM algorithms WHERE id = ?
@@ -1848,26 +2731,6 @@ class SQLiteDatabaseManager:
                 algorithm_time_type = original_algorithm['time_type'] # <-- Сохраняем тип времени
                 print(f"SQLiteDatabaseManager: Запуск алгоритма ID {algorithm_id} с time_type '{algorithm_time_type}'.")
 
-                cursor.execute("""
-                    SELECT id, description, technical_text, start_offset, end_offset, contact_phones, report_materials
-                    FROM actions WHERE algorithm_id = ? ORDER BY start_offset
-                """, (algorithm_id,))
-                original_actions_raw = cursor.fetchall()
-                # Преобразуем в список словарей
-                original_actions = []
-                for action_row in original_actions_raw:
-                    action_dict = {
-                        'id': action_row[0],
-                        'description': action_row[1],
-                        'technical_text': action_row[2],
-                        'start_offset': action_row[3],
-                        'end_offset': action_row[4],
-                        'contact_phones': action_row[5],
-                        'report_materials': action_row[6]
-                    }
-                    original_actions.append(action_dict)
-                print(f"SQLiteDatabaseManager: Получено {len(original_actions)} действий для алгоритма {algorithm_id}.")
-
                 # 2. Получить информацию о пользователе на момент запуска
                 cursor.execute("""
                     SELECT rank, last_name, first_name, middle_name
@@ -1903,145 +2766,35 @@ class SQLiteDatabaseManager:
                 new_execution_id = cursor.lastrowid
                 print(f"SQLiteDatabaseManager: Создан новый execution ID {new_execution_id} для алгоритма {algorithm_id}.")
 
-                # 4. Вставить action_executions (snapshot'ы действий)
-                # Рассчитываем абсолютные времена на основе started_at и смещений
+                # 4. Вставить action_executions (snapshot'ы действий) запросами INSERT ... SELECT из actions:
+                # время = точка отсчёта + секунды смещения (start_offset_seconds/end_offset_seconds)
                 import datetime
                 started_at_dt = datetime.datetime.fromisoformat(started_at_str.replace(' ', 'T'))
                 print(f"SQLiteDatabaseManager: Абсолютное время запуска алгоритма: {started_at_dt}.")
 
-                for action in original_actions:
-                    calculated_start_time = None
-                    calculated_end_time = None
-
-                    # --- ИЗМЕНЕНО: Логика в зависимости от time_type ---
-                    if action['start_offset'] is not None:
-                        if algorithm_time_type == 'астрономическое':
-                            # --- ЛОГИКА ДЛЯ АСТРОНОМИЧЕСКОГО ---
-                            print(f"SQLiteDatabaseManager: Рассчитываем calculated_start_time для астрономического времени действия ID {action['id']}.")
-                            start_date_only = started_at_dt.date()
-
-                            # Преобразуем строку смещения в формат, подходящий для расчета
-                            offset_str = action['start_offset']
-                            # Формат может быть 'dd hh:mm:ss' или 'hh:mm:ss'
-                            import re
-                            match = re.match(r'(\d+)\s+(\d{2}):(\d{2}):(\d{2})', offset_str) if ' ' in offset_str else re.match(r'(\d{2}):(\d{2}):(\d{2})', offset_str)
-
-                            if match:
-                                if ' ' in offset_str:  # Формат 'dd hh:mm:ss'
-                                    days, hours, minutes, seconds = map(int, match.groups())
-                                else:  # Формат 'hh:mm:ss'
-                                    hours, minutes, seconds = map(int, match.groups())
-                                    days = 0
-
-                                # Создаем timedelta
-                                offset_timedelta = datetime.timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
-
-                                # Добавляем дни к дате запуска, а время суток берем из смещения
-                                calculated_start_time = datetime.datetime.combine(
-                                    start_date_only + datetime.timedelta(days=days),
-                                    datetime.time(hour=hours, minute=minutes, second=seconds)
-                                )
-                                print(f"SQLiteDatabaseManager:   Результат calculated_start_time: {calculated_start_time}")
-                            else:
-                                print(f"SQLiteDatabaseManager: Ошибка - не удается распознать формат start_offset '{offset_str}'. Устанавливаю None.")
-                                calculated_start_time = None
-                        else:
-                            # --- ЛОГИКА ДЛЯ ОПЕРАТИВНОГО ---
-                            print(f"SQLiteDatabaseManager: Рассчитываем calculated_start_time для оперативного времени действия ID {action['id']}.")
-                            # Преобразуем строку смещения в timedelta
-                            offset_str = action['start_offset']
-                            import re
-                            # Поддерживаем оба формата: 'hh:mm:ss' и 'dd hh:mm:ss'
-                            match = re.match(r'(\d{2}):(\d{2}):(\d{2})', offset_str)  # Формат 'hh:mm:ss'
-                            if not match:
-                                match = re.match(r'(\d+)\s+(\d{2}):(\d{2}):(\d{2})', offset_str)  # Формат 'dd hh:mm:ss'
-                                if match:
-                                    # Формат 'dd hh:mm:ss' - извлекаем дни, часы, минуты, секунды
-                                    days, hours, minutes, seconds = map(int, match.groups())
-                                    offset_timedelta = datetime.timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
-                                    calculated_start_time = started_at_dt + offset_timedelta
-                                    print(f"SQLiteDatabaseManager:   started_at_dt ({started_at_dt}) + offset ({offset_timedelta}) = {calculated_start_time}")
-                                else:
-                                    print(f"SQLiteDatabaseManager: Ошибка - не удается распознать формат start_offset '{offset_str}'. Устанавливаю None.")
-                                    calculated_start_time = None
-                            else:
-                                # Формат 'hh:mm:ss' - извлекаем часы, минуты, секунды
-                                hours, minutes, seconds = map(int, match.groups())
-                                offset_timedelta = datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
-                                calculated_start_time = started_at_dt + offset_timedelta
-                                print(f"SQLiteDatabaseManager:   started_at_dt ({started_at_dt}) + offset ({offset_timedelta}) = {calculated_start_time}")
-                    # --- ---
-                    if action['end_offset'] is not None:
-                        if algorithm_time_type == 'астрономическое':
-                            # --- ЛОГИКА ДЛЯ АСТРОНОМИЧЕСКОГО ---
-                            print(f"SQLiteDatabaseManager: Рассчитываем calculated_end_time для астрономического времени действия ID {action['id']}.")
-                            start_date_only = started_at_dt.date()
-
-                            # Преобразуем строку смещения в формат, подходящий для расчета
-                            offset_str = action['end_offset']
-                            # Формат может быть 'dd hh:mm:ss' или 'hh:mm:ss'
-                            import re
-                            match = re.match(r'(\d+)\s+(\d{2}):(\d{2}):(\d{2})', offset_str) if ' ' in offset_str else re.match(r'(\d{2}):(\d{2}):(\d{2})', offset_str)
-
-                            if match:
-                                if ' ' in offset_str:  # Формат 'dd hh:mm:ss'
-                                    days, hours, minutes, seconds = map(int, match.groups())
-                                else:  # Формат 'hh:mm:ss'
-                                    hours, minutes, seconds = map(int, match.groups())
-                                    days = 0
-
-                                # Создаем timedelta
-                                offset_timedelta = datetime.timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
-
-                                # Добавляем дни к дате запуска, а время суток берем из смещения
-                                calculated_end_time = datetime.datetime.combine(
-                                    start_date_only + datetime.timedelta(days=days),
-                                    datetime.time(hour=hours, minute=minutes, second=seconds)
-                                )
-                                print(f"SQLiteDatabaseManager:   Результат calculated_end_time: {calculated_end_time}")
-                            else:
-                                print(f"SQLiteDatabaseManager: Ошибка - не удается распознать формат end_offset '{offset_str}'. Устанавливаю None.")
-                                calculated_end_time = None
-                        else:
-                            # --- ЛОГИКА ДЛЯ ОПЕРАТИВНОГО ---
-                            print(f"SQLiteDatabaseManager: Рассчитываем calculated_end_time для оперативного времени действия ID {action['id']}.")
-                            # Преобразуем строку смещения в timedelta
-                            offset_str = action['end_offset']
-                            import re
-                            # Поддерживаем оба формата: 'hh:mm:ss' и 'dd hh:mm:ss'
-                            match = re.match(r'(\d{2}):(\d{2}):(\d{2})', offset_str)  # Формат 'hh:mm:ss'
-                            if not match:
-                                match = re.match(r'(\d+)\s+(\d{2}):(\d{2}):(\d{2})', offset_str)  # Формат 'dd hh:mm:ss'
-                                if match:
-                                    # Формат 'dd hh:mm:ss' - извлекаем дни, часы, минуты, секунды
-                                    days, hours, minutes, seconds = map(int, match.groups())
-                                    offset_timedelta = datetime.timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
-                                    calculated_end_time = started_at_dt + offset_timedelta
-                                    print(f"SQLiteDatabaseManager:   started_at_dt ({started_at_dt}) + offset ({offset_timedelta}) = {calculated_end_time}")
-                                else:
-                                    print(f"SQLiteDatabaseManager: Ошибка - не удается распознать формат end_offset '{offset_str}'. Устанавливаю None.")
-                                    calculated_end_time = None
-                            else:
-                                # Формат 'hh:mm:ss' - извлекаем часы, минуты, секунды
-                                hours, minutes, seconds = map(int, match.groups())
-                                offset_timedelta = datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
-                                calculated_end_time = started_at_dt + offset_timedelta
-                                print(f"SQLiteDatabaseManager:   started_at_dt ({started_at_dt}) + offset ({offset_timedelta}) = {calculated_end_time}")
-
-                    cursor.execute("""
-                        INSERT INTO action_executions (
-                            execution_id,
-                            snapshot_description, snapshot_technical_text, snapshot_contact_phones, snapshot_report_materials,
-                            calculated_start_time, calculated_end_time
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        new_execution_id,
-                        action['description'], action.get('technical_text'), action['contact_phones'], action['report_materials'],
-                        calculated_start_time.isoformat() if calculated_start_time else None,
-                        calculated_end_time.isoformat() if calculated_end_time else None
-                    ))
-                    print(f"SQLiteDatabaseManager: Создан action_execution для действия ID {action['id']} (start: {calculated_start_time}, end: {calculated_end_time}).")
-                print(f"SQLiteDatabaseManager: Созданы {len(original_actions)} action_executions для execution ID {new_execution_id}.")
+                if algorithm_time_type == 'астрономическое':
+                    # Астрономическое: смещение - номер дня и время суток, отсчёт от полуночи даты запуска
+                    base_dt = datetime.datetime.combine(started_at_dt.date(), datetime.time())
+                    cursor.execute(
+                        "SELECT COUNT(*) FROM actions WHERE algorithm_id = ? AND offset_time_of_day = 0;", (algorithm_id,)
+                    )
+                    if cursor.fetchone()[0] > 0:
+                        print(f"SQLiteDatabaseManager: Внимание - смещения части действий алгоритма {algorithm_id} не являются "
+                              f"временем суток (часы >= 24), время переносится на следующие сутки.")
+                else:
+                    # Оперативное: смещение отсчитывается от момента запуска
+                    base_dt = started_at_dt
+
+                params = {
+                    'algorithm_id': algorithm_id,
+                    'execution_id': new_execution_id,
+                    'base_time': base_dt.isoformat(sep=' '),
+                }
+                cursor.execute(LAUNCH_SNAPSHOT_BLOBS_QUERY, params)
+                cursor.execute(LAUNCH_ACTION_EXECUTIONS_QUERY, params)
+                actions_count = cursor.rowcount
+                cursor.execute(LAUNCH_MATERIALS_QUERY, params)
+                print(f"SQLiteDatabaseManager: Созданы {actions_count} action_executions для execution ID {new_execution_id}.")
 
                 print(f"SQLiteDatabaseManager: Транзакция завершена успешно. Новый execution ID: {new_execution_id}")
                 return new_execution_id
@@ -2068,18 +2821,36 @@ class SQLiteDatabaseManager:
         Получает список завершённых (status = 'completed' или 'cancelled')
         выполнений алгоритмов (algorithm_executions) за заданную дату и категорию.
         Включает время начала и окончания в отформатированном виде.
+        Для интерфейса используйте get_completed_executions_by_category_and_date_page.
+
+        :param category: Категория алгоритмов (snapshot_category).
+        :param date_string: Дата в формате 'DD.MM.YYYY'.
+        :return: Список записей ExecutionRecord.
+        """
+        return self.get_completed_executions_by_category_and_date_page(category, date_string, limit=None)['items']
+
+    def get_completed_executions_by_category_and_date_page(self, category: str, date_string: str,
+                                                           after_key: str = "", after_id: int = 0,
+                                                           limit: Optional[int] = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Получает страницу завершённых (status = 'completed' или 'cancelled') выполнений
+        алгоритмов за заданную дату завершения и категорию.
+        Порядок - (completed_at, id) по убыванию; следующая страница начинается после ключа (after_key, after_id).
 
         :param category: Категория алгоритмов (snapshot_category).
         :param date_string: Дата в формате 'DD.MM.YYYY'.
-        :return: Список словарей с данными execution'ов.
+        :param after_key: completed_at последней строки предыдущей страницы ('' - первая страница).
+        :param after_id: id последней строки предыдущей страницы.
+        :param limit: Размер страницы или None (все строки).
+        :return: Страница (см. _keyset_page) с записями ExecutionRecord.
         """
         if not category or not date_string:
             print("SQLiteDatabaseManager: Категория или дата не заданы.")
-            return []
+            return self._keyset_page([], limit, 'completed_at')
 
         try:
             # Преобразуем дату из DD.MM.YYYY в объект date для SQL
-            from datetime import datetime
+            from datetime import datetime, timedelta
             target_date = datetime.strptime(date_string, '%d.%m.%Y').date()
             target_date_iso = target_date.isoformat() # 'YYYY-MM-DD'
 
@@ -2090,7 +2861,7 @@ class SQLiteDatabaseManager:
                 cursor = conn.cursor()
                 
                 # SQL-запрос
-                sql_query = """
+                sql_query = f"""
                     SELECT
                         ae.id,
                         ae.algorithm_id,
@@ -2106,51 +2877,78 @@ class SQLiteDatabaseManager:
                         ae.status,
                         ae.created_by_user_id,
                         ae.created_by_user_display_name
-                    FROM algorithm_executions ae
+                    FROM {self._history_table('algorithm_executions')} ae
                     WHERE ae.snapshot_category = ? 
                     AND ae.status IN ('completed', 'cancelled')
-                    AND substr(ae.completed_at, 1, 10) = ?
-                    ORDER BY ae.completed_at DESC;
+                    AND ae.completed_at >= ? AND ae.completed_at < ?
+                    {"AND (ae.completed_at, ae.id) < (?, ?)" if after_key else ""}
+                    ORDER BY ae.completed_at DESC, ae.id DESC
+                    {"LIMIT ?" if limit is not None else ""};
                 """
-                cursor.execute(sql_query, (category, target_date_iso))
-                rows = cursor.fetchall()
-
-                # Преобразуем результаты в список словарей
-                executions = [dict(row) for row in rows]
+                # Диапазон [дата, дата + 1 день) вместо substr() позволяет использовать индекс по completed_at
+                next_date_iso = (target_date + timedelta(days=1)).isoformat()
+                params = [category, target_date_iso, next_date_iso]
+                if after_key:
+                    params += [after_key, after_id]
+                if limit is not None:
+                    params.append(limit + 1)
+                cursor.execute(sql_query, params)
+                executions = ExecutionRecord.from_cursor(cursor)
                 print(f"SQLiteDatabaseManager: Найдено {len(executions)} завершённых executions.")
-                return executions
+                return self._keyset_page(executions, limit, 'completed_at')
 
         except sqlite3.Error as e:
             print(f"SQLiteDatabaseManager: Ошибка БД при получении завершённых executions: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            return self._keyset_page([], limit, 'completed_at')
         except ValueError as ve:
             print(f"SQLiteDatabaseManager: Ошибка преобразования даты '{date_string}': {ve}")
-            return []
+            return self._keyset_page([], limit, 'completed_at')
         except Exception as e:
             print(f"SQLiteDatabaseManager: Неизвестная ошибка: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            return self._keyset_page([], limit, 'completed_at')
 
-    def get_algorithm_execution_by_id(self, execution_id: int) -> dict:
+    def get_action_executions_version(self, execution_id: int) -> Optional[Tuple[int, Any]]:
         """
-        Получает данные конкретного экземпляра выполнения алгоритма (execution) по его ID.
-        Включает информацию о пользователе, создавшем execution, на момент запуска.
+        Версия строк действий execution'а для кэша отчётов: количество и max(updated_at).
+        Любое изменение действия (статус, примечания, материалы) обновляет его updated_at.
         :param execution_id: ID execution'а.
-        :return: Словарь с данными execution'а или None, если не найден.
+        :return: (количество действий, max(updated_at)) или None в случае ошибки.
         """
         try:
             conn = self._get_connection()
-            with conn:
-                cursor = conn.cursor()
-                
-                # SQL-запрос для получения данных execution'а и имени пользователя
-                # Используем LEFT JOIN, чтобы получить данные даже если пользователь был удалён
-                # В этом случае created_by_user_display_name будет NULL
-                sql_query = """
-                    SELECT
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT COUNT(*), MAX(updated_at) FROM {self._history_table('action_executions')} WHERE execution_id = ?;",
+                (execution_id,),
+            )
+            count, max_updated_at = cursor.fetchone()
+            cursor.close()
+            return count, max_updated_at
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка при получении версии action_execution'ов для execution ID {execution_id}: {e}")
+            return None
+
+    def get_algorithm_execution_by_id(self, execution_id: int) -> dict:
+        """
+        Получает данные конкретного экземпляра выполнения алгоритма (execution) по его ID.
+        Включает информацию о пользователе, создавшем execution, на момент запуска.
+        :param execution_id: ID execution'а.
+        :return: Словарь с данными execution'а или None, если не найден.
+        """
+        try:
+            conn = self._get_connection()
+            with conn:
+                cursor = conn.cursor()
+                
+                # SQL-запрос для получения данных execution'а и имени пользователя
+                # Используем LEFT JOIN, чтобы получить данные даже если пользователь был удалён
+                # В этом случае created_by_user_display_name будет NULL
+                sql_query = f"""
+                    SELECT
                         ae.id,
                         ae.algorithm_id,
                         ae.snapshot_name,
@@ -2164,7 +2962,7 @@ class SQLiteDatabaseManager:
                         ae.created_by_user_display_name, -- Имя, сохранённое на момент запуска
                         ae.created_at,
                         ae.updated_at
-                    FROM algorithm_executions ae
+                    FROM {self._history_table('algorithm_executions')} ae
                     WHERE ae.id = ?
                 """
                 cursor.execute(sql_query, (execution_id,))
@@ -2202,13 +3000,15 @@ class SQLiteDatabaseManager:
             print(f"SQLiteDatabaseManager: Неизвестная ошибка при получении execution ID {execution_id}: {e}")
             return None
 
-    def get_action_executions_by_execution_id(self, execution_id: int) -> list:
+    def get_action_executions_by_execution_id(self, execution_id: int, summary: bool = False) -> list:
         """
         Получает список всех выполнений действий (action_execution'ов) для конкретного execution'а.
         Результат сортируется по calculated_start_time.
         :param execution_id: ID execution'а.
-        :return: Список словарей с данными action_execution'ов или пустой список, если не найдены.
-                 Возвращает None в случае ошибки.
+        :param summary: True - только поля строки списка (ACTION_EXECUTION_SUMMARY_COLUMNS),
+                        без технического текста, телефонов, материалов и примечаний.
+        :return: Список записей ActionExecutionRecord (ActionExecutionSummaryRecord при summary=True)
+                 или пустой список, если не найдены. Возвращает None в случае ошибки.
         """
         try:
             conn = self._get_connection()
@@ -2217,14 +3017,13 @@ class SQLiteDatabaseManager:
                 
                 # SQL-запрос для получения данных action_execution'ов
                 # Сортировка по calculated_start_time
-                sql_query = """
-                    SELECT
+                columns = ACTION_EXECUTION_SUMMARY_COLUMNS if summary else f"""
                         ae.id,
                         ae.execution_id,
                         ae.snapshot_description,
-                        ae.snapshot_technical_text,
+                        {SNAPSHOT_TECHNICAL_TEXT_SUBQUERY.format(alias='ae')} AS snapshot_technical_text,
                         ae.snapshot_contact_phones,
-                        ae.snapshot_report_materials,
+                        {self._report_materials_sql('ae')} AS snapshot_report_materials,
                         ae.calculated_start_time,
                         ae.calculated_end_time,
                         ae.actual_end_time,
@@ -2233,7 +3032,10 @@ class SQLiteDatabaseManager:
                         ae.notes,
                         ae.created_at,
                         ae.updated_at
-                    FROM action_executions ae
+                """
+                sql_query = f"""
+                    SELECT {columns}
+                    FROM {self._history_table('action_executions')} ae
                     WHERE ae.execution_id = ?
                     ORDER BY
                         ae.calculated_start_time ASC,
@@ -2241,17 +3043,9 @@ class SQLiteDatabaseManager:
                         ae.id ASC
                 """
                 cursor.execute(sql_query, (execution_id,))
-                rows = cursor.fetchall()
-
-                # Получаем названия колонок
-                colnames = [desc[0] for desc in cursor.description]
-
-                action_executions_list = []
-                for row in rows:
-                    # Создаем словарь из строки результата
-                    action_exec_dict = dict(zip(colnames, row))
-                    # В SQLite даты хранятся как строки, оставляем как есть
-                    action_executions_list.append(action_exec_dict)
+                # В SQLite даты хранятся как строки, оставляем как есть
+                record_class = ActionExecutionSummaryRecord if summary else ActionExecutionRecord
+                action_executions_list = record_class.from_cursor(cursor)
 
                 logger.info(f"SQLiteDatabaseManager: Получено {len(action_executions_list)} action_execution'ов для execution ID {execution_id}.")
                 return action_executions_list
@@ -2299,6 +3093,9 @@ class SQLiteDatabaseManager:
         prepared_data = {k: v for k, v in action_execution_data.items() if k in allowed_fields_in_db}
         logger.debug(f"SQLiteDatabaseManager: Подготовленные данные (до преобразования времени): {prepared_data}")
 
+        # Отчётные материалы хранятся в action_execution_materials, а не в колонке
+        report_materials = prepared_data.pop('snapshot_report_materials', None)
+
         # Добавляем execution_id
         prepared_data['execution_id'] = execution_id
         # --- ---
@@ -2377,6 +3174,11 @@ class SQLiteDatabaseManager:
                  conn.close()
                  return False
 
+            # Технический текст хранится в snapshot_blobs, в строке - ссылка на него
+            if 'snapshot_technical_text' in prepared_data:
+                prepared_data['snapshot_technical_text_hash'] = self._store_snapshot_blob(
+                    cursor, prepared_data.pop('snapshot_technical_text'))
+
             # Подготавливаем список колонок и значений
             columns = list(prepared_data.keys())
             values = [prepared_data[col] for col in columns] # Список значений, включая datetime или None
@@ -2392,8 +3194,9 @@ class SQLiteDatabaseManager:
 
             logger.debug(f"SQLiteDatabaseManager: Выполняем SQL: {sql_query} с параметрами {values}")
             cursor.execute(sql_query, values)
-            conn.commit()
             new_action_id = cursor.lastrowid
+            self._insert_action_execution_materials(cursor, new_action_id, report_materials)
+            conn.commit()
 
             if new_action_id:
                 logger.info(f"SQLiteDatabaseManager: Новое action_execution (ID: {new_action_id}) добавлено для execution ID {execution_id}.")
@@ -2452,6 +3255,10 @@ class SQLiteDatabaseManager:
                 else:
                     prepared_data[k] = v
 
+        # Отчётные материалы хранятся в action_execution_materials: при передаче - заменяем набор целиком
+        replace_report_materials = 'snapshot_report_materials' in prepared_data
+        report_materials = prepared_data.pop('snapshot_report_materials', None)
+
         logger.debug(f"SQLiteDatabaseManager: Подготовленные данные для обновления (до преобразования времени): {prepared_data}")
         # --- ---
 
@@ -2549,10 +3356,24 @@ class SQLiteDatabaseManager:
                 # Если actual_end_time не передан, статус не изменяем, оставляем как есть
                 # --- ---
 
+                if replace_report_materials:
+                    cursor.execute(
+                        "DELETE FROM action_execution_materials WHERE action_execution_id = ?;",
+                        (action_execution_id,)
+                    )
+                    self._insert_action_execution_materials(cursor, action_execution_id, report_materials)
+
+                # Технический текст хранится в snapshot_blobs: заменяем ссылку, старую колонку очищаем
+                if 'snapshot_technical_text' in prepared_data:
+                    prepared_data['snapshot_technical_text_hash'] = self._store_snapshot_blob(
+                        cursor, prepared_data['snapshot_technical_text'])
+                    prepared_data['snapshot_technical_text'] = None
+
                 # --- Подготовка SQL-запроса ---
                 if not prepared_data:
                     logger.info("SQLiteDatabaseManager: Нет данных для обновления (после фильтрации и преобразований).")
                     # Если нет данных для обновления, возвращаем True (ничего обновлять не нужно)
+                    conn.commit()
                     cursor.close()
                     conn.close()
                     return True
@@ -2570,6 +3391,7 @@ class SQLiteDatabaseManager:
                 # Если нет полей для обновления, возвращаем True (ничего обновлять не нужно)
                 if not set_clauses:
                     logger.info("SQLiteDatabaseManager: Нет полей для обновления.")
+                    conn.commit()
                     cursor.close()
                     conn.close()
                     return True
@@ -2662,21 +3484,22 @@ class SQLiteDatabaseManager:
                 cursor = conn.cursor()
                 
                 # Запрос включает все нужные поля, включая snapshot и calculated/actual
-                query = """
+                query = f"""
                 SELECT
-                    id,
-                    execution_id,
-                    snapshot_description,
-                    snapshot_contact_phones,
-                    snapshot_report_materials,
-                    calculated_start_time,
-                    calculated_end_time,
-                    actual_end_time,
-                    status,
-                    reported_to,
-                    notes
-                FROM action_executions
-                WHERE id = ?;
+                    ae.id,
+                    ae.execution_id,
+                    ae.snapshot_description,
+                    ae.snapshot_contact_phones,
+                    {self._report_materials_sql('ae')} AS snapshot_report_materials,
+                    ae.calculated_start_time,
+                    ae.calculated_end_time,
+                    ae.actual_end_time,
+                    ae.status,
+                    ae.reported_to,
+                    ae.notes,
+                    {SNAPSHOT_TECHNICAL_TEXT_SUBQUERY.format(alias='ae')} AS snapshot_technical_text
+                FROM {self._history_table('action_executions')} ae
+                WHERE ae.id = ?;
                 """
                 cursor.execute(query, (action_execution_id,))
                 row = cursor.fetchone()
@@ -2694,7 +3517,8 @@ class SQLiteDatabaseManager:
                         'actual_end_time': row[7],
                         'status': row[8],
                         'reported_to': row[9],
-                        'notes': row[10]
+                        'notes': row[10],
+                        'snapshot_technical_text': row[11]
                     }
 
                     # В SQLite даты хранятся как строки, оставляем как есть
@@ -2782,8 +3606,10 @@ class SQLiteDatabaseManager:
     def get_active_action_executions_with_details(self) -> list:
         """
         Получает список активных action_executions вместе с деталями execution'а.
+        Вызывается таймером проверки дедлайнов каждые несколько секунд, поэтому строки
+        возвращаются компактными записями ActiveActionRecord (db/records.py), а не словарями.
 
-        Возвращает список словарей:
+        Возвращает список записей с полями:
         [
             {
                 'id': int, # ID action_execution
@@ -2792,46 +3618,18 @@ class SQLiteDatabaseManager:
                 'calculated_end_time': str, # Время окончания в формате строки
                 'status': str, # Статус action_execution ('pending', 'in_progress', ...)
                 'snapshot_description': str, # Описание действия
-                'execution_status': str # Статус algorithm_execution ('active', 'completed', ...)
+                'execution_status': str, # Статус algorithm_execution ('active', 'completed', ...)
+                'calculated_start_epoch': int, # Время начала в секундах (шкала TimeService) или None
+                'calculated_end_epoch': int # Время окончания в секундах (шкала TimeService) или None
             },
             ...
         ]
         """
-        query = """
-        SELECT
-            ae.id,
-            ae.execution_id,
-            ae.calculated_start_time,
-            ae.calculated_end_time,
-            ae.status,
-            ae.snapshot_description,
-            exec.status AS execution_status,
-            exec.snapshot_name
-        FROM action_executions ae
-        JOIN algorithm_executions exec ON ae.execution_id = exec.id
-        WHERE exec.status = 'active' -- Только активные выполнения алгоритмов
-        AND ae.status IN ('pending', 'in_progress'); -- Только активные действия
-        """
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-            # Преобразуем результаты в список словарей
-            results = []
-            for row in rows:
-                result_dict = {
-                    'id': row[0],
-                    'execution_id': row[1],
-                    'calculated_start_time': row[2],
-                    'calculated_end_time': row[3],
-                    'status': row[4],
-                    'snapshot_description': row[5],
-                    'execution_status': row[6],
-                    'snapshot_name': row[7]
-                }
-                results.append(result_dict)
+            cursor.execute(ACTIVE_ACTION_EXECUTIONS_QUERY)
+            results = ActiveActionRecord.from_cursor(cursor)
             cursor.close()
             conn.close()
             return results
@@ -2947,9 +3745,68 @@ class SQLiteDatabaseManager:
                 conn.close()
             return False
 
+    @staticmethod
+    def _split_report_materials(materials_text) -> List[str]:
+        """
+        Разбивает текст отчётных материалов (строки, разделённые '\\n') на список путей.
+        Пустые строки пропускаются.
+        :param materials_text: Текст материалов или None.
+        :return: Список непустых строк.
+        """
+        if not materials_text or not isinstance(materials_text, str):
+            return []
+        return [line.strip() for line in materials_text.split("\n") if line.strip()]
+
+    def _insert_action_execution_materials(self, cursor, action_execution_id: int, materials_text) -> int:
+        """
+        Добавляет отчётные материалы action_execution'а в action_execution_materials.
+        Использует переданный курсор, коммит выполняет вызывающий метод.
+        :param cursor: Курсор открытой транзакции.
+        :param action_execution_id: ID action_execution'а.
+        :param materials_text: Текст материалов (строки, разделённые '\\n') или None.
+        :return: Количество добавленных строк.
+        """
+        materials = self._split_report_materials(materials_text)
+        if materials:
+            cursor.executemany(
+                "INSERT INTO action_execution_materials (action_execution_id, file_path) VALUES (?, ?);",
+                [(action_execution_id, path) for path in materials]
+            )
+        return len(materials)
+
+    def get_action_execution_report_materials(self, action_execution_id: int) -> list:
+        """
+        Получает отчётные материалы action_execution'а в порядке добавления.
+        :param action_execution_id: ID action_execution'а.
+        :return: Список словарей {id, action_execution_id, file_path, created_at} или пустой список.
+        """
+        if not isinstance(action_execution_id, int) or action_execution_id <= 0:
+            logger.error(f"SQLiteDatabaseManager: Некорректный action_execution_id: {action_execution_id}")
+            return []
+
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, action_execution_id, file_path, created_at "
+                f"FROM {self._history_table('action_execution_materials')} "
+                "WHERE action_execution_id = ? ORDER BY id;",
+                (action_execution_id,)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            conn.close()
+            return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при получении отчётных материалов: {e}")
+            return []
+        except Exception as e:
+            logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при получении отчётных материалов: {e}")
+            return []
+
     def append_action_execution_report_material(self, action_execution_id: int, material_path: str) -> bool:
         """
-        Добавляет путь к отчётному материалу в action_execution (дополняет существующие).
+        Добавляет отчётный материал к action_execution (одна строка в action_execution_materials).
         :param action_execution_id: ID action_execution'а.
         :param material_path: Путь к файлу материала.
         :return: True, если успешно, иначе False.
@@ -2958,31 +3815,23 @@ class SQLiteDatabaseManager:
             logger.error(f"SQLiteDatabaseManager: Некорректный action_execution_id: {action_execution_id}")
             return False
 
+        material_path = (material_path or "").strip()
+        if not material_path:
+            logger.error("SQLiteDatabaseManager: Пустой путь к отчётному материалу.")
+            return False
+
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
 
-            # Получаем текущие материалы
+            # Вставка одной строки; несуществующий action_execution отсекается внешним ключом
             cursor.execute(
-                "SELECT snapshot_report_materials FROM action_executions WHERE id = ?;",
-                (action_execution_id,)
+                "INSERT INTO action_execution_materials (action_execution_id, file_path) VALUES (?, ?);",
+                (action_execution_id, material_path)
             )
-            row = cursor.fetchone()
-            if not row:
-                logger.error(f"SQLiteDatabaseManager: Action_execution ID {action_execution_id} не существует.")
-                cursor.close()
-                conn.close()
-                return False
-
-            current_materials = row[0] or ""
-            if current_materials:
-                new_materials = current_materials + "\n" + material_path
-            else:
-                new_materials = material_path
-
             cursor.execute(
-                "UPDATE action_executions SET snapshot_report_materials = ?, updated_at = datetime('now', 'localtime') WHERE id = ?;",
-                (new_materials, action_execution_id)
+                "UPDATE action_executions SET updated_at = datetime('now', 'localtime') WHERE id = ?;",
+                (action_execution_id,)
             )
             conn.commit()
             logger.info(f"SQLiteDatabaseManager: Добавлен отчётный материал для action_execution ID {action_execution_id}.")
@@ -2990,6 +3839,11 @@ class SQLiteDatabaseManager:
             conn.close()
             return True
 
+        except sqlite3.IntegrityError as e:
+            logger.error(f"SQLiteDatabaseManager: Action_execution ID {action_execution_id} не существует: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return False
         except sqlite3.Error as e:
             logger.error(f"SQLiteDatabaseManager: Ошибка БД при добавлении отчётного материала: {e}")
             if 'conn' in locals():
@@ -3003,82 +3857,257 @@ class SQLiteDatabaseManager:
 
     def delete_action_execution_report_material(self, action_execution_id: int, material_index: int) -> bool:
         """
-        Удаляет отчётный материал по индексу (строка в snapshot_report_materials).
+        Удаляет отчётный материал по его позиции в списке материалов action_execution'а.
+        Оставлено для совместимости; предпочтительно удаление по ID
+        (delete_action_execution_report_material_by_id).
         :param action_execution_id: ID action_execution'а.
-        :param material_index: Индекс строки для удаления (0-based).
+        :param material_index: Позиция материала (0-based, в порядке добавления).
         :return: True, если успешно, иначе False.
         """
         if not isinstance(action_execution_id, int) or action_execution_id <= 0:
             logger.error(f"SQLiteDatabaseManager: Некорректный action_execution_id: {action_execution_id}")
             return False
+        if not isinstance(material_index, int) or material_index < 0:
+            logger.error(f"SQLiteDatabaseManager: Некорректный индекс материала: {material_index}")
+            return False
+
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                DELETE FROM action_execution_materials
+                WHERE id = (
+                    SELECT id FROM action_execution_materials
+                    WHERE action_execution_id = ?
+                    ORDER BY id
+                    LIMIT 1 OFFSET ?
+                );
+            """, (action_execution_id, material_index))
+            deleted = cursor.rowcount
+            if deleted > 0:
+                cursor.execute(
+                    "UPDATE action_executions SET updated_at = datetime('now', 'localtime') WHERE id = ?;",
+                    (action_execution_id,)
+                )
+            conn.commit()
+            cursor.close()
+            conn.close()
+            return deleted > 0
+
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при удалении отчётного материала: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return False
+        except Exception as e:
+            logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при удалении отчётного материала: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return False
+
+    def delete_action_execution_report_material_by_id(self, material_id: int) -> bool:
+        """
+        Удаляет отчётный материал по его ID в action_execution_materials.
+        :param material_id: ID материала.
+        :return: True, если материал удалён, иначе False.
+        """
+        if not isinstance(material_id, int) or material_id <= 0:
+            logger.error(f"SQLiteDatabaseManager: Некорректный ID материала: {material_id}")
+            return False
 
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
 
             cursor.execute(
-                "SELECT snapshot_report_materials FROM action_executions WHERE id = ?;",
-                (action_execution_id,)
+                "SELECT action_execution_id FROM action_execution_materials WHERE id = ?;",
+                (material_id,)
             )
             row = cursor.fetchone()
             if not row:
+                logger.warning(f"SQLiteDatabaseManager: Отчётный материал ID {material_id} не найден.")
                 cursor.close()
                 conn.close()
                 return False
 
-            current_materials = row[0] or ""
-            lines = [line for line in current_materials.split("\n") if line.strip()]
-            if material_index < 0 or material_index >= len(lines):
-                cursor.close()
-                conn.close()
-                return False
-
-            lines.pop(material_index)
-            new_materials = "\n".join(lines) if lines else None
-
+            cursor.execute("DELETE FROM action_execution_materials WHERE id = ?;", (material_id,))
             cursor.execute(
-                "UPDATE action_executions SET snapshot_report_materials = ?, updated_at = datetime('now', 'localtime') WHERE id = ?;",
-                (new_materials, action_execution_id)
+                "UPDATE action_executions SET updated_at = datetime('now', 'localtime') WHERE id = ?;",
+                (row[0],)
             )
             conn.commit()
+            logger.info(f"SQLiteDatabaseManager: Удалён отчётный материал ID {material_id}.")
             cursor.close()
             conn.close()
             return True
 
         except sqlite3.Error as e:
-            logger.error(f"SQLiteDatabaseManager: Ошибка БД при удалении отчётного материала: {e}")
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при удалении отчётного материала ID {material_id}: {e}")
             if 'conn' in locals():
                 conn.close()
             return False
         except Exception as e:
-            logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при удалении отчётного материала: {e}")
+            logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при удалении отчётного материала ID {material_id}: {e}")
             if 'conn' in locals():
                 conn.close()
             return False
 
+    # ========================================================================
+    # СОСТОЯНИЕ УВЕДОМЛЕНИЙ (уже показанные уведомления о действиях)
+    # ========================================================================
+
+    def get_action_execution_notification_masks(self, action_execution_ids: list) -> Dict[int, int]:
+        """
+        Возвращает битовые маски уже показанных уведомлений для заданных action_execution'ов.
+        Бит маски - код типа уведомления (notification_type).
+        :param action_execution_ids: Список ID action_execution'ов.
+        :return: Словарь {action_execution_id: маска}; ID без уведомлений в словарь не попадают.
+        """
+        masks: Dict[int, int] = {}
+        ids = [int(i) for i in action_execution_ids if i is not None]
+        if not ids:
+            return masks
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            # Ограничение SQLite на число параметров запроса - читаем порциями
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT action_execution_id, SUM(notification_type)
+                    FROM action_execution_notifications
+                    WHERE action_execution_id IN ({placeholders})
+                    GROUP BY action_execution_id;
+                """, chunk)
+                for action_execution_id, mask in cursor.fetchall():
+                    masks[action_execution_id] = mask
+            conn.close()
+            return masks
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при получении состояния уведомлений: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return masks
+
+    def mark_action_execution_notified(self, action_execution_id: int, notification_type: int) -> bool:
+        """
+        Сохраняет факт показа уведомления данного типа для action_execution'а.
+        :param action_execution_id: ID action_execution'а.
+        :param notification_type: Код типа уведомления (степень двойки).
+        :return: True, если успешно, иначе False.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR IGNORE INTO action_execution_notifications (action_execution_id, notification_type) VALUES (?, ?);",
+                (action_execution_id, notification_type)
+            )
+            conn.commit()
+            conn.close()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при сохранении уведомления для action_execution ID {action_execution_id}: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return False
+
+    def mark_action_executions_notified(self, pairs: list) -> bool:
+        """
+        Сохраняет факты показа уведомлений одной транзакцией (за одну проверку дедлайнов).
+        :param pairs: Список пар (ID action_execution'а, код типа уведомления).
+        :return: True, если успешно, иначе False.
+        """
+        if not pairs:
+            return True
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT OR IGNORE INTO action_execution_notifications (action_execution_id, notification_type) VALUES (?, ?);",
+                pairs
+            )
+            conn.commit()
+            conn.close()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при сохранении уведомлений ({len(pairs)} шт.): {e}")
+            if 'conn' in locals():
+                conn.close()
+            return False
+
+    def prune_action_execution_notifications(self) -> int:
+        """
+        Удаляет состояние уведомлений для завершённых/пропущенных действий и неактивных выполнений
+        (для них уведомления больше не показываются). Активные действия - это строки
+        active_action_queue, поэтому проверяются только записи состояния, по первичному ключу очереди.
+        :return: Количество удалённых записей или -1 при ошибке.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM action_execution_notifications
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM active_action_queue q
+                    WHERE q.action_execution_id = action_execution_notifications.action_execution_id
+                );
+            """)
+            deleted_count = cursor.rowcount
+            conn.commit()
+            conn.close()
+            if deleted_count:
+                logger.info(f"SQLiteDatabaseManager: Удалено записей состояния уведомлений: {deleted_count}.")
+            return deleted_count
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при очистке состояния уведомлений: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return -1
+
     # ========================================================================
     # МЕТОДЫ ДЛЯ РАБОТЫ С ОРГАНИЗАЦИЯМИ
     # ========================================================================
 
     def get_all_organizations(self) -> list:
         """Получить все организации из справочника."""
+        return self.get_organizations_page(limit=None)['items']
+
+    def get_organizations_page(self, after_key: str = "", after_id: int = 0,
+                               limit: Optional[int] = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Получить страницу справочника организаций в порядке (name, id).
+        :param after_key: name последней организации предыдущей страницы ('' - первая страница).
+        :param after_id: id последней организации предыдущей страницы.
+        :param limit: Размер страницы или None (все организации).
+        :return: Страница (см. _keyset_page) с записями OrganizationRecord.
+        """
         try:
             conn = self._get_connection()
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM organizations ORDER BY name;")
-            rows = cursor.fetchall()
-            organizations = [dict(row) for row in rows]
+            params = []
+            sql_query = "SELECT id, name, phone, contact_person, notes, created_at, updated_at FROM organizations"
+            if after_key or after_id:
+                sql_query += " WHERE (name, id) > (?, ?)"
+                params += [after_key, after_id]
+            sql_query += " ORDER BY name, id"
+            if limit is not None:
+                sql_query += " LIMIT ?"
+                params.append(limit + 1)
+            cursor.execute(sql_query + ";", params)
+            organizations = OrganizationRecord.from_cursor(cursor)
             cursor.close()
             conn.close()
             logger.info(f"SQLiteDatabaseManager: Получено {len(organizations)} организаций.")
-            return organizations
+            return self._keyset_page(organizations, limit, 'name')
         except sqlite3.Error as e:
             logger.error(f"SQLiteDatabaseManager: Ошибка при получении организаций: {e}")
-            return []
+            return self._keyset_page([], limit, 'name')
         except Exception as e:
             logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при получении организаций: {e}")
-            return []
+            return self._keyset_page([], limit, 'name')
 
     def create_organization(self, org_data: dict) -> int:
         """Создать новую организацию. Возвращает ID новой записи или 0 при ошибке."""
@@ -3267,10 +4296,10 @@ class SQLiteDatabaseManager:
             conn = self._get_connection()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT o.*
                 FROM organizations o
-                INNER JOIN action_execution_organizations aeo ON o.id = aeo.organization_id
+                INNER JOIN {self._history_table('action_execution_organizations')} aeo ON o.id = aeo.organization_id
                 WHERE aeo.action_execution_id = ?
                 ORDER BY o.name;
             """, (action_execution_id,))
@@ -3330,3 +4359,404 @@ class SQLiteDatabaseManager:
         except Exception as e:
             logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при отвязке организации от действия: {e}")
             return False
+
+    # ========================================================================
+    # ПОЛНОТЕКСТОВЫЙ ПОИСК
+    # ========================================================================
+
+    # Типы сущностей в search_index
+    SEARCH_ENTITY_TYPES = ('algorithm', 'action', 'action_execution', 'organization')
+
+    @staticmethod
+    def _build_fts_query(query_text: str) -> str:
+        """
+        Преобразует пользовательскую строку поиска в запрос FTS5.
+        Каждое слово ищется по префиксу, слова объединяются по И.
+        Спецсимволы синтаксиса FTS5 в запрос не попадают.
+        :param query_text: Строка, введённая пользователем.
+        :return: Выражение для MATCH или пустая строка.
+        """
+        import re
+        tokens = re.findall(r'\w+', query_text or "", re.UNICODE)
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def search(self, query_text: str, entity_types: list = None, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        Ранжированный полнотекстовый поиск по алгоритмам, действиям, истории выполнений и организациям.
+        :param query_text: Строка поиска (слова ищутся по префиксу, все слова должны встречаться).
+        :param entity_types: Список типов сущностей для фильтрации (см. SEARCH_ENTITY_TYPES) или None - все.
+        :param limit: Размер страницы.
+        :param offset: Смещение страницы.
+        :return: Словарь {'items': [...], 'has_more': bool}. Элемент содержит entity_type, entity_id,
+                 execution_id, algorithm_id, title, snippet, rank, execution_name, execution_started_at.
+        """
+        empty_result = {'items': [], 'has_more': False}
+        if not self.fulltext_search_available:
+            logger.warning("SQLiteDatabaseManager: Полнотекстовый поиск недоступен.")
+            return empty_result
+
+        fts_query = self._build_fts_query(query_text)
+        if not fts_query:
+            return empty_result
+
+        limit = max(1, min(int(limit), 500))
+        offset = max(0, int(offset))
+
+        where_clauses = ["search_index MATCH ?"]
+        params: List[Any] = [fts_query]
+        if entity_types:
+            types = [t for t in entity_types if t in self.SEARCH_ENTITY_TYPES]
+            if not types:
+                return empty_result
+            where_clauses.append(f"search_index.entity_type IN ({', '.join(['?'] * len(types))})")
+            params.extend(types)
+
+        # Лишняя строка (limit + 1) показывает, есть ли следующая страница
+        params.extend([limit + 1, offset])
+
+        # Выполнение ищется по первичному ключу в каждой БД истории отдельно: соединение
+        # с объединением (_history_table) SQLite материализовал бы целиком
+        execution_joins = "LEFT JOIN main.algorithm_executions ex ON ex.id = search_index.execution_id"
+        execution_columns = "ex.snapshot_name AS execution_name, ex.started_at AS execution_started_at"
+        if self.archive_available:
+            execution_joins += "\n            LEFT JOIN archive.algorithm_executions arch_ex ON arch_ex.id = search_index.execution_id"
+            execution_columns = ("COALESCE(ex.snapshot_name, arch_ex.snapshot_name) AS execution_name, "
+                                 "COALESCE(ex.started_at, arch_ex.started_at) AS execution_started_at")
+
+        # bm25: вес заголовка выше веса текста; UNINDEXED-колонки не учитываются
+        sql_query = f"""
+            SELECT
+                search_index.entity_type,
+                search_index.entity_id,
+                search_index.execution_id,
+                a.algorithm_id,
+                search_index.title,
+                snippet(search_index, -1, '<b>', '</b>', '…', 12) AS snippet,
+                bm25(search_index, 0.0, 0.0, 0.0, 3.0, 1.0) AS rank,
+                {execution_columns}
+            FROM search_index
+            {execution_joins}
+            LEFT JOIN actions a ON search_index.entity_type = 'action' AND a.id = search_index.entity_id
+            WHERE {' AND '.join(where_clauses)}
+            ORDER BY rank, search_index.rowid DESC
+            LIMIT ? OFFSET ?;
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute(sql_query, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            conn.close()
+
+            items = [dict(row) for row in rows[:limit]]
+            logger.debug(f"SQLiteDatabaseManager: Поиск '{query_text}': найдено {len(items)} (offset {offset}).")
+            return {'items': items, 'has_more': len(rows) > limit}
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при полнотекстовом поиске '{query_text}': {e}")
+            return empty_result
+        except Exception as e:
+            logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при полнотекстовом поиске '{query_text}': {e}")
+            return empty_result
+
+    def rebuild_search_index(self) -> bool:
+        """
+        Полностью пересобирает полнотекстовый индекс (триггеры также пересоздаются при отсутствии).
+        :return: True, если успешно, иначе False.
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            self._run_migration_file(cursor, '005_add_fulltext_search.sql')
+            cursor.close()
+            conn.close()
+            self.fulltext_search_available = True
+            logger.info("SQLiteDatabaseManager: Полнотекстовый индекс пересобран.")
+            return True
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка при пересборке полнотекстового индекса: {e}")
+            return False
+
+    # ========================================================================
+    # АРХИВ ЗАВЕРШЁННЫХ ВЫПОЛНЕНИЙ
+    # ========================================================================
+
+    # Таблицы, строки которых переносятся в архив (родитель - первым)
+    ARCHIVE_TABLES = (
+        'algorithm_executions',
+        'action_executions',
+        'action_execution_materials',
+        'action_execution_organizations',
+    )
+
+    # Индексы архива для запросов истории: имя -> (таблица, колонки)
+    ARCHIVE_INDEXES = {
+        'idx_arch_algorithm_executions_started_at': ('algorithm_executions', 'started_at'),
+        'idx_arch_algorithm_executions_category_completed_at': ('algorithm_executions', 'snapshot_category, completed_at'),
+        'idx_arch_action_executions_execution_id': ('action_executions', 'execution_id'),
+        'idx_arch_ae_materials_action_execution_id': ('action_execution_materials', 'action_execution_id'),
+        'idx_arch_ae_orgs_action_execution_id': ('action_execution_organizations', 'action_execution_id'),
+    }
+
+    # Архивация пакетами: execution'ов в пакете (одна транзакция), ожидание блокировки записи (мс)
+    # и пауза между пакетами (с), за которую успевает записать поток интерфейса
+    ARCHIVE_BATCH_SIZE = 200
+    ARCHIVE_BUSY_TIMEOUT_MS = 10000
+    ARCHIVE_BATCH_PAUSE_SECONDS = 0.05
+
+    def _ensure_archive_schema(self, cursor):
+        """
+        Создаёт таблицы архива (подключённого как 'archive') по образцу основной БД
+        и добавляет в них недостающие колонки, если схема основной БД расширилась.
+        Внешние ключи в архив не переносятся: архивные строки только читаются.
+        :param cursor: Курсор подключения с присоединённым архивом.
+        :return: Колонки таблиц истории {таблица: [колонки]} (для _history_columns).
+        """
+        history_columns: Dict[str, List[str]] = {}
+        for table in self.ARCHIVE_TABLES:
+            cursor.execute(f"PRAGMA main.table_info({table});")
+            main_columns = [(info[1], info[2], info[5]) for info in cursor.fetchall()]
+            cursor.execute(f"PRAGMA archive.table_info({table});")
+            archive_columns = {info[1] for info in cursor.fetchall()}
+
+            if not archive_columns:
+                column_defs = ", ".join(
+                    f"{name} {col_type}{' PRIMARY KEY' if pk else ''}" for name, col_type, pk in main_columns
+                )
+                cursor.execute(f"CREATE TABLE archive.{table} ({column_defs});")
+                logger.info(f"SQLiteDatabaseManager: В архиве создана таблица {table}.")
+            else:
+                for name, col_type, _ in main_columns:
+                    if name not in archive_columns:
+                        cursor.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {col_type};")
+                        logger.info(f"SQLiteDatabaseManager: В архивную таблицу {table} добавлена колонка {name}.")
+
+            history_columns[table] = [name for name, _, _ in main_columns]
+
+        for index_name, (table, columns) in self.ARCHIVE_INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS archive.{index_name} ON {table}({columns});")
+        return history_columns
+
+    def _history_table(self, table_name: str) -> str:
+        """
+        Возвращает источник строк истории для FROM: саму таблицу или, если подключён архив,
+        объединение основной и архивной таблиц. Простые условия WHERE внешнего запроса
+        SQLite переносит внутрь обеих частей UNION ALL, и они идут по индексам. Условия
+        соединений и коррелированных подзапросов не переносятся - объединение читается
+        целиком или материализуется, поэтому для них есть _history_union и _report_materials_sql.
+        :param table_name: Имя таблицы из ARCHIVE_TABLES.
+        :return: Фрагмент SQL для FROM.
+        """
+        if not self.archive_available or table_name not in self._history_columns:
+            return table_name
+        columns = ", ".join(self._history_columns[table_name])
+        return f"(SELECT {columns} FROM main.{table_name} UNION ALL SELECT {columns} FROM archive.{table_name})"
+
+    def _history_union(self, query: str, params=(), **fields) -> Tuple[str, list]:
+        """
+        Запрос по истории с соединениями: query выполняется отдельно по основной БД и, если
+        подключён архив, по архиву, результаты объединяются (UNION ALL). Выполнение и его
+        строки всегда лежат в одной БД, поэтому соединения внутри каждой части полные и идут
+        по индексам своей БД.
+        :param query: Запрос с {schema} вместо имени БД (main или archive) перед таблицами истории.
+        :param params: Параметры query.
+        :param fields: Прочие подстановки query.
+        :return: (SQL объединения, параметры для всех его частей).
+        """
+        schemas = ('main', 'archive') if self.archive_available else ('main',)
+        sql = "\nUNION ALL\n".join(query.format(schema=schema, **fields) for schema in schemas)
+        return sql, list(params) * len(schemas)
+
+    def _report_materials_sql(self, alias: str) -> str:
+        """
+        Подзапрос отчётных материалов (REPORT_MATERIALS_SUBQUERY) для action_execution'а с
+        псевдонимом alias: с архивом - по индексу основной БД, а если там материалов нет, по архиву.
+        """
+        materials = REPORT_MATERIALS_SUBQUERY.format(alias=alias, materials='main.action_execution_materials')
+        if not self.archive_available:
+            return materials
+        archived = REPORT_MATERIALS_SUBQUERY.format(alias=alias, materials='archive.action_execution_materials')
+        return f"COALESCE({materials}, {archived})"
+
+    def activate_archive(self) -> bool:
+        """
+        Подключает архив к запросам истории после фоновой архивации (ArchiveWorker): состояние
+        менеджера (archive_available, _history_columns) меняется только в потоке интерфейса.
+        :return: True, если архив подключен, иначе False.
+        """
+        if self.archive_available:
+            return True
+        if not os.path.exists(self.archive_db_path):
+            return False
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("ATTACH DATABASE ? AS archive;", (self.archive_db_path,))
+            history_columns = self._ensure_archive_schema(cursor)
+            conn.commit()
+            conn.close()
+            self._history_columns.update(history_columns)
+            self.archive_available = True
+            logger.info(f"Архив подключен: {self.archive_db_path}")
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Не удалось подключить архив {self.archive_db_path}: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return False
+
+    def archive_completed_executions(self, older_than_days: int, vacuum: bool = False,
+                                     activate_archive: bool = True) -> int:
+        """
+        Переносит завершённые и отменённые execution'ы, завершившиеся более older_than_days дней назад,
+        вместе с их action_execution'ами, отчётными материалами и привязками организаций в архивную БД.
+        Перенос идёт пакетами по ARCHIVE_BATCH_SIZE execution'ов, каждый - короткой транзакцией над
+        обеими БД, начатой BEGIN IMMEDIATE: блокировка записи берётся в начале пакета, поэтому
+        одновременная запись из интерфейса дожидается конца пакета, а не обрывает перенос.
+        Архивные записи остаются доступны запросам истории и полнотекстовому поиску, но не редактируются.
+        :param older_than_days: Минимальный возраст завершённых execution'ов в днях.
+        :param vacuum: Выполнить VACUUM основной БД после переноса (уменьшает файл, но занимает время).
+        :param activate_archive: Сразу подключить архив к запросам истории. Фоновый перенос передаёт
+                                 False и подключает архив из потока интерфейса (activate_archive()).
+        :return: Количество перенесённых execution'ов или -1 при ошибке до первого перенесённого пакета.
+        """
+        if not isinstance(older_than_days, int) or older_than_days <= 0:
+            logger.error(f"SQLiteDatabaseManager: Некорректный срок архивации: {older_than_days}")
+            return -1
+
+        # completed_at хранится как ISO-строка (с пробелом или 'T'), сравнение с датой корректно
+        cutoff_date = (datetime.date.today() - datetime.timedelta(days=older_than_days)).isoformat()
+        batch_filters = {
+            'algorithm_executions': "id IN (SELECT id FROM temp.archive_batch)",
+            'action_executions': "execution_id IN (SELECT id FROM temp.archive_batch)",
+            'action_execution_materials': (
+                "action_execution_id IN (SELECT id FROM main.action_executions "
+                "WHERE execution_id IN (SELECT id FROM temp.archive_batch))"
+            ),
+            'action_execution_organizations': (
+                "action_execution_id IN (SELECT id FROM main.action_executions "
+                "WHERE execution_id IN (SELECT id FROM temp.archive_batch))"
+            ),
+        }
+
+        conn = None
+        archived_count = 0
+        try:
+            conn = self._get_connection()
+            # Транзакции открываются явно (BEGIN IMMEDIATE), а не неявно перед первой записью
+            conn.isolation_level = None
+            conn.execute(f"PRAGMA busy_timeout = {self.ARCHIVE_BUSY_TIMEOUT_MS};")
+            cursor = conn.cursor()
+            if not self.archive_available:
+                cursor.execute("ATTACH DATABASE ? AS archive;", (self.archive_db_path,))
+            cursor.execute("BEGIN IMMEDIATE;")
+            history_columns = self._ensure_archive_schema(cursor)
+            cursor.execute("COMMIT;")
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY);")
+
+            while True:
+                cursor.execute("BEGIN IMMEDIATE;")
+                cursor.execute("DELETE FROM temp.archive_batch;")
+                cursor.execute("""
+                    INSERT INTO temp.archive_batch (id)
+                    SELECT id FROM main.algorithm_executions
+                    WHERE status IN ('completed', 'cancelled')
+                    AND completed_at IS NOT NULL
+                    AND completed_at < ?
+                    ORDER BY id
+                    LIMIT ?;
+                """, (cutoff_date, self.ARCHIVE_BATCH_SIZE))
+                batch_size = cursor.rowcount
+                if batch_size <= 0:
+                    cursor.execute("COMMIT;")
+                    break
+                self._archive_batch(cursor, history_columns, batch_filters)
+                cursor.execute("COMMIT;")
+                archived_count += batch_size
+                # Пауза между пакетами: ожидающая запись интерфейса успевает взять блокировку
+                time.sleep(self.ARCHIVE_BATCH_PAUSE_SECONDS)
+
+            cursor.execute("DROP TABLE IF EXISTS temp.archive_batch;")
+            logger.info(f"SQLiteDatabaseManager: В архив перенесено {archived_count} execution'ов (завершены до {cutoff_date}).")
+
+            if vacuum and archived_count > 0:
+                conn.execute("VACUUM main;")
+                logger.info("SQLiteDatabaseManager: Выполнен VACUUM основной БД.")
+
+            cursor.close()
+            conn.close()
+            if activate_archive:
+                self._history_columns.update(history_columns)
+                self.archive_available = True
+            return archived_count
+
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteDatabaseManager: Ошибка БД при архивации execution'ов "
+                         f"(перенесено до ошибки: {archived_count}): {e}")
+        except Exception as e:
+            logger.exception(f"SQLiteDatabaseManager: Неизвестная ошибка при архивации execution'ов "
+                             f"(перенесено до ошибки: {archived_count}): {e}")
+        if conn:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            conn.close()
+        # Уже перенесённые пакеты зафиксированы: архив нужно подключить и при ошибке
+        if archived_count > 0 and activate_archive:
+            self.activate_archive()
+        return archived_count if archived_count > 0 else -1
+
+    def _archive_batch(self, cursor, history_columns: Dict[str, List[str]], batch_filters: Dict[str, str]):
+        """
+        Переносит в архив execution'ы из temp.archive_batch внутри открытой транзакции.
+        :param history_columns: Колонки таблиц истории (результат _ensure_archive_schema).
+        :param batch_filters: Условия отбора строк пакета для каждой таблицы из ARCHIVE_TABLES.
+        """
+        for table in self.ARCHIVE_TABLES:
+            columns = ", ".join(history_columns[table])
+            cursor.execute(
+                f"INSERT OR REPLACE INTO archive.{table} ({columns}) "
+                f"SELECT {columns} FROM main.{table} WHERE {batch_filters[table]};"
+            )
+
+        # Удаление execution'ов каскадно удаляет action_execution'ы, материалы, привязки
+        # и (триггерами) записи полнотекстового индекса и статистики
+        cursor.execute("DELETE FROM main.algorithm_executions WHERE id IN (SELECT id FROM temp.archive_batch);")
+
+        # Возвращаем вклад архивных execution'ов в статистику - она охватывает всю историю.
+        # Строк выполнений в основной БД уже нет, поэтому триггеры execution_stats суточные итоги не меняют.
+        cursor.execute(
+            "INSERT INTO execution_stats (execution_id, total, completed, on_time, late, skipped) "
+            + EXECUTION_STATS_QUERY.format(
+                schema="archive",
+                where="a.execution_id IN (SELECT id FROM temp.archive_batch)",
+            )
+        )
+        cursor.execute("""
+            INSERT INTO daily_execution_stats
+                (day, snapshot_category, algorithm_id, executions, completed_executions,
+                 total, completed, on_time, late, skipped)
+            SELECT substr(e.started_at, 1, 10), e.snapshot_category, IFNULL(e.algorithm_id, 0),
+                   COUNT(*), SUM(e.status IS 'completed'),
+                   IFNULL(SUM(s.total), 0), IFNULL(SUM(s.completed), 0), IFNULL(SUM(s.on_time), 0),
+                   IFNULL(SUM(s.late), 0), IFNULL(SUM(s.skipped), 0)
+            FROM archive.algorithm_executions e
+            LEFT JOIN execution_stats s ON s.execution_id = e.id
+            WHERE e.id IN (SELECT id FROM temp.archive_batch) AND e.started_at IS NOT NULL
+            GROUP BY 1, 2, 3
+            ON CONFLICT (day, snapshot_category, algorithm_id) DO UPDATE SET
+                executions = executions + excluded.executions,
+                completed_executions = completed_executions + excluded.completed_executions,
+                total = total + excluded.total, completed = completed + excluded.completed,
+                on_time = on_time + excluded.on_time, late = late + excluded.late,
+                skipped = skipped + excluded.skipped;
+        """)
+
+        # Возвращаем архивные action_execution'ы в поисковый индекс, чтобы поиск охватывал всю историю
+        if self.fulltext_search_available:
+            cursor.execute("""
+                INSERT OR REPLACE INTO search_index (rowid, entity_type, entity_id, execution_id, title, body)
+                SELECT id * 4 + 2, 'action_execution', id, execution_id, snapshot_description,
+                       coalesce(notes, '') || char(10) || coalesce(reported_to, '') || char(10) || coalesce(snapshot_contact_phones, '')
+                FROM archive.action_executions
+                WHERE execution_id IN (SELECT id FROM temp.archive_batch);
+            """)
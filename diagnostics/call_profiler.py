@@ -0,0 +1,272 @@
+# diagnostics/call_profiler.py
+"""
+Профилирование вызовов слотов ApplicationData и методов менеджера БД (включается флагом --profile).
+
+Каждый вызов замеряется: количество, ошибки, гистограмма длительностей (p50/p95 оцениваются по
+ней), число возвращённых строк. Вызовы дольше порога попадают в журнал медленных вызовов вместе
+с аргументами и текстом SQL-запросов, выполненных за время вызова (запросы приходят из
+diagnostics.traced_connection). Статистика доступна снимком (dict), в JSON-файле и в окне
+диагностики (diagnostics.diagnostics_panel).
+"""
+import bisect
+import datetime
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from diagnostics.traced_connection import StatementEvent, install_connection_tracing
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограммы, мс (последняя корзина - всё, что дольше)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+DEFAULT_SLOW_MS = 200
+DEFAULT_SLOW_LOG_SIZE = 200
+
+# Ограничения журнала медленных вызовов: длина аргумента, длина запроса, запросов на вызов
+MAX_ARGUMENT_LENGTH = 200
+MAX_STATEMENT_LENGTH = 500
+MAX_STATEMENTS_PER_CALL = 20
+
+# Аргументы вызовов с такими именами и значения таких ключей словарей не попадают в журнал
+SENSITIVE_CALL_PATTERN = re.compile(r"password|login|authenticate|hash", re.IGNORECASE)
+SENSITIVE_KEY_PATTERN = re.compile(r"password", re.IGNORECASE)
+MASKED_ARGUMENTS = "***"
+
+
+def _row_count(result) -> Optional[int]:
+    """Число строк результата: список, кортеж или страница {'items': [...]}; иначе None."""
+    if isinstance(result, dict) and isinstance(result.get("items"), list):
+        return len(result["items"])
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return None
+
+
+def _short(value, limit: int) -> str:
+    if isinstance(value, dict):  # Данные пользователя (new_password и т.п.) - без значений паролей
+        value = {key: MASKED_ARGUMENTS if SENSITIVE_KEY_PATTERN.search(str(key)) else item
+                 for key, item in value.items()}
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+class _CallStats:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets", "rows_total", "rows_max")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.rows_total = 0
+        self.rows_max = 0
+
+    def percentile(self, fraction: float) -> float:
+        """Оценка перцентиля по гистограмме: верхняя граница корзины (для последней - максимум)."""
+        threshold = fraction * self.count
+        accumulated = 0
+        for index, bucket_count in enumerate(self.buckets):
+            accumulated += bucket_count
+            if accumulated >= threshold and bucket_count:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(float(LATENCY_BUCKETS_MS[index]), self.max_ms)
+                break
+        return self.max_ms
+
+    def as_dict(self, name: str) -> dict:
+        return {
+            "name": name,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows_total": self.rows_total,
+            "rows_max": self.rows_max,
+            "histogram": list(self.buckets),
+        }
+
+
+class CallProfiler:
+    """
+    Сборщик статистики вызовов. Потокобезопасен: менеджер БД вызывается и из рабочих потоков
+    (выгрузка отчётов), SQL-запросы относятся к вызовам своего потока.
+    """
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS, slow_log_size: int = DEFAULT_SLOW_LOG_SIZE):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[str, _CallStats] = {}
+        self._slow_calls = deque(maxlen=slow_log_size)
+        self._started_at = datetime.datetime.now()
+
+    # --- Замер вызовов ---
+
+    def _frames(self) -> list:
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def wrap(self, name: str, func: Callable, mask_arguments: bool = False) -> Callable:
+        """Обёртка func, замеряющая каждый вызов под именем name."""
+        mask_arguments = mask_arguments or bool(SENSITIVE_CALL_PATTERN.search(name))
+
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            frames = self._frames()
+            statements = []
+            frames.append(statements)
+            started = time.perf_counter()
+            failed = False
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                frames.pop()
+                arguments = None
+                if elapsed_ms >= self.slow_ms:
+                    arguments = MASKED_ARGUMENTS if mask_arguments else self._format_arguments(args, kwargs)
+                self._record(name, elapsed_ms, _row_count(result), failed, arguments, statements)
+
+        profiled.__profiled__ = True
+        return profiled
+
+    @staticmethod
+    def _format_arguments(args, kwargs) -> str:
+        parts = [_short(value, MAX_ARGUMENT_LENGTH) for value in args]
+        parts.extend(f"{key}={_short(value, MAX_ARGUMENT_LENGTH)}" for key, value in kwargs.items())
+        return ", ".join(parts)
+
+    def record_statement(self, event: StatementEvent):
+        """Подписчик перехвата SQL: запрос относится ко всем незавершённым вызовам потока."""
+        frames = getattr(self._local, "frames", None)
+        if not frames:
+            return
+        entry = (_short(" ".join(event.statement.split()), MAX_STATEMENT_LENGTH), round(event.seconds * 1000, 3))
+        for statements in frames:
+            if len(statements) < MAX_STATEMENTS_PER_CALL:
+                statements.append(entry)
+
+    def _record(self, name: str, elapsed_ms: float, rows: Optional[int], failed: bool,
+                arguments: Optional[str], statements: list):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _CallStats()
+            stats.count += 1
+            stats.errors += failed
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.buckets[bucket] += 1
+            if rows is not None:
+                stats.rows_total += rows
+                stats.rows_max = max(stats.rows_max, rows)
+            if arguments is None:
+                return
+            self._slow_calls.append({
+                "time": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                "name": name,
+                "ms": round(elapsed_ms, 3),
+                "rows": rows,
+                "error": failed,
+                "thread": threading.current_thread().name,
+                "arguments": arguments,
+                "sql": [{"statement": statement, "ms": ms} for statement, ms in statements],
+            })
+        logger.warning(f"Медленный вызов {name}: {elapsed_ms:.1f} мс, запросов SQL: {len(statements)}")
+
+    # --- Результаты ---
+
+    def snapshot(self) -> dict:
+        """Статистика вызовов (по убыванию суммарного времени) и журнал медленных вызовов."""
+        with self._lock:
+            calls = [stats.as_dict(name) for name, stats in self._stats.items()]
+            slow_calls = list(self._slow_calls)
+        calls.sort(key=lambda item: item["total_ms"], reverse=True)
+        return {
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "slow_ms": self.slow_ms,
+            "buckets_ms": list(LATENCY_BUCKETS_MS),
+            "calls": calls,
+            "slow_calls": slow_calls,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow_calls.clear()
+            self._started_at = datetime.datetime.now()
+
+    def dump_json(self, path: str) -> bool:
+        """Сохраняет snapshot() в JSON-файл. :return: True при успехе."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Ошибка сохранения статистики вызовов в {path}: {e}")
+            return False
+
+
+def instrument_qobject_slots(obj, profiler: CallProfiler, prefix: Optional[str] = None) -> List[str]:
+    """
+    Оборачивает все слоты (@Slot) класса obj, объявленные в Python, на уровне экземпляра:
+    вызовы из QML идут через атрибут экземпляра и поэтому тоже замеряются.
+    :return: Имена обёрнутых слотов.
+    """
+    prefix = prefix or type(obj).__name__
+    meta_object = obj.metaObject()
+    wrapped = []
+    for index in range(meta_object.methodOffset(), meta_object.methodCount()):
+        method = meta_object.method(index)
+        if method.methodType() != method.MethodType.Slot:
+            continue
+        name = bytes(method.name()).decode()
+        if name in wrapped:  # Перегрузки одного слота оборачиваются один раз
+            continue
+        bound = getattr(obj, name, None)
+        if bound is None or getattr(bound, "__profiled__", False):
+            continue
+        setattr(obj, name, profiler.wrap(f"{prefix}.{name}", bound))
+        wrapped.append(name)
+    return wrapped
+
+
+def instrument_manager(manager, profiler: CallProfiler, prefix: Optional[str] = None) -> List[str]:
+    """
+    Оборачивает публичные методы менеджера БД и подписывает профилировщик на его SQL-запросы.
+    Генераторы (потоковое чтение) не оборачиваются: их работа идёт уже после возврата из метода.
+    :return: Имена обёрнутых методов.
+    """
+    prefix = prefix or type(manager).__name__
+    wrapped = []
+    for name, func in inspect.getmembers(type(manager), inspect.isfunction):
+        if name.startswith("_") or inspect.isgeneratorfunction(func):
+            continue
+        bound = getattr(manager, name)
+        if getattr(bound, "__profiled__", False):
+            continue
+        setattr(manager, name, profiler.wrap(f"{prefix}.{name}", bound))
+        wrapped.append(name)
+    install_connection_tracing(manager, profiler.record_statement)
+    return wrapped
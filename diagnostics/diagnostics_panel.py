@@ -0,0 +1,231 @@
+# diagnostics/diagnostics_panel.py
+"""
+Окно диагностики: статистика вызовов слотов и методов менеджера БД и журнал медленных вызовов
+из CallProfiler, задержка цикла событий и журнал зависаний из StallWatchdog, статистика
+SQL-запросов по отпечаткам с планами из QueryTracer. Показываются вкладки включённых средств;
+окно обновляется по таймеру, пока открыто.
+"""
+import datetime
+import json
+import logging
+from typing import Optional
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QFileDialog, QHBoxLayout, QHeaderView, QLabel, QPlainTextEdit, QPushButton, QSplitter, QTabWidget,
+    QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget,
+)
+
+from diagnostics.call_profiler import CallProfiler
+from diagnostics.query_tracer import QueryTracer
+from diagnostics.stall_watchdog import StallWatchdog
+
+logger = logging.getLogger(__name__)
+
+# Период обновления окна, мс
+REFRESH_INTERVAL_MS = 2000
+
+CALL_COLUMNS = (
+    ("name", "Вызов"), ("count", "Вызовов"), ("errors", "Ошибок"), ("total_ms", "Всего, мс"),
+    ("mean_ms", "Сред., мс"), ("p50_ms", "p50, мс"), ("p95_ms", "p95, мс"), ("max_ms", "Макс., мс"),
+    ("rows_max", "Строк (макс.)"),
+)
+SLOW_CALL_COLUMNS = (
+    ("time", "Время"), ("name", "Вызов"), ("ms", "мс"), ("rows", "Строк"), ("thread", "Поток"),
+    ("arguments", "Аргументы"), ("sql", "SQL"),
+)
+STALL_COLUMNS = (
+    ("started_at", "Начало"), ("duration_ms", "мс"), ("location", "Где стоял главный поток"),
+)
+QUERY_COLUMNS = (
+    ("id", "Отпечаток"), ("count", "Вызовов"), ("slow", "Медленных"), ("total_ms", "Всего, мс"),
+    ("mean_ms", "Сред., мс"), ("max_ms", "Макс., мс"), ("rows_total", "Строк"), ("vm_steps", "Шагов ВМ"),
+    ("trigger_events", "События триггеров"), ("fingerprint", "Запрос"),
+)
+
+
+def _table(columns) -> QTableWidget:
+    table = QTableWidget(0, len(columns))
+    table.setHorizontalHeaderLabels([title for _, title in columns])
+    table.setEditTriggers(QTableWidget.NoEditTriggers)
+    table.setSelectionBehavior(QTableWidget.SelectRows)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+    table.horizontalHeader().setStretchLastSection(True)
+    return table
+
+
+def _cell(value) -> QTableWidgetItem:
+    item = QTableWidgetItem()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        item.setData(Qt.DisplayRole, value)  # Числовая сортировка
+        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    else:
+        item.setText("" if value is None else str(value))
+    return item
+
+
+class DiagnosticsPanel(QWidget):
+    """Окно со статистикой CallProfiler и/или StallWatchdog."""
+
+    def __init__(self, profiler: Optional[CallProfiler] = None, watchdog: Optional[StallWatchdog] = None,
+                 query_tracer: Optional[QueryTracer] = None, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.watchdog = watchdog
+        self.query_tracer = query_tracer
+        self._stalls = []
+        self._queries = {}  # id отпечатка -> статистика (для плана выбранной строки)
+        self.setWindowTitle("Диагностика")
+        self.resize(1100, 600)
+
+        self.summary_label = QLabel()
+        refresh_button = QPushButton("Обновить")
+        reset_button = QPushButton("Сбросить")
+        save_button = QPushButton("Сохранить JSON…")
+        refresh_button.clicked.connect(self.refresh)
+        reset_button.clicked.connect(self.reset)
+        save_button.clicked.connect(self.save_json)
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(self.summary_label, 1)
+        toolbar.addWidget(refresh_button)
+        toolbar.addWidget(reset_button)
+        toolbar.addWidget(save_button)
+
+        tabs = QTabWidget()
+        if profiler is not None:
+            self.calls_table = _table(CALL_COLUMNS)
+            self.slow_calls_table = _table(SLOW_CALL_COLUMNS)
+            tabs.addTab(self.calls_table, "Вызовы")
+            tabs.addTab(self.slow_calls_table, "Медленные вызовы")
+        if watchdog is not None:
+            # Таблица зависаний без сортировки: строка соответствует self._stalls по индексу
+            self.stalls_table = _table(STALL_COLUMNS)
+            self.stalls_table.currentCellChanged.connect(self._show_stall_stack)
+            self.stall_stack_view = QPlainTextEdit()
+            self.stall_stack_view.setReadOnly(True)
+            stalls_splitter = QSplitter(Qt.Vertical)
+            stalls_splitter.addWidget(self.stalls_table)
+            stalls_splitter.addWidget(self.stall_stack_view)
+            tabs.addTab(stalls_splitter, "Зависания")
+        if query_tracer is not None:
+            self.queries_table = _table(QUERY_COLUMNS)
+            self.queries_table.currentCellChanged.connect(self._show_query_plan)
+            self.query_plan_view = QPlainTextEdit()
+            self.query_plan_view.setReadOnly(True)
+            queries_splitter = QSplitter(Qt.Vertical)
+            queries_splitter.addWidget(self.queries_table)
+            queries_splitter.addWidget(self.query_plan_view)
+            tabs.addTab(queries_splitter, "SQL-запросы")
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(toolbar)
+        layout.addWidget(tabs)
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self._refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        summary = []
+        if self.profiler is not None:
+            snapshot = self.profiler.snapshot()
+            summary.append(
+                f"С {snapshot['started_at']}: вызовов {sum(item['count'] for item in snapshot['calls'])}, "
+                f"медленных (от {snapshot['slow_ms']} мс) {len(snapshot['slow_calls'])}"
+            )
+            self._fill(self.calls_table, CALL_COLUMNS, snapshot["calls"])
+            slow_calls = [
+                {**item, "sql": " | ".join(f"{entry['statement']} ({entry['ms']} мс)" for entry in item["sql"])}
+                for item in reversed(snapshot["slow_calls"])
+            ]
+            self._fill(self.slow_calls_table, SLOW_CALL_COLUMNS, slow_calls)
+        if self.watchdog is not None:
+            snapshot = self.watchdog.snapshot()
+            summary.append(
+                f"задержка цикла событий {snapshot['lag_ms']} мс (p95 {snapshot['lag_p95_ms']}, "
+                f"макс. {snapshot['lag_max_ms']}), зависаний (от {snapshot['threshold_ms']} мс) {len(snapshot['stalls'])}"
+            )
+            self._stalls = snapshot["stalls"]  # По времени: при обновлении выбранная строка не смещается
+            rows = [{**stall, "location": stall["samples"][0]["location"] if stall["samples"] else "стек не снят"}
+                    for stall in self._stalls]
+            current_row = self.stalls_table.currentRow()
+            self._fill(self.stalls_table, STALL_COLUMNS, rows, sorting=False)
+            if 0 <= current_row < len(rows):
+                self.stalls_table.selectRow(current_row)
+        if self.query_tracer is not None:
+            queries = self.query_tracer.snapshot()
+            summary.append(f"запросов SQL: отпечатков {len(queries)}, "
+                           f"медленных (от {self.query_tracer.slow_ms} мс) {sum(item['slow'] for item in queries)}")
+            self._queries = {item["id"]: item for item in queries}
+            self._fill(self.queries_table, QUERY_COLUMNS, queries)
+        self.summary_label.setText("; ".join(summary))
+
+    @staticmethod
+    def _fill(table: QTableWidget, columns, rows: list, sorting: bool = True):
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column_index, (key, _) in enumerate(columns):
+                table.setItem(row_index, column_index, _cell(row.get(key)))
+        table.setSortingEnabled(sorting)
+
+    def _show_stall_stack(self, row: int, *_):
+        if not 0 <= row < len(self._stalls):
+            self.stall_stack_view.clear()
+            return
+        stall = self._stalls[row]
+        parts = [f"Зависание {stall['duration_ms']} мс, начало {stall['started_at']}"]
+        for sample in stall["samples"]:
+            parts.append(f"\n--- через {sample['after_ms']} мс ---\n{''.join(sample['stack'])}")
+        self.stall_stack_view.setPlainText("\n".join(parts))
+
+    def _show_query_plan(self, row: int, *_):
+        id_item = self.queries_table.item(row, 0) if row >= 0 else None
+        item = self._queries.get(id_item.text()) if id_item is not None else None
+        if item is None:
+            self.query_plan_view.clear()
+            return
+        parts = [item["sample"], ""]
+        plan = item["plan"]
+        if plan:
+            parts.append(f"План ({plan['backend']}, {plan['ms']} мс, {plan['captured_at']}):")
+            parts.extend(plan["lines"])
+        else:
+            parts.append("План не снят (запрос не был медленнее порога).")
+        self.query_plan_view.setPlainText("\n".join(parts))
+
+    def reset(self):
+        # Статистика SQL-запросов не сбрасывается: она копится между запусками (query_trace.json)
+        if self.profiler is not None:
+            self.profiler.reset()
+        if self.watchdog is not None:
+            self.watchdog.reset()
+        self.refresh()
+
+    def save_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить диагностику", "diagnostics.json", "JSON (*.json)")
+        if not path:
+            return
+        document = {"created_at": datetime.datetime.now().isoformat(timespec="seconds")}
+        if self.profiler is not None:
+            document["calls"] = self.profiler.snapshot()
+        if self.watchdog is not None:
+            document["event_loop"] = self.watchdog.snapshot()
+        if self.query_tracer is not None:
+            document["queries"] = self.query_tracer.snapshot()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.error(f"Ошибка сохранения диагностики в {path}: {e}")
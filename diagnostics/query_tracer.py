@@ -0,0 +1,315 @@
+# diagnostics/query_tracer.py
+"""
+Трассировка SQL-запросов менеджеров БД (включается флагом --trace-sql).
+
+Каждый запрос, прошедший через TracedConnection, нормализуется в отпечаток (литералы и
+параметры -> ?, списки значений -> (?), пробелы и регистр), и по отпечатку накапливаются
+количество, ошибки, медленные вызовы, суммарное и максимальное время, прочитанные строки.
+Для SQLite на каждое соединение ставятся обратные вызовы sqlite3: progress handler считает
+шаги виртуальной машины (сколько работы сделал запрос), trace callback - события программ триггеров
+(см. _take_counters).
+
+Для запроса дольше порога автоматически снимается план: EXPLAIN QUERY PLAN в SQLite,
+EXPLAIN (ANALYZE, BUFFERS) в PostgreSQL для чтения и EXPLAIN для изменений. Запрос при ANALYZE
+выполняется повторно, поэтому план снимается внутри точки сохранения с откатом и не чаще
+EXPLAIN_INTERVAL_SECONDS для отпечатка (и только если запрос стал медленнее прошлого плана).
+
+Статистика сохраняется в JSON и при следующем запуске продолжается с того же файла;
+query_report.py выводит по нему самые тяжёлые запросы.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from diagnostics.traced_connection import StatementEvent, TracedConnection, install_connection_tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_MS = 100
+
+# Шагов виртуальной машины SQLite между вызовами progress handler
+PROGRESS_STEPS = 1000
+
+# Не чаще, чем раз в столько секунд, снимать план одного отпечатка
+EXPLAIN_INTERVAL_SECONDS = 60
+
+# Период сохранения статистики приложением, мс (чтобы не потерять её при аварийном завершении)
+SAVE_INTERVAL_MS = 5 * 60 * 1000
+
+# Длина примера запроса в статистике
+MAX_SAMPLE_LENGTH = 2000
+
+SORT_KEYS = ("total_ms", "max_ms", "mean_ms", "count", "slow")
+
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_PATTERN = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAMETER_PATTERN = re.compile(r"%\(\w+\)s|%s|\?\d*|(?<![:\w]):[a-z_]\w*|\$\d+")
+_VALUE_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUE_ROWS_PATTERN = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_EXPLAINABLE_PATTERN = re.compile(r"^\s*(select|with|insert|update|delete|replace)\b", re.IGNORECASE)
+_WRITE_PATTERN = re.compile(r"\b(insert|update|delete|merge)\b", re.IGNORECASE)
+_TRANSACTION_PATTERN = re.compile(r"^\s*(begin|commit|rollback|savepoint|release)\b", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Нормализованный текст запроса: запросы, отличающиеся только значениями, совпадают.
+    WHERE id IN (1, 2, 3) и VALUES (...), (...) сворачиваются в (?) независимо от числа элементов.
+    """
+    text = _COMMENT_PATTERN.sub(" ", statement)
+    text = _STRING_PATTERN.sub("?", text)
+    text = " ".join(text.split()).lower()
+    text = _PARAMETER_PATTERN.sub("?", text)
+    text = _NUMBER_PATTERN.sub("?", text)
+    text = _VALUE_LIST_PATTERN.sub("(?)", text)
+    text = _VALUE_ROWS_PATTERN.sub("(?)", text)
+    return text.rstrip("; ")
+
+
+def fingerprint_id(text: str) -> str:
+    """Короткий идентификатор отпечатка для отчётов."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+
+
+def _format_sqlite_plan(rows) -> List[str]:
+    """Строки EXPLAIN QUERY PLAN (id, parent, notused, detail) -> дерево с отступами."""
+    depth = {0: -1}
+    lines = []
+    for row in rows:
+        node_id, parent_id, detail = row[0], row[1], row[3]
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def _new_stats(text: str, sample: str) -> dict:
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    return {
+        "id": fingerprint_id(text),
+        "fingerprint": text,
+        "sample": sample[:MAX_SAMPLE_LENGTH],
+        "count": 0,
+        "errors": 0,
+        "slow": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "rows_total": 0,
+        "vm_steps": 0,
+        "trigger_events": 0,
+        "first_seen": now,
+        "last_seen": now,
+        "plan": None,
+    }
+
+
+class QueryTracer:
+    """Сборщик статистики запросов по отпечаткам. Потокобезопасен."""
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS, explain: bool = True):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+        self._explained_at: Dict[str, float] = {}
+
+    def install(self, manager):
+        """Подключает трассировку к менеджеру БД (SQLite или PostgreSQL)."""
+        install_connection_tracing(manager, self.record, self._on_connect)
+
+    # --- Сбор ---
+
+    def _on_connect(self, connection: TracedConnection):
+        raw_connection = connection.raw_connection
+        if not isinstance(raw_connection, sqlite3.Connection):
+            return
+        # [шаги ВМ / PROGRESS_STEPS, события трассировки] с момента последнего запроса
+        counters = [0, 0]
+        connection.trace_state["query_tracer"] = counters
+
+        def on_progress():
+            counters[0] += 1
+            return 0
+
+        def on_trace(statement):
+            if not _TRANSACTION_PATTERN.match(statement):
+                counters[1] += 1
+
+        raw_connection.set_progress_handler(on_progress, PROGRESS_STEPS)
+        raw_connection.set_trace_callback(on_trace)
+
+    @staticmethod
+    def _take_counters(connection: TracedConnection):
+        counters = connection.trace_state.get("query_tracer")
+        if counters is None:
+            return 0, 0
+        steps, trace_events = counters
+        counters[0] = counters[1] = 0
+        # Одно событие трассировки - сам запрос, остальные - события программ триггеров: SQLite
+        # сообщает о входе в каждый сработавший триггер и о каждом его операторе (триггер из N
+        # операторов даёт N + 1 событие). sqlite3 передаёт в trace callback текст внешнего запроса,
+        # поэтому вход в триггер от оператора не отличить - считаются события, а не операторы.
+        return steps * PROGRESS_STEPS, max(0, trace_events - 1)
+
+    def record(self, event: StatementEvent):
+        """Подписчик перехвата SQL."""
+        elapsed_ms = event.seconds * 1000
+        vm_steps, trigger_events = self._take_counters(event.connection)
+        text = fingerprint(event.statement)
+        slow = elapsed_ms >= self.slow_ms
+        with self._lock:
+            stats = self._stats.get(text)
+            if stats is None:
+                stats = self._stats[text] = _new_stats(text, event.statement)
+            stats["count"] += 1
+            stats["errors"] += event.failed
+            stats["slow"] += slow
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["rows_total"] += event.rows
+            stats["vm_steps"] += vm_steps
+            stats["trigger_events"] += trigger_events
+            stats["last_seen"] = datetime.datetime.now().isoformat(timespec="seconds")
+            need_plan = self._need_plan(text, stats, elapsed_ms, event) if slow else False
+        if not slow:
+            return
+        logger.warning(f"Медленный запрос [{stats['id']}] {elapsed_ms:.1f} мс: {text[:200]}")
+        if need_plan:
+            plan = self._explain(event)
+            # Шаги и трассировка самого EXPLAIN не относятся к следующему запросу
+            self._take_counters(event.connection)
+            if plan is not None:
+                with self._lock:
+                    stats["plan"] = plan
+
+    def _need_plan(self, text: str, stats: dict, elapsed_ms: float, event: StatementEvent) -> bool:
+        if not self.explain or event.failed or not _EXPLAINABLE_PATTERN.match(event.statement):
+            return False
+        now = time.monotonic()
+        if now - self._explained_at.get(text, -EXPLAIN_INTERVAL_SECONDS) < EXPLAIN_INTERVAL_SECONDS:
+            return False
+        if stats["plan"] is not None and elapsed_ms <= stats["plan"]["ms"]:
+            return False
+        self._explained_at[text] = now
+        return True
+
+    def _explain(self, event: StatementEvent) -> Optional[dict]:
+        raw_connection = event.connection.raw_connection
+        try:
+            if isinstance(raw_connection, sqlite3.Connection):
+                backend = "sqlite"
+                parameters = event.parameters if event.parameters is not None else ()
+                lines = _format_sqlite_plan(
+                    raw_connection.execute(f"EXPLAIN QUERY PLAN {event.statement}", parameters).fetchall())
+            else:
+                backend = "postgresql"
+                lines = self._explain_postgres(raw_connection, event)
+                if lines is None:
+                    return None
+        except Exception as e:
+            logger.error(f"Не удалось получить план запроса: {e}")
+            return None
+        return {
+            "captured_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "ms": round(event.seconds * 1000, 3),
+            "backend": backend,
+            "lines": lines,
+        }
+
+    @staticmethod
+    def _explain_postgres(raw_connection, event: StatementEvent) -> Optional[List[str]]:
+        """
+        EXPLAIN в точке сохранения (или отдельной транзакции в autocommit) с откатом: ANALYZE
+        выполняет запрос повторно, а функции в SELECT могут менять данные.
+        """
+        from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+
+        if raw_connection.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+            return None
+        analyze = not _WRITE_PATTERN.search(event.statement)
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        begin, rollback, release = (
+            ("BEGIN;", "ROLLBACK;", None) if raw_connection.autocommit else
+            ("SAVEPOINT query_tracer_explain;", "ROLLBACK TO SAVEPOINT query_tracer_explain;",
+             "RELEASE SAVEPOINT query_tracer_explain;")
+        )
+        with raw_connection.cursor() as cursor:
+            cursor.execute(begin)
+            try:
+                cursor.execute(prefix + event.statement, event.parameters)
+                rows = cursor.fetchall()
+            finally:
+                cursor.execute(rollback)
+                if release:
+                    cursor.execute(release)
+        return [row[0] if isinstance(row, (list, tuple)) else next(iter(row.values())) for row in rows]
+
+    # --- Результаты ---
+
+    def snapshot(self, sort: str = "total_ms") -> List[dict]:
+        """Статистика по отпечаткам, по убыванию sort (один из SORT_KEYS)."""
+        with self._lock:
+            items = [dict(stats) for stats in self._stats.values()]
+        for item in items:
+            item["total_ms"] = round(item["total_ms"], 3)
+            item["max_ms"] = round(item["max_ms"], 3)
+            item["mean_ms"] = round(item["total_ms"] / item["count"], 3) if item["count"] else 0.0
+        items.sort(key=lambda item: item[sort], reverse=True)
+        return items
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._explained_at.clear()
+
+    def load(self, path: str) -> bool:
+        """Продолжает статистику из файла прошлых запусков (если он есть)."""
+        if not Path(path).exists():
+            return False
+        items = load_trace(path)
+        if items is None:
+            return False
+        with self._lock:
+            for item in items:
+                stats = self._stats.setdefault(item["fingerprint"], _new_stats(item["fingerprint"], item["sample"]))
+                for key in ("count", "errors", "slow", "total_ms", "rows_total", "vm_steps", "trigger_events"):
+                    stats[key] += item.get(key, 0)
+                # Файлы прошлых версий хранят тот же счётчик под старым именем
+                stats["trigger_events"] += item.get("trigger_statements", 0)
+                stats["max_ms"] = max(stats["max_ms"], item.get("max_ms", 0.0))
+                stats["first_seen"] = min(stats["first_seen"], item.get("first_seen", stats["first_seen"]))
+                if stats["plan"] is None:
+                    stats["plan"] = item.get("plan")
+        return True
+
+    def save(self, path: str) -> bool:
+        """Сохраняет статистику в JSON (перезаписывая файл). :return: True при успехе."""
+        document = {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "slow_ms": self.slow_ms,
+            "fingerprints": self.snapshot(),
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Ошибка сохранения трассировки запросов в {path}: {e}")
+            return False
+
+
+def load_trace(path: str) -> Optional[List[dict]]:
+    """Статистика по отпечаткам из файла QueryTracer.save или None при ошибке."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["fingerprints"]
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Ошибка чтения трассировки запросов {path}: {e}")
+        return None
@@ -0,0 +1,208 @@
+# diagnostics/stall_watchdog.py
+"""
+Сторожевой таймер зависаний цикла событий Qt (включается флагом --watchdog).
+
+В главном потоке тикает таймер-пульс; по разнице между фактическим и заданным интервалом
+считается задержка цикла событий. Отдельный поток следит за временем последнего пульса: если
+пульса нет дольше порога, главный поток занят (долгий запрос, построение отчёта, печать), и
+сторож снимает его Python-стек через sys._current_frames - повторно, пока зависание длится
+(различающиеся стеки, не больше MAX_SAMPLES_PER_STALL). Когда пульс возвращается, зависание
+с длительностью и стеками записывается в скользящий журнал (в памяти и в файле с ротацией).
+"""
+import datetime
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_MS = 100
+DEFAULT_THRESHOLD_MS = 500
+DEFAULT_STALL_LOG_SIZE = 100
+
+# Сколько различных стеков снимать за одно зависание
+MAX_SAMPLES_PER_STALL = 5
+
+# Сколько последних задержек пульса хранить для p95 (при 100 мс - около минуты)
+LAG_WINDOW = 600
+
+# Ротация файла журнала зависаний: размер файла и число архивных копий
+STALL_LOG_MAX_BYTES = 1024 * 1024
+STALL_LOG_BACKUP_COUNT = 3
+
+
+def _frame_location(frame) -> str:
+    return f"{frame.f_code.co_filename}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+class StallWatchdog(QObject):
+    """
+    Сторож цикла событий. Создаётся и запускается в главном (GUI) потоке.
+    Сигнал stallDetected(dict) испускается в главном потоке после завершения зависания.
+    """
+    stallDetected = Signal(dict)
+
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS, heartbeat_ms: int = DEFAULT_HEARTBEAT_MS,
+                 log_path: Optional[str] = None, log_size: int = DEFAULT_STALL_LOG_SIZE, parent=None):
+        super().__init__(parent)
+        self.threshold_ms = threshold_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.log_path = log_path
+        self._main_thread_id = threading.get_ident()
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._pending = None  # Зависание, которое сейчас наблюдает поток сторожа
+        self._stalls = deque(maxlen=log_size)
+        self._lags_ms = deque(maxlen=LAG_WINDOW)
+        self._max_lag_ms = 0.0
+        self._beats = 0
+        self._started_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._file_logger = None
+        if log_path:
+            handler = RotatingFileHandler(log_path, maxBytes=STALL_LOG_MAX_BYTES,
+                                          backupCount=STALL_LOG_BACKUP_COUNT, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._file_logger = logging.getLogger(f"{__name__}.file")
+            self._file_logger.propagate = False
+            self._file_logger.setLevel(logging.INFO)
+            self._file_logger.addHandler(handler)
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setTimerType(Qt.PreciseTimer)
+        self._heartbeat.setInterval(heartbeat_ms)
+        self._heartbeat.timeout.connect(self._on_heartbeat)
+
+    # --- Управление ---
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._started_at = datetime.datetime.now()
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name="StallWatchdog", daemon=True)
+        self._thread.start()
+        self._heartbeat.start()
+        logger.info(f"Сторож цикла событий запущен: пульс {self.heartbeat_ms} мс, порог {self.threshold_ms} мс.")
+
+    def stop(self):
+        self._heartbeat.stop()
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    # --- Главный поток: пульс ---
+
+    def _on_heartbeat(self):
+        now = time.monotonic()
+        with self._lock:
+            previous = self._last_beat
+            self._last_beat = now
+            pending = self._pending if self._pending and self._pending["beat"] == previous else None
+            self._pending = None
+        gap_ms = (now - previous) * 1000
+        lag_ms = max(0.0, gap_ms - self.heartbeat_ms)
+        self._beats += 1
+        self._lags_ms.append(lag_ms)
+        self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+        if gap_ms < self.threshold_ms:
+            return
+        # Зависание закончилось; стеков может не быть, если оно короче периода проверки сторожа
+        stall = {
+            "started_at": (datetime.datetime.now() - datetime.timedelta(milliseconds=gap_ms))
+            .isoformat(timespec="milliseconds"),
+            "duration_ms": round(gap_ms, 1),
+            "samples": list(pending["samples"]) if pending else [],
+        }
+        self._stalls.append(stall)
+        self._log_stall(stall)
+        self.stallDetected.emit(stall)
+
+    def _log_stall(self, stall: dict):
+        location = stall["samples"][0]["location"] if stall["samples"] else "стек не снят"
+        logger.warning(f"Цикл событий заблокирован на {stall['duration_ms']:.0f} мс: {location}")
+        if self._file_logger is not None:
+            lines = [f"{stall['started_at']} зависание {stall['duration_ms']:.0f} мс"]
+            for sample in stall["samples"]:
+                lines.append(f"  через {sample['after_ms']:.0f} мс:")
+                lines.extend(f"    {line}" for entry in sample["stack"] for line in entry.rstrip().splitlines())
+            self._file_logger.info("\n".join(lines))
+
+    # --- Поток сторожа ---
+
+    def _watch(self):
+        check_interval = min(self.threshold_ms, self.heartbeat_ms) / 2000
+        while not self._stop_event.wait(check_interval):
+            now = time.monotonic()
+            with self._lock:
+                last_beat = self._last_beat
+                pending = self._pending
+            blocked_ms = (now - last_beat) * 1000
+            if blocked_ms < self.threshold_ms:
+                continue
+            if pending is None or pending["beat"] != last_beat:
+                pending = {"beat": last_beat, "samples": [], "next_sample_ms": 0.0}
+            if blocked_ms >= pending["next_sample_ms"] and len(pending["samples"]) < MAX_SAMPLES_PER_STALL:
+                self._sample(pending, blocked_ms)
+            with self._lock:
+                # Пульс мог вернуться, пока снимался стек - тогда зависание уже закрыто
+                if self._last_beat == last_beat:
+                    self._pending = pending
+
+    def _sample(self, pending: dict, blocked_ms: float):
+        frame = sys._current_frames().get(self._main_thread_id)
+        pending["next_sample_ms"] = blocked_ms + self.threshold_ms
+        if frame is None:
+            return
+        stack = traceback.format_stack(frame)
+        if pending["samples"] and pending["samples"][-1]["stack"] == stack:
+            return
+        pending["samples"].append({
+            "after_ms": round(blocked_ms, 1),
+            "location": _frame_location(frame),
+            "stack": stack,
+        })
+
+    # --- Результаты ---
+
+    def snapshot(self) -> dict:
+        """Задержка цикла событий (текущая, p95 за окно, максимум) и журнал зависаний."""
+        lags = sorted(self._lags_ms)
+        return {
+            "started_at": self._started_at.isoformat(timespec="seconds") if self._started_at else None,
+            "heartbeat_ms": self.heartbeat_ms,
+            "threshold_ms": self.threshold_ms,
+            "beats": self._beats,
+            "lag_ms": round(self._lags_ms[-1], 1) if self._lags_ms else 0.0,
+            "lag_p95_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.95))], 1) if lags else 0.0,
+            "lag_max_ms": round(self._max_lag_ms, 1),
+            "stalls": list(self._stalls),
+        }
+
+    def reset(self):
+        self._stalls.clear()
+        self._lags_ms.clear()
+        self._max_lag_ms = 0.0
+        self._beats = 0
+
+    def dump_json(self, path: str) -> bool:
+        """Сохраняет snapshot() в JSON-файл. :return: True при успехе."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Ошибка сохранения журнала зависаний в {path}: {e}")
+            return False
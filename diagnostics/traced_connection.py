@@ -0,0 +1,249 @@
+# diagnostics/traced_connection.py
+"""
+Перехват SQL-запросов менеджеров БД для диагностики.
+
+install_connection_tracing подменяет _get_connection менеджера (SQLite или PostgreSQL): соединения
+возвращаются обёрнутыми в TracedConnection, курсоры - в TracedCursor. Остальные атрибуты
+(row_factory, commit, with-блоки) делегируются исходным объектам, поэтому код менеджеров
+не меняется. Без установки перехвата накладных расходов нет.
+
+Время запроса - это execute/executemany/executescript плюс чтение его строк (fetch*, итерация):
+SQLite выполняет SELECT по мере чтения, поэтому одного execute мало. Подписчики получают
+StatementEvent, когда запрос дочитан, курсор закрыт или уже выполняется следующий запрос.
+"""
+import logging
+import time
+from typing import Any, Callable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StatementEvent(NamedTuple):
+    """Выполненный запрос."""
+    statement: str
+    seconds: float
+    parameters: Any  # Как переданы в execute; для executemany - первый набор
+    rows: int  # Прочитано строк
+    failed: bool
+    connection: "TracedConnection"
+
+
+# Подписчик на выполненные запросы; вызывается в потоке, выполнившем запрос
+StatementListener = Callable[[StatementEvent], None]
+# Обработчик нового соединения (например, установка обратных вызовов sqlite3)
+ConnectHook = Callable[["TracedConnection"], None]
+
+
+def statement_text(statement, cursor=None) -> str:
+    """Текст запроса: str, bytes (psycopg2 execute_values) или psycopg2.sql.Composed."""
+    if isinstance(statement, bytes):
+        return statement.decode("utf-8", errors="replace")
+    if cursor is not None and hasattr(statement, "as_string"):
+        return statement.as_string(cursor)
+    return str(statement)
+
+
+class _PendingStatement:
+    __slots__ = ("statement", "parameters", "seconds", "rows", "failed")
+
+    def __init__(self, statement, parameters, seconds: float, failed: bool):
+        self.statement = statement
+        self.parameters = parameters
+        self.seconds = seconds
+        self.rows = 0
+        self.failed = failed
+
+
+class TracedCursor:
+    """Курсор, замеряющий запросы вместе с чтением их строк."""
+
+    def __init__(self, cursor, connection: "TracedConnection"):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_traced_connection", connection)
+        object.__setattr__(self, "_pending", None)
+
+    def _finish(self):
+        pending = self._pending
+        if pending is None:
+            return
+        object.__setattr__(self, "_pending", None)
+        event = StatementEvent(statement_text(pending.statement, self._cursor), pending.seconds,
+                               pending.parameters, pending.rows, pending.failed, self._traced_connection)
+        for listener in self._traced_connection._listeners:
+            try:
+                listener(event)
+            except Exception as e:  # Диагностика не должна ломать запрос
+                logger.error(f"Ошибка подписчика перехвата SQL: {e}")
+
+    def _timed(self, method_name: str, statement, parameters=None, *args, **kwargs):
+        self._finish()
+        call_args = (statement,) if parameters is None else (statement, parameters)
+        started = time.perf_counter()
+        failed = False
+        try:
+            result = getattr(self._cursor, method_name)(*call_args, *args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if method_name == "executemany" and parameters is not None:
+                parameters = next(iter(parameters), None) if isinstance(parameters, (list, tuple)) else None
+            object.__setattr__(self, "_pending", _PendingStatement(
+                statement, parameters, time.perf_counter() - started, failed))
+            # Запросы без строк (изменения, DDL, ошибки) завершаются сразу
+            if failed or method_name != "execute" or self._cursor.description is None:
+                self._finish()
+        # sqlite3 возвращает сам курсор (conn.execute(...).fetchall()) - отдаём обёртку
+        return self if result is self._cursor else result
+
+    def execute(self, statement, parameters=None, *args, **kwargs):
+        return self._timed("execute", statement, parameters, *args, **kwargs)
+
+    def executemany(self, statement, parameters, *args, **kwargs):
+        return self._timed("executemany", statement, parameters, *args, **kwargs)
+
+    def executescript(self, script):
+        return self._timed("executescript", script)
+
+    def _fetch(self, method_name: str, *args):
+        started = time.perf_counter()
+        result = getattr(self._cursor, method_name)(*args)
+        pending = self._pending
+        if pending is not None:
+            pending.seconds += time.perf_counter() - started
+            if method_name == "fetchone":
+                pending.rows += result is not None
+            else:
+                pending.rows += len(result)
+        return result
+
+    def fetchone(self):
+        row = self._fetch("fetchone")
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._fetch("fetchmany", *args)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch("fetchall")
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        iterator = iter(self._cursor)
+        while True:
+            started = time.perf_counter()
+            try:
+                row = next(iterator)
+            except StopIteration:
+                self._finish()
+                return
+            finally:
+                pending = self._pending
+                if pending is not None:
+                    pending.seconds += time.perf_counter() - started
+            if pending is not None:
+                pending.rows += 1
+            yield row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __del__(self):
+        # Курсор, дочитанный не до конца (conn.execute(...).fetchone()), завершается при удалении
+        if object.__getattribute__(self, "__dict__").get("_pending") is not None:
+            self._finish()
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._finish()
+        return self._cursor.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+
+class TracedConnection:
+    """
+    Соединение, выдающее TracedCursor; сокращения sqlite3 (conn.execute) тоже замеряются.
+    trace_state - место для состояния подписчиков, привязанного к соединению.
+    """
+
+    def __init__(self, connection, listeners: List[StatementListener]):
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "_listeners", listeners)
+        object.__setattr__(self, "trace_state", {})
+
+    @property
+    def raw_connection(self):
+        return self._connection
+
+    def cursor(self, *args, **kwargs):
+        return TracedCursor(self._connection.cursor(*args, **kwargs), self)
+
+    def execute(self, statement, *args, **kwargs):
+        return self.cursor().execute(statement, *args, **kwargs)
+
+    def executemany(self, statement, *args, **kwargs):
+        return self.cursor().executemany(statement, *args, **kwargs)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._connection.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection, name, value)
+
+
+def install_connection_tracing(manager, listener: StatementListener, on_connect: Optional[ConnectHook] = None):
+    """
+    Подписывает listener на все запросы менеджера БД, on_connect - на новые соединения.
+    _get_connection подменяется один раз, повторные вызовы только добавляют подписчиков.
+    Постоянное соединение PostgreSQL (manager.connection) заменяется обёрткой, чтобы
+    перехватывались и методы, которые обращаются к нему напрямую.
+    """
+    tracing = manager.__dict__.get("_statement_tracing")
+    if tracing is None:
+        tracing = manager._statement_tracing = {"listeners": [], "connect_hooks": []}
+        listeners, connect_hooks = tracing["listeners"], tracing["connect_hooks"]
+        original_get_connection = manager._get_connection
+
+        def _get_connection(*args, **kwargs):
+            connection = original_get_connection(*args, **kwargs)
+            if connection is None or isinstance(connection, TracedConnection):
+                return connection
+            traced = TracedConnection(connection, listeners)
+            for hook in connect_hooks:
+                try:
+                    hook(traced)
+                except Exception as e:
+                    logger.error(f"Ошибка обработчика нового соединения: {e}")
+            if getattr(manager, "connection", None) is connection:
+                manager.connection = traced
+            return traced
+
+        manager._get_connection = _get_connection
+    tracing["listeners"].append(listener)
+    if on_connect is not None:
+        tracing["connect_hooks"].append(on_connect)
@@ -12,6 +12,11 @@ import traceback
 from pathlib import Path
 from typing import Any, Dict, Optional, Set
 
+# =============================================================================
+# СТОРОННИЕ БИБЛИОТЕКИ
+# =============================================================================
+import numpy as np
+
 # =============================================================================
 # БИБЛИОТЕКА PYSIDE6 - ОСНОВНЫЕ МОДУЛИ
 # =============================================================================
@@ -21,7 +26,7 @@ from PySide6.QtCharts import QChart, QChartView, QPieSeries, QPieSlice
 
 # Базовые классы и утилиты Qt Core
 from PySide6.QtCore import (
-    QDateTime, QObject, Property, QSettings, QTimer,
+    QObject, Property, QSettings, QThread, QTimer,
     QUrl, Qt, Signal, Slot
 )
 
@@ -43,12 +48,23 @@ from PySide6.QtWidgets import (
 )
 
 from notifications.notification_container_widget import NotificationContainerWidget
+from notifications.notified_state import NOTIFICATION_TYPE_BITS, NotifiedStateCache
+from notifications.deadline_evaluator import (
+    VECTORIZED_MIN_ACTIONS, REMINDER_THRESHOLD_SECONDS, evaluate_deadlines, to_epoch_array,
+)
+from reports.execution_report import ReportCache, action_statistics, render_execution_report
+from reports.docx_export_worker import DocxExportWorker
+from reports.pdf_report_worker import PdfReportWorker
+from reports.performance_analytics import performance_report
+from time_service import TimeService, ZONE_SYSTEM, ZONE_LOCAL, ZONE_MOSCOW
 # =============================================================================
 # ЛОКАЛЬНЫЕ МОДУЛИ ПРИЛОЖЕНИЯ
 # =============================================================================
 
 # Менеджеры базы данных
 from db.sqlite_database_manager import SQLiteDatabaseManager  # Основная БД SQLite
+from db.archive_worker import ArchiveWorker                 # Фоновая архивация выполнений
+from db.records import page_to_maps, records_to_maps         # Записи строк БД -> словари для QML
 from db.sqlite_config import SQLiteConfigManager            # Конфигурация в SQLite
 from werkzeug.security import check_password_hash
 
@@ -80,6 +96,10 @@ class ApplicationData(QObject):
     fontFamilyChanged = Signal()
     fontSizeChanged = Signal()
     fontStyleChanged = Signal()
+    # --- СИГНАЛЫ ФОНОВОЙ ВЫГРУЗКИ ОТЧЁТОВ (PDF, DOCX) ---
+    reportExportRunningChanged = Signal()
+    reportExportProgress = Signal(int, int)   # (готово, всего)
+    reportExportFinished = Signal(bool, str)  # (успешно, сообщение для пользователя)
 
     def load_initial_settings(self):
         """Загружает начальные настройки при запуске приложения"""
@@ -127,6 +147,7 @@ class ApplicationData(QObject):
 
                     if updated_time_props:
                         print("Python: Некоторые настройки времени обновлены из БД.")
+                        self.time_service.set_offsets(self._custom_time_offset_seconds, self._moscow_time_offset_seconds)
                         # Принудительно обновляем рассчитываемые времена
                         self.update_time()
                         # Уведомляем QML об изменении настроек времени
@@ -202,6 +223,10 @@ class ApplicationData(QObject):
                         print(f"Python: Загружен sound_enabled: {self._sound_enabled}")
                     # --- ---
 
+                    if settings.get('archive_after_days') is not None:
+                        self._archive_after_days = int(settings['archive_after_days'])
+                        print(f"Python: Загружен archive_after_days: {self._archive_after_days}")
+
                     if updated_appearance_props:
                         self.fontFamilyChanged.emit()
                         self.fontSizeChanged.emit()
@@ -240,8 +265,11 @@ class ApplicationData(QObject):
         # --- Инициализация свойств (временно из заглушек, позже из БД) ---
         self._workplace_name = "Рабочее место дежурного"
         self._duty_officer = "Не выбран"
-        self._current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
-        self._current_date = QDateTime.currentDateTime().toString("dd.MM.yyyy")
+        # Единый источник текущего времени (часы, проверка дедлайнов, отчёты)
+        self.time_service = TimeService()
+        now_system = self.time_service.now_datetime(ZONE_SYSTEM)
+        self._current_time = now_system.strftime("%H:%M:%S")
+        self._current_date = now_system.strftime("%d.%m.%Y")
         self._post_number = "1"  # Значение по умолчанию
         self._post_name = "Дежурство по части"  # Значение по умолчанию
                 # --- НОВЫЕ свойства для времени ---
@@ -273,6 +301,28 @@ class ApplicationData(QObject):
         self._use_persistent_reminders = False
         self._sound_enabled = False
         # --- ---
+        # Срок (в днях), после которого завершённые выполнения переносятся в архив; 0 - не архивировать
+        self._archive_after_days = 180
+        # Фоновая архивация при запуске: поток и исполнитель (None - не выполняется)
+        self._archive_thread: Optional[QThread] = None
+        self._archive_worker: Optional[ArchiveWorker] = None
+        # Фоновая выгрузка отчётов (PDF, DOCX): поток и исполнитель текущей выгрузки (None - не выполняется)
+        self._report_export_thread: Optional[QThread] = None
+        self._report_export_worker = None  # PdfReportWorker или DocxExportWorker
+        self._report_export_unit = "отчётов"
+        # Готовые HTML-отчёты по выполнениям и разобранный документ последнего отчёта (html, QTextDocument)
+        self._report_cache = ReportCache()
+        self._report_document = None
+        # Открытые окна временных диаграмм: execution_id -> ExecutionTimelineWidget
+        self._timeline_windows: Dict[int, QObject] = {}
+        # Диагностика: профилирование вызовов (--profile), сторож цикла событий (--watchdog),
+        # трассировка SQL (--trace-sql) и окно диагностики; None - выключено
+        self.call_profiler = None
+        self.stall_watchdog = None
+        self.query_tracer = None
+        self._query_trace_path = None
+        self._query_trace_timer = None
+        self._diagnostics_panel = None
 
         # Загружаем начальные настройки
         self.load_initial_settings()
@@ -288,15 +338,56 @@ class ApplicationData(QObject):
         # Подключаемся к сигналу, когда объекты QML созданы
         self.engine.objectCreated.connect(self.on_qml_objects_created)
         # --- Атрибуты для уведомлений ---
-        # Хранит ID action_executions, для которых было показано уведомление определенного типа
-        # Формат: {action_exec_id: set(status_types)}
-        self._notified_action_executions: Dict[int, Set[str]] = {}
+        # Уже показанные уведомления: хранятся в БД (action_execution_notifications),
+        # в памяти - ограниченный LRU битовых масок для активных действий
+        self._notified_state = NotifiedStateCache(self.database_manager)
         self._notification_timer: Optional[QTimer] = None
         self._sound_approaching: Optional[QSoundEffect] = None
         self._sound_overdue: Optional[QSoundEffect] = None
         # --- ИНИЦИАЛИЗАЦИЯ КОНТЕЙНЕРА УВЕДОМЛЕНИЙ ---
         self.notification_container = NotificationContainerWidget()
 
+        # Архивация старых выполнений - после запуска, чтобы не задерживать отображение окна
+        QTimer.singleShot(5000, self.archive_old_executions)
+
+    def archive_old_executions(self):
+        """
+        Переносит в архив завершённые выполнения старше archive_after_days дней.
+        Перенос идёт в отдельном потоке (ArchiveWorker), интерфейс не блокируется.
+        """
+        if not self.database_manager or self._archive_after_days <= 0 or self._archive_thread is not None:
+            return
+        worker = ArchiveWorker(self.database_manager, self._archive_after_days)
+        thread = QThread()
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        # Сигнал исполнителя приходит в поток интерфейса через очередь событий
+        worker.finished.connect(self._on_archive_finished)
+        self._archive_worker = worker
+        self._archive_thread = thread
+        thread.start()
+
+    def _on_archive_finished(self, archived_count: int):
+        if self._archive_thread is None:
+            return
+        self.stop_archiving()
+        if archived_count > 0:
+            # Перенесённые выполнения снова видны истории: архив подключается в потоке интерфейса
+            self.database_manager.activate_archive()
+            print(f"Python: В архив перенесено выполнений: {archived_count}")
+        elif archived_count < 0:
+            print("Python: Ошибка при архивации старых выполнений. Подробности в журнале.")
+
+    def stop_archiving(self):
+        """Дожидается завершения фоновой архивации и освобождает поток (в том числе при выходе из приложения)."""
+        thread = self._archive_thread
+        if thread is None:
+            return
+        thread.quit()
+        thread.wait()
+        self._archive_worker = None
+        self._archive_thread = None
+
 
 
     def on_qml_objects_created(self, obj, url):
@@ -332,6 +423,10 @@ class ApplicationData(QObject):
         tray_menu.addAction(restore_action)
         tray_menu.addAction(minimize_action)
         tray_menu.addAction(maximize_action)
+        if any(tool is not None for tool in (self.call_profiler, self.stall_watchdog, self.query_tracer)):
+            diagnostics_action = QAction("Диагностика…", tray_menu)
+            diagnostics_action.triggered.connect(self.showDiagnosticsPanel)
+            tray_menu.addAction(diagnostics_action)
         tray_menu.addSeparator()
         tray_menu.addAction(quit_action)
 
@@ -342,12 +437,12 @@ class ApplicationData(QObject):
 
     def update_time(self):
         """Обновляет текущее время, местное время и московское время."""
-        now_system = QDateTime.currentDateTime() # Время системы QDateTime
+        now_system = self.time_service.now_datetime(ZONE_SYSTEM) # Системное время
         
         # --- Обновляем основное (системное) время и ДАТУ ---
-        self._current_time = now_system.toString("hh:mm:ss")
+        self._current_time = now_system.strftime("%H:%M:%S")
         # --- ОБНОВЛЕНО: Обновляем и системную дату ---
-        self._current_date = now_system.toString("dd.MM.yyyy") 
+        self._current_date = now_system.strftime("%d.%m.%Y")
         # --- ---
         self.currentTimeChanged.emit()
         # --- ОБНОВЛЕНО: Эмитируем сигнал о смене системной даты ---
@@ -355,11 +450,11 @@ class ApplicationData(QObject):
         # --- ---
 
         # --- Рассчитываем и обновляем местное время и ДАТУ ---
-        # Создаем QDateTime для местного времени на основе системного
-        local_dt = now_system.addSecs(self._custom_time_offset_seconds)
-        self._local_time = local_dt.toString("hh:mm:ss")
+        # Местное время = системное + custom_time_offset_seconds (смещение хранит time_service)
+        local_dt = self.time_service.now_datetime(ZONE_LOCAL)
+        self._local_time = local_dt.strftime("%H:%M:%S")
         # --- НОВОЕ: Рассчитываем и обновляем местную дату ---
-        self._local_date = local_dt.toString("dd.MM.yyyy") 
+        self._local_date = local_dt.strftime("%d.%m.%Y")
         # --- ---
         self.localTimeChanged.emit()
         # --- НОВОЕ: Эмитируем сигнал о смене местной даты ---
@@ -367,11 +462,11 @@ class ApplicationData(QObject):
         # --- ---
 
         # --- Рассчитываем и обновляем московское время и ДАТУ ---
-        # Создаем QDateTime для московского времени на основе системного
-        moscow_dt = now_system.addSecs(self._moscow_time_offset_seconds)
-        self._moscow_time = moscow_dt.toString("hh:mm:ss")
+        # Московское время = системное + moscow_time_offset_seconds
+        moscow_dt = self.time_service.now_datetime(ZONE_MOSCOW)
+        self._moscow_time = moscow_dt.strftime("%H:%M:%S")
         # --- НОВОЕ: Рассчитываем и обновляем московскую дату ---
-        self._moscow_date = moscow_dt.toString("dd.MM.yyyy") 
+        self._moscow_date = moscow_dt.strftime("%d.%m.%Y")
         # --- ---
         self.moscowTimeChanged.emit()
         # --- НОВОЕ: Эмитируем сигнал о смене московской даты ---
@@ -803,12 +898,17 @@ class ApplicationData(QObject):
                         print(f"Python: Обновлен _sound_enabled: {self._sound_enabled}")
                         # updated_props или другой флаг можно добавить, если нужно уведомлять QML об этом изменении
 
+                    if new_settings.get('archive_after_days') is not None:
+                        self._archive_after_days = int(new_settings['archive_after_days'])
+                        print(f"Python: Обновлен _archive_after_days: {self._archive_after_days}")
+
                     if updated_properties:
                         print("Python: Локальные свойства обновлены.")
                         self.settingsChanged.emit()
                         # --- Если изменялись настройки времени, обновляем рассчитываемые времена ---
                         if updated_time_props:
                             print("Python: Обнаружены изменения настроек времени. Пересчет localTime/moscowTime...")
+                            self.time_service.set_offsets(self._custom_time_offset_seconds, self._moscow_time_offset_seconds)
                             self.update_time() # Пересчитываем localTime и moscowTime
                         # --- ---
                         # Уведомляем QML об общем изменении настроек (если нужно)
@@ -1221,13 +1321,7 @@ class ApplicationData(QObject):
                     {'id': 2, 'name': 'Алгоритм 2 (заглушка)', 'category': 'кризисные ситуации', 'time_type': 'астрономическое', 'description': 'Описание алгоритма 2'},
                 ]
             print(f"Python: QML запросил список алгоритмов. Найдено: {len(algorithms)}")
-            result = []
-            for alg in algorithms:
-                if isinstance(alg, dict):
-                    result.append(alg)
-                else:
-                    result.append(dict(alg))
-            return result
+            return records_to_maps(algorithms)
         except Exception as e:
             print(f"Python: Ошибка при получении списка алгоритмов: {e}")
             import traceback
@@ -1445,6 +1539,20 @@ class ApplicationData(QObject):
             traceback.print_exc()
             return []
 
+    @Slot(int, result=list)
+    def getActionSummariesByAlgorithmId(self, algorithm_id: int) -> list:
+        """
+        Сводный список действий алгоритма для QML: только описание и смещения.
+        Полные данные действия - getActionById при открытии на редактирование.
+        """
+        if not isinstance(algorithm_id, int) or algorithm_id <= 0:
+            print(f"Python: Ошибка - Некорректный ID алгоритма: {algorithm_id}")
+            return []
+        if not self.database_manager:
+            print("Python: Ошибка - Нет подключения к БД SQLite.")
+            return []
+        return self.database_manager.get_actions_by_algorithm_id(algorithm_id, summary=True)
+
     @Slot(int, result='QVariant')
     def getActionById(self, action_id: int) -> 'QVariant':
         """Возвращает данные действия по ID."""
@@ -1723,8 +1831,8 @@ class ApplicationData(QObject):
                 executions = self.database_manager.get_executions_by_date(date_string)
                 if executions and isinstance(executions, list):
                     print(f"Python: Получен список {len(executions)} execution'ов за дату '{date_string}' из БД.")
-                    # Возвращаем как есть, QML сам преобразует QVariantList в JS Array
-                    return executions 
+                    # Записи -> словари: QML преобразует QVariantList of QVariantMap в JS Array
+                    return records_to_maps(executions)
                 else:
                     print(f"Python: Не найдено execution'ов за дату '{date_string}' или ошибка получения.")
                     return []
@@ -1737,6 +1845,25 @@ class ApplicationData(QObject):
             print("Python: Ошибка - Нет подключения к БД SQLite.")
             return []
 
+    @Slot(str, str, int, result='QVariantMap')
+    def getExecutionsByDatePage(self, date_string: str, after_key: str, after_id: int) -> dict:
+        """
+        Возвращает страницу execution'ов за дату (keyset-пагинация, порядок started_at, id по убыванию).
+        :param date_string: Дата в формате 'YYYY-MM-DD'.
+        :param after_key: next_key предыдущей страницы ('' - первая страница).
+        :param after_id: next_id предыдущей страницы.
+        :return: {"items": [...], "has_more": bool, "next_key": str, "next_id": int}.
+        """
+        if not self.database_manager or not date_string:
+            return {"items": [], "has_more": False, "next_key": "", "next_id": 0}
+        try:
+            return page_to_maps(self.database_manager.get_executions_by_date_page(date_string, after_key, after_id))
+        except Exception as e:
+            print(f"Python: Ошибка при получении страницы execution'ов за дату '{date_string}': {e}")
+            import traceback
+            traceback.print_exc()
+            return {"items": [], "has_more": False, "next_key": "", "next_id": 0}
+
     # --- СЛОТЫ ДЛЯ РАБОТЫ С ЗАПУЩЕННЫМИ АЛГОРИТМАМИ (EXECUTIONS) ---
 
     @Slot(str, result='QVariant')
@@ -1747,7 +1874,7 @@ class ApplicationData(QObject):
         print(f"Python: QML запросил активные executions для категории '{category}'.")
         if self.database_manager:
             try:
-                executions = self.database_manager.get_active_executions_by_category(category)
+                executions = self.database_manager.get_active_executions_by_category(category, self.time_service.now_epoch())
                 # print(f"DEBUG: Executions from DB: {executions}")
                 # QML ожидает список словарей (QVariantList of QVariantMap)
                 return executions
@@ -1882,7 +2009,7 @@ class ApplicationData(QObject):
                 executions_list = self.database_manager.get_completed_executions_by_category_and_date(category, date_string)
                 print(f"Python: Найдено {len(executions_list) if isinstance(executions_list, list) else 'N/A'} завершённых executions.")
                 # QML ожидает список словарей (QVariantList of QVariantMap)
-                return executions_list if isinstance(executions_list, list) else []
+                return records_to_maps(executions_list) if isinstance(executions_list, list) else []
             except Exception as e:
                 print(f"Python: Ошибка в слоте getCompletedExecutionsByCategoryAndDate: {e}")
                 import traceback
@@ -1892,6 +2019,30 @@ class ApplicationData(QObject):
             print("Python: Ошибка - database_manager не инициализирован.")
             return []
 
+    @Slot(str, str, str, int, result='QVariantMap')
+    def getCompletedExecutionsByCategoryAndDatePage(self, category: str, date_string: str,
+                                                    after_key: str, after_id: int) -> dict:
+        """
+        Возвращает страницу завершённых executions по категории и дате
+        (keyset-пагинация, порядок completed_at, id по убыванию).
+        :param category: Категория алгоритмов.
+        :param date_string: Дата в формате 'DD.MM.YYYY'.
+        :param after_key: next_key предыдущей страницы ('' - первая страница).
+        :param after_id: next_id предыдущей страницы.
+        :return: {"items": [...], "has_more": bool, "next_key": str, "next_id": int}.
+        """
+        if not self.database_manager:
+            print("Python: Ошибка - database_manager не инициализирован.")
+            return {"items": [], "has_more": False, "next_key": "", "next_id": 0}
+        try:
+            return page_to_maps(self.database_manager.get_completed_executions_by_category_and_date_page(
+                category, date_string, after_key, after_id))
+        except Exception as e:
+            print(f"Python: Ошибка в слоте getCompletedExecutionsByCategoryAndDatePage: {e}")
+            import traceback
+            traceback.print_exc()
+            return {"items": [], "has_more": False, "next_key": "", "next_id": 0}
+
     @Slot(int, result='QVariant') # Указываем QVariant для QML
     def getExecutionById(self, execution_id: int):
         """
@@ -1919,7 +2070,8 @@ class ApplicationData(QObject):
         """
         print(f"Python ApplicationData: Запрос списка action_execution'ов для execution ID {execution_id}")
         if self.database_manager: 
-            action_executions_list = self.database_manager.get_action_executions_by_execution_id(execution_id)
+            # Словари, а не записи: ниже к строкам добавляются оперативные смещения
+            action_executions_list = records_to_maps(self.database_manager.get_action_executions_by_execution_id(execution_id))
             if not action_executions_list:
                 print(f"Python ApplicationData: Список action_execution'ов пуст для execution ID {execution_id}.")
                 return action_executions_list
@@ -2006,6 +2158,20 @@ class ApplicationData(QObject):
             print("Python ApplicationData: Менеджер PostgreSQL недоступен.")
             return None
 
+    @Slot(int, result='QVariant')
+    def getActionExecutionSummariesByExecutionId(self, execution_id: int):
+        """
+        Сводный список action_execution'ов execution'а для QML: только поля строки списка
+        (описание, времена, статус), без технического текста, телефонов, материалов и примечаний.
+        Полные данные строки - getActionExecutionById при её открытии.
+        :param execution_id: ID execution'а.
+        :return: Список словарей или пустой список.
+        """
+        if not self.database_manager:
+            print("Python ApplicationData: Менеджер БД не инициализирован.")
+            return []
+        return records_to_maps(self.database_manager.get_action_executions_by_execution_id(execution_id, summary=True)) or []
+
     # --- НОВЫЙ СЛОТ ДЛЯ ДОБАВЛЕНИЯ ACTION_EXECUTION ---
     @Slot(int, 'QVariant', result=bool) # <-- ВАЖНО: сигнатура
     def addActionExecution(self, execution_id: int, action_execution_: 'QVariant') -> bool: # <-- ИМЯ ПАРАМЕТРА С ПОДЧЁРКИВАНИЕМ
@@ -2250,12 +2416,11 @@ class ApplicationData(QObject):
                         new_notes = f"{existing_notes}\n\n{auto_note}"
 
                     # Преобразуем calculated_end_time в нужный формат
-                    try:
-                        dt = datetime.datetime.fromisoformat(calculated_end.replace('Z', '+00:00'))
-                        actual_end_formatted = dt.strftime('%d.%m.%Y %H:%M:%S')
-                    except Exception as e:
-                        print(f"Python: Ошибка парсинга calculated_end_time '{calculated_end}': {e}")
+                    calculated_end_epoch = TimeService.to_epoch(calculated_end)
+                    if calculated_end_epoch is None:
+                        print(f"Python: Ошибка парсинга calculated_end_time '{calculated_end}'")
                         continue
+                    actual_end_formatted = TimeService.format(calculated_end_epoch, '%d.%m.%Y %H:%M:%S')
 
                     update_data = {
                         'actual_end_time': actual_end_formatted,
@@ -2278,6 +2443,112 @@ class ApplicationData(QObject):
             traceback.print_exc()
             return False
 
+    @Slot(int)
+    def showExecutionTimeline(self, execution_id: int):
+        """Открывает (или выводит на передний план) окно временной диаграммы выполнения."""
+        if not isinstance(execution_id, int) or execution_id <= 0 or not self.database_manager:
+            return
+        window = self._timeline_windows.get(execution_id)
+        if window is None:
+            try:
+                # pyqtgraph импортируется при первом открытии диаграммы, а не при запуске приложения
+                from timeline.execution_timeline_widget import ExecutionTimelineWidget
+                window = ExecutionTimelineWidget(execution_id, self._load_execution_timeline, self.time_service)
+            except Exception as e:
+                print(f"Python: Ошибка открытия временной диаграммы execution {execution_id}: {e}")
+                traceback.print_exc()
+                return
+            window.setAttribute(Qt.WA_DeleteOnClose)
+            window.destroyed.connect(lambda _=None, eid=execution_id: self._timeline_windows.pop(eid, None))
+            self._timeline_windows[execution_id] = window
+        window.show()
+        window.raise_()
+        window.activateWindow()
+
+    def enable_call_profiling(self, slow_ms: float):
+        """
+        Включает профилирование: все слоты ApplicationData и публичные методы менеджера БД
+        замеряются, вызовы дольше slow_ms попадают в журнал медленных вызовов вместе с SQL.
+        Вызывается до регистрации appData в QML.
+        """
+        if self.call_profiler is not None:
+            return
+        from diagnostics.call_profiler import CallProfiler, instrument_manager, instrument_qobject_slots
+        self.call_profiler = CallProfiler(slow_ms=slow_ms)
+        slots = instrument_qobject_slots(self, self.call_profiler, "ApplicationData")
+        methods = instrument_manager(self.database_manager, self.call_profiler, "db")
+        print(f"Python: Профилирование включено (порог {slow_ms} мс): слотов {len(slots)}, методов БД {len(methods)}.")
+
+    def enable_stall_watchdog(self, threshold_ms: float, log_path: Optional[str] = None):
+        """
+        Запускает сторож цикла событий: зависания главного потока дольше threshold_ms
+        записываются со стеком в журнал (в памяти и, если задан log_path, в файл с ротацией).
+        """
+        if self.stall_watchdog is not None:
+            return
+        from diagnostics.stall_watchdog import StallWatchdog
+        self.stall_watchdog = StallWatchdog(threshold_ms=threshold_ms, log_path=log_path, parent=self)
+        # Запуск с началом цикла событий: загрузка QML до app.exec() зависанием не считается
+        QTimer.singleShot(0, self.stall_watchdog.start)
+        print(f"Python: Сторож цикла событий включён (порог {threshold_ms} мс, журнал: {log_path or 'только в памяти'}).")
+
+    def stop_stall_watchdog(self):
+        """Останавливает сторож цикла событий (при завершении приложения)."""
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.stop()
+
+    def enable_query_tracing(self, slow_ms: float, trace_path: str):
+        """
+        Включает трассировку SQL: статистика по отпечаткам запросов с планами медленных
+        продолжается из trace_path и сохраняется туда периодически и при выходе.
+        """
+        if self.query_tracer is not None:
+            return
+        from diagnostics.query_tracer import SAVE_INTERVAL_MS, QueryTracer
+        self.query_tracer = QueryTracer(slow_ms=slow_ms)
+        self.query_tracer.load(trace_path)
+        self.query_tracer.install(self.database_manager)
+        self._query_trace_path = trace_path
+        self._query_trace_timer = QTimer(self)
+        self._query_trace_timer.timeout.connect(self.save_query_trace)
+        self._query_trace_timer.start(SAVE_INTERVAL_MS)
+        print(f"Python: Трассировка SQL включена (порог {slow_ms} мс, файл {trace_path}).")
+
+    def save_query_trace(self):
+        """Сохраняет статистику трассировки SQL (по таймеру и при завершении приложения)."""
+        if self.query_tracer is not None:
+            self.query_tracer.save(self._query_trace_path)
+
+    @Slot()
+    def showDiagnosticsPanel(self):
+        """Открывает (или выводит на передний план) окно диагностики."""
+        if all(tool is None for tool in (self.call_profiler, self.stall_watchdog, self.query_tracer)):
+            print("Python: Диагностика не включена (запуск с --profile, --watchdog и/или --trace-sql).")
+            return
+        if self._diagnostics_panel is None:
+            from diagnostics.diagnostics_panel import DiagnosticsPanel
+            self._diagnostics_panel = DiagnosticsPanel(self.call_profiler, self.stall_watchdog, self.query_tracer)
+        self._diagnostics_panel.show()
+        self._diagnostics_panel.raise_()
+        self._diagnostics_panel.activateWindow()
+
+    @Slot(str, result=bool)
+    def dumpCallProfile(self, file_path: str) -> bool:
+        """Сохраняет статистику вызовов в JSON-файл (путь или file:///-URL из FileDialog)."""
+        if self.call_profiler is None or not file_path:
+            return False
+        if file_path.startswith("file:"):
+            file_path = QUrl(file_path).toLocalFile()
+        return self.call_profiler.dump_json(file_path)
+
+    def _load_execution_timeline(self, execution_id: int):
+        """Данные временной диаграммы: (данные выполнения, сводные строки действий) или None."""
+        exec_data = self.database_manager.get_algorithm_execution_by_id(execution_id)
+        actions = self.database_manager.get_action_executions_by_execution_id(execution_id, summary=True)
+        if not exec_data or actions is None:
+            return None
+        return exec_data, actions
+
     @Slot(int, result='QVariantMap')
     def getActionExecutionStatsForPieChart(self, execution_id: int) -> dict:
         """
@@ -2296,50 +2567,58 @@ class ApplicationData(QObject):
             return {"on_time": 0, "late": 0, "not_done": 0, "total": 0}
 
         try:
-            actions = self.database_manager.get_action_executions_by_execution_id(execution_id)
-            if not actions:
-                return {"on_time": 0, "late": 0, "not_done": 0, "total": 0}
-
-            on_time = 0
-            late = 0
-            not_done = 0
-
-            for a in actions:
-                status = a.get('status', 'pending')
-                if status != 'completed':
-                    not_done += 1
-                else:
-                    actual = a.get('actual_end_time')
-                    planned = a.get('calculated_end_time')
-
-                    if not actual or not planned:
-                        not_done += 1
-                        continue
-
-                    try:
-                        actual_dt = datetime.datetime.fromisoformat(actual)
-                        planned_dt = datetime.datetime.fromisoformat(planned)
-                    except Exception:
-                        not_done += 1
-                        continue
-
-                    if actual_dt <= planned_dt:
-                        on_time += 1
-                    else:
-                        late += 1
-
-            total = len(actions)
+            # Счётчики поддерживаются триггерами БД; строки действий читаются, только если их нет
+            stats = self.database_manager.get_execution_stats(execution_id)
+            if stats is None:
+                actions = self.database_manager.get_action_executions_by_execution_id(execution_id)
+                if not actions:
+                    return {"on_time": 0, "late": 0, "not_done": 0, "total": 0}
+                stats = action_statistics(actions)
             return {
-                "on_time": on_time,
-                "late": late,
-                "not_done": not_done,
-                "total": total
+                "on_time": stats["on_time"],
+                "late": stats["late"],
+                "not_done": stats["not_done"],
+                "total": stats["total"]
             }
 
         except Exception as e:
             print(f"Ошибка при расчёте статистики для execution {execution_id}: {e}")
             return {"on_time": 0, "late": 0, "not_done": 0, "total": 0}
 
+    @Slot(str, str, str, result='QVariantList')
+    def getDailyExecutionStats(self, start_date: str, end_date: str, category: str) -> list:
+        """
+        Суточные итоги выполнений за сутки запуска [start_date, end_date) ('YYYY-MM-DD') -
+        из таблицы статистики, без чтения действий (итоги дня в календаре).
+        :param category: Категория выполнений; пустая строка - все категории.
+        :return: Список словарей по суткам (см. get_daily_execution_stats); [] при ошибке.
+        """
+        if not self.database_manager:
+            return []
+        try:
+            return self.database_manager.get_daily_execution_stats(start_date, end_date, category or None)
+        except Exception as e:
+            print(f"Python: Ошибка получения суточной статистики выполнений ('{start_date}' - '{end_date}'): {e}")
+            return []
+
+    @Slot(str, str, str, result='QVariantList')
+    def getPerformanceAnalytics(self, dimension: str, start_date: str, end_date: str) -> list:
+        """
+        Аналитика исполнения за период [start_date, end_date) ('YYYY-MM-DD') в разрезе
+        'algorithm', 'action' или 'officer': доли в срок и с опозданием, среднее и процентили
+        опоздания, пропущенные (см. reports/performance_analytics.py).
+        :return: Список словарей, сначала группы с наибольшей долей опозданий; [] при ошибке.
+        """
+        if not self.database_manager:
+            return []
+        try:
+            report = performance_report(self.database_manager, dimension, start_date, end_date)
+            return report if report is not None else []
+        except Exception as e:
+            print(f"Python: Ошибка расчёта аналитики исполнения ({dimension}, '{start_date}' - '{end_date}'): {e}")
+            traceback.print_exc()
+            return []
+
 
     @Slot(int, str, result=bool)
     def updateActionExecutionNotes(self, action_execution_id: int, notes: str) -> bool:
@@ -2370,16 +2649,11 @@ class ApplicationData(QObject):
     def previewExecutionDetails(self, execution_id: int):
         """Открывает окно предпросмотра печати."""
         try:
-            exec_data = self.database_manager.get_algorithm_execution_by_id(execution_id)
-            actions = self.database_manager.get_action_executions_by_execution_id(execution_id)
-            if not exec_data or not actions:
+            doc = self._execution_report_document(execution_id)
+            if doc is None:
                 print("Нет данных для предпросмотра")
                 return
 
-            html_content = self._generate_execution_html(exec_data, actions)
-            doc = QTextDocument()
-            doc.setHtml(html_content)
-
             from PySide6.QtPrintSupport import QPrintPreviewDialog
             from PySide6.QtGui import QPageLayout 
             printer = QPrinter(QPrinter.HighResolution)
@@ -2401,16 +2675,11 @@ class ApplicationData(QObject):
     def printExecutionDetails(self, execution_id: int):
         """Печатает напрямую (без предпросмотра)."""
         try:
-            exec_data = self.database_manager.get_algorithm_execution_by_id(execution_id)
-            actions = self.database_manager.get_action_executions_by_execution_id(execution_id)
-            if not exec_data or not actions:
+            doc = self._execution_report_document(execution_id)
+            if doc is None:
                 print("Нет данных для печати")
                 return
 
-            html_content = self._generate_execution_html(exec_data, actions)
-            doc = QTextDocument()
-            doc.setHtml(html_content)
-
             printer = QPrinter()
             dialog = QPrintDialog(printer)
             if dialog.exec() == QPrintDialog.Accepted:
@@ -2419,6 +2688,170 @@ class ApplicationData(QObject):
             print(f"Ошибка печати: {e}")
             traceback.print_exc()
 
+    # --- ФОНОВАЯ ВЫГРУЗКА ОТЧЁТОВ (PDF, DOCX) ---
+
+    @Property(bool, notify=reportExportRunningChanged)
+    def reportExportRunning(self):
+        return self._report_export_thread is not None
+
+    @Slot(list, str, bool, result=bool)
+    def exportExecutionReportsToPdf(self, execution_ids: list, output_path: str, single_file: bool) -> bool:
+        """
+        Запускает фоновую выгрузку отчётов по выполнениям в PDF.
+        :param execution_ids: id выполнений в порядке вывода.
+        :param output_path: PDF-файл (single_file) или каталог для набора файлов; путь или URL "file:///...".
+        :param single_file: True - все отчёты в один файл, False - файл на каждое выполнение.
+        :return: True, если выгрузка запущена. Ход - reportExportProgress, итог - reportExportFinished.
+        """
+        output_path = self._report_export_path(output_path)
+        if output_path is None:
+            return False
+        execution_ids = [int(execution_id) for execution_id in execution_ids]
+        if not execution_ids:
+            self.reportExportFinished.emit(False, "Нет выполнений для выгрузки.")
+            return False
+
+        worker = PdfReportWorker(self._load_execution_report, execution_ids, output_path, single_file)
+        print(f"Python: Запущена выгрузка {len(execution_ids)} отчётов в PDF: '{output_path}'.")
+        return self._start_report_export(worker, "отчётов")
+
+    @Slot(int, str, result=bool)
+    def exportExecutionLogToDocx(self, execution_id: int, output_path: str) -> bool:
+        """
+        Запускает фоновую выгрузку журнала действий одного выполнения в DOCX.
+        :param output_path: DOCX-файл; путь или URL "file:///...".
+        :return: True, если выгрузка запущена. Ход - reportExportProgress, итог - reportExportFinished.
+        """
+        output_path = self._report_export_path(output_path)
+        if output_path is None:
+            return False
+        exec_data = self.database_manager.get_algorithm_execution_by_id(execution_id)
+        if not exec_data:
+            self.reportExportFinished.emit(False, "Выполнение не найдено.")
+            return False
+        title = f"Журнал выполнения: {exec_data.get('snapshot_name') or 'Без названия'}"
+        worker = DocxExportWorker(self.database_manager, output_path, title, self._docx_export_subtitle(),
+                                  execution_id=execution_id)
+        print(f"Python: Запущена выгрузка журнала выполнения ID {execution_id} в DOCX: '{output_path}'.")
+        return self._start_report_export(worker, "строк журнала")
+
+    @Slot(str, str, str, result=bool)
+    def exportPeriodLogToDocx(self, start_string: str, end_string: str, output_path: str) -> bool:
+        """
+        Запускает фоновую выгрузку журнала действий всех выполнений, запущенных в периоде
+        [start_string, end_string) (сутки, смена, месяц), в один DOCX-файл.
+        Границы - 'YYYY-MM-DD' или 'YYYY-MM-DD HH:MM:SS'.
+        """
+        output_path = self._report_export_path(output_path)
+        if output_path is None:
+            return False
+        start_display = TimeService.format(start_string, "%d.%m.%Y %H:%M").replace(" 00:00", "")
+        end_epoch = TimeService.to_epoch(end_string)
+        if len(end_string) == 10 and end_epoch is not None:
+            # Граница-дата не включается: в заголовке - последний день периода
+            end_display = TimeService.format(end_epoch - 24 * 3600, "%d.%m.%Y")
+        else:
+            end_display = TimeService.format(end_string, "%d.%m.%Y %H:%M")
+        title = f"Журнал действий за период {start_display} – {end_display}"
+        worker = DocxExportWorker(self.database_manager, output_path, title, self._docx_export_subtitle(),
+                                  start_string=start_string, end_string=end_string)
+        print(f"Python: Запущена выгрузка журнала действий за '{start_string}' - '{end_string}' в DOCX: '{output_path}'.")
+        return self._start_report_export(worker, "строк журнала")
+
+    def _docx_export_subtitle(self) -> str:
+        """Подзаголовок журнала: пост и время формирования."""
+        formed_at = self.time_service.now_datetime(ZONE_LOCAL).strftime("%d.%m.%Y %H:%M")
+        return f"{self._post_name or 'Пост'}. Сформировано: {formed_at}"
+
+    def _report_export_path(self, output_path: str) -> Optional[str]:
+        """Локальный путь для выгрузки (URL из FileDialog преобразуется) или None, если выгрузка невозможна."""
+        if self._report_export_thread is not None:
+            print("Python: Выгрузка отчётов уже выполняется.")
+            return None
+        if output_path.startswith("file:"):
+            output_path = QUrl(output_path).toLocalFile()
+        if not output_path:
+            self.reportExportFinished.emit(False, "Не указан путь для сохранения отчётов.")
+            return None
+        return output_path
+
+    def _start_report_export(self, worker, unit: str) -> bool:
+        """
+        Запускает исполнителя выгрузки (PdfReportWorker, DocxExportWorker) в отдельном потоке.
+        :param unit: Что считает исполнитель - для сообщения об итоге ("отчётов", "строк журнала").
+        """
+        thread = QThread()
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        # Сигналы исполнителя приходят в поток интерфейса через очередь событий
+        worker.progress.connect(self.reportExportProgress)
+        worker.finished.connect(self._on_report_export_finished)
+        worker.failed.connect(self._on_report_export_failed)
+
+        self._report_export_worker = worker
+        self._report_export_thread = thread
+        self._report_export_unit = unit
+        self.reportExportRunningChanged.emit()
+        thread.start()
+        return True
+
+    @Slot(str, str, str, bool, result=bool)
+    def exportPeriodReportsToPdf(self, start_string: str, end_string: str, output_path: str, single_file: bool) -> bool:
+        """
+        Фоновая выгрузка отчётов по всем выполнениям, запущенным в периоде [start_string, end_string)
+        (сутки, смена). Границы - 'YYYY-MM-DD' или 'YYYY-MM-DD HH:MM:SS'.
+        """
+        execution_ids = self.database_manager.get_execution_ids_by_period(start_string, end_string)
+        return self.exportExecutionReportsToPdf(execution_ids, output_path, single_file)
+
+    @Slot(str, str, bool, result=bool)
+    def exportDayReportsToPdf(self, date_string: str, output_path: str, single_file: bool) -> bool:
+        """Фоновая выгрузка отчётов по всем выполнениям за дату 'YYYY-MM-DD'."""
+        try:
+            next_date_string = (datetime.date.fromisoformat(date_string) + datetime.timedelta(days=1)).isoformat()
+        except ValueError:
+            print(f"Python: Некорректная дата для выгрузки отчётов: '{date_string}'.")
+            return False
+        return self.exportPeriodReportsToPdf(date_string, next_date_string, output_path, single_file)
+
+    @Slot()
+    def cancelReportExport(self):
+        """Отменяет текущую выгрузку (после отчёта или порции строк, которые сейчас записываются)."""
+        if self._report_export_worker is not None:
+            self._report_export_worker.cancel()
+
+    def stop_report_export(self):
+        """Отменяет выгрузку и дожидается завершения потока (при выходе из приложения)."""
+        if self._report_export_thread is not None:
+            self._report_export_worker.cancel()
+            self._release_report_export()
+
+    def _release_report_export(self):
+        """Останавливает поток выгрузки и освобождает исполнителя."""
+        thread = self._report_export_thread
+        thread.quit()
+        thread.wait()
+        self._report_export_worker = None
+        self._report_export_thread = None
+        self.reportExportRunningChanged.emit()
+
+    def _on_report_export_finished(self, done: int, files: list, cancelled: bool):
+        if self._report_export_thread is None:
+            return
+        self._release_report_export()
+        if cancelled:
+            self.reportExportFinished.emit(False, f"Выгрузка отменена. Сохранено {self._report_export_unit}: {done if files else 0}.")
+        elif done == 0:
+            self.reportExportFinished.emit(False, "Нет данных для выгрузки.")
+        else:
+            self.reportExportFinished.emit(True, f"Сохранено {self._report_export_unit}: {done}, файлов: {len(files)}.")
+
+    def _on_report_export_failed(self, message: str):
+        if self._report_export_thread is None:
+            return
+        self._release_report_export()
+        self.reportExportFinished.emit(False, f"Ошибка выгрузки отчётов: {message}")
+
     @Slot(str, str, result=bool)
     def verifyAdminPassword(self, login: str, password: str) -> bool:
         """
@@ -2466,237 +2899,52 @@ class ApplicationData(QObject):
 
     def _generate_execution_html(self, exec_data, actions) -> str:
         """Генерирует HTML-отчёт по выполнению с учётом настроек печати и корректной подписью."""
-        import html
-        import os
-        from datetime import datetime
-        import re
-
-        def escape(s):
-            return html.escape(str(s) if s is not None else "", quote=True)
-
-        def fmt_dt(dt_str):
-            if not dt_str:
-                return ""
-            try:
-                dt = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
-                return dt.strftime("%d.%m.%Y %H:%M")
-            except Exception:
-                return str(dt_str)
-
-        # === Настройки шрифта печати ===
-        font_family = self._print_font_family or "Arial"
-        font_size = max(8, min(24, int(self._print_font_size or 12)))
-        font_style = self._print_font_style or "normal"
-
-        font_weight = "bold" if font_style in ("bold", "bold_italic") else "normal"
-        font_style_css = "italic" if font_style in ("italic", "bold_italic") else "normal"
-
-        # === Данные заголовка ===
-        title = escape(exec_data.get('snapshot_name', 'Без названия'))
-        started_at_raw = exec_data.get('started_at')
-        started_at = fmt_dt(started_at_raw)
-
-        # === Подпись: парсинг ФИО и звания ===
-        # 1. Название поста — из appData (SQLite)
-        post_name = escape(self._post_name) if self._post_name else "Пост"
-
-        # 2. Пытаемся взять звание из отдельного поля (если сохранено при запуске)
-        rank = escape(exec_data.get('created_by_rank', ''))
-
-        # 3. Полное отображаемое имя (сохранено при запуске)
-        full_display = exec_data.get('created_by_user_display_name', '').strip()
-
-        # 4. Если звание не сохранено отдельно — извлекаем его из full_display
-        if not rank and full_display:
-            # Пример: "ст. лейтенант Иванов И.И." → звание = "ст. лейтенант"
-            # Ищем первую часть до фамилии (предполагаем, что фамилия начинается с заглавной буквы)
-            # Простой способ: всё до первой заглавной буквы, за которой следует строчная (начало фамилии)
-            match = re.match(r'^([^\w]*[А-Яа-яёЁ\s]+?)\s+([А-Я][а-яё]+)', full_display)
-            if match:
-                rank = escape(match.group(1).strip())
-                fio_part = full_display[len(rank):].strip()
-            else:
-                # Если не удалось распарсить — считаем, что всё — ФИО, звание пустое
-                fio_part = full_display
-        else:
-            fio_part = full_display
-
-        # 5. Очищаем ФИО от возможного дублирующего звания
-        if fio_part.startswith(rank):
-            fio_part = fio_part[len(rank):].strip()
-
-        # 6. Если ФИО пустое — используем заглушку
-        full_name = escape(fio_part) if fio_part else "—"
-
-        current_year = datetime.now().strftime("%Y")
+        return render_execution_report(exec_data, actions, *self._report_settings())
+
+    def _report_settings(self) -> tuple:
+        """Настройки, от которых зависит отчёт: шрифт печати, название поста и год подписи."""
+        return (
+            self._print_font_family or "Arial",
+            max(8, min(24, int(self._print_font_size or 12))),
+            self._print_font_style or "normal",
+            self._post_name,
+            self.time_service.now_datetime(ZONE_LOCAL).year,
+        )
+
+    def _load_execution_report(self, execution_id: int):
+        """
+        HTML-отчёт по выполнению из кэша отчётов или построенный заново.
+        Ключ кэша - (id, updated_at выполнения, версия строк действий, настройки отчёта).
+        :return: (данные выполнения, HTML) или None, если данных нет.
+        """
+        exec_data = self.database_manager.get_algorithm_execution_by_id(execution_id)
+        version = self.database_manager.get_action_executions_version(execution_id)
+        if not exec_data or not version or not version[0]:
+            return None
+        key = (execution_id, exec_data.get('updated_at'), version) + self._report_settings()
+        html_content = self._report_cache.get(key)
+        if html_content is None:
+            actions = self.database_manager.get_action_executions_by_execution_id(execution_id)
+            if not actions:
+                return None
+            html_content = self._generate_execution_html(exec_data, actions)
+            self._report_cache.put(key, html_content)
+        return exec_data, html_content
 
-        # === Статистика ===
-        total = len(actions)
-        completed = sum(1 for a in actions if a.get('status') == 'completed')
-        on_time = 0
-        for a in actions:
-            if a.get('status') == 'completed':
-                try:
-                    actual = datetime.fromisoformat(a.get('actual_end_time', '').replace('Z', '+00:00'))
-                    planned = datetime.fromisoformat(a.get('calculated_end_time', '').replace('Z', '+00:00'))
-                    if actual <= planned:
-                        on_time += 1
-                except Exception:
-                    pass
-
-        pct_completed = round(100 * completed / total, 1) if total > 0 else 0
-        pct_on_time = round(100 * on_time / total, 1) if total > 0 else 0
-
-        # === Формирование строк таблицы ===
-        rows = []
-        for i, a in enumerate(actions, 1):
-            desc = escape(a.get('snapshot_description', ''))
-            start = fmt_dt(a.get('calculated_start_time'))
-            end = fmt_dt(a.get('calculated_end_time'))
-            phones = escape(a.get('snapshot_contact_phones', ''))
-
-            materials_html = ""
-            materials = a.get('snapshot_report_materials')
-            if materials:
-                for line in str(materials).splitlines():
-                    path = line.strip()
-                    if path:
-                        filename = os.path.basename(path)
-                        materials_html += f'<a href="{html.escape(path)}">{html.escape(filename)}</a><br>'
-
-            status = a.get('status', '')
-            if status == 'completed':
-                actual_end = fmt_dt(a.get('actual_end_time'))
-                execution_text = f"Выполнено<br>{actual_end}"
-            else:
-                execution_text = "Не выполнено"
-
-            rows.append(f"""
-            <tr>
-                <td>{i}</td>
-                <td>{desc}</td>
-                <td>{start}</td>
-                <td>{end}</td>
-                <td>{phones}</td>
-                <td>{materials_html}</td>
-                <td>{execution_text}</td>
-            </tr>
-            """)
-
-        # === Генерация HTML ===
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Отчёт по выполнению</title>
-            <style>
-                body {{
-                    font-family: "{font_family}", Arial, sans-serif;
-                    font-size: {font_size}pt;
-                    font-weight: {font_weight};
-                    font-style: {font_style_css};
-                    line-height: 1.4;
-                    margin: 20px;
-                }}
-                .header {{
-                    text-align: center;
-                    margin-bottom: 20px;
-                }}
-                .header h1 {{
-                    margin: 0;
-                    font-size: {font_size + 4}pt;
-                    font-weight: bold;
-                }}
-                .start-date {{
-                    margin-top: 8px;
-                    font-size: {font_size}pt;
-                }}
-                table {{
-                    width: 100%;
-                    table-layout: fixed;
-                    border-collapse: collapse;
-                    margin-bottom: 20px;
-                }}
-                colgroup col {{ }}
-                th, td {{
-                    border: 1px solid #000;
-                    padding: 6px;
-                    vertical-align: top;
-                    text-align: left;
-                    word-wrap: break-word;
-                }}
-                th {{
-                    background-color: #f0f0f0;
-                    font-weight: bold;
-                }}
-                tr:nth-child(even) {{ background-color: #fafafa; }}
-                .summary {{
-                    margin-top: 20px;
-                    font-weight: bold;
-                    font-size: {font_size}pt;
-                }}
-                .signature-block {{
-                    margin-top: 40px;
-                    font-size: {font_size}pt;
-                }}
-                .signature-line-left {{
-                    text-align: left;
-                    margin: 4px 0;
-                }}
-                .signature-line-right {{
-                    text-align: right;
-                    margin: 4px 0;
-                }}
-                a {{ color: #0066cc; text-decoration: none; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>{title}</h1>
-                <div class="start-date">Начало: {started_at}</div>
-            </div>
-
-            <table>
-                <colgroup>
-                    <col style="width: 5%;">
-                    <col style="width: 30%;">
-                    <col style="width: 10%;">
-                    <col style="width: 10%;">
-                    <col style="width: 12%;">
-                    <col style="width: 15%;">
-                    <col style="width: 18%;">
-                </colgroup>
-                <thead>
-                    <tr>
-                        <th>№</th>
-                        <th>Выполняемое мероприятие</th>
-                        <th>Начало</th>
-                        <th>Окончание</th>
-                        <th>Телефоны для взаимодействия</th>
-                        <th>Отчётный материал</th>
-                        <th>Выполнение</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join(rows)}
-                </tbody>
-            </table>
-
-            <div class="summary">
-                Итого: из {total} задач выполнено {completed} ({pct_completed}%), своевременно — {on_time} ({pct_on_time}%)
-            </div>
-
-            <div class="signature-block">
-                <div class="signature-line-left">{post_name}</div>
-                <div class="signature-line-left">{rank}</div>
-                <div class="signature-line-right">{full_name}</div>
-                <div class="signature-line-left">«____»  _________________ {current_year} г.</div>
-            </div>
-        </body>
-        </html>
-        """
-        return html_content
+    def _execution_report_document(self, execution_id: int) -> Optional[QTextDocument]:
+        """
+        QTextDocument отчёта для предпросмотра и печати. Разобранный документ последнего отчёта
+        переиспользуется, пока кэш возвращает тот же HTML (выполнение не менялось).
+        """
+        report = self._load_execution_report(execution_id)
+        if report is None:
+            return None
+        html_content = report[1]
+        if self._report_document is None or self._report_document[0] is not html_content:
+            doc = QTextDocument()
+            doc.setHtml(html_content)
+            self._report_document = (html_content, doc)
+        return self._report_document[1]
 
     def minimize_window(self):
         if self.window:
@@ -2735,6 +2983,8 @@ class ApplicationData(QObject):
         self._notification_timer.timeout.connect(self._check_action_deadlines)
         # Проверяем раз в 30 секунд (30000 миллисекунд)
         self._notification_timer.start(10000) # 10 секунд
+        # Удаляем состояние уведомлений действий, завершённых с прошлого запуска
+        self.database_manager.prune_action_execution_notifications()
         print("Python: Таймер проверки дедлайнов действий запущен (30 секунд).")
 
         # Инициализация QSoundEffect для звуков
@@ -2779,21 +3029,12 @@ class ApplicationData(QObject):
             print("Python: _check_action_deadlines - database_manager не инициализирован.")
             return # Нечего проверять без БД
 
-        # Получаем текущее МЕСТНОЕ время из appData (строки)
-        # Нужно преобразовать строку времени и даты в объект datetime
-        current_time_str = self._local_time # "HH:MM:SS"
-        current_date_str = self._local_date # "DD.MM.YYYY"
-        try:
-            # Формат даты "DD.MM.YYYY HH:MM:SS"
-            local_now_str = f"{current_date_str} {current_time_str}"
-            local_now_dt = datetime.datetime.strptime(local_now_str, "%d.%m.%Y %H:%M:%S")
-            print(f"Python: Проверка дедлайнов. Текущее местное время: {local_now_dt}")
-        except ValueError as e:
-            print(f"Python: Ошибка преобразования местного времени: {e}")
-            return # Не удалось получить корректное время, пропускаем проверку
+        # Текущее МЕСТНОЕ время в секундах (time_service учитывает смещение из настроек)
+        now_epoch = self.time_service.now_epoch(ZONE_LOCAL)
+        print(f"Python: Проверка дедлайнов. Текущее местное время: {TimeService.format(now_epoch)}")
 
         # Определяем порог для "приближается" (5 минут)
-        reminder_threshold = datetime.timedelta(minutes=5)
+        reminder_threshold = 5 * 60
 
         # Загружаем активные action_executions для активных algorithm_executions
         try:
@@ -2804,19 +3045,24 @@ class ApplicationData(QObject):
             traceback.print_exc()
             return
 
+        # Подгружаем состояние уведомлений одним запросом и вытесняем завершённые действия
+        active_action_ids = [action.get('id') for action in active_actions]
+        self._notified_state.load(active_action_ids)
+        self._notified_state.retain(active_action_ids)
+
+        # Большие наборы (учения, тысячи действий) проверяем векторизованно
+        if len(active_actions) >= VECTORIZED_MIN_ACTIONS:
+            self._check_action_deadlines_vectorized(active_actions, now_epoch)
+            return
+
         for action in active_actions:
             action_exec_id = action.get('id')
             execution_id = action.get('execution_id')
-            calculated_end_time_value = action.get('calculated_end_time')
-            calculated_start_time_value = action.get('calculated_start_time')
             action_status = action.get('status')
             execution_status = action.get('execution_status')
             action_description = action.get('snapshot_description', 'Действие без описания')
             algorithm_name = action.get('snapshot_name', 'Неизвестный алгоритм')
 
-            # Получаем множество типов уведомлений, которые уже были показаны для этого действия
-            notified_types = self._notified_action_executions.get(action_exec_id, set())
-
             # Пропускаем, если статус действия не pending или in_progress
             if action_status not in ['pending', 'in_progress']:
                 print(f"Python: Пропуск action_execution ID {action_exec_id} - статус '{action_status}', не pending/in_progress.")
@@ -2827,108 +3073,112 @@ class ApplicationData(QObject):
                 print(f"Python: Пропуск action_execution ID {action_exec_id} - статус алгоритма '{execution_status}', не active.")
                 continue
 
-            # Преобразуем calculated_start_time и calculated_end_time в datetime
-            action_start_dt = None
-            action_end_dt = None
-
-            # === Преобразование времени начала ===
-            if calculated_start_time_value is not None:
-                try:
-                    if isinstance(calculated_start_time_value, datetime.datetime):
-                        action_start_dt = calculated_start_time_value
-                    elif isinstance(calculated_start_time_value, str):
-                        try:
-                            action_start_dt = datetime.datetime.strptime(calculated_start_time_value, "%Y-%m-%d %H:%M:%S")
-                        except ValueError:
-                            try:
-                                action_start_dt = datetime.datetime.fromisoformat(calculated_start_time_value.replace('Z', '+00:00'))
-                            except ValueError:
-                                print(f"Python: Не удается распознать формат calculated_start_time для action_execution ID {action_exec_id}")
-                                action_start_dt = None
-                except Exception as e:
-                    print(f"Python: Ошибка преобразования calculated_start_time для action_execution ID {action_exec_id}: {e}")
-
-            # === Преобразование времени окончания ===
-            if calculated_end_time_value is not None:
-                try:
-                    if isinstance(calculated_end_time_value, datetime.datetime):
-                        action_end_dt = calculated_end_time_value
-                    elif isinstance(calculated_end_time_value, str):
-                        try:
-                            action_end_dt = datetime.datetime.strptime(calculated_end_time_value, "%Y-%m-%d %H:%M:%S")
-                        except ValueError:
-                            try:
-                                action_end_dt = datetime.datetime.fromisoformat(calculated_end_time_value.replace('Z', '+00:00'))
-                            except ValueError:
-                                print(f"Python: Не удается распознать формат calculated_end_time для action_execution ID {action_exec_id}")
-                                action_end_dt = None
-                except Exception as e:
-                    print(f"Python: Ошибка преобразования calculated_end_time для action_execution ID {action_exec_id}: {e}")
+            # Плановые времена в секундах (None, если не заданы или не распознаны)
+            action_start = TimeService.to_epoch(action.get('calculated_start_time'))
+            action_end = TimeService.to_epoch(action.get('calculated_end_time'))
 
             # Вычисляем длительность действия
             action_duration = None
-            if action_start_dt and action_end_dt:
-                action_duration = action_end_dt - action_start_dt
+            if action_start is not None and action_end is not None:
+                action_duration = action_end - action_start
 
-            print(f"Python: Проверка action_execution ID {action_exec_id} (exec {execution_id}), начало: {action_start_dt}, окончание: {action_end_dt}, длительность: {action_duration}, статус: {action_status}")
+            print(f"Python: Проверка action_execution ID {action_exec_id} (exec {execution_id}), начало: {action_start}, окончание: {action_end}, длительность: {action_duration} с, статус: {action_status}")
 
             # === 1. ПРОВЕРКА: Время начала действия (зеленое уведомление, когда действие уже началось) ===
-            if action_start_dt and action_start_dt <= local_now_dt:
-                if "Начало действия" not in notified_types:
-                    print(f"Python: Обнаружено НАЧАЛО действия ID {action_exec_id} (execution {execution_id}), начало: {action_start_dt}.")
+            if action_start is not None and action_start <= now_epoch:
+                if not self._notified_state.is_notified(action_exec_id, "Начало действия"):
+                    print(f"Python: Обнаружено НАЧАЛО действия ID {action_exec_id} (execution {execution_id}), начало: {TimeService.format(action_start)}.")
                     # Отправляем уведомление о начале действия
-                    self._send_notification(action_exec_id, execution_id, algorithm_name, "Начало действия", action_description, action_start_dt)
+                    self._send_notification(action_exec_id, execution_id, algorithm_name, "Начало действия", action_description, TimeService.from_epoch(action_start))
                     # Воспроизводим звук
                     self._play_notification_sound("approaching")
-                    # Добавляем тип уведомления в множество уведомленных
-                    if action_exec_id not in self._notified_action_executions:
-                        self._notified_action_executions[action_exec_id] = set()
-                    self._notified_action_executions[action_exec_id].add("Начало действия")
+                    self._notified_state.mark(action_exec_id, "Начало действия")
                     print(f"Python: Добавлено action_execution ID {action_exec_id} в список уведомлений (начало действия).")
                 else:
                     print(f"Python: Пропуск - уведомление о начале действия уже было показано для ID {action_exec_id}.")
 
             # === 2. ПРОВЕРКА: Время истекло (красное уведомление) ===
-            if action_end_dt and action_end_dt < local_now_dt:
-                if "Время истекло" not in notified_types:
+            if action_end is not None and action_end < now_epoch:
+                if not self._notified_state.is_notified(action_exec_id, "Время истекло"):
                     print(f"Python: Обнаружено ПРОСРОЧЕННОЕ действие ID {action_exec_id} (execution {execution_id}).")
                     # Отправляем уведомление
-                    self._send_notification(action_exec_id, execution_id, algorithm_name, "Время истекло", action_description, action_end_dt)
+                    self._send_notification(action_exec_id, execution_id, algorithm_name, "Время истекло", action_description, TimeService.from_epoch(action_end))
                     # Воспроизводим звук
                     self._play_notification_sound("overdue")
-                    # Добавляем тип уведомления в множество уведомленных
-                    if action_exec_id not in self._notified_action_executions:
-                        self._notified_action_executions[action_exec_id] = set()
-                    self._notified_action_executions[action_exec_id].add("Время истекло")
+                    self._notified_state.mark(action_exec_id, "Время истекло")
                     print(f"Python: Добавлено action_execution ID {action_exec_id} в список уведомлений (время истекло).")
                 else:
                     print(f"Python: Пропуск - уведомление об истечении времени уже было показано для ID {action_exec_id}.")
 
             # === 3. ПРОВЕРКА: Осталось 5 минут до окончания (желтое уведомление, только если длительность > 5 минут) ===
-            # Проверяем, что длительность действия больше 5 минут
-            if action_duration and action_duration > reminder_threshold:
+            if action_duration is not None and action_duration > reminder_threshold:
                 # Проверяем, приближается ли время окончания (в течение 5 минут)
-                if action_end_dt and local_now_dt <= action_end_dt <= (local_now_dt + reminder_threshold):
-                    if "Осталось 5 минут" not in notified_types:
-                        print(f"Python: Обнаружено ПРИБЛИЖАЮЩЕЕСЯ ОКОНЧАНИЕ действия ID {action_exec_id} (execution {execution_id}), окончание: {action_end_dt}.")
+                if now_epoch <= action_end <= now_epoch + reminder_threshold:
+                    if not self._notified_state.is_notified(action_exec_id, "Осталось 5 минут"):
+                        print(f"Python: Обнаружено ПРИБЛИЖАЮЩЕЕСЯ ОКОНЧАНИЕ действия ID {action_exec_id} (execution {execution_id}), окончание: {TimeService.format(action_end)}.")
                         # Отправляем уведомление
-                        self._send_notification(action_exec_id, execution_id, algorithm_name, "Осталось 5 минут", action_description, action_end_dt)
+                        self._send_notification(action_exec_id, execution_id, algorithm_name, "Осталось 5 минут", action_description, TimeService.from_epoch(action_end))
                         # Воспроизводим звук
                         self._play_notification_sound("approaching")
-                        # Добавляем тип уведомления в множество уведомленных
-                        if action_exec_id not in self._notified_action_executions:
-                            self._notified_action_executions[action_exec_id] = set()
-                        self._notified_action_executions[action_exec_id].add("Осталось 5 минут")
+                        self._notified_state.mark(action_exec_id, "Осталось 5 минут")
                         print(f"Python: Добавлено action_execution ID {action_exec_id} в список уведомлений (осталось 5 минут).")
                     else:
                         print(f"Python: Пропуск - уведомление об окончании уже было показано для ID {action_exec_id}.")
             else:
-                if action_duration:
-                    print(f"Python: Пропуск проверки окончания для action_execution ID {action_exec_id} - длительность действия ({action_duration}) <= 5 минут.")
+                if action_duration is not None:
+                    print(f"Python: Пропуск проверки окончания для action_execution ID {action_exec_id} - длительность действия ({action_duration} с) <= 5 минут.")
 
+        # Показанные за проверку уведомления сохраняются в БД одним запросом
+        self._notified_state.flush()
         print("Python: Проверка дедлайнов завершена.")
     # --- Конец метода _check_action_deadlines ---
 
+    def _check_action_deadlines_vectorized(self, active_actions: list, now_epoch: int):
+        """
+        Векторизованная проверка дедлайнов: времена начала/окончания (calculated_*_epoch из БД)
+        и маски показанных уведомлений собираются в массивы int64, правила считаются за один проход.
+        Запрос уже отбирает только pending/in_progress действия активных выполнений.
+        Отметки о показе собираются парами (id, бит) по индексам и сохраняются одним запросом.
+        """
+        action_ids = [action['id'] for action in active_actions]
+        action_id_array = np.array(action_ids, dtype=np.int64)
+        due = evaluate_deadlines(
+            to_epoch_array([action.get('calculated_start_epoch') for action in active_actions]),
+            to_epoch_array([action.get('calculated_end_epoch') for action in active_actions]),
+            np.array(self._notified_state.masks(action_ids), dtype=np.int64),
+            now_epoch,
+            REMINDER_THRESHOLD_SECONDS,
+        )
+
+        # Поле времени в уведомлении и звук для каждого типа
+        notification_kinds = (
+            ("Начало действия", 'calculated_start_epoch', "approaching"),
+            ("Время истекло", 'calculated_end_epoch', "overdue"),
+            ("Осталось 5 минут", 'calculated_end_epoch', "approaching"),
+        )
+        notified_pairs = []
+        for status_type, epoch_field, sound_type in notification_kinds:
+            indices = due[status_type]
+            if len(indices) == 0:
+                continue
+            for index in indices.tolist():
+                action = active_actions[index]
+                self._send_notification(
+                    action['id'], action.get('execution_id'),
+                    action.get('snapshot_name', 'Неизвестный алгоритм'), status_type,
+                    action.get('snapshot_description', 'Действие без описания'),
+                    TimeService.from_epoch(action[epoch_field]),
+                )
+            bit = NOTIFICATION_TYPE_BITS[status_type]
+            notified_pairs.extend((action_id, bit) for action_id in action_id_array[indices].tolist())
+            # Один звук на тип за тик, а не на каждое действие
+            self._play_notification_sound(sound_type)
+            print(f"Python: Уведомления '{status_type}': {len(indices)}.")
+
+        self._notified_state.mark_many(notified_pairs)
+        self._notified_state.flush()
+        print(f"Python: Векторизованная проверка дедлайнов завершена ({len(active_actions)} действий).")
+
     def _send_notification(self, action_exec_id: int, execution_id: int, algorithm_name: str, status_type: str, description: str, calculated_time: datetime.datetime):
         """Отправляет визуальное уведомление через NotificationContainerWidget."""
         # Проверяем внутреннюю переменную настройки '_use_persistent_reminders'
@@ -3278,7 +3528,7 @@ class ApplicationData(QObject):
         """Получить все организации для QML."""
         if self.database_manager:
             try:
-                result = self.database_manager.get_all_organizations()
+                result = records_to_maps(self.database_manager.get_all_organizations())
                 print(f"Python ApplicationData: getAllOrganizations вернул: {result}")
                 print(f"Python ApplicationData: Тип результата: {type(result)}")
                 if result:
@@ -3294,6 +3544,23 @@ class ApplicationData(QObject):
             print("Python ApplicationData: Менеджер БД не инициализирован.")
             return []
 
+    @Slot(str, int, result='QVariantMap')
+    def getOrganizationsPage(self, after_key: str, after_id: int) -> dict:
+        """
+        Получить страницу справочника организаций для QML (keyset-пагинация, порядок name, id).
+        :return: {"items": [...], "has_more": bool, "next_key": str, "next_id": int}.
+        """
+        if not self.database_manager:
+            print("Python ApplicationData: Менеджер БД не инициализирован.")
+            return {"items": [], "has_more": False, "next_key": "", "next_id": 0}
+        try:
+            return page_to_maps(self.database_manager.get_organizations_page(after_key, after_id))
+        except Exception as e:
+            print(f"Python ApplicationData: Ошибка при получении страницы организаций: {e}")
+            import traceback
+            traceback.print_exc()
+            return {"items": [], "has_more": False, "next_key": "", "next_id": 0}
+
     @Slot('QVariant', result='QVariant')
     def createOrganization(self, org_data: 'QVariant'):
         """Создать организацию. Возвращает ID новой записи или 0 при ошибке."""
@@ -3422,7 +3689,7 @@ class ApplicationData(QObject):
                 
                 # 2. Для каждой организации подгружаем файлы
                 for org in orgs:
-                    org_with_files = dict(org) # Копируем данные организации
+                    org_with_files = org.to_dict() # Копируем данные организации (запись -> словарь)
                     # Получаем файлы и добавляем их в словарь организации
                     files = self.database_manager.get_organization_reference_files(org['id'])
                     org_with_files['reference_files'] = files 
@@ -3479,6 +3746,63 @@ class ApplicationData(QObject):
                 return False
         return False
 
+    @Slot(str, 'QVariant', int, int, result='QVariant')
+    def search(self, query_text: str, entity_types, limit: int, offset: int):
+        """
+        Полнотекстовый поиск по алгоритмам, действиям, истории выполнений и организациям.
+        :param query_text: Строка поиска.
+        :param entity_types: Массив типов ('algorithm', 'action', 'action_execution', 'organization') или пустой - все.
+        :param limit: Размер страницы.
+        :param offset: Смещение страницы.
+        :return: {'items': [...], 'has_more': bool}
+        """
+        if self.database_manager:
+            try:
+                if hasattr(entity_types, 'toVariant'):
+                    entity_types = entity_types.toVariant()
+                types = [str(t) for t in entity_types] if entity_types else None
+                return self.database_manager.search(query_text, types, limit, offset)
+            except Exception as e:
+                print(f"Python ApplicationData: Ошибка при полнотекстовом поиске: {e}")
+                return {'items': [], 'has_more': False}
+        return {'items': [], 'has_more': False}
+
+    @Slot(int, result=int)
+    def archiveCompletedExecutions(self, older_than_days: int) -> int:
+        """
+        Перенести в архив завершённые выполнения старше older_than_days дней.
+        :return: Количество перенесённых выполнений или -1 при ошибке.
+        """
+        if self.database_manager:
+            try:
+                return self.database_manager.archive_completed_executions(older_than_days)
+            except Exception as e:
+                print(f"Python ApplicationData: Ошибка при архивации выполнений: {e}")
+                return -1
+        return -1
+
+    @Slot(int, result='QVariant')
+    def getActionExecutionReportMaterials(self, action_execution_id: int):
+        """Получить отчётные материалы действия (с ID для удаления)."""
+        if self.database_manager:
+            try:
+                return self.database_manager.get_action_execution_report_materials(action_execution_id)
+            except Exception as e:
+                print(f"Python ApplicationData: Ошибка при получении отчётных материалов: {e}")
+                return []
+        return []
+
+    @Slot(int, result=bool)
+    def deleteActionExecutionReportMaterialById(self, material_id: int) -> bool:
+        """Удалить отчётный материал по его ID."""
+        if self.database_manager:
+            try:
+                return self.database_manager.delete_action_execution_report_material_by_id(material_id)
+            except Exception as e:
+                print(f"Python ApplicationData: Ошибка при удалении отчётного материала: {e}")
+                return False
+        return False
+
 
 def on_qml_loaded(obj, url):
     if obj and url.fileName() == "main.qml":
@@ -3494,6 +3818,28 @@ def on_qml_loaded(obj, url):
 
 # --- ТОЧКА ВХОДА В ПРИЛОЖЕНИЕ ---
 if __name__ == "__main__":
+    # --- Флаги диагностики; остальные аргументы остаются Qt ---
+    import argparse
+    cli_parser = argparse.ArgumentParser(add_help=False)
+    cli_parser.add_argument("--profile", action="store_true",
+                            help="Замерять вызовы слотов и методов БД (окно 'Диагностика…' в трее).")
+    cli_parser.add_argument("--profile-slow-ms", type=float, default=200,
+                            help="Порог медленного вызова, мс (по умолчанию 200).")
+    cli_parser.add_argument("--profile-dump", help="JSON-файл для статистики вызовов при выходе.")
+    cli_parser.add_argument("--watchdog", action="store_true",
+                            help="Следить за зависаниями цикла событий и снимать стек главного потока.")
+    cli_parser.add_argument("--watchdog-threshold-ms", type=float, default=500,
+                            help="Порог зависания, мс (по умолчанию 500).")
+    cli_parser.add_argument("--watchdog-log", default="stalls.log",
+                            help="Файл журнала зависаний с ротацией (по умолчанию stalls.log).")
+    cli_parser.add_argument("--trace-sql", action="store_true",
+                            help="Собирать статистику SQL-запросов и планы медленных (отчёт: query_report.py).")
+    cli_parser.add_argument("--trace-sql-slow-ms", type=float, default=100,
+                            help="Порог медленного запроса, мс (по умолчанию 100).")
+    cli_parser.add_argument("--trace-sql-file", default="query_trace.json",
+                            help="Файл статистики запросов (по умолчанию query_trace.json).")
+    cli_args, _ = cli_parser.parse_known_args()
+
     # --- Используем QApplication для поддержки QSystemTrayIcon ---
     app = QApplication(sys.argv)
     # ВАЖНО: Не завершать приложение при закрытии последнего окна
@@ -3512,6 +3858,18 @@ if __name__ == "__main__":
     # --- Затем создаем ApplicationData, ПЕРЕДАВАЯ app, engine и db_manager ---
     # Обратите внимание на добавленный аргумент db_manager
     data_context = ApplicationData(app, engine, sqlite_config_manager) # <-- Добавлен sqlite_config_manager
+
+    # --- Диагностика (необязательные флаги командной строки) ---
+    if cli_args.profile:
+        data_context.enable_call_profiling(cli_args.profile_slow_ms)
+        if cli_args.profile_dump:
+            app.aboutToQuit.connect(lambda: data_context.call_profiler.dump_json(cli_args.profile_dump))
+    if cli_args.watchdog:
+        data_context.enable_stall_watchdog(cli_args.watchdog_threshold_ms, cli_args.watchdog_log)
+        app.aboutToQuit.connect(data_context.stop_stall_watchdog)
+    if cli_args.trace_sql:
+        data_context.enable_query_tracing(cli_args.trace_sql_slow_ms, cli_args.trace_sql_file)
+        app.aboutToQuit.connect(data_context.save_query_trace)
     
     # --- Регистрация контекста для QML ---
     engine.rootContext().setContextProperty("appData", data_context)
@@ -3529,6 +3887,10 @@ if __name__ == "__main__":
     # Подключаем сигнал aboutToQuit к методу уничтожения контейнера у data_context
     # Lambda используется для захвата ссылки на data_context в момент подключения
     app.aboutToQuit.connect(lambda dc=data_context: dc.notification_container.deleteLater() if hasattr(dc, 'notification_container') else None)
+    # Незавершённая выгрузка отчётов в PDF отменяется, поток дожидается завершения
+    app.aboutToQuit.connect(data_context.stop_report_export)
+    # Начатая архивация не прерывается: поток дожидается конца транзакции
+    app.aboutToQuit.connect(data_context.stop_archiving)
     # --- ---
 
     sys.exit(app.exec())
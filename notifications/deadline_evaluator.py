@@ -0,0 +1,77 @@
+# notifications/deadline_evaluator.py
+"""
+Правила уведомлений о сроках действий в двух вариантах:
+- evaluate_deadlines_loop - построчная проверка (эталон, используется для небольших наборов);
+- evaluate_deadlines - векторизованная проверка на NumPy для тысяч активных действий.
+
+Оба варианта принимают времена в секундах (шкала TimeService), маски уже показанных
+уведомлений (биты NOTIFICATION_TYPE_BITS) и возвращают индексы строк, по которым нужно
+показать уведомление каждого типа.
+"""
+import numpy as np
+
+from .notified_state import NOTIFICATION_TYPE_BITS
+
+# Порог "осталось 5 минут" и минимальная длительность действия для этого уведомления
+REMINDER_THRESHOLD_SECONDS = 5 * 60
+
+# Начиная с этого количества активных действий используется векторизованная проверка
+VECTORIZED_MIN_ACTIONS = 256
+
+# Значение "время не задано" в массивах int64
+MISSING_TIME = np.iinfo(np.int64).min
+
+NOTIFICATION_START = "Начало действия"
+NOTIFICATION_OVERDUE = "Время истекло"
+NOTIFICATION_REMINDER = "Осталось 5 минут"
+
+
+def to_epoch_array(values) -> np.ndarray:
+    """Список секунд (None - время не задано) -> массив int64 с MISSING_TIME вместо None."""
+    return np.fromiter((MISSING_TIME if v is None else v for v in values), dtype=np.int64, count=len(values))
+
+
+def evaluate_deadlines(start_epochs: np.ndarray, end_epochs: np.ndarray, notified_masks: np.ndarray,
+                       now_epoch: int, reminder_threshold: int = REMINDER_THRESHOLD_SECONDS) -> dict:
+    """
+    Векторизованная проверка: все три правила за один проход по массивам.
+    :return: {тип уведомления: массив индексов строк, для которых его нужно показать}.
+    """
+    has_start = start_epochs != MISSING_TIME
+    has_end = end_epochs != MISSING_TIME
+    has_both = has_start & has_end
+
+    duration = np.zeros_like(end_epochs)
+    np.subtract(end_epochs, start_epochs, out=duration, where=has_both)
+
+    start_due = has_start & (start_epochs <= now_epoch)
+    overdue_due = has_end & (end_epochs < now_epoch)
+    reminder_due = (has_both & (duration > reminder_threshold)
+                    & (end_epochs >= now_epoch) & (end_epochs <= now_epoch + reminder_threshold))
+
+    def not_notified(notification_type):
+        return (notified_masks & NOTIFICATION_TYPE_BITS[notification_type]) == 0
+
+    return {
+        NOTIFICATION_START: np.flatnonzero(start_due & not_notified(NOTIFICATION_START)),
+        NOTIFICATION_OVERDUE: np.flatnonzero(overdue_due & not_notified(NOTIFICATION_OVERDUE)),
+        NOTIFICATION_REMINDER: np.flatnonzero(reminder_due & not_notified(NOTIFICATION_REMINDER)),
+    }
+
+
+def evaluate_deadlines_loop(start_epochs: list, end_epochs: list, notified_masks: list,
+                            now_epoch: int, reminder_threshold: int = REMINDER_THRESHOLD_SECONDS) -> dict:
+    """Построчная проверка тех же правил (None - время не задано). Результат как у evaluate_deadlines."""
+    due = {NOTIFICATION_START: [], NOTIFICATION_OVERDUE: [], NOTIFICATION_REMINDER: []}
+    start_bit = NOTIFICATION_TYPE_BITS[NOTIFICATION_START]
+    overdue_bit = NOTIFICATION_TYPE_BITS[NOTIFICATION_OVERDUE]
+    reminder_bit = NOTIFICATION_TYPE_BITS[NOTIFICATION_REMINDER]
+    for i, (start, end, mask) in enumerate(zip(start_epochs, end_epochs, notified_masks)):
+        if start is not None and start <= now_epoch and not mask & start_bit:
+            due[NOTIFICATION_START].append(i)
+        if end is not None and end < now_epoch and not mask & overdue_bit:
+            due[NOTIFICATION_OVERDUE].append(i)
+        if (start is not None and end is not None and end - start > reminder_threshold
+                and now_epoch <= end <= now_epoch + reminder_threshold and not mask & reminder_bit):
+            due[NOTIFICATION_REMINDER].append(i)
+    return due
@@ -1,12 +1,49 @@
 # notifications/notification_container_widget.py
 import sys
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QApplication
-from PySide6.QtCore import Qt
+from collections import deque
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QApplication, QLabel, QPushButton
+from PySide6.QtCore import Qt, QTimer
 from .notification_item_widget import NotificationItemWidget
 
+# Максимальное количество одновременно показываемых уведомлений.
+# Остальные ждут в очереди и отображаются сводкой ("+12 ещё: просрочено 7, ...").
+MAX_VISIBLE_ITEMS = 5
+# Максимальный размер очереди ожидающих уведомлений (более старые отбрасываются)
+MAX_QUEUED_ITEMS = 500
+
+# Подписи групп в сводке по типу уведомления
+GROUP_LABELS = {
+    "Error": "просрочено",
+    "Warning": "осталось 5 минут",
+    "Success": "начало",
+    "Information": "прочие",
+}
+
 class NotificationContainerWidget(QWidget):
+    """
+    Контейнер всплывающих уведомлений.
+    - Уведомления, добавленные за один проход цикла событий (один тик проверки дедлайнов),
+      накапливаются и раскладываются за одну перестройку макета.
+    - Одновременно показывается не более MAX_VISIBLE_ITEMS элементов, остальные ждут в очереди;
+      при закрытии элемента на его место выводится следующее из очереди.
+    - Закрытые элементы не удаляются, а возвращаются в пул и переиспользуются.
+    """
     def __init__(self):
         super().__init__()
+        # Уведомления текущего тика, ещё не разложенные по макету
+        self._pending = []
+        # Уведомления, не поместившиеся в лимит видимых: (title, message, icon_type, duration_ms)
+        self._queued = deque(maxlen=MAX_QUEUED_ITEMS)
+        # Показанные элементы и пул свободных элементов
+        self._visible_items = []
+        self._pool = []
+
+        # Таймер с нулевым интервалом: срабатывает после завершения текущего тика
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush_pending)
+
         # --- Настройка окна ---
         self.setWindowFlags(Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
         self.setAttribute(Qt.WA_DeleteOnClose)
@@ -34,6 +71,21 @@ class NotificationContainerWidget(QWidget):
         # Добавляем ScrollArea в основной макет
         main_layout.addWidget(self.scroll_area)
 
+        # --- Сводка по уведомлениям в очереди ---
+        self.summary_widget = QWidget()
+        self.summary_widget.setStyleSheet("background-color: #424242; color: white;")
+        summary_layout = QHBoxLayout(self.summary_widget)
+        summary_layout.setContentsMargins(5, 2, 5, 2)
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        clear_button = QPushButton("Скрыть")
+        clear_button.setFixedHeight(20)
+        clear_button.clicked.connect(self.clear_queued)
+        summary_layout.addWidget(self.summary_label, 1)
+        summary_layout.addWidget(clear_button)
+        self.summary_widget.setVisible(False)
+        main_layout.addWidget(self.summary_widget)
+
         # --- Размеры и позиционирование ---
         self.setFixedSize(350, 200)
         self._reposition()
@@ -49,35 +101,90 @@ class NotificationContainerWidget(QWidget):
         self.move(x, y)
 
     def add_notification(self, title, message, icon_type, duration_ms):
-        """Добавляет новое уведомление в контейнер."""
-        # Создаем элемент уведомления, передавая self как container_widget
-        item_widget = NotificationItemWidget(title, message, icon_type, duration_ms, container_widget=self, parent=self.content_widget) # <-- Передаем self
-
-        # Найти позицию для вставки (перед stretch)
-        insert_position = self.content_layout.count() - 1
-
-        # Вставляем новый элемент уведомления
-        self.content_layout.insertWidget(insert_position, item_widget)
+        """Добавляет новое уведомление. Раскладка выполняется один раз за тик (см. _flush_pending)."""
+        self._pending.append((title, message, icon_type, duration_ms))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_pending(self):
+        """Раскладывает накопленные за тик уведомления за одну перестройку макета."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        self.setUpdatesEnabled(False)
+        try:
+            for title, message, icon_type, duration_ms in pending:
+                if len(self._visible_items) < MAX_VISIBLE_ITEMS:
+                    self._show_item(title, message, icon_type, duration_ms)
+                else:
+                    self._queued.append((title, message, icon_type, duration_ms))
+            self._update_summary()
+        finally:
+            self.setUpdatesEnabled(True)
 
         # Показываем контейнер, если он был скрыт
         if not self.isVisible():
             self.show()
 
-        print(f"Python: Уведомление добавлено в контейнер: {title}")
+        print(f"Python: В контейнер добавлено уведомлений: {len(pending)} (показано {len(self._visible_items)}, в очереди {len(self._queued)}).")
+
+    def _show_item(self, title, message, icon_type, duration_ms):
+        """Показывает уведомление, используя элемент из пула (или создаёт новый)."""
+        if self._pool:
+            item_widget = self._pool.pop()
+            item_widget.set_content(title, message, icon_type, duration_ms)
+        else:
+            item_widget = NotificationItemWidget(title, message, icon_type, duration_ms, container_widget=self, parent=self.content_widget)
+
+        # Вставляем перед stretch
+        self.content_layout.insertWidget(self.content_layout.count() - 1, item_widget)
+        item_widget.show()
+        self._visible_items.append(item_widget)
+
+    def _update_summary(self):
+        """Обновляет строку сводки по уведомлениям в очереди."""
+        if not self._queued:
+            self.summary_widget.setVisible(False)
+            return
+        counts = {}
+        for _, _, icon_type, _ in self._queued:
+            label = GROUP_LABELS.get(icon_type, GROUP_LABELS["Information"])
+            counts[label] = counts.get(label, 0) + 1
+        details = ", ".join(f"{label} {count}" for label, count in counts.items())
+        self.summary_label.setText(f"+{len(self._queued)} ещё: {details}")
+        self.summary_widget.setVisible(True)
+
+    def clear_queued(self):
+        """Отбрасывает уведомления, ожидающие в очереди."""
+        self._queued.clear()
+        self._update_summary()
+        if not self._visible_items:
+            self.hide()
 
     # --- МЕТОД: Обработка удаления элемента ---
-    def on_item_removed(self):
-        """Вызывается дочерним NotificationItemWidget при его удалении."""
-        # Проверяем, остались ли *настоящие* уведомления (не считая stretch)
-        num_items = self.content_layout.count()
-        num_real_items = num_items - 1 # Вычитаем stretch
-
-        if num_real_items <= 0:
-            # Если не осталось реальных уведомлений, скрываем контейнер
+    def on_item_removed(self, item_widget):
+        """Вызывается дочерним NotificationItemWidget при закрытии: возвращает элемент в пул."""
+        if item_widget in self._visible_items:
+            self._visible_items.remove(item_widget)
+        self.content_layout.removeWidget(item_widget)
+        item_widget.hide()
+        if len(self._pool) < MAX_VISIBLE_ITEMS:
+            self._pool.append(item_widget)
+        else:
+            item_widget.deleteLater()
+
+        # На освободившееся место выводим следующее уведомление из очереди
+        if self._queued:
+            self._show_item(*self._queued.popleft())
+            self._update_summary()
+
+        if not self._visible_items and not self._pending:
+            # Если не осталось уведомлений, скрываем контейнер
             print("Python: Уведомления закончились, контейнер скрывается.")
             self.hide()
         else:
-            print(f"Python: Уведомление удалено, осталось {num_real_items} уведомлений.")
+            print(f"Python: Уведомление закрыто, показано {len(self._visible_items)}, в очереди {len(self._queued)}.")
 
     def showEvent(self, event):
         """Переопределяем, чтобы корректно позиционировать при показе."""
@@ -4,7 +4,19 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBu
 from PySide6.QtCore import QTimer, Qt
 from PySide6.QtGui import QPalette, QFont, QColor
 
+# Цвета фона по типу уведомления
+BACKGROUND_COLORS = {
+    "Error": QColor(244, 67, 54),         # Material Red 500 - время истекло
+    "Warning": QColor(255, 193, 7),       # Material Amber 500 - осталось 5 минут
+    "Success": QColor(76, 175, 80),       # Material Green 500 - начало действия
+    "Information": QColor(Qt.lightGray),  # Информационные уведомления
+}
+
 class NotificationItemWidget(QWidget):
+    """
+    Элемент уведомления. Виджеты переиспользуются контейнером (пул):
+    после закрытия элемент не удаляется, а получает новое содержимое через set_content().
+    """
     def __init__(self, title, message, icon_type, duration_ms, container_widget, parent=None):
         super().__init__(parent)
         # --- УВЕЛИЧЕНО: Фиксированная высота для каждого уведомления ---
@@ -21,25 +33,6 @@ class NotificationItemWidget(QWidget):
         self.setFont(font)
         # --- ---
 
-        # --- Настройка фона в зависимости от типа ---
-        palette = self.palette()
-        if icon_type == "Error":
-            # Красный фон для ошибок (время истекло)
-            palette.setColor(QPalette.Window, QColor(244, 67, 54))  # Material Red 500
-        elif icon_type == "Warning":
-            # Желтый фон для предупреждений (осталось 5 минут)
-            palette.setColor(QPalette.Window, QColor(255, 193, 7))  # Material Amber 500
-        elif icon_type == "Success":
-            # Зеленый фон для успеха (начало действия)
-            palette.setColor(QPalette.Window, QColor(76, 175, 80))  # Material Green 500
-        elif icon_type == "Information":
-            # Светло-серый фон для информационных уведомлений
-            palette.setColor(QPalette.Window, Qt.lightGray)
-        else:
-            palette.setColor(QPalette.Window, Qt.white)
-        self.setPalette(palette)
-        # --- ---
-
         # --- Макет для содержимого ---
         main_layout = QHBoxLayout(self)
         main_layout.setContentsMargins(5, 5, 5, 5)
@@ -49,13 +42,13 @@ class NotificationItemWidget(QWidget):
         content_layout = QVBoxLayout()
         content_layout.setSpacing(2)
 
-        self.title_label = QLabel(title)
+        self.title_label = QLabel()
         self.title_label.setWordWrap(True)
         self.title_label.setStyleSheet("font-weight: bold;") # Убедимся, что заголовок жирный
         # self.title_label.setFont(font) # Применить шрифт, если установлен
 
         # --- УВЕЛИЧЕНО: QLabel для сообщения с ограничением высоты ---
-        self.message_label = QLabel(message)
+        self.message_label = QLabel()
         self.message_label.setWordWrap(True)
         # self.message_label.setFont(font) # Применить шрифт, если установлен
         self.message_label.setMaximumHeight(60) # <-- Ограничиваем высоту текста (примерное значение)
@@ -95,6 +88,16 @@ class NotificationItemWidget(QWidget):
         self.auto_hide_timer = QTimer(self)
         self.auto_hide_timer.timeout.connect(self._on_timer_timeout)
         self.auto_hide_timer.setSingleShot(True)
+
+        self.set_content(title, message, icon_type, duration_ms)
+
+    def set_content(self, title, message, icon_type, duration_ms):
+        """Задаёт содержимое, цвет фона и перезапускает таймер автоскрытия."""
+        palette = self.palette()
+        palette.setColor(QPalette.Window, BACKGROUND_COLORS.get(icon_type, QColor(Qt.white)))
+        self.setPalette(palette)
+        self.title_label.setText(title)
+        self.message_label.setText(message)
         self.auto_hide_timer.start(duration_ms)
 
     def _on_close_clicked(self):
@@ -108,15 +111,11 @@ class NotificationItemWidget(QWidget):
     def _cleanup(self):
         self.auto_hide_timer.stop()
 
-        parent_layout = self.parent().layout()
-        if parent_layout:
-            parent_layout.removeWidget(self)
-
-        self.hide()
-        self.deleteLater()
-
-        # --- УВЕДОМЛЯЕМ РОДИТЕЛЬСКИЙ КОНТЕЙНЕР ОБ УДАЛЕНИИ ---
+        # --- УВЕДОМЛЯЕМ РОДИТЕЛЬСКИЙ КОНТЕЙНЕР: он уберёт элемент из макета и вернёт в пул ---
         if hasattr(self.container_widget, 'on_item_removed'):
-            self.container_widget.on_item_removed()
+            self.container_widget.on_item_removed(self)
+        else:
+            self.hide()
+            self.deleteLater()
         # --- ---
 
@@ -0,0 +1,103 @@
+# notifications/notified_state.py
+from collections import OrderedDict
+
+# Коды типов уведомлений (биты маски). Совпадают с notification_type в action_execution_notifications.
+NOTIFICATION_TYPE_BITS = {
+    "Начало действия": 1,
+    "Время истекло": 2,
+    "Осталось 5 минут": 4,
+}
+
+# Максимальное количество action_execution'ов, состояние которых хранится в памяти
+MAX_CACHED_ENTRIES = 4096
+
+
+class NotifiedStateCache:
+    """
+    Состояние уже показанных уведомлений о действиях.
+    Источник истины - таблица action_execution_notifications в БД (переживает перезапуск),
+    в памяти - LRU битовых масок {action_execution_id: маска} для действий, проверяемых таймером.
+    Новые отметки копятся в памяти и сохраняются в БД одним запросом (flush) за проверку дедлайнов.
+    """
+
+    def __init__(self, database_manager, max_entries: int = MAX_CACHED_ENTRIES):
+        self.database_manager = database_manager
+        self.max_entries = max_entries
+        self._masks = OrderedDict()
+        self._pending = []  # Ещё не сохранённые отметки (action_execution_id, бит)
+
+    def load(self, action_execution_ids):
+        """Подгружает из БД (одним запросом) маски для ID, которых нет в памяти."""
+        # Все проверяемые в одном тике действия должны помещаться в кэш, иначе вытесненные
+        # записи пришлось бы перечитывать (или, хуже, уведомление показалось бы повторно)
+        self.max_entries = max(self.max_entries, len(action_execution_ids))
+        missing_ids = [i for i in action_execution_ids if i is not None and i not in self._masks]
+        if not missing_ids:
+            return
+        stored_masks = self.database_manager.get_action_execution_notification_masks(missing_ids)
+        for action_execution_id in missing_ids:
+            self._put(action_execution_id, stored_masks.get(action_execution_id, 0))
+
+    def is_notified(self, action_execution_id: int, notification_type: str) -> bool:
+        """Было ли уже показано уведомление данного типа."""
+        mask = self._masks.get(action_execution_id)
+        if mask is None:
+            return False
+        self._masks.move_to_end(action_execution_id)
+        return bool(mask & NOTIFICATION_TYPE_BITS[notification_type])
+
+    def masks(self, action_execution_ids) -> list:
+        """Маски уже показанных уведомлений в порядке action_execution_ids (для векторизованной проверки)."""
+        return [self._masks.get(action_execution_id, 0) for action_execution_id in action_execution_ids]
+
+    def mark(self, action_execution_id: int, notification_type: str):
+        """Отмечает уведомление как показанное; в БД отметка попадёт при flush()."""
+        bit = NOTIFICATION_TYPE_BITS[notification_type]
+        self._put(action_execution_id, self._masks.get(action_execution_id, 0) | bit)
+        self._pending.append((action_execution_id, bit))
+
+    def mark_many(self, pairs):
+        """
+        Отмечает показанные уведомления пачкой (векторизованная проверка); в БД - при flush().
+        :param pairs: Пары (action_execution_id, бит типа уведомления).
+        """
+        pairs = list(pairs)
+        for action_execution_id, bit in pairs:
+            self._put(action_execution_id, self._masks.get(action_execution_id, 0) | bit)
+        self._pending.extend(pairs)
+
+    def flush(self) -> int:
+        """
+        Сохраняет накопленные отметки в БД одним запросом. При ошибке отметки остаются
+        и сохраняются при следующем вызове.
+        :return: Количество сохранённых отметок.
+        """
+        if not self._pending:
+            return 0
+        pending = self._pending
+        if not self.database_manager.mark_action_executions_notified(pending):
+            return 0
+        self._pending = []
+        return len(pending)
+
+    def retain(self, active_action_execution_ids):
+        """
+        Вытесняет из памяти действия, которые больше не активны, и удаляет их состояние из БД.
+        :return: Количество вытесненных записей.
+        """
+        active_ids = set(active_action_execution_ids)
+        stale_ids = [i for i in self._masks if i not in active_ids]
+        for action_execution_id in stale_ids:
+            del self._masks[action_execution_id]
+        if stale_ids:
+            self.database_manager.prune_action_execution_notifications()
+        return len(stale_ids)
+
+    def _put(self, action_execution_id: int, mask: int):
+        self._masks[action_execution_id] = mask
+        self._masks.move_to_end(action_execution_id)
+        while len(self._masks) > self.max_entries:
+            self._masks.popitem(last=False)
+
+    def __len__(self):
+        return len(self._masks)
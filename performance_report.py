@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Скрипт для вывода аналитики исполнения за период: какие алгоритмы, действия или ответственные
+чаще всего выполняют действия с опозданием.
+Запускать из корневой директории проекта:
+python performance_report.py --from 2025-01-01 --to 2026-01-01 [--by algorithm|action|officer] [--top 20]
+"""
+
+import argparse
+from pathlib import Path
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+from reports.performance_analytics import DEFAULT_PERCENTILES, DIMENSIONS, performance_report
+
+DB_PATH = "duty_app.db"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Аналитика исполнения алгоритмов за период.")
+    parser.add_argument("--from", dest="start_date", required=True, help="Начало периода 'YYYY-MM-DD'.")
+    parser.add_argument("--to", dest="end_date", required=True, help="Конец периода 'YYYY-MM-DD' (не включается).")
+    parser.add_argument("--by", choices=list(DIMENSIONS), default="algorithm",
+                        help="Разрез: алгоритм, действие или ответственный (по умолчанию algorithm).")
+    parser.add_argument("--top", type=int, default=20, help="Сколько строк выводить (по умолчанию 20).")
+    parser.add_argument("--db", default=DB_PATH, help=f"Путь к основной БД (по умолчанию {DB_PATH}).")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"База данных не найдена: {args.db}")
+        return
+
+    manager = SQLiteDatabaseManager(args.db)
+    report = performance_report(manager, args.by, args.start_date, args.end_date)
+    if report is None:
+        print("Ошибка при расчёте аналитики. Подробности в журнале.")
+        return
+
+    percentile_headers = "".join(f" | {f'p{p}, мин':>9}" for p in DEFAULT_PERCENTILES)
+    print(f"{DIMENSIONS[args.by]:<40} | {'всего':>6} | {'в срок, %':>9} | {'опозд., %':>9} | "
+          f"{'пропущ.':>7} | {'сред., мин':>10}{percentile_headers}")
+    print("-" * (94 + 12 * len(DEFAULT_PERCENTILES)))
+    for item in report[:args.top]:
+        percentiles = "".join(f" | {item[f'p{p}_lateness_minutes']:>9}" for p in DEFAULT_PERCENTILES)
+        print(f"{item['key'][:40]:<40} | {item['total']:>6} | {item['on_time_rate']:>9} | {item['late_rate']:>9} | "
+              f"{item['skipped']:>7} | {item['mean_lateness_minutes']:>10}{percentiles}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Скрипт для вывода самых тяжёлых SQL-запросов по статистике трассировки (запуск приложения
+с --trace-sql или бенчмарка с --trace-sql): отпечатки запросов с количеством, временем,
+прочитанными строками и снятыми планами.
+События триггеров (SQLite) - вход в каждый сработавший триггер и каждый его оператор.
+Запускать из корневой директории проекта:
+python query_report.py [--file query_trace.json] [--sort total_ms|max_ms|mean_ms|count|slow] [--top 20] [--plans]
+"""
+
+import argparse
+from pathlib import Path
+
+from diagnostics.query_tracer import SORT_KEYS, load_trace
+
+TRACE_PATH = "query_trace.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Самые тяжёлые SQL-запросы по статистике трассировки.")
+    parser.add_argument("--file", default=TRACE_PATH, help=f"Файл статистики (по умолчанию {TRACE_PATH}).")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="total_ms",
+                        help="Порядок: суммарное, максимальное, среднее время, количество или медленные "
+                             "(по умолчанию total_ms).")
+    parser.add_argument("--top", type=int, default=20, help="Сколько запросов выводить (по умолчанию 20).")
+    parser.add_argument("--plans", action="store_true", help="Выводить планы медленных запросов.")
+    args = parser.parse_args()
+
+    if not Path(args.file).exists():
+        print(f"Файл статистики не найден: {args.file}")
+        return
+
+    items = load_trace(args.file)
+    if items is None:
+        print("Ошибка чтения статистики. Подробности в журнале.")
+        return
+    for item in items:
+        item["mean_ms"] = item["total_ms"] / item["count"] if item["count"] else 0.0
+    items.sort(key=lambda item: item[args.sort], reverse=True)
+
+    print(f"{'отпечаток':<10} | {'вызовов':>8} | {'медл.':>6} | {'всего, мс':>11} | {'сред., мс':>9} | "
+          f"{'макс., мс':>9} | {'строк/выз.':>10} | {'шагов ВМ/выз.':>13} | {'соб. тригг./выз.':>17} | запрос")
+    print("-" * 156)
+    for item in items[:args.top]:
+        count = item["count"] or 1
+        trigger_events = item.get("trigger_events", item.get("trigger_statements", 0))
+        print(f"{item['id']:<10} | {item['count']:>8} | {item['slow']:>6} | {item['total_ms']:>11.1f} | "
+              f"{item['mean_ms']:>9.2f} | {item['max_ms']:>9.1f} | {item['rows_total'] / count:>10.1f} | "
+              f"{item['vm_steps'] / count:>13.0f} | {trigger_events / count:>17.1f} | "
+              f"{item['fingerprint'][:120]}")
+
+    if args.plans:
+        for item in items[:args.top]:
+            plan = item.get("plan")
+            if not plan:
+                continue
+            print(f"\n[{item['id']}] {item['fingerprint']}")
+            print(f"План ({plan['backend']}, запрос {plan['ms']} мс, {plan['captured_at']}):")
+            for line in plan["lines"]:
+                print(f"    {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Скрипт для пересборки статистики выполнений (execution_stats, daily_execution_stats) по истории,
+включая архив: заполнение после загрузки данных в обход приложения или проверка расхождений.
+Запускать из корневой директории проекта:
+python rebuild_statistics.py [--from 2025-01-01] [--to 2026-01-01] [--rollup]
+"""
+
+import argparse
+from pathlib import Path
+
+from db.sqlite_database_manager import SQLiteDatabaseManager
+from reports.performance_analytics import refresh_rollup
+
+DB_PATH = "duty_app.db"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересборка статистики выполнений алгоритмов.")
+    parser.add_argument("--from", dest="start_date", help="Начало периода 'YYYY-MM-DD' (по умолчанию - вся история).")
+    parser.add_argument("--to", dest="end_date", help="Конец периода 'YYYY-MM-DD' (не включается).")
+    parser.add_argument("--rollup", action="store_true",
+                        help="Сразу построить сводки аналитики исполнения за период (нужны --from и --to).")
+    parser.add_argument("--db", default=DB_PATH, help=f"Путь к основной БД (по умолчанию {DB_PATH}).")
+    args = parser.parse_args()
+
+    if args.rollup and not (args.start_date and args.end_date):
+        parser.error("--rollup требует --from и --to")
+
+    if not Path(args.db).exists():
+        print(f"База данных не найдена: {args.db}")
+        return
+
+    manager = SQLiteDatabaseManager(args.db)
+    rebuilt_count = manager.rebuild_execution_statistics(args.start_date, args.end_date)
+    if rebuilt_count < 0:
+        print("Ошибка при пересборке статистики. Подробности в журнале.")
+        return
+    print(f"Статистика пересобрана для выполнений: {rebuilt_count}")
+
+    if args.rollup:
+        rebuilt_days = refresh_rollup(manager, args.start_date, args.end_date)
+        if rebuilt_days < 0:
+            print("Ошибка при построении сводок аналитики. Подробности в журнале.")
+        else:
+            print(f"Сводки аналитики построены за суток: {rebuilt_days}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# reports/docx_export_worker.py
+"""
+Фоновая выгрузка журнала действий (выполнение или период - сутки, смена, месяц) в DOCX.
+
+Оформление документа (поля, заголовок, шапка таблицы, стили) строит python-docx, но строки
+таблицы в дерево python-docx не добавляются: шаблон сохраняется в память, word/document.xml
+разрезается по концу таблицы, и итоговый файл пишется потоком - начало документа, строки
+порциями из БД (iter_action_log_rows), конец документа. Память не растёт с числом
+строк, поэтому месячная сводка на десятки тысяч действий строится так же, как суточная.
+
+DocxExportWorker повторяет интерфейс PdfReportWorker (progress, finished, failed, cancel())
+и запускается в QThread тем же способом.
+"""
+import io
+import logging
+import os
+import re
+import threading
+import traceback
+import zipfile
+from typing import Callable, Iterable, Optional, Tuple
+from xml.sax.saxutils import escape as xml_escape
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from reports.execution_report import format_report_time
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_XML = "word/document.xml"
+
+# Колонки таблицы журнала; строка-заголовок выполнения объединяет их все
+ACTION_LOG_HEADERS = (
+    "№", "Выполняемое мероприятие", "Начало", "Окончание", "Выполнено",
+    "Статус", "Кому доложено", "Примечания",
+)
+
+ACTION_STATUS_TEXT = {
+    "completed": "Выполнено",
+    "pending": "Ожидает",
+    "in_progress": "В процессе",
+    "skipped": "Пропущено",
+}
+
+# Текст абзаца, который после выгрузки строк заменяется итогами
+SUMMARY_PLACEHOLDER = "@@ACTION_LOG_SUMMARY@@"
+
+# Символы, недопустимые в XML 1.0 (встречаются во вставленных из буфера примечаниях)
+INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def build_docx_template(title: str, subtitle: str) -> bytes:
+    """Документ-шаблон: альбомная A4, заголовок, подзаголовок, шапка таблицы и абзац итогов."""
+    from docx import Document
+    from docx.enum.section import WD_ORIENT
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import Mm
+
+    document = Document()
+    section = document.sections[0]
+    section.orientation = WD_ORIENT.LANDSCAPE
+    section.page_width, section.page_height = Mm(297), Mm(210)
+    for side in ("left_margin", "right_margin", "top_margin", "bottom_margin"):
+        setattr(section, side, Mm(10))
+
+    document.add_heading(title, level=1)
+    if subtitle:
+        document.add_paragraph(subtitle)
+
+    table = document.add_table(rows=1, cols=len(ACTION_LOG_HEADERS))
+    table.style = "Table Grid"
+    for cell, header in zip(table.rows[0].cells, ACTION_LOG_HEADERS):
+        cell.text = ""
+        cell.paragraphs[0].add_run(header).bold = True
+    # Шапка повторяется на каждой странице
+    header_flag = OxmlElement("w:tblHeader")
+    header_flag.set(qn("w:val"), "true")
+    table.rows[0]._tr.get_or_add_trPr().append(header_flag)
+
+    document.add_paragraph(SUMMARY_PLACEHOLDER)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _text_xml(value, bold: bool = False) -> str:
+    """Абзац ячейки; переводы строк - разрывы строки Word."""
+    text = INVALID_XML_CHARS.sub("", "" if value is None else str(value))
+    run_properties = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    runs = "<w:br/>".join(f'<w:t xml:space="preserve">{xml_escape(line)}</w:t>' for line in text.split("\n"))
+    return f"<w:p><w:r>{run_properties}{runs}</w:r></w:p>"
+
+
+def _cells_xml(values) -> str:
+    return "<w:tr>" + "".join(f"<w:tc>{_text_xml(value)}</w:tc>" for value in values) + "</w:tr>"
+
+
+def _execution_row_xml(name, started_at) -> str:
+    """Строка-заголовок выполнения на всю ширину таблицы."""
+    text = f"{name or 'Без названия'} — начало {format_report_time(started_at)}"
+    return (f'<w:tr><w:tc><w:tcPr><w:gridSpan w:val="{len(ACTION_LOG_HEADERS)}"/></w:tcPr>'
+            f"{_text_xml(text, bold=True)}</w:tc></w:tr>")
+
+
+class ActionLogWriter:
+    """Перевод строк ACTION_LOG_QUERY в XML строк таблицы с подсчётом итогов."""
+
+    def __init__(self):
+        self.executions = 0
+        self.rows = 0
+        self.completed = 0
+        self._execution_id = None
+        self._number = 0
+
+    def chunk_xml(self, rows) -> str:
+        parts = []
+        for (execution_id, name, started_at, description, start, end,
+             actual_end, status, reported_to, notes) in rows:
+            if execution_id != self._execution_id:
+                self._execution_id = execution_id
+                self._number = 0
+                self.executions += 1
+                parts.append(_execution_row_xml(name, started_at))
+            self._number += 1
+            self.rows += 1
+            if status == "completed":
+                self.completed += 1
+            parts.append(_cells_xml((
+                self._number, description, format_report_time(start), format_report_time(end),
+                format_report_time(actual_end), ACTION_STATUS_TEXT.get(status, status or ""),
+                reported_to, notes,
+            )))
+        return "".join(parts)
+
+    def summary(self) -> str:
+        percent = round(100 * self.completed / self.rows, 1) if self.rows else 0
+        return (f"Итого: выполнений — {self.executions}, действий — {self.rows}, "
+                f"выполнено — {self.completed} ({percent}%)")
+
+
+def write_action_log_docx(path: str, title: str, subtitle: str, chunks: Iterable[list],
+                          on_chunk: Optional[Callable[[int], None]] = None,
+                          is_cancelled: Callable[[], bool] = lambda: False) -> Tuple[int, bool]:
+    """
+    Пишет журнал действий в DOCX потоком.
+    :param chunks: Порции строк ACTION_LOG_QUERY (iter_action_log_rows).
+    :param on_chunk: Вызывается после каждой порции с количеством записанных строк.
+    :param is_cancelled: Проверяется перед каждой порцией; при отмене файл удаляется.
+    :return: (количество строк, выгрузка отменена).
+    """
+    template = build_docx_template(title, subtitle)
+    log_writer = ActionLogWriter()
+    cancelled = False
+    try:
+        with zipfile.ZipFile(io.BytesIO(template)) as source, \
+                zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+            for item in source.infolist():
+                if item.filename != DOCUMENT_XML:
+                    target.writestr(item, source.read(item.filename))
+                    continue
+                document_xml = source.read(item.filename).decode("utf-8")
+                table_end = document_xml.rindex("</w:tbl>")
+                head, tail = document_xml[:table_end], document_xml[table_end:]
+                with target.open(DOCUMENT_XML, "w") as stream:
+                    stream.write(head.encode("utf-8"))
+                    for rows in chunks:
+                        if is_cancelled():
+                            cancelled = True
+                            break
+                        stream.write(log_writer.chunk_xml(rows).encode("utf-8"))
+                        if on_chunk is not None:
+                            on_chunk(log_writer.rows)
+                    tail = tail.replace(SUMMARY_PLACEHOLDER, xml_escape(log_writer.summary()), 1)
+                    stream.write(tail.encode("utf-8"))
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    finally:
+        # Генератор строк закрывается сразу: освобождает курсор и соединение с БД
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    if cancelled:
+        os.remove(path)
+    return log_writer.rows, cancelled
+
+
+class DocxExportWorker(QObject):
+    """
+    Выгрузка журнала действий в DOCX. Работает в отдельном QThread:
+    thread.started -> run(), finished/failed -> thread.quit().
+    """
+    # (выгружено строк, всего строк)
+    progress = Signal(int, int)
+    # (количество выгруженных строк, пути созданных файлов, выгрузка отменена)
+    finished = Signal(int, list, bool)
+    # Текст ошибки; недописанный файл удаляется
+    failed = Signal(str)
+
+    def __init__(self, database_manager, output_path: str, title: str, subtitle: str = "",
+                 start_string: Optional[str] = None, end_string: Optional[str] = None,
+                 execution_id: Optional[int] = None):
+        """
+        :param database_manager: Менеджер БД (count_action_log_rows, iter_action_log_rows).
+        :param output_path: Путь к DOCX-файлу.
+        :param title: Заголовок документа.
+        :param subtitle: Подзаголовок (пост, время формирования).
+        :param start_string: Начало периода (если не задан execution_id).
+        :param end_string: Конец периода, не включается.
+        :param execution_id: Выгрузить одно выполнение.
+        """
+        super().__init__()
+        self.database_manager = database_manager
+        self.output_path = output_path
+        self.title = title
+        self.subtitle = subtitle
+        self.start_string = start_string
+        self.end_string = end_string
+        self.execution_id = execution_id
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Запрашивает отмену; выгрузка остановится перед следующей порцией строк."""
+        self._cancel_event.set()
+
+    @Slot()
+    def run(self):
+        try:
+            total = self.database_manager.count_action_log_rows(self.start_string, self.end_string, self.execution_id)
+            if total < 0:
+                raise RuntimeError("Не удалось подсчитать строки журнала действий.")
+            self.progress.emit(0, total)
+            chunks = self.database_manager.iter_action_log_rows(self.start_string, self.end_string, self.execution_id)
+            rows, cancelled = write_action_log_docx(
+                self.output_path, self.title, self.subtitle, chunks,
+                on_chunk=lambda written: self.progress.emit(written, max(total, written)),
+                is_cancelled=self._cancel_event.is_set,
+            )
+            logger.info(f"Выгрузка журнала действий в DOCX {'отменена' if cancelled else 'завершена'}: "
+                        f"{rows} из {total} строк, '{self.output_path}'.")
+            self.finished.emit(rows, [] if cancelled else [self.output_path], cancelled)
+        except Exception as e:
+            logger.error(f"Ошибка выгрузки журнала действий в DOCX '{self.output_path}': {e}")
+            traceback.print_exc()
+            self.failed.emit(str(e))
@@ -0,0 +1,315 @@
+# reports/execution_report.py
+"""
+HTML-отчёт по выполнению алгоритма (предпросмотр, печать, выгрузка в PDF).
+
+Шаблоны страницы и строки таблицы компилируются один раз при импорте (string.Template),
+блок стилей строится один раз на набор настроек шрифта печати, а повторяющиеся значения
+(времена действий, подпись ответственного) разбираются через кэши функций. Готовые отчёты
+хранит ReportCache: ключ - id выполнения, версия его строк в БД (max(updated_at)) и
+настройки печати, поэтому повторный предпросмотр и печать того же отчёта не строят его заново.
+"""
+import html
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from time_service import TimeService
+
+# Сколько готовых отчётов держать в памяти
+REPORT_CACHE_SIZE = 32
+
+# Формат времени в отчёте
+REPORT_TIME_FORMAT = "%d.%m.%Y %H:%M"
+
+# "ст. лейтенант Иванов И.И." -> звание до фамилии (первое слово с заглавной и строчными буквами)
+RANK_PATTERN = re.compile(r'^([^\w]*[А-Яа-яёЁ\s]+?)\s+([А-Я][а-яё]+)')
+
+REPORT_STYLE_TEMPLATE = Template("""
+                body {
+                    font-family: "$font_family", Arial, sans-serif;
+                    font-size: ${font_size}pt;
+                    font-weight: $font_weight;
+                    font-style: $font_style;
+                    line-height: 1.4;
+                    margin: 20px;
+                }
+                .header {
+                    text-align: center;
+                    margin-bottom: 20px;
+                }
+                .header h1 {
+                    margin: 0;
+                    font-size: ${title_font_size}pt;
+                    font-weight: bold;
+                }
+                .start-date {
+                    margin-top: 8px;
+                    font-size: ${font_size}pt;
+                }
+                table {
+                    width: 100%;
+                    table-layout: fixed;
+                    border-collapse: collapse;
+                    margin-bottom: 20px;
+                }
+                colgroup col { }
+                th, td {
+                    border: 1px solid #000;
+                    padding: 6px;
+                    vertical-align: top;
+                    text-align: left;
+                    word-wrap: break-word;
+                }
+                th {
+                    background-color: #f0f0f0;
+                    font-weight: bold;
+                }
+                tr:nth-child(even) { background-color: #fafafa; }
+                .summary {
+                    margin-top: 20px;
+                    font-weight: bold;
+                    font-size: ${font_size}pt;
+                }
+                .signature-block {
+                    margin-top: 40px;
+                    font-size: ${font_size}pt;
+                }
+                .signature-line-left {
+                    text-align: left;
+                    margin: 4px 0;
+                }
+                .signature-line-right {
+                    text-align: right;
+                    margin: 4px 0;
+                }
+                a { color: #0066cc; text-decoration: none; }
+""")
+
+REPORT_TEMPLATE = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>Отчёт по выполнению</title>
+            <style>$style            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>$title</h1>
+                <div class="start-date">Начало: $started_at</div>
+            </div>
+
+            <table>
+                <colgroup>
+                    <col style="width: 5%;">
+                    <col style="width: 30%;">
+                    <col style="width: 10%;">
+                    <col style="width: 10%;">
+                    <col style="width: 12%;">
+                    <col style="width: 15%;">
+                    <col style="width: 18%;">
+                </colgroup>
+                <thead>
+                    <tr>
+                        <th>№</th>
+                        <th>Выполняемое мероприятие</th>
+                        <th>Начало</th>
+                        <th>Окончание</th>
+                        <th>Телефоны для взаимодействия</th>
+                        <th>Отчётный материал</th>
+                        <th>Выполнение</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    $rows
+                </tbody>
+            </table>
+
+            <div class="summary">
+                Итого: из $total задач выполнено $completed ($pct_completed%), своевременно — $on_time ($pct_on_time%)
+            </div>
+
+            <div class="signature-block">
+                <div class="signature-line-left">$post_name</div>
+                <div class="signature-line-left">$rank</div>
+                <div class="signature-line-right">$full_name</div>
+                <div class="signature-line-left">«____»  _________________ $year г.</div>
+            </div>
+        </body>
+        </html>
+        """)
+
+ROW_TEMPLATE = Template("""
+            <tr>
+                <td>$number</td>
+                <td>$description</td>
+                <td>$start</td>
+                <td>$end</td>
+                <td>$phones</td>
+                <td>$materials</td>
+                <td>$execution</td>
+            </tr>
+            """)
+
+
+def escape(value) -> str:
+    return html.escape(str(value) if value is not None else "", quote=True)
+
+
+@lru_cache(maxsize=4096)
+def format_report_time(value) -> str:
+    """Время из БД в формате отчёта (у действий одного запуска времена часто совпадают)."""
+    return TimeService.format(value, REPORT_TIME_FORMAT)
+
+
+@lru_cache(maxsize=4096)
+def _to_epoch(value) -> Optional[int]:
+    return TimeService.to_epoch(value)
+
+
+@lru_cache(maxsize=64)
+def report_style(font_family: str, font_size: int, font_style: str) -> str:
+    """Блок CSS отчёта для настроек шрифта печати."""
+    return REPORT_STYLE_TEMPLATE.substitute(
+        font_family=font_family,
+        font_size=font_size,
+        title_font_size=font_size + 4,
+        font_weight="bold" if font_style in ("bold", "bold_italic") else "normal",
+        font_style="italic" if font_style in ("italic", "bold_italic") else "normal",
+    )
+
+
+@lru_cache(maxsize=256)
+def split_rank_and_name(full_display: str, rank: str = "") -> Tuple[str, str]:
+    """
+    Разделяет сохранённое при запуске отображаемое имя на звание и ФИО.
+    :param rank: Звание, если оно сохранено отдельно (тогда из имени убирается только его дубль).
+    :return: (звание, ФИО) без экранирования.
+    """
+    fio_part = full_display
+    if not rank and full_display:
+        match = RANK_PATTERN.match(full_display)
+        if match:
+            rank = match.group(1).strip()
+            fio_part = full_display[len(rank):].strip()
+    # Очищаем ФИО от возможного дублирующего звания
+    if fio_part.startswith(rank):
+        fio_part = fio_part[len(rank):].strip()
+    return rank, fio_part
+
+
+def action_statistics(actions) -> Dict[str, int]:
+    """
+    Итоги по действиям выполнения (отчёт, круговая диаграмма).
+    :return: {"total", "completed" (статус 'completed'), "on_time" и "late" (завершены с известными
+             временами - в срок и с опозданием), "not_done" (все остальные)}.
+    """
+    completed = on_time = late = 0
+    for action in actions:
+        if action.get('status') != 'completed':
+            continue
+        completed += 1
+        actual = _to_epoch(action.get('actual_end_time') or None)
+        planned = _to_epoch(action.get('calculated_end_time') or None)
+        if actual is None or planned is None:
+            continue
+        if actual <= planned:
+            on_time += 1
+        else:
+            late += 1
+    total = len(actions)
+    return {
+        "total": total,
+        "completed": completed,
+        "on_time": on_time,
+        "late": late,
+        "not_done": total - on_time - late,
+    }
+
+
+def _materials_html(materials) -> str:
+    links = []
+    for line in str(materials).splitlines():
+        path = line.strip()
+        if path:
+            links.append(f'<a href="{html.escape(path)}">{html.escape(os.path.basename(path))}</a><br>')
+    return "".join(links)
+
+
+def render_execution_report(exec_data, actions, font_family: str, font_size: int, font_style: str,
+                            post_name: str, year: int) -> str:
+    """
+    HTML-отчёт по выполнению.
+    :param exec_data: Данные выполнения (get_algorithm_execution_by_id).
+    :param actions: Действия выполнения (get_action_executions_by_execution_id).
+    :param font_size: Размер шрифта печати (уже ограниченный диапазоном).
+    :param post_name: Название поста для подписи.
+    :param year: Год в строке даты подписи.
+    """
+    rank, fio_part = split_rank_and_name((exec_data.get('created_by_user_display_name') or '').strip(),
+                                         exec_data.get('created_by_rank') or '')
+    rows = []
+    for number, action in enumerate(actions, 1):
+        materials = action.get('snapshot_report_materials')
+        if action.get('status', '') == 'completed':
+            execution_text = f"Выполнено<br>{format_report_time(action.get('actual_end_time'))}"
+        else:
+            execution_text = "Не выполнено"
+        rows.append(ROW_TEMPLATE.substitute(
+            number=number,
+            description=escape(action.get('snapshot_description', '')),
+            start=format_report_time(action.get('calculated_start_time')),
+            end=format_report_time(action.get('calculated_end_time')),
+            phones=escape(action.get('snapshot_contact_phones', '')),
+            materials=_materials_html(materials) if materials else "",
+            execution=execution_text,
+        ))
+
+    stats = action_statistics(actions)
+    total = stats["total"]
+    return REPORT_TEMPLATE.substitute(
+        style=report_style(font_family, font_size, font_style),
+        title=escape(exec_data.get('snapshot_name', 'Без названия')),
+        started_at=format_report_time(exec_data.get('started_at')),
+        rows="".join(rows),
+        total=total,
+        completed=stats["completed"],
+        on_time=stats["on_time"],
+        pct_completed=round(100 * stats["completed"] / total, 1) if total > 0 else 0,
+        pct_on_time=round(100 * stats["on_time"] / total, 1) if total > 0 else 0,
+        post_name=escape(post_name) if post_name else "Пост",
+        rank=escape(rank),
+        full_name=escape(fio_part) if fio_part else "—",
+        year=year,
+    )
+
+
+class ReportCache:
+    """
+    LRU готовых отчётов. Ключ - (id выполнения, версия строк выполнения в БД, настройки печати):
+    любое изменение выполнения или его действий меняет версию, и отчёт строится заново.
+    Используется из потока интерфейса и из потока выгрузки в PDF, поэтому доступ под блокировкой.
+    """
+
+    def __init__(self, max_size: int = REPORT_CACHE_SIZE):
+        self._max_size = max_size
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
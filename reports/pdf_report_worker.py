@@ -0,0 +1,186 @@
+# reports/pdf_report_worker.py
+"""
+Фоновая выгрузка отчётов по выполнениям алгоритмов в PDF (QPdfWriter).
+
+PdfReportWorker переносится в отдельный QThread (moveToThread) и по одному выполнению
+строит HTML-отчёт, раскладывает его в QTextDocument и рисует постранично в PDF, не занимая
+поток интерфейса: выгрузка за смену из десятков выполнений не "замораживает" пульт дежурного.
+
+Отчёты пишутся либо в один файл (каждое выполнение - с новой страницы), либо в набор файлов
+в каталоге (файл на выполнение). Ход выгрузки сообщается сигналом progress, отмена -
+методом cancel(), который безопасно вызывать из потока интерфейса.
+"""
+import logging
+import os
+import re
+import threading
+import traceback
+from typing import Callable, List, Optional, Tuple
+
+from PySide6.QtCore import QMarginsF, QObject, QPointF, QRectF, QSizeF, Signal, Slot
+from PySide6.QtGui import QPageLayout, QPageSize, QPainter, QPdfWriter, QTextDocument
+
+logger = logging.getLogger(__name__)
+
+# Разрешение PDF: как у QPrinter.HighResolution при печати на принтер
+PDF_RESOLUTION_DPI = 300
+
+# Поля страницы, мм
+PDF_MARGINS_MM = 10
+
+# Символы, недопустимые в именах файлов Windows
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def create_pdf_writer(path: str) -> QPdfWriter:
+    """QPdfWriter для отчёта: A4, альбомная ориентация (как при печати из предпросмотра)."""
+    writer = QPdfWriter(path)
+    writer.setResolution(PDF_RESOLUTION_DPI)
+    writer.setPageLayout(QPageLayout(
+        QPageSize(QPageSize.PageSizeId.A4),
+        QPageLayout.Orientation.Landscape,
+        QMarginsF(PDF_MARGINS_MM, PDF_MARGINS_MM, PDF_MARGINS_MM, PDF_MARGINS_MM),
+        QPageLayout.Unit.Millimeter,
+    ))
+    writer.setCreator("DuOfficer")
+    return writer
+
+
+def render_html(painter: QPainter, writer: QPdfWriter, html_content: str, new_page: bool) -> int:
+    """
+    Рисует HTML-документ постранично на уже открытом painter'е.
+    :param new_page: Начать документ с новой страницы (для второго и следующих отчётов в одном файле).
+    :return: Количество нарисованных страниц.
+    """
+    document = QTextDocument()
+    # Раскладка по метрикам PDF, а не экрана - иначе шрифты и переносы не совпадут с печатью
+    document.documentLayout().setPaintDevice(writer)
+    document.setHtml(html_content)
+    page_rect = writer.pageLayout().paintRectPixels(writer.resolution())
+    page_size = QSizeF(page_rect.width(), page_rect.height())
+    document.setPageSize(page_size)
+
+    pages = max(1, document.pageCount())
+    for page in range(pages):
+        if new_page or page > 0:
+            writer.newPage()
+        painter.save()
+        painter.translate(QPointF(0, -page * page_size.height()))
+        document.drawContents(painter, QRectF(QPointF(0, page * page_size.height()), page_size))
+        painter.restore()
+    return pages
+
+
+def report_file_name(exec_data) -> str:
+    """Имя файла отчёта: дата и время запуска, id и название выполнения."""
+    started_at = str(exec_data.get('started_at') or '')[:19].replace('T', '_').replace(' ', '_').replace(':', '-')
+    name = UNSAFE_FILENAME_CHARS.sub('_', str(exec_data.get('snapshot_name') or 'Без_названия')).strip('._')
+    return f"{started_at}_{exec_data.get('id')}_{name[:80]}.pdf"
+
+
+class PdfReportWorker(QObject):
+    """
+    Выгрузка отчётов по списку выполнений в PDF. Работает в отдельном QThread:
+    thread.started -> run(), finished/failed -> thread.quit().
+    """
+    # (готово, всего)
+    progress = Signal(int, int)
+    # (количество выгруженных отчётов, пути созданных файлов, выгрузка отменена)
+    finished = Signal(int, list, bool)
+    # Текст ошибки; недописанный файл удаляется
+    failed = Signal(str)
+
+    def __init__(self, report_loader: Callable[[int], Optional[Tuple[dict, str]]], execution_ids: List[int],
+                 output_path: str, single_file: bool = True):
+        """
+        :param report_loader: id выполнения -> (данные выполнения, HTML-отчёт) или None, если данных нет
+                              (ApplicationData._load_execution_report, с кэшем готовых отчётов).
+        :param execution_ids: id выполнений в порядке вывода.
+        :param output_path: Путь к PDF-файлу (single_file) или к каталогу для набора файлов.
+        :param single_file: True - все отчёты в один файл, False - файл на каждое выполнение.
+        """
+        super().__init__()
+        self.report_loader = report_loader
+        self.execution_ids = list(execution_ids)
+        self.output_path = output_path
+        self.single_file = single_file
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Запрашивает отмену; выгрузка остановится после текущего отчёта."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def _load_report(self, execution_id: int) -> Optional[Tuple[dict, str]]:
+        """(данные выполнения, HTML-отчёт) или None, если данных нет."""
+        report = self.report_loader(execution_id)
+        if report is None:
+            logger.warning(f"Нет данных для отчёта по выполнению ID {execution_id}, пропущено.")
+        return report
+
+    @Slot()
+    def run(self):
+        total = len(self.execution_ids)
+        created_files: List[str] = []
+        done = 0
+        painter = None
+        current_path = None  # Файл, открытый painter'ом в данный момент
+        try:
+            self.progress.emit(0, total)
+            if self.single_file:
+                writer = create_pdf_writer(self.output_path)
+                painter = QPainter()
+                current_path = self.output_path
+                for position, execution_id in enumerate(self.execution_ids, start=1):
+                    if self.cancelled:
+                        break
+                    report = self._load_report(execution_id)
+                    if report is not None:
+                        if not painter.isActive() and not painter.begin(writer):
+                            raise OSError(f"Не удалось открыть файл '{self.output_path}' для записи.")
+                        render_html(painter, writer, report[1], new_page=done > 0)
+                        done += 1
+                    self.progress.emit(position, total)
+                if painter.isActive():
+                    painter.end()
+                    created_files.append(self.output_path)
+                if self.cancelled and created_files:
+                    # Отменённая выгрузка в один файл не оставляет неполный отчёт
+                    os.remove(self.output_path)
+                    created_files.clear()
+            else:
+                os.makedirs(self.output_path, exist_ok=True)
+                for position, execution_id in enumerate(self.execution_ids, start=1):
+                    if self.cancelled:
+                        break
+                    report = self._load_report(execution_id)
+                    if report is not None:
+                        exec_data, html_content = report
+                        path = os.path.join(self.output_path, report_file_name(exec_data))
+                        writer = create_pdf_writer(path)
+                        painter = QPainter()
+                        current_path = path
+                        if not painter.begin(writer):
+                            raise OSError(f"Не удалось открыть файл '{path}' для записи.")
+                        render_html(painter, writer, html_content, new_page=False)
+                        painter.end()
+                        created_files.append(path)
+                        done += 1
+                    self.progress.emit(position, total)
+
+            logger.info(f"Выгрузка отчётов в PDF {'отменена' if self.cancelled else 'завершена'}: "
+                        f"{done} из {total}, файлов: {len(created_files)}.")
+            self.finished.emit(done, created_files, self.cancelled)
+        except Exception as e:
+            logger.error(f"Ошибка выгрузки отчётов в PDF '{self.output_path}': {e}")
+            traceback.print_exc()
+            if painter is not None and painter.isActive():
+                painter.end()
+                try:
+                    os.remove(current_path)
+                except OSError:
+                    pass
+            self.failed.emit(str(e))
@@ -0,0 +1,230 @@
+# reports/performance_analytics.py
+"""
+Аналитика исполнения за произвольный период: доля действий, выполненных в срок, среднее
+и процентили опоздания, количество пропущенных - в разрезе алгоритмов, описаний действий
+и ответственных.
+
+Расчёт идёт по суточным сводкам (таблицы performance_rollup*). Сводка суток строится один раз
+NumPy-группировкой исходных строк; триггеры БД помечают сутки, данные которых изменились,
+и при запросе перестраиваются только они. Итоги за период - сгруппированный SQL по сводкам
+(строк не больше, чем сутки x значения разреза), процентили - по суммарной гистограмме
+опозданий. Годовой отчёт поэтому не читает сотни тысяч строк action_executions.
+"""
+import datetime
+import logging
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from notifications.deadline_evaluator import MISSING_TIME, to_epoch_array
+
+logger = logging.getLogger(__name__)
+
+# Разрезы аналитики и их названия
+DIMENSIONS = {
+    "algorithm": "Алгоритм",
+    "action": "Действие",
+    "officer": "Ответственный",
+}
+
+# Колонка значения разреза в исходных строках (PERFORMANCE_SOURCE_QUERY менеджеров БД):
+# (сутки, алгоритм, описание действия, ответственный, статус, плановое окончание, фактическое окончание)
+DIMENSION_COLUMNS = {
+    "algorithm": 1,
+    "action": 2,
+    "officer": 3,
+}
+
+# Значение разреза, если в строке оно не задано
+EMPTY_GROUP_KEY = "—"
+
+# Левые границы интервалов гистограммы опозданий, с: до часа - по минуте, до 4 часов - по 5 минут,
+# до суток - по 30 минут, затем сутки, двое суток и неделя (последний интервал не ограничен).
+# Процентиль интерполируется внутри интервала, погрешность не больше его ширины.
+LATENESS_BUCKET_EDGES = np.concatenate((
+    np.arange(0, 3600, 60),
+    np.arange(3600, 4 * 3600, 300),
+    np.arange(4 * 3600, 24 * 3600, 1800),
+    [24 * 3600, 2 * 24 * 3600, 7 * 24 * 3600],
+)).astype(np.int64)
+
+DEFAULT_PERCENTILES = (50, 90, 95)
+
+
+def day_runs(days: Sequence[str]) -> List[Tuple[str, str]]:
+    """Отсортированные сутки 'YYYY-MM-DD' -> непрерывные периоды [начало, конец)."""
+    runs = []
+    for day in days:
+        date = datetime.date.fromisoformat(day)
+        if runs and runs[-1][1] == date:
+            runs[-1][1] = date + datetime.timedelta(days=1)
+        else:
+            runs.append([date, date + datetime.timedelta(days=1)])
+    return [(start.isoformat(), end.isoformat()) for start, end in runs]
+
+
+def build_daily_rollup(rows: Sequence[tuple]) -> Tuple[list, list]:
+    """
+    Суточные сводки по исходным строкам.
+    :return: (строки performance_rollup, строки performance_rollup_lateness) - кортежи в порядке
+             колонок save_performance_rollup менеджеров БД.
+    """
+    if not rows:
+        return [], []
+    columns = list(zip(*rows))
+    status = np.array(columns[4], dtype=object)
+    planned = to_epoch_array(columns[5])
+    actual = to_epoch_array(columns[6])
+
+    completed = status == "completed"
+    skipped = status == "skipped"
+    timed = completed & (planned != MISSING_TIME) & (actual != MISSING_TIME)
+    lateness = np.zeros(len(rows), dtype=np.int64)
+    np.subtract(actual, planned, out=lateness, where=timed)
+    late = timed & (lateness > 0)
+    on_time = timed & ~late
+    bucket = np.searchsorted(LATENESS_BUCKET_EDGES, lateness, side="right") - 1
+    bucket_count = len(LATENESS_BUCKET_EDGES)
+
+    day_values, day_index = np.unique(np.array(columns[0], dtype=object), return_inverse=True)
+    rollup_rows, lateness_rows = [], []
+    for dimension, column in DIMENSION_COLUMNS.items():
+        keys = np.array([value or EMPTY_GROUP_KEY for value in columns[column]], dtype=object)
+        key_values, key_index = np.unique(keys, return_inverse=True)
+        # Группа - пара (сутки, значение разреза), закодированная одним целым
+        group_codes, group_index = np.unique(day_index * len(key_values) + key_index, return_inverse=True)
+        group_count = len(group_codes)
+        group_day = day_values[group_codes // len(key_values)]
+        group_key = key_values[group_codes % len(key_values)]
+
+        def group_sum(values):
+            return np.bincount(group_index, weights=values, minlength=group_count).astype(np.int64)
+
+        lateness_max = np.zeros(group_count, dtype=np.int64)
+        np.maximum.at(lateness_max, group_index[late], lateness[late])
+        rollup_rows.extend(zip(
+            repeat(dimension), group_day.tolist(), group_key.tolist(),
+            np.bincount(group_index, minlength=group_count).tolist(),
+            group_sum(completed).tolist(), group_sum(on_time).tolist(), group_sum(late).tolist(),
+            group_sum(skipped).tolist(), group_sum(np.where(late, lateness, 0)).tolist(), lateness_max.tolist(),
+        ))
+
+        cells, cell_counts = np.unique(group_index[late] * bucket_count + bucket[late], return_counts=True)
+        cell_groups = cells // bucket_count
+        lateness_rows.extend(zip(
+            repeat(dimension), group_day[cell_groups].tolist(), group_key[cell_groups].tolist(),
+            (cells % bucket_count).tolist(), cell_counts.tolist(),
+        ))
+    return rollup_rows, lateness_rows
+
+
+def lateness_percentile(histogram: np.ndarray, maxima: np.ndarray, percentile: float) -> np.ndarray:
+    """
+    Процентиль опоздания по гистограммам (строка - группа, колонка - интервал LATENESS_BUCKET_EDGES).
+    :param maxima: Наибольшее опоздание группы - верхняя граница последнего интервала.
+    :return: Секунды (float); 0 для групп без опозданий.
+    """
+    rows = np.arange(len(histogram))
+    late_counts = histogram.sum(axis=1)
+    cumulative = np.cumsum(histogram, axis=1)
+    rank = late_counts * (percentile / 100)
+    bucket = np.argmax(cumulative >= rank[:, None], axis=1)
+    before = np.where(bucket > 0, cumulative[rows, bucket - 1], 0)
+    in_bucket = histogram[rows, bucket]
+    lower = LATENESS_BUCKET_EDGES[bucket]
+    upper = np.minimum(np.append(LATENESS_BUCKET_EDGES[1:], np.iinfo(np.int64).max)[bucket], maxima)
+    fraction = np.divide(rank - before, in_bucket, out=np.zeros(len(rows)), where=in_bucket > 0)
+    value = np.minimum(lower + fraction * (upper - lower), maxima)
+    return np.where(late_counts > 0, value, 0.0)
+
+
+def summarize_rollup(totals: Sequence[tuple], lateness_rows: Sequence[tuple],
+                     percentiles: Sequence[int] = DEFAULT_PERCENTILES) -> List[Dict[str, object]]:
+    """
+    Показатели групп по итогам сводок за период (get_performance_rollup менеджеров БД).
+    :return: Список словарей, сначала группы с наибольшей долей опозданий:
+             {"key", "total", "completed", "on_time", "late", "skipped", "not_done",
+              "on_time_rate", "late_rate" (% от всех действий), "mean_lateness_minutes",
+              "max_lateness_minutes", "p<N>_lateness_minutes" - для каждого процентиля}.
+             Средние и процентили опоздания - по действиям, выполненным с опозданием.
+    """
+    if not totals:
+        return []
+    keys = [row[0] for row in totals]
+    counts = np.array([row[1:] for row in totals], dtype=np.int64)
+    total, completed, on_time, late, skipped, lateness_sum, lateness_max = counts.T
+
+    histogram = np.zeros((len(keys), len(LATENESS_BUCKET_EDGES)), dtype=np.int64)
+    if lateness_rows:
+        positions = {key: index for index, key in enumerate(keys)}
+        np.add.at(
+            histogram,
+            (np.array([positions[row[0]] for row in lateness_rows]), np.array([row[1] for row in lateness_rows])),
+            np.array([row[2] for row in lateness_rows], dtype=np.int64),
+        )
+
+    def rate(values):
+        return np.round(100 * np.divide(values, total, out=np.zeros(len(keys)), where=total > 0), 1)
+
+    def minutes(seconds):
+        return np.round(seconds / 60, 1)
+
+    columns = {
+        "key": keys,
+        "total": total.tolist(),
+        "completed": completed.tolist(),
+        "on_time": on_time.tolist(),
+        "late": late.tolist(),
+        "skipped": skipped.tolist(),
+        "not_done": (total - completed - skipped).tolist(),
+        "on_time_rate": rate(on_time).tolist(),
+        "late_rate": rate(late).tolist(),
+        "mean_lateness_minutes": minutes(np.divide(lateness_sum, late, out=np.zeros(len(keys)), where=late > 0)).tolist(),
+        "max_lateness_minutes": minutes(lateness_max).tolist(),
+    }
+    for percentile in percentiles:
+        columns[f"p{percentile}_lateness_minutes"] = minutes(lateness_percentile(histogram, lateness_max, percentile)).tolist()
+
+    order = np.lexsort((-late, -rate(late)))
+    names = list(columns)
+    return [{name: columns[name][index] for name in names} for index in order.tolist()]
+
+
+def refresh_rollup(database_manager, start_date: str, end_date: str) -> int:
+    """
+    Перестраивает сводки суток периода [start_date, end_date), которые ещё не построены
+    или изменились после построения.
+    :return: Количество перестроенных суток или -1 при ошибке.
+    """
+    days = database_manager.claim_performance_rollup_days(start_date, end_date)
+    if days is None:
+        return -1
+    if not days:
+        return 0
+    rollup_rows, lateness_rows = [], []
+    for run_start, run_end in day_runs(days):
+        day_rollup, day_lateness = build_daily_rollup(database_manager.get_performance_source_rows(run_start, run_end))
+        rollup_rows.extend(day_rollup)
+        lateness_rows.extend(day_lateness)
+    if not database_manager.save_performance_rollup(days, rollup_rows, lateness_rows):
+        return -1
+    return len(days)
+
+
+def performance_report(database_manager, dimension: str, start_date: str, end_date: str,
+                       percentiles: Sequence[int] = DEFAULT_PERCENTILES) -> Optional[List[Dict[str, object]]]:
+    """
+    Аналитика исполнения за период [start_date, end_date) ('YYYY-MM-DD') в разрезе dimension
+    (ключ DIMENSIONS). Сначала дополняет сводки (refresh_rollup), затем считает показатели.
+    :return: Результат summarize_rollup или None при ошибке БД.
+    """
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Неизвестный разрез аналитики: '{dimension}'")
+    rebuilt_days = refresh_rollup(database_manager, start_date, end_date)
+    if rebuilt_days > 0:
+        logger.info(f"Сводки аналитики перестроены за {rebuilt_days} сут. периода '{start_date}' - '{end_date}'.")
+    data = database_manager.get_performance_rollup(dimension, start_date, end_date)
+    if data is None:
+        return None
+    return summarize_rollup(*data, percentiles=percentiles)
@@ -0,0 +1,104 @@
+# time_service.py
+"""
+Единый источник текущего времени приложения.
+
+Все времена в БД хранятся как "настенное" местное время без часового пояса
+('YYYY-MM-DD HH:MM:SS'). TimeService переводит их и текущий момент в целые секунды
+в одной шкале - секунды от 1970-01-01 00:00:00 настенного времени зоны (без учёта пояса),
+поэтому сравнение "сейчас" с плановыми временами действий - целочисленная арифметика.
+
+Зоны:
+- ZONE_SYSTEM - системное время компьютера;
+- ZONE_LOCAL  - местное время (системное + custom_time_offset_seconds из настроек);
+- ZONE_MOSCOW - московское время (системное + moscow_time_offset_seconds из настроек).
+"""
+import calendar
+import datetime
+import time
+from typing import Optional, Union
+
+ZONE_SYSTEM = 'system'
+ZONE_LOCAL = 'local'
+ZONE_MOSCOW = 'moscow'
+
+# Как часто сверять монотонные часы с системными (например, после перевода часов или сна)
+RESYNC_INTERVAL_SECONDS = 60.0
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class TimeService:
+    """
+    Хранит смещения местного и московского времени и выдаёт "сейчас" в секундах для любой зоны.
+    Текущее время отсчитывается по time.monotonic() от последней сверки с системными часами,
+    поэтому между сверками оно не идёт назад при подстройке системных часов.
+    """
+
+    def __init__(self, custom_offset_seconds: int = 0, moscow_offset_seconds: int = 0):
+        self._offsets = {
+            ZONE_SYSTEM: 0,
+            ZONE_LOCAL: int(custom_offset_seconds or 0),
+            ZONE_MOSCOW: int(moscow_offset_seconds or 0),
+        }
+        self._resync()
+
+    def set_offsets(self, custom_offset_seconds: Optional[int] = None, moscow_offset_seconds: Optional[int] = None):
+        """Обновляет смещения (вызывается при загрузке и изменении настроек)."""
+        if custom_offset_seconds is not None:
+            self._offsets[ZONE_LOCAL] = int(custom_offset_seconds)
+        if moscow_offset_seconds is not None:
+            self._offsets[ZONE_MOSCOW] = int(moscow_offset_seconds)
+
+    def _resync(self):
+        # Настенное системное время в секундах (UTC + смещение пояса компьютера)
+        wall_time = time.time()
+        self._anchor_wall = calendar.timegm(time.localtime(wall_time)) + (wall_time % 1)
+        self._anchor_monotonic = time.monotonic()
+
+    def now_epoch(self, zone: str = ZONE_LOCAL) -> int:
+        """Текущее время зоны в целых секундах (шкала настенного времени)."""
+        elapsed = time.monotonic() - self._anchor_monotonic
+        if elapsed >= RESYNC_INTERVAL_SECONDS:
+            self._resync()
+            elapsed = 0.0
+        return int(self._anchor_wall + elapsed) + self._offsets[zone]
+
+    def now_datetime(self, zone: str = ZONE_LOCAL) -> datetime.datetime:
+        """Текущее время зоны как datetime без часового пояса."""
+        return self.from_epoch(self.now_epoch(zone))
+
+    @staticmethod
+    def to_epoch(value: Union[str, datetime.datetime, None]) -> Optional[int]:
+        """
+        Переводит время из БД (строка ISO/'YYYY-MM-DD HH:MM:SS' или datetime) в секунды.
+        Часовой пояс, если указан, отбрасывается - время считается настенным.
+        :return: Секунды или None, если значение пустое или не распознано.
+        """
+        if value is None or value == '':
+            return None
+        if isinstance(value, datetime.datetime):
+            dt = value
+        else:
+            try:
+                dt = datetime.datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+            except ValueError:
+                try:
+                    dt = datetime.datetime.strptime(str(value).strip(), '%d.%m.%Y %H:%M:%S')
+                except ValueError:
+                    return None
+        return calendar.timegm(dt.timetuple())
+
+    @staticmethod
+    def from_epoch(epoch_seconds: int) -> datetime.datetime:
+        """Переводит секунды обратно в datetime без часового пояса."""
+        return _EPOCH + datetime.timedelta(seconds=epoch_seconds)
+
+    @classmethod
+    def format(cls, value: Union[str, datetime.datetime, int, None], fmt: str = '%d.%m.%Y %H:%M:%S') -> str:
+        """Форматирует время (секунды, datetime или строку из БД); нераспознанное значение возвращается как есть."""
+        if value is None or value == '':
+            return ""
+        epoch_seconds = value if isinstance(value, int) else cls.to_epoch(value)
+        if epoch_seconds is None:
+            return str(value)
+        return cls.from_epoch(epoch_seconds).strftime(fmt)
@@ -0,0 +1,238 @@
+# timeline/execution_timeline_widget.py
+"""
+Временная диаграмма (Ганта) выполнения алгоритма на pyqtgraph.
+
+Каждое действие - полоса от планового начала до планового окончания в своей строке,
+фактическое завершение - маркер (зелёный - в срок, красный - с опозданием), вертикальная
+линия "сейчас" сдвигается по таймеру без повторного запроса к БД.
+
+Геометрия строится векторно (NumPy): времена разбираются массивом datetime64, полосы
+группируются по статусу масками, и каждая группа - один BarGraphItem с общими пером и
+кистью, который pyqtgraph рисует одним вызовом drawRects. Поэтому выполнение из тысяч
+действий отрисовывается и прокручивается без задержек.
+"""
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+
+from notifications.deadline_evaluator import MISSING_TIME, to_epoch_array
+from time_service import TimeService, ZONE_LOCAL
+
+# Цвета статусов - как в StatusChangeDialog.qml
+STATUS_COLORS = {
+    "pending": "#3498db",
+    "in_progress": "#f39c12",
+    "completed": "#27ae60",
+    "skipped": "#e74c3c",
+}
+OTHER_STATUS_COLOR = "#95a5a6"
+ON_TIME_MARKER_COLOR = "#1e8449"
+LATE_MARKER_COLOR = "#c0392b"
+NOW_LINE_COLOR = "#e74c3c"
+
+# Высота полосы действия в долях строки
+BAR_HEIGHT = 0.7
+
+# Сколько строк показывать при открытии (остальные - прокруткой)
+INITIAL_VISIBLE_ROWS = 50
+
+# Период сдвига линии "сейчас", мс
+NOW_LINE_INTERVAL_MS = 1000
+
+# Длина подписи действия на оси строк и ширина этой оси, px
+ROW_LABEL_LENGTH = 40
+ROW_AXIS_WIDTH = 280
+
+
+def parse_epochs(values: list) -> np.ndarray:
+    """
+    Времена из БД (строки 'YYYY-MM-DD HH:MM:SS', datetime, None) -> массив int64 секунд
+    в шкале TimeService; не заданное время - MISSING_TIME.
+    """
+    try:
+        # Разбор всего столбца одним вызовом; None -> NaT, а NaT в int64 - это MISSING_TIME
+        return np.array(values, dtype="datetime64[s]").astype(np.int64)
+    except (ValueError, TypeError):
+        # Нестандартный формат хотя бы в одной строке - построчно через TimeService
+        return to_epoch_array([TimeService.to_epoch(value) for value in values])
+
+
+def timeline_geometry(actions: list) -> Dict[str, object]:
+    """
+    Геометрия диаграммы по списку действий (порядок строк = порядок списка).
+    :return: {
+        "bars": {статус: (строки, начала, окончания)} - только действия с заданным началом или окончанием,
+        "on_time": (строки, времена) и "late": (строки, времена) - маркеры фактического завершения,
+        "x_range": (мин, макс) или None, если времён нет
+    }
+    """
+    count = len(actions)
+    rows = np.arange(count, dtype=np.float64)
+    start = parse_epochs([action.get("calculated_start_time") for action in actions])
+    end = parse_epochs([action.get("calculated_end_time") for action in actions])
+    actual = parse_epochs([action.get("actual_end_time") for action in actions])
+    status = np.array([action.get("status") or "" for action in actions], dtype=object)
+
+    has_start = start != MISSING_TIME
+    has_end = end != MISSING_TIME
+    has_actual = actual != MISSING_TIME
+    # Действие без одной из границ рисуется отрезком нулевой длины
+    bar_start = np.where(has_start, start, end)
+    bar_end = np.where(has_end, end, start)
+    has_bar = has_start | has_end
+
+    bars = {}
+    other = has_bar.copy()
+    for status_key in STATUS_COLORS:
+        mask = has_bar & (status == status_key)
+        other &= ~mask
+        if mask.any():
+            bars[status_key] = (rows[mask], bar_start[mask], bar_end[mask])
+    if other.any():
+        bars[""] = (rows[other], bar_start[other], bar_end[other])
+
+    late = has_actual & has_end & (actual > end)
+    on_time = has_actual & ~late
+
+    times = np.concatenate((bar_start[has_bar], bar_end[has_bar], actual[has_actual]))
+    return {
+        "bars": bars,
+        "on_time": (rows[on_time], actual[on_time]),
+        "late": (rows[late], actual[late]),
+        "x_range": (int(times.min()), int(times.max())) if times.size else None,
+    }
+
+
+class ActionAxisItem(pg.AxisItem):
+    """Ось строк: вместо номера строки - номер и начало описания действия."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._labels: List[str] = []
+
+    def set_labels(self, labels: List[str]):
+        self._labels = labels
+        self.picture = None
+        self.update()
+
+    def tickStrings(self, values, scale, spacing):
+        strings = []
+        for value in values:
+            row = int(round(value))
+            if abs(value - row) < 1e-6 and 0 <= row < len(self._labels):
+                strings.append(self._labels[row])
+            else:
+                strings.append("")
+        return strings
+
+
+class ExecutionTimelineWidget(QWidget):
+    """
+    Окно временной диаграммы выполнения.
+    :param loader: execution_id -> (данные выполнения, список действий); вызывается при открытии
+                   и по кнопке "Обновить".
+    :param time_service: Источник текущего времени для линии "сейчас".
+    """
+
+    def __init__(self, execution_id: int, loader: Callable[[int], Optional[tuple]], time_service: TimeService):
+        super().__init__()
+        self.execution_id = execution_id
+        self._loader = loader
+        self._time_service = time_service
+        self._items = []
+
+        self.setWindowTitle("Временная диаграмма выполнения")
+        self.resize(1200, 700)
+
+        layout = QVBoxLayout(self)
+        header_layout = QHBoxLayout()
+        self.title_label = QLabel()
+        self.title_label.setStyleSheet("font-weight: bold;")
+        header_layout.addWidget(self.title_label, 1)
+        refresh_button = QPushButton("Обновить")
+        refresh_button.clicked.connect(self.reload)
+        header_layout.addWidget(refresh_button)
+        layout.addLayout(header_layout)
+
+        self.row_axis = ActionAxisItem(orientation="left")
+        # Подписи длиннее автоматической ширины оси pyqtgraph не выводит
+        self.row_axis.setWidth(ROW_AXIS_WIDTH)
+        self.plot_widget = pg.PlotWidget(
+            background="w",
+            axisItems={"bottom": pg.DateAxisItem(orientation="bottom", utcOffset=0), "left": self.row_axis},
+        )
+        self.plot_item = self.plot_widget.getPlotItem()
+        self.plot_item.invertY(True)
+        self.plot_item.showGrid(x=True, y=False, alpha=0.3)
+        self.plot_item.setMenuEnabled(False)
+        layout.addWidget(self.plot_widget, 1)
+
+        # Линия "сейчас": только сдвигается по таймеру, данные не перечитываются
+        self.now_line = pg.InfiniteLine(
+            angle=90, movable=False,
+            pen=pg.mkPen(NOW_LINE_COLOR, width=2, style=Qt.DashLine),
+            label="сейчас", labelOpts={"position": 0.02, "color": NOW_LINE_COLOR},
+        )
+        self.now_line.setZValue(10)
+        self.plot_item.addItem(self.now_line, ignoreBounds=True)
+        self._now_timer = QTimer(self)
+        self._now_timer.timeout.connect(self._update_now_line)
+        self._now_timer.start(NOW_LINE_INTERVAL_MS)
+        self._update_now_line()
+
+        self.reload()
+
+    def _update_now_line(self):
+        self.now_line.setValue(self._time_service.now_epoch(ZONE_LOCAL))
+
+    def reload(self):
+        """Перечитывает выполнение и его действия и перестраивает диаграмму."""
+        data = self._loader(self.execution_id)
+        if not data:
+            self.title_label.setText(f"Нет данных для выполнения ID {self.execution_id}")
+            self.set_actions([])
+            return
+        exec_data, actions = data
+        started_at = TimeService.format(exec_data.get("started_at"), "%d.%m.%Y %H:%M")
+        self.title_label.setText(f"{exec_data.get('snapshot_name') or 'Без названия'} — начало {started_at}, "
+                                 f"действий: {len(actions)}")
+        self.set_actions(actions)
+
+    def set_actions(self, actions: list):
+        for item in self._items:
+            self.plot_item.removeItem(item)
+        self._items = []
+
+        geometry = timeline_geometry(actions)
+        for status_key, (rows, starts, ends) in geometry["bars"].items():
+            bar = pg.BarGraphItem(
+                x0=starts, x1=ends, y0=rows - BAR_HEIGHT / 2, height=BAR_HEIGHT,
+                pen=pg.mkPen(None), brush=pg.mkBrush(STATUS_COLORS.get(status_key, OTHER_STATUS_COLOR)),
+            )
+            self._items.append(bar)
+        for key, color in (("on_time", ON_TIME_MARKER_COLOR), ("late", LATE_MARKER_COLOR)):
+            rows, times = geometry[key]
+            if rows.size:
+                self._items.append(pg.ScatterPlotItem(
+                    x=times, y=rows, symbol="d", size=9, pen=pg.mkPen(None), brush=pg.mkBrush(color),
+                ))
+        for item in self._items:
+            self.plot_item.addItem(item)
+
+        self.row_axis.set_labels([
+            f"{number}. {(action.get('snapshot_description') or '')[:ROW_LABEL_LENGTH]}"
+            for number, action in enumerate(actions, 1)
+        ])
+        count = len(actions)
+        self.plot_item.setLimits(yMin=-1, yMax=max(count, 1))
+        self.plot_item.setYRange(-0.5, min(count, INITIAL_VISIBLE_ROWS) - 0.5, padding=0)
+        if geometry["x_range"] is not None:
+            x_min, x_max = geometry["x_range"]
+            self.plot_item.setXRange(x_min, max(x_max, x_min + 60), padding=0.02)
+
+    def closeEvent(self, event):
+        self._now_timer.stop()
+        super().closeEvent(event)
@@ -171,11 +171,22 @@ Popup {
     function loadActionData() {
         if (actionDetailsDialog.executionId <= 0 || actionDetailsDialog.currentActionIndex < 0) return
 
-        var actions = appData.getActionExecutionsByExecutionId(actionDetailsDialog.executionId)
+        // Сводный список (без тяжёлых текстов) - для навигации; полные данные - только текущего действия
+        var actions = appData.getActionExecutionSummariesByExecutionId(actionDetailsDialog.executionId)
         if (!actions || actionDetailsDialog.currentActionIndex >= actions.length) return
 
-        var action = actions[actionDetailsDialog.currentActionIndex]
+        var summary = actions[actionDetailsDialog.currentActionIndex]
         actionDetailsDialog.totalActions = actions.length
+        var details = appData.getActionExecutionById(summary.id) || {}
+        var action = {
+            "id": summary.id,
+            "snapshot_description": summary.snapshot_description,
+            "calculated_start_time": summary.calculated_start_time,
+            "calculated_end_time": summary.calculated_end_time,
+            "status": details.status || summary.status,
+            "reported_to": details.reported_to !== undefined ? details.reported_to : summary.reported_to,
+            "snapshot_technical_text": details.snapshot_technical_text
+        }
 
         // Название
         var actionNum = actionDetailsDialog.currentActionIndex + 1
@@ -216,14 +227,11 @@ Popup {
         statusRectangle.color = statusColor
 
         // Отчётные материалы
+        // Материалы загружаются с ID, чтобы удаление не зависело от позиции в списке
         reportMaterialsModel.clear()
-        if (action.snapshot_report_materials) {
-            var materials = action.snapshot_report_materials.split('\n')
-            for (var i = 0; i < materials.length; i++) {
-                if (materials[i].trim()) {
-                    reportMaterialsModel.append({ "path": materials[i].trim() })
-                }
-            }
+        var materials = appData.getActionExecutionReportMaterials(action.id) || []
+        for (var i = 0; i < materials.length; i++) {
+            reportMaterialsModel.append({ "materialId": materials[i].id, "path": materials[i].file_path })
         }
 
         // Кому доложено
@@ -296,7 +304,7 @@ Popup {
     
     function getCurrentActionId() {
         if (actionDetailsDialog.executionId <= 0 || actionDetailsDialog.currentActionIndex < 0) return -1
-        var actions = appData.getActionExecutionsByExecutionId(actionDetailsDialog.executionId)
+        var actions = appData.getActionExecutionSummariesByExecutionId(actionDetailsDialog.executionId)
         if (actions && actionDetailsDialog.currentActionIndex < actions.length) {
             return actions[actionDetailsDialog.currentActionIndex].id || -1
         }
@@ -1552,14 +1560,10 @@ Popup {
                                     hoverEnabled: true
                                     cursorShape: Qt.PointingHandCursor
                                     onClicked: {
-                                        var matIndex = index;
-                                        var actionId = getCurrentActionId();
-                                        if (actionId > 0) {
-                                            var success = appData.deleteActionExecutionReportMaterial(actionId, matIndex);
-                                            if (success) {
-                                                // Перезагружаем материалы
-                                                loadActionData();
-                                            }
+                                        var success = appData.deleteActionExecutionReportMaterialById(model.materialId);
+                                        if (success) {
+                                            // Перезагружаем материалы
+                                            loadActionData();
                                         }
                                     }
                                 }
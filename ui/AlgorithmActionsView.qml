@@ -195,7 +195,7 @@ Item {
                                     onDoubleClicked: {
                                         actionsListView.currentIndex = index;
                                         // Убедитесь, что actionsModel определен в корне AlgorithmActionsView
-                                        var actionData = actionsModel.get(index); 
+                                        var actionData = algorithmActionsViewRoot.actionDetailsAt(index);
                                         algorithmActionsViewRoot.editActionRequested(actionData);
                                     }
                                 }
@@ -229,7 +229,7 @@ Item {
                 onClicked: {
                     var index = actionsListView.currentIndex;
                     if (index >= 0 && index < actionsModel.count) {
-                        var actionData = actionsModel.get(index);
+                        var actionData = algorithmActionsViewRoot.actionDetailsAt(index);
                         algorithmActionsViewRoot.editActionRequested(actionData);
                     }
                 }
@@ -283,7 +283,8 @@ Item {
         console.log("QML AlgorithmActionsView: === НАЧАЛО ЗАГРУЗКИ СПИСКА ДЕЙСТВИЙ ===");
         console.log("QML AlgorithmActionsView: 1. Запрос списка действий для алгоритма ID", currentAlgorithmId, "у Python...");
         
-        var actionsList = appData.getActionsByAlgorithmId(currentAlgorithmId);
+        // Сводный список: только описание и смещения; полные данные - actionDetailsAt при редактировании
+        var actionsList = appData.getActionSummariesByAlgorithmId(currentAlgorithmId);
         
         console.log("QML AlgorithmActionsView: 2. Получен список действий из Python (сырой):", JSON.stringify(actionsList).substring(0, 500));
 
@@ -361,12 +362,9 @@ Item {
                             "id": action["id"],
                             "algorithm_id": action["algorithm_id"],
                             "description": action["description"] || "",
-                            "technical_text": action["technical_text"] || "",
                             "start_offset": startOffsetValue, // Может быть строкой, null или undefined
-                            "end_offset": endOffsetValue,     // Может быть строкой, null или undefined
-                            "contact_phones": action["contact_phones"] || "",
-                            "report_materials": action["report_materials"] || ""
-                            // Добавьте другие поля, если они нужны для отображения в списке
+                            "end_offset": endOffsetValue      // Может быть строкой, null или undefined
+                            // Технический текст, телефоны и материалы в список не грузятся (см. actionDetailsAt)
                         });
                         // --- ---
                         
@@ -415,6 +413,29 @@ Item {
                 .trim();
     }
 
+    /**
+     * Полные данные действия строки index (для редактирования).
+     * Модель хранит только сводные поля, остальное читается из БД по ID.
+     */
+    function actionDetailsAt(index) {
+        var row = actionsModel.get(index);
+        var details = appData.getActionById(row.id);
+        return details ? details : row;
+    }
+
+    /**
+     * Сводные поля действия для модели списка (без тяжёлых текстов)
+     */
+    function actionSummary(actionData) {
+        return {
+            "id": actionData.id,
+            "algorithm_id": actionData.algorithm_id,
+            "description": actionData.description || "",
+            "start_offset": actionData.start_offset !== undefined && actionData.start_offset !== null ? String(actionData.start_offset) : "",
+            "end_offset": actionData.end_offset !== undefined && actionData.end_offset !== null ? String(actionData.end_offset) : ""
+        };
+    }
+
     /**
      * Обновляет или добавляет действие в модель
      */
@@ -428,14 +449,14 @@ Item {
         for (var i = 0; i < actionsModel.count; i++) {
             if (actionsModel.get(i).id === actionData.id) {
                 // Обновляем существующий
-                actionsModel.set(i, actionData);
+                actionsModel.set(i, actionSummary(actionData));
                 console.log("QML AlgorithmActionsView: Действие ID", actionData.id, "обновлено в модели.");
                 return;
             }
         }
         // Добавляем новый (если он принадлежит текущему алгоритму)
         if (actionData.algorithm_id === currentAlgorithmId) {
-            actionsModel.append(actionData);
+            actionsModel.append(actionSummary(actionData));
             console.log("QML AlgorithmActionsView: Новое действие ID", actionData.id, "добавлено в модель.");
         } else {
              console.log("QML AlgorithmActionsView: Новое действие ID", actionData.id, "не добавлено в модель, так как принадлежит другому алгоритму (", actionData.algorithm_id, ").");
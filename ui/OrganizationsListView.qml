@@ -9,6 +9,10 @@ Item {
     // --- Свойства ---
     property int currentIndex: -1
     property var organizationDataList: [] // Кэш данных для быстрого доступа
+    // Постраничная загрузка (keyset): ключ последней загруженной организации
+    property string pageNextKey: ""
+    property int pageNextId: 0
+    property bool pageHasMore: false
 
     // --- Функция для получения данных организации по индексу ---
     function getOrganizationData(index) {
@@ -18,23 +22,39 @@ Item {
         return null
     }
 
-    // --- Функция загрузки списка организаций ---
+    // --- Функция загрузки списка организаций (первая страница, остальные - fetchMore) ---
     function loadOrganizations() {
         console.log("QML OrganizationsListView: === НАЧАЛО ЗАГРУЗКИ ===")
-        var orgs = appData.getAllOrganizations()
-        console.log("QML OrganizationsListView: Получено от appData:", orgs)
-        console.log("QML OrganizationsListView: orgs.length:", orgs ? orgs.length : "N/A")
-        console.log("QML OrganizationsListView: orgs.hasOwnProperty('length'):", orgs ? orgs.hasOwnProperty('length') : "N/A")
-        
         organizationDataList = []
         organizationsListModel.clear()
-        
+        pageNextKey = ""
+        pageNextId = 0
+        pageHasMore = true
+        currentIndex = -1
+        fetchMore()
+    }
+
+    // --- Есть ли ещё не загруженные страницы ---
+    function canFetchMore() {
+        return pageHasMore
+    }
+
+    // --- Загрузка следующей страницы после последней загруженной организации ---
+    function fetchMore() {
+        if (!canFetchMore()) {
+            return
+        }
+        var page = appData.getOrganizationsPage(pageNextKey, pageNextId)
+        if (page && typeof page === 'object' && page.hasOwnProperty('toVariant')) {
+            page = page.toVariant()
+        }
+        var orgs = page ? page.items : null
+
         // Qt 6: Array.isArray может возвращать false для списков из Python
         // Проверяем по длине или по наличию свойства length
         if (orgs && orgs.length !== undefined) {
             for (var i = 0; i < orgs.length; i++) {
                 var org = orgs[i]
-                console.log("QML OrganizationsListView: org[", i, "] =", org)
                 organizationsListModel.append({
                     "id": org.id || -1,
                     "name": org.name || "",
@@ -44,11 +64,19 @@ Item {
                 })
                 organizationDataList.push(org)
             }
-            console.log("QML OrganizationsListView: Загружено", organizationsListModel.count, "организаций.")
+            pageNextKey = page.next_key || ""
+            pageNextId = page.next_id || 0
+            pageHasMore = page.has_more === true
+            console.log("QML OrganizationsListView: Загружено", organizationsListModel.count, "организаций, есть ещё:", pageHasMore)
         } else {
-            console.log("QML OrganizationsListView: orgs пуст или не имеет свойства length!")
+            console.log("QML OrganizationsListView: страница организаций пуста или не имеет свойства length!")
+            pageHasMore = false
+        }
+
+        // Если страница не заполнила список, прокрутки не будет - догружаем сразу
+        if (pageHasMore && organizationsListView.atYEnd) {
+            Qt.callLater(fetchMore)
         }
-        currentIndex = -1
     }
 
     // --- События (сигналы) ---
@@ -74,6 +102,12 @@ Item {
 
         ListView {
             id: organizationsListView
+            // Следующая страница - при прокрутке до конца списка
+            onAtYEndChanged: {
+                if (atYEnd && organizationsListViewRoot.canFetchMore()) {
+                    organizationsListViewRoot.fetchMore()
+                }
+            }
             width: Math.max(parent.width, organizationsListViewRoot.width)
             model: ListModel { id: organizationsListModel }
             delegate: Rectangle {
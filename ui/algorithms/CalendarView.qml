@@ -2,6 +2,7 @@
 import QtQuick 6.5
 import QtQuick.Controls 6.5
 import QtQuick.Layouts 6.5
+import QtQuick.Dialogs 6.5 // Для FileDialog / FolderDialog выгрузки отчётов
 
 Item {
     id: calendarViewRoot
@@ -9,6 +10,15 @@ Item {
     // --- Свойства ---
     property date selectedDate: new Date() // Текущая дата по умолчанию
     property string selectedDateString: Qt.formatDate(selectedDate, "dd.MM.yyyy") // Форматированная строка даты
+    property bool docxExportMonth: false // Журнал DOCX: false - за выбранный день, true - за его месяц
+    property string daySummaryText: "" // Итоги выбранного дня (из суточной статистики выполнений)
+    // --- ---
+
+    // --- Постраничная загрузка (keyset): ключ последней загруженной строки ---
+    property string pageDateString: "" // Дата ('YYYY-MM-DD'), для которой загружаются страницы
+    property string pageNextKey: ""
+    property int pageNextId: 0
+    property bool pageHasMore: false
     // --- ---
 
     // --- Сигналы ---
@@ -50,6 +60,11 @@ Item {
             font.pointSize: 12
             font.bold: true
         }
+        Label {
+            text: calendarViewRoot.daySummaryText
+            visible: text !== ""
+            color: "#555555"
+        }
         // --- ---
 
         // --- Список выполненных алгоритмов за выбранную дату ---
@@ -71,6 +86,12 @@ Item {
                         model: ListModel {
                             id: executionsModel
                         }
+                        // Следующая страница - при прокрутке до конца списка
+                        onAtYEndChanged: {
+                            if (atYEnd && calendarViewRoot.canFetchMore()) {
+                                calendarViewRoot.fetchMore();
+                            }
+                        }
                         delegate: Rectangle {
                             width: ListView.view.width
                             height: 60
@@ -160,8 +181,8 @@ Item {
                             var index = executionsListView.currentIndex;
                             if (index !== -1) {
                                 var executionId = executionsModel.get(index).id;
-                                // TODO: Печать отчета
                                 console.log("QML CalendarView: Запрошено печать отчета по execution'у ID", executionId);
+                                appData.printExecutionDetails(executionId);
                             }
                         }
                     }
@@ -171,67 +192,245 @@ Item {
                     }
                 }
                 // --- ---
+
+                // --- Выгрузка отчётов за день в PDF (в фоновом потоке) ---
+                RowLayout {
+                    Layout.fillWidth: true
+                    spacing: 10
+
+                    Button {
+                        text: "Отчёты за день в PDF"
+                        enabled: !appData.reportExportRunning && executionsModel.count > 0
+                        onClicked: {
+                            if (singleFileCheckBox.checked) {
+                                reportFileDialog.open();
+                            } else {
+                                reportFolderDialog.open();
+                            }
+                        }
+                    }
+
+                    CheckBox {
+                        id: singleFileCheckBox
+                        text: "Одним файлом"
+                        checked: true
+                        enabled: !appData.reportExportRunning
+                    }
+
+                    Button {
+                        text: "Журнал за день в DOCX"
+                        enabled: !appData.reportExportRunning && executionsModel.count > 0
+                        onClicked: {
+                            calendarViewRoot.docxExportMonth = false;
+                            docxFileDialog.open();
+                        }
+                    }
+
+                    Button {
+                        text: "Журнал за месяц в DOCX"
+                        enabled: !appData.reportExportRunning
+                        onClicked: {
+                            calendarViewRoot.docxExportMonth = true;
+                            docxFileDialog.open();
+                        }
+                    }
+
+                    ProgressBar {
+                        id: reportExportProgressBar
+                        Layout.fillWidth: true
+                        visible: appData.reportExportRunning
+                        from: 0
+                        to: 1
+                        value: 0
+                    }
+
+                    Button {
+                        text: "Отмена"
+                        visible: appData.reportExportRunning
+                        onClicked: appData.cancelReportExport()
+                    }
+
+                    Label {
+                        id: reportExportStatusLabel
+                        Layout.fillWidth: true
+                        visible: !appData.reportExportRunning && text !== ""
+                        elide: Text.ElideRight
+                    }
+                }
+                // --- ---
             }
         }
         // --- ---
     }
 
+    // --- Диалоги выбора места сохранения отчётов ---
+    FileDialog {
+        id: reportFileDialog
+        title: "Сохранить отчёты за " + calendarViewRoot.selectedDateString
+        fileMode: FileDialog.SaveFile
+        nameFilters: ["PDF (*.pdf)"]
+        defaultSuffix: "pdf"
+        onAccepted: calendarViewRoot.exportDayReports(selectedFile.toString(), true)
+    }
+
+    FileDialog {
+        id: docxFileDialog
+        title: calendarViewRoot.docxExportMonth
+               ? "Сохранить журнал действий за " + Qt.formatDate(calendarViewRoot.selectedDate, "MM.yyyy")
+               : "Сохранить журнал действий за " + calendarViewRoot.selectedDateString
+        fileMode: FileDialog.SaveFile
+        nameFilters: ["Документ Word (*.docx)"]
+        defaultSuffix: "docx"
+        onAccepted: calendarViewRoot.exportActionLog(selectedFile.toString(), calendarViewRoot.docxExportMonth)
+    }
+
+    FolderDialog {
+        id: reportFolderDialog
+        title: "Каталог для отчётов за " + calendarViewRoot.selectedDateString
+        onAccepted: calendarViewRoot.exportDayReports(selectedFolder.toString(), false)
+    }
+
+    Connections {
+        target: appData
+        function onReportExportProgress(done, total) {
+            reportExportProgressBar.value = total > 0 ? done / total : 0;
+        }
+        function onReportExportFinished(success, message) {
+            console.log("QML CalendarView: Выгрузка отчётов завершена:", success, message);
+            reportExportStatusLabel.text = message;
+        }
+    }
+    // --- ---
+
+    /**
+     * Запускает фоновую выгрузку отчётов по всем выполнениям выбранной даты.
+     * @param {string} outputUrl - URL файла (singleFile) или каталога
+     * @param {bool} singleFile - true - один PDF, false - файл на каждое выполнение
+     */
+    function exportDayReports(outputUrl, singleFile) {
+        var dateString = Qt.formatDate(calendarViewRoot.selectedDate, "yyyy-MM-dd");
+        console.log("QML CalendarView: Выгрузка отчётов за", dateString, "в", outputUrl);
+        reportExportProgressBar.value = 0;
+        reportExportStatusLabel.text = "";
+        appData.exportDayReportsToPdf(dateString, outputUrl, singleFile);
+    }
+
+    /**
+     * Запускает фоновую выгрузку журнала действий в DOCX за выбранный день или его месяц.
+     * @param {string} outputUrl - URL файла
+     * @param {bool} wholeMonth - true - за весь месяц выбранной даты
+     */
+    function exportActionLog(outputUrl, wholeMonth) {
+        var date = calendarViewRoot.selectedDate;
+        var start = wholeMonth ? new Date(date.getFullYear(), date.getMonth(), 1)
+                               : new Date(date.getFullYear(), date.getMonth(), date.getDate());
+        var end = wholeMonth ? new Date(date.getFullYear(), date.getMonth() + 1, 1)
+                             : new Date(date.getFullYear(), date.getMonth(), date.getDate() + 1);
+        var startString = Qt.formatDate(start, "yyyy-MM-dd");
+        var endString = Qt.formatDate(end, "yyyy-MM-dd");
+        console.log("QML CalendarView: Выгрузка журнала действий за", startString, "-", endString, "в", outputUrl);
+        reportExportProgressBar.value = 0;
+        reportExportStatusLabel.text = "";
+        appData.exportPeriodLogToDocx(startString, endString, outputUrl);
+    }
+
     /**
-     * Загружает список выполненных алгоритмов (executions) за заданную дату из Python
+     * Загружает список выполненных алгоритмов (executions) за заданную дату из Python.
+     * Загружается первая страница, остальные - по мере прокрутки (fetchMore).
      * @param {string} dateString - Дата в формате 'YYYY-MM-DD'
      */
     function loadExecutionsForDate(dateString) {
         console.log("QML CalendarView: Запрос списка execution'ов за дату", dateString, "у Python...");
-        var executionsList = appData.getExecutionsByDate(dateString);
-        console.log("QML CalendarView: Получен список execution'ов из Python (сырой):", JSON.stringify(executionsList).substring(0, 500));
+        executionsModel.clear();
+        executionsListView.currentIndex = -1;
+        pageDateString = dateString;
+        pageNextKey = "";
+        pageNextId = 0;
+        pageHasMore = true;
+        fetchMore();
+        loadDaySummary(dateString);
+    }
 
-        // Преобразование QJSValue/QVariant в массив JS
-        if (executionsList && typeof executionsList === 'object' && executionsList.hasOwnProperty('toVariant')) {
-            executionsList = executionsList.toVariant();
-            console.log("QML CalendarView: QJSValue (executionsList) преобразован в:", JSON.stringify(executionsList).substring(0, 500));
+    /**
+     * Загружает итоги дня из суточной статистики выполнений (без чтения действий)
+     * @param {string} dateString - Дата в формате 'YYYY-MM-DD'
+     */
+    function loadDaySummary(dateString) {
+        var nextDay = new Date(dateString + "T00:00:00");
+        nextDay.setDate(nextDay.getDate() + 1);
+        var days = appData.getDailyExecutionStats(dateString, Qt.formatDate(nextDay, "yyyy-MM-dd"), "");
+        if (days && typeof days === 'object' && days.hasOwnProperty('toVariant')) {
+            days = days.toVariant();
+        }
+        if (!days || days.length === undefined || days.length === 0) {
+            daySummaryText = "Выполнений нет";
+            return;
         }
+        var day = days[0];
+        daySummaryText = "Выполнений: " + day.executions + " (завершено " + day.completed_executions + ")"
+                + ", действий: " + day.total + ", в срок: " + day.on_time + ", с опозданием: " + day.late
+                + ", пропущено: " + day.skipped;
+    }
 
-        // Очищаем текущую модель
-        executionsModel.clear();
-        console.log("QML CalendarView: Модель ListView execution'ов очищена.");
+    /**
+     * Есть ли ещё не загруженные страницы для текущей даты
+     */
+    function canFetchMore() {
+        return pageHasMore && pageDateString !== "";
+    }
 
-        // --- Более гибкая проверка на "массивоподобность" ---
-        if (executionsList && typeof executionsList === 'object' && executionsList.length !== undefined) {
-        // --- ---
-            var count = executionsList.length;
-            console.log("QML CalendarView: Полученный список execution'ов является массивоподобным. Количество элементов:", count);
-            
-            for (var i = 0; i < count; i++) {
-                var execution = executionsList[i];
-                console.log("QML CalendarView: Обрабатываем execution", i, ":", JSON.stringify(execution).substring(0, 200));
-                
-                if (typeof execution === 'object' && execution !== null) {
-                    try {
-                        executionsModel.append({
-                            "id": execution["id"],
-                            "algorithm_id": execution["algorithm_id"],
-                            "algorithm_name": execution["algorithm_name"] || "",
-                            "started_at": execution["started_at"] || "",
-                            "started_at_display": execution["started_at_display"] || "", // Форматированное время начала
-                            "completed_at": execution["completed_at"] || "",
-                            "completed_at_display": execution["completed_at_display"] || "", // Форматированное время окончания
-                            "status": execution["status"] || "unknown",
-                            "created_by_user_id": execution["created_by_user_id"] || null,
-                            "created_by_user_display_name": execution["created_by_user_display_name"] || "Неизвестен"
-                            // Добавьте другие поля, если они нужны для отображения в списке
-                        });
-                        console.log("QML CalendarView: Execution", i, "добавлен в модель.");
-                    } catch (e) {
-                        console.error("QML CalendarView: Ошибка при добавлении execution", i, "в модель:", e.toString(), "Данные:", JSON.stringify(execution));
-                    }
-                } else {
-                    console.warn("QML CalendarView: Execution", i, "не является корректным объектом:", typeof execution, execution);
+    /**
+     * Загружает следующую страницу execution'ов после последней загруженной строки
+     */
+    function fetchMore() {
+        if (!canFetchMore()) {
+            return;
+        }
+        var page = appData.getExecutionsByDatePage(pageDateString, pageNextKey, pageNextId);
+        // Преобразование QJSValue/QVariant в объект JS
+        if (page && typeof page === 'object' && page.hasOwnProperty('toVariant')) {
+            page = page.toVariant();
+        }
+        if (!page || !page.items || page.items.length === undefined) {
+            console.error("QML CalendarView: Python не вернул корректную страницу execution'ов:", JSON.stringify(page));
+            pageHasMore = false;
+            return;
+        }
+
+        var executionsList = page.items;
+        for (var i = 0; i < executionsList.length; i++) {
+            var execution = executionsList[i];
+            if (typeof execution === 'object' && execution !== null) {
+                try {
+                    executionsModel.append({
+                        "id": execution["id"],
+                        "algorithm_id": execution["algorithm_id"],
+                        "algorithm_name": execution["algorithm_name"] || "",
+                        "started_at": execution["started_at"] || "",
+                        "started_at_display": execution["started_at_display"] || "", // Форматированное время начала
+                        "completed_at": execution["completed_at"] || "",
+                        "completed_at_display": execution["completed_at_display"] || "", // Форматированное время окончания
+                        "status": execution["status"] || "unknown",
+                        "created_by_user_id": execution["created_by_user_id"] || null,
+                        "created_by_user_display_name": execution["created_by_user_display_name"] || "Неизвестен"
+                        // Добавьте другие поля, если они нужны для отображения в списке
+                    });
+                } catch (e) {
+                    console.error("QML CalendarView: Ошибка при добавлении execution", i, "в модель:", e.toString(), "Данные:", JSON.stringify(execution));
                 }
+            } else {
+                console.warn("QML CalendarView: Execution", i, "не является корректным объектом:", typeof execution, execution);
             }
-        } else {
-            console.error("QML CalendarView: Python не вернул корректный массивоподобный объект для execution'ов. Получен тип:", typeof executionsList, "Значение:", executionsList);
         }
-        console.log("QML CalendarView: Модель ListView execution'ов обновлена. Элементов:", executionsModel.count);
+        pageNextKey = page.next_key || "";
+        pageNextId = page.next_id || 0;
+        pageHasMore = page.has_more === true;
+        console.log("QML CalendarView: Загружена страница execution'ов. Элементов в модели:", executionsModel.count, "есть ещё:", pageHasMore);
+
+        // Если страница не заполнила список, прокрутки не будет - догружаем сразу
+        if (pageHasMore && executionsListView.atYEnd) {
+            Qt.callLater(fetchMore);
+        }
     }
 
     Component.onCompleted: {
@@ -315,6 +315,22 @@ Window {
                 }
             }
 
+            Button {
+                text: "Диаграмма Ганта"
+                font.family: appData.fontFamily
+                font.pixelSize: appData.fontSize
+                font.bold: executionDetailsWindow.isFontBold(appData.fontStyle)
+                font.italic: executionDetailsWindow.isFontItalic(appData.fontStyle)
+                onClicked: {
+                    if (executionId <= 0) {
+                        showInfoMessage("Неверный ID выполнения");
+                        return;
+                    }
+                    // Окно pyqtgraph: полосы плановых интервалов, маркеры завершения и линия "сейчас"
+                    appData.showExecutionTimeline(executionId);
+                }
+            }
+
             Item { Layout.fillWidth: true }
 
             Button {
@@ -14,6 +14,10 @@ Item {
     property string categoryFilter: "" // Фильтр по категории алгоритмов
     property string selectedHistoryDate: appData.localDate // <-- НОВОЕ: Выбранная дата для истории (по умолчанию местная дата)
     property bool isHistoryExpanded: false // <-- НОВОЕ: Состояние свёрнутости/развёрнутости истории
+    // Постраничная загрузка истории (keyset): ключ последней загруженной строки
+    property string completedNextKey: ""
+    property int completedNextId: 0
+    property bool completedHasMore: false
     // --- ---
 
     // --- Сигналы ---
@@ -132,6 +136,15 @@ Item {
                             elide: Text.ElideRight
                         }
 
+                        // Незавершённые и просроченные действия (из очереди активных действий)
+                        Text {
+                            Layout.fillWidth: true
+                            text: "Действий: " + (model.live_actions_count || 0) + ", просрочено: " + (model.overdue_actions_count || 0)
+                            color: model.overdue_actions_count > 0 ? "#e74c3c" : "gray"
+                            font.pixelSize: (Window.window && Window.window.scaleFactor ? Window.window.scaleFactor : 1) * 10
+                            elide: Text.ElideRight
+                        }
+
                         // Статус и время (в одной строке)
                         RowLayout {
                             Layout.fillWidth: true
@@ -502,6 +515,17 @@ Item {
                 id: completedExecutionsListView
                 model: completedExecutionsModel
                 spacing: 8 // Небольшой отступ между элементами
+                // Следующая страница истории - при прокрутке до конца списка (или раскрытии истории)
+                onAtYEndChanged: {
+                    if (atYEnd && visible && runningAlgorithmsViewRoot.canFetchMore()) {
+                        runningAlgorithmsViewRoot.fetchMore();
+                    }
+                }
+                onVisibleChanged: {
+                    if (atYEnd && visible && runningAlgorithmsViewRoot.canFetchMore()) {
+                        runningAlgorithmsViewRoot.fetchMore();
+                    }
+                }
                 delegate: Rectangle {
                     width: ListView.view.width
                     height: completedContentColumn.implicitHeight + 2 * padding // Высота зависит от содержимого
@@ -669,78 +693,91 @@ Item {
     }
 
     /**
-     * Загружает список завершённых алгоритмов для заданной категории и даты
+     * Загружает список завершённых алгоритмов для заданной категории и даты.
+     * Загружается первая страница, остальные - по мере прокрутки (fetchMore).
      */
     function loadCompletedExecutions() {
+        completedExecutionsModel.clear();
+        completedNextKey = "";
+        completedNextId = 0;
+        completedHasMore = false;
         if (!categoryFilter || categoryFilter === "") {
             console.warn("QML RunningAlgorithmsView: categoryFilter не задан для загрузки завершённых, пропускаем.");
-            completedExecutionsModel.clear();
             return;
         }
         if (!selectedHistoryDate || selectedHistoryDate === "") {
              console.warn("QML RunningAlgorithmsView: selectedHistoryDate не задана для загрузки завершённых, пропускаем.");
-             completedExecutionsModel.clear();
              return;
         }
 
         console.log("QML RunningAlgorithmsView: Запрос списка завершённых executions для категории:", categoryFilter, "и даты:", selectedHistoryDate);
-        // Предполагаем, что в ApplicationData есть метод getCompletedExecutionsByCategoryAndDate
-        // который возвращает список завершённых execution'ов за конкретную дату.
-        var completedList = appData.getCompletedExecutionsByCategoryAndDate(categoryFilter, selectedHistoryDate);
-        console.log("QML RunningAlgorithmsView: Получен список завершённых executions из Python (сырой):", JSON.stringify(completedList).substring(0, 500));
-
-        // Преобразование QJSValue/QVariant в массив JS
-        if (completedList && typeof completedList === 'object' && typeof completedList.hasOwnProperty === 'function' && completedList.hasOwnProperty('toVariant')) {
-            console.log("QML RunningAlgorithmsView: Обнаружен QJSValue, преобразование в JS-объект...");
-            completedList = completedList.toVariant();
-            console.log("QML RunningAlgorithmsView: QJSValue (completedList) преобразован в:", JSON.stringify(completedList).substring(0, 500));
-        } else {
-            console.log("QML RunningAlgorithmsView: Преобразование QJSValue не требуется.");
-        }
+        completedHasMore = true;
+        fetchMore();
+    }
 
-        // Очистка модели
-        console.log("QML RunningAlgorithmsView: Очистка модели ListView завершённых executions...");
-        completedExecutionsModel.clear();
+    /**
+     * Есть ли ещё не загруженные страницы завершённых алгоритмов
+     */
+    function canFetchMore() {
+        return completedHasMore;
+    }
 
-        // Заполнение модели
-        if (completedList && typeof completedList === 'object' && completedList.length !== undefined) {
-            var count = completedList.length;
-            console.log("QML RunningAlgorithmsView: Полученный список завершённых является массивоподобным. Количество элементов:", count);
+    /**
+     * Загружает следующую страницу завершённых алгоритмов после последней загруженной строки
+     */
+    function fetchMore() {
+        if (!canFetchMore()) {
+            return;
+        }
+        var page = appData.getCompletedExecutionsByCategoryAndDatePage(categoryFilter, selectedHistoryDate, completedNextKey, completedNextId);
 
-            for (var i = 0; i < count; i++) {
-                var execution = completedList[i];
-                console.log("QML RunningAlgorithmsView: Обрабатываем завершённый execution", i, ":", JSON.stringify(execution).substring(0, 200));
+        // Преобразование QJSValue/QVariant в объект JS
+        if (page && typeof page === 'object' && typeof page.hasOwnProperty === 'function' && page.hasOwnProperty('toVariant')) {
+            page = page.toVariant();
+        }
+        if (!page || !page.items || page.items.length === undefined) {
+            console.error("QML RunningAlgorithmsView: Python не вернул корректную страницу завершённых executions:", JSON.stringify(page));
+            completedHasMore = false;
+            return;
+        }
 
-                if (typeof execution === 'object' && execution !== null) {
-                    try {
-                        // --- Явное копирование свойств ---
-                        var executionCopy = {
-                            "id": execution["id"],
-                            "algorithm_id": execution["algorithm_id"],
-                            "algorithm_name": execution["algorithm_name"] || "",
-                            "category": execution["category"] || "",
-                            "started_at": execution["started_at"] || "",
-                            "started_at_display": execution["started_at_display"] || "", // <-- НОВОЕ: Отформатированное время начала
-                            "completed_at": execution["completed_at"] || "",
-                            "completed_at_display": execution["completed_at_display"] || "", // <-- НОВОЕ: Отформатированное время окончания
-                            "status": execution["status"] || "unknown",
-                            "created_by_user_id": execution["created_by_user_id"] || null,
-                            "created_by_user_display_name": execution["created_by_user_display_name"] || "Неизвестен"
-                        };
-                        // --- ---
-                        completedExecutionsModel.append(executionCopy);
-                        console.log("QML RunningAlgorithmsView: Завершённый execution", i, "добавлен в модель.");
-                    } catch (e_append) {
-                        console.error("QML RunningAlgorithmsView: Ошибка при добавлении завершённого execution", i, "в модель:", e_append.toString(), "Данные:", JSON.stringify(execution));
-                    }
-                } else {
-                    console.warn("QML RunningAlgorithmsView: Завершённый execution", i, "не является корректным объектом:", typeof execution, execution);
+        var completedList = page.items;
+        for (var i = 0; i < completedList.length; i++) {
+            var execution = completedList[i];
+            if (typeof execution === 'object' && execution !== null) {
+                try {
+                    // --- Явное копирование свойств ---
+                    var executionCopy = {
+                        "id": execution["id"],
+                        "algorithm_id": execution["algorithm_id"],
+                        "algorithm_name": execution["algorithm_name"] || "",
+                        "category": execution["category"] || "",
+                        "started_at": execution["started_at"] || "",
+                        "started_at_display": execution["started_at_display"] || "", // <-- НОВОЕ: Отформатированное время начала
+                        "completed_at": execution["completed_at"] || "",
+                        "completed_at_display": execution["completed_at_display"] || "", // <-- НОВОЕ: Отформатированное время окончания
+                        "status": execution["status"] || "unknown",
+                        "created_by_user_id": execution["created_by_user_id"] || null,
+                        "created_by_user_display_name": execution["created_by_user_display_name"] || "Неизвестен"
+                    };
+                    // --- ---
+                    completedExecutionsModel.append(executionCopy);
+                } catch (e_append) {
+                    console.error("QML RunningAlgorithmsView: Ошибка при добавлении завершённого execution", i, "в модель:", e_append.toString(), "Данные:", JSON.stringify(execution));
                 }
+            } else {
+                console.warn("QML RunningAlgorithmsView: Завершённый execution", i, "не является корректным объектом:", typeof execution, execution);
             }
-        } else {
-            console.error("QML RunningAlgorithmsView: Python не вернул корректный массивоподобный объект для завершённых executions. Получен тип:", typeof completedList, "Значение:", completedList);
         }
-        console.log("QML RunningAlgorithmsView: Модель ListView завершённых executions обновлена. Элементов:", completedExecutionsModel.count);
+        completedNextKey = page.next_key || "";
+        completedNextId = page.next_id || 0;
+        completedHasMore = page.has_more === true;
+        console.log("QML RunningAlgorithmsView: Загружена страница завершённых executions. Элементов в модели:", completedExecutionsModel.count, "есть ещё:", completedHasMore);
+
+        // Если страница не заполнила видимый список, прокрутки не будет - догружаем сразу
+        if (completedHasMore && completedExecutionsListView.visible && completedExecutionsListView.atYEnd) {
+            Qt.callLater(fetchMore);
+        }
     }
 
     /**
@@ -797,7 +834,9 @@ Item {
                             "completed_at": execution["completed_at"] || "",
                             "status": execution["status"] || "unknown",
                             "created_by_user_id": execution["created_by_user_id"] || null,
-                            "created_by_user_display_name": execution["created_by_user_display_name"] || "Неизвестен"
+                            "created_by_user_display_name": execution["created_by_user_display_name"] || "Неизвестен",
+                            "live_actions_count": execution["live_actions_count"] || 0,
+                            "overdue_actions_count": execution["overdue_actions_count"] || 0
                         };
                         executionsModel.append(executionCopy);
                         console.log("QML RunningAlgorithmsView: Execution", i, "добавлен в модель.");